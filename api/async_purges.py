@@ -0,0 +1,21 @@
+# api/async_purges.py
+"""async-вариант api/purges.py (ASYNC_DB=true)."""
+
+from fastapi import APIRouter, Depends, HTTPException
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from db.async_database import get_async_db
+from domain.messages import Messages
+from domain.schemas import PurgeJob
+from services.purge import PurgeService
+
+router = APIRouter()  # префикс и теги задаются в main.py
+
+
+@router.get("/{job_id}", response_model=PurgeJob)
+async def get_purge(job_id: int, db: AsyncSession = Depends(get_async_db)):
+    """Progress of a background deletion."""
+    job = await db.run_sync(lambda session: PurgeService(session).get(job_id))
+    if job is None:
+        raise HTTPException(status_code=404, detail=Messages.PURGE_JOB_NOT_FOUND.value)
+    return job
@@ -0,0 +1,109 @@
+# api/async_questions.py
+"""async-вариант api/questions.py (ASYNC_DB=true)."""
+
+from fastapi import APIRouter, Depends, HTTPException, Query, Response
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import List, Optional
+
+from api.codec import core_list, rows_response, tuples_response
+from api.pagination import AFTER_QUERY, OFFSET_QUERY, paginate_async
+from db.async_database import get_async_db
+from domain.messages import Messages
+from domain.schemas import Question, QuestionCreate, QuestionUpdate
+from repositories.question import AsyncQuestionRepository
+from services.question import AsyncQuestionService
+from services.version import VersionPublishedError
+
+router = APIRouter()  # префикс и теги задаются в main.py
+
+
+@router.get("/", response_model=List[Question])
+async def list_questions(
+    response: Response,
+    db: AsyncSession = Depends(get_async_db),
+    version_id: Optional[int] = Query(None, description="Фильтр по версии"),
+    number: Optional[str] = Query(None, description="Фильтр по номеру (1.1 и т.п.)"),
+    limit: int = Query(100, ge=1, le=1000),
+    after: Optional[str] = AFTER_QUERY,
+    offset: int = OFFSET_QUERY,
+):
+    """Questions ordered by id; the next page cursor is in X-Next-Cursor."""
+    core = core_list("questions")
+    source = AsyncQuestionRepository(db)
+    rows = await paginate_async(
+        response,
+        source.rows_page if core else source.page,
+        after,
+        offset,
+        version_id=version_id,
+        number=number,
+        limit=limit,
+    )
+    if core:
+        return tuples_response(rows, Question, response)
+    return rows_response(rows, Question, response)
+
+
+@router.post("/", response_model=Question)
+async def create_question(
+    question: QuestionCreate, db: AsyncSession = Depends(get_async_db)
+) -> Question:
+    """Create a new survey question."""
+    try:
+        return await AsyncQuestionService(db).create(question)
+    except ValueError as e:
+        raise HTTPException(status_code=422, detail=str(e))
+    except VersionPublishedError:
+        raise HTTPException(status_code=409, detail=Messages.VERSION_PUBLISHED.value)
+    except IntegrityError:
+        # номер уже занят в версии (uq_questions_version_number)
+        raise HTTPException(
+            status_code=409, detail=Messages.QUESTION_ALREADY_EXISTS.value
+        )
+
+
+@router.get("/{question_id}", response_model=Question)
+async def get_question(
+    question_id: int, db: AsyncSession = Depends(get_async_db)
+) -> Question:
+    """Retrieve a specific question by ID."""
+    question = await AsyncQuestionService(db).get(question_id)
+    if not question:
+        raise HTTPException(status_code=404, detail=Messages.QUESTION_NOT_FOUND.value)
+    return question
+
+
+@router.put("/{question_id}", response_model=Question)
+async def update_question(
+    question_id: int, question: QuestionUpdate, db: AsyncSession = Depends(get_async_db)
+) -> Question:
+    """Update an existing question."""
+    try:
+        updated = await AsyncQuestionService(db).update(question_id, question)
+    except ValueError as e:
+        raise HTTPException(status_code=422, detail=str(e))
+    except VersionPublishedError:
+        raise HTTPException(status_code=409, detail=Messages.VERSION_PUBLISHED.value)
+    except IntegrityError:
+        # номер уже занят в версии (uq_questions_version_number)
+        raise HTTPException(
+            status_code=409, detail=Messages.QUESTION_ALREADY_EXISTS.value
+        )
+    if not updated:
+        raise HTTPException(status_code=404, detail=Messages.QUESTION_NOT_FOUND.value)
+    return updated
+
+
+@router.delete("/{question_id}", response_model=bool)
+async def delete_question(
+    question_id: int, db: AsyncSession = Depends(get_async_db)
+) -> bool:
+    """Delete a question by ID."""
+    try:
+        deleted = await AsyncQuestionService(db).delete(question_id)
+    except VersionPublishedError:
+        raise HTTPException(status_code=409, detail=Messages.VERSION_PUBLISHED.value)
+    if not deleted:
+        raise HTTPException(status_code=404, detail=Messages.QUESTION_NOT_FOUND.value)
+    return True
@@ -0,0 +1,181 @@
+# api/async_responses.py
+"""async-вариант api/responses.py (ASYNC_DB=true)."""
+
+from typing import List, Optional
+
+from fastapi import (
+    APIRouter,
+    BackgroundTasks,
+    Depends,
+    HTTPException,
+    Query,
+    status,
+    Response as FastAPIResponse,
+)
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from api.codec import core_list, rows_response, tuples_response
+from api.pagination import AFTER_QUERY, OFFSET_QUERY, paginate_async
+from db.async_database import get_async_db, get_async_session_factory
+from domain.messages import Messages
+from domain.schemas import (
+    PurgeJob,
+    Response as ResponseSchema,
+    ResponseBatchCreate,
+    ResponseBatchResult,
+    ResponseCreate,
+    ResponseUpdate,
+    ResponseWithDependents,
+)
+from services.purge import PurgeService, run_purge_async
+from services.response import AsyncResponseService
+
+router = APIRouter()  # префикс и теги задаются в main.py
+
+
+# ---------- LIST & DETAIL ----------
+
+
+@router.get("/", response_model=List[ResponseSchema])
+async def list_responses(
+    response: FastAPIResponse,
+    db: AsyncSession = Depends(get_async_db),
+    user_id: Optional[int] = Query(None, description="Фильтр по пользователю"),
+    version_id: Optional[int] = Query(None, description="Фильтр по версии"),
+    question_id: Optional[int] = Query(None, description="Фильтр по вопросу"),
+    limit: int = Query(100, ge=1, le=1000),
+    after: Optional[str] = AFTER_QUERY,
+    offset: int = OFFSET_QUERY,
+) -> FastAPIResponse:
+    """
+    Получить список ответов с фильтрами (по возрастанию id).
+    Курсор следующей страницы — в заголовке X-Next-Cursor.
+    """
+    core = core_list("responses")
+    source = AsyncResponseService(db)
+    rows = await paginate_async(
+        response,
+        source.rows_page if core else source.page,
+        after,
+        offset,
+        user_id=user_id,
+        version_id=version_id,
+        question_id=question_id,
+        limit=limit,
+    )
+    if core:
+        return tuples_response(rows, ResponseSchema, response)
+    return rows_response(rows, ResponseSchema, response)
+
+
+@router.get("/{response_id}", response_model=ResponseSchema)
+async def get_response(
+    response_id: int, db: AsyncSession = Depends(get_async_db)
+) -> ResponseSchema:
+    """
+    Получить ответ по ID.
+    """
+    obj = await AsyncResponseService(db).get(response_id)
+    if not obj:
+        raise HTTPException(status_code=404, detail=Messages.RESPONSE_NOT_FOUND.value)
+    return obj
+
+
+# ---------- CREATE / UPDATE / DELETE ----------
+
+
+@router.post("/", response_model=ResponseSchema, status_code=status.HTTP_201_CREATED)
+async def create_response(
+    response: ResponseCreate,
+    db: AsyncSession = Depends(get_async_db),
+    upsert: bool = Query(
+        False, description="Перезаписать ответ, если на вопрос уже отвечали"
+    ),
+) -> ResponseSchema:
+    """
+    Создать новый ответ пользователя.
+    """
+    try:
+        created = await AsyncResponseService(db).create(response, upsert=upsert)
+    except ValueError as e:
+        raise HTTPException(status_code=422, detail=str(e))
+    except IntegrityError:
+        await db.rollback()
+        raise HTTPException(
+            status_code=409, detail=Messages.RESPONSE_ALREADY_EXISTS.value
+        )
+    if not created:
+        raise HTTPException(status_code=404, detail=Messages.RESPONSE_NOT_FOUND.value)
+    return created
+
+
+@router.post("/batch", response_model=ResponseBatchResult)
+async def create_responses_batch(
+    batch: ResponseBatchCreate,
+    db: AsyncSession = Depends(get_async_db),
+    upsert: bool = Query(
+        False, description="Перезаписать ответы, если на вопросы уже отвечали"
+    ),
+) -> ResponseBatchResult:
+    """
+    Создать пачку ответов одного пользователя для одной версии.
+    """
+    try:
+        return await AsyncResponseService(db).create_batch(batch, upsert=upsert)
+    except IntegrityError:
+        # ответ появился в обход закэшированного контекста (гонка записей)
+        await db.rollback()
+        raise HTTPException(
+            status_code=409, detail=Messages.RESPONSE_ALREADY_EXISTS.value
+        )
+
+
+@router.put("/{response_id}", response_model=ResponseWithDependents)
+async def update_response(
+    response_id: int, response: ResponseUpdate, db: AsyncSession = Depends(get_async_db)
+) -> ResponseWithDependents:
+    """
+    Обновить существующий ответ (см. invalid_dependents).
+    """
+    try:
+        updated = await AsyncResponseService(db).update(response_id, response)
+    except ValueError as e:
+        raise HTTPException(status_code=422, detail=str(e))
+    if not updated:
+        raise HTTPException(status_code=404, detail=Messages.RESPONSE_NOT_FOUND.value)
+    return updated
+
+
+@router.delete("/{response_id}", status_code=status.HTTP_204_NO_CONTENT)
+async def delete_response(
+    response_id: int,
+    db: AsyncSession = Depends(get_async_db),
+    version_id: Optional[int] = Query(
+        None, description="Версия ответа, если известна: DELETE по одной секции"
+    ),
+) -> FastAPIResponse:
+    """
+    Удалить ответ по ID.
+    """
+    if not await AsyncResponseService(db).delete(response_id, version_id):
+        raise HTTPException(status_code=404, detail=Messages.RESPONSE_NOT_FOUND.value)
+    return FastAPIResponse(status_code=status.HTTP_204_NO_CONTENT)
+
+
+@router.delete(
+    "/users/{user_id}", response_model=PurgeJob, status_code=status.HTTP_202_ACCEPTED
+)
+async def purge_user_responses(
+    user_id: int,
+    background_tasks: BackgroundTasks,
+    db: AsyncSession = Depends(get_async_db),
+    sessions: async_sessionmaker = Depends(get_async_session_factory),
+):
+    """
+    Удалить все ответы пользователя во всех версиях (в фоне, пачками);
+    прогресс — GET /purges/{job_id}.
+    """
+    job = await db.run_sync(lambda session: PurgeService(session).start_user(user_id))
+    background_tasks.add_task(run_purge_async, sessions, job.id)
+    return job
@@ -0,0 +1,274 @@
+# api/async_versions.py
+"""async-вариант api/versions.py (ASYNC_DB=true)."""
+
+from fastapi import (
+    APIRouter,
+    BackgroundTasks,
+    Depends,
+    HTTPException,
+    Query,
+    Request,
+    Response,
+    status,
+)
+from fastapi.responses import StreamingResponse
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+from typing import List, Optional
+
+from api.codec import rows_response
+from api.export import FORMAT_QUERY, export_response_async
+from api.questionnaire import IF_NONE_MATCH, questionnaire_response
+from api.pagination import AFTER_QUERY, OFFSET_QUERY, paginate_async
+from db.async_database import get_async_db, get_async_session_factory
+from domain.messages import Messages
+from domain.schemas import (
+    CarryOverReport,
+    PurgeJob,
+    QuestionBulkReport,
+    QuestionOptions,
+    QuestionStats,
+    SurveySnapshot,
+    Version,
+    VersionCreate,
+    VersionUpdate,
+)
+from repositories.version import AsyncVersionRepository, VersionRepository
+from services.purge import PurgeService, run_purge_async
+from services.question_import import AsyncQuestionImportService
+from services.questionnaire import load_questionnaire, questionnaire_cache
+from services.response import AsyncResponseService
+from services.snapshot import load_snapshot
+from services.stats import StatsService
+from services.version import (
+    AsyncVersionService,
+    VersionPublishedError,
+    VersionService,
+)
+
+router = APIRouter()  # префикс и теги задаются в main.py
+
+
+@router.post("/", response_model=Version)
+async def create_version(
+    version: VersionCreate, db: AsyncSession = Depends(get_async_db)
+) -> Version:
+    """Create a new survey version."""
+    return await AsyncVersionService(db).create(version)
+
+
+@router.get("/", response_model=List[Version])
+async def list_versions(
+    response: Response,
+    db: AsyncSession = Depends(get_async_db),
+    limit: int = Query(100, ge=1, le=1000),
+    after: Optional[str] = AFTER_QUERY,
+    offset: int = OFFSET_QUERY,
+):
+    """Versions, newest first; the next page cursor is in X-Next-Cursor."""
+    rows = await paginate_async(
+        response, AsyncVersionRepository(db).page, after, offset, limit=limit
+    )
+    return rows_response(rows, Version, response)
+
+
+@router.get("/{version_id}", response_model=Version)
+async def get_version(
+    version_id: int, db: AsyncSession = Depends(get_async_db)
+) -> Version:
+    """Retrieve a specific version by ID."""
+    version = await AsyncVersionService(db).get(version_id)
+    if not version:
+        raise HTTPException(status_code=404, detail=Messages.VERSION_NOT_FOUND.value)
+    return version
+
+
+@router.put("/{version_id}", response_model=Version)
+async def update_version(
+    version_id: int, version: VersionUpdate, db: AsyncSession = Depends(get_async_db)
+) -> Version:
+    """Update an existing version."""
+    updated = await AsyncVersionService(db).update(version_id, version)
+    if not updated:
+        raise HTTPException(status_code=404, detail=Messages.VERSION_NOT_FOUND.value)
+    return updated
+
+
+@router.delete(
+    "/{version_id}", response_model=PurgeJob, status_code=status.HTTP_202_ACCEPTED
+)
+async def delete_version(
+    version_id: int,
+    background_tasks: BackgroundTasks,
+    db: AsyncSession = Depends(get_async_db),
+    sessions: async_sessionmaker = Depends(get_async_session_factory),
+):
+    """
+    Delete a version with its questions and responses in the background,
+    in bounded chunks; progress at GET /purges/{job_id}.
+    """
+    job = await db.run_sync(
+        lambda session: PurgeService(session).start_version(version_id)
+    )
+    if job is None:
+        raise HTTPException(status_code=404, detail=Messages.VERSION_NOT_FOUND.value)
+    background_tasks.add_task(run_purge_async, sessions, job.id)
+    return job
+
+
+@router.post("/{version_id}/publish", response_model=Version)
+async def publish_version(
+    version_id: int, db: AsyncSession = Depends(get_async_db)
+) -> Version:
+    """Freeze a version's questions; its questionnaire becomes immutable."""
+    published = await AsyncVersionService(db).publish(version_id)
+    if not published:
+        raise HTTPException(status_code=404, detail=Messages.VERSION_NOT_FOUND.value)
+    return published
+
+
+@router.get(
+    "/{version_id}/questionnaire", responses={304: {"description": "Not Modified"}}
+)
+async def get_questionnaire(
+    version_id: int,
+    db: AsyncSession = Depends(get_async_db),
+    if_none_match: Optional[str] = IF_NONE_MATCH,
+) -> Response:
+    """
+    All questions of a version in id order with an ETag; If-None-Match
+    gives 304. A published version is served from memory.
+    """
+    # опубликованная анкета — без run_sync и без соединения
+    document = questionnaire_cache.peek(version_id) or await db.run_sync(
+        lambda session: load_questionnaire(session, version_id)
+    )
+    if document is None:
+        raise HTTPException(status_code=404, detail=Messages.VERSION_NOT_FOUND.value)
+    return questionnaire_response(document, if_none_match)
+
+
+@router.post("/{version_id}/clone", response_model=Version)
+async def clone_version(
+    version_id: int, version: VersionCreate, db: AsyncSession = Depends(get_async_db)
+) -> Version:
+    """Create a new version with a copy of every question of this one."""
+    cloned = await db.run_sync(
+        lambda session: VersionService(session).clone(version_id, version)
+    )
+    if cloned is None:
+        raise HTTPException(status_code=404, detail=Messages.VERSION_NOT_FOUND.value)
+    return cloned
+
+
+@router.post("/{version_id}/carry-over", response_model=CarryOverReport)
+async def carry_over_responses(
+    version_id: int,
+    db: AsyncSession = Depends(get_async_db),
+    from_version_id: Optional[int] = Query(
+        None, description="Откуда переносить; по умолчанию — предыдущая версия"
+    ),
+    user_id: Optional[int] = Query(None, description="Только этот пользователь"),
+    all_questions: bool = Query(
+        False, description="Все совпавшие номера, а не только prefill_from_previous"
+    ),
+) -> CarryOverReport:
+    """Copy answers from a previous version onto questions with the same number."""
+
+    def source(session) -> Optional[int]:
+        versions = VersionRepository(session)
+        if versions.get(version_id) is None:
+            return None
+        previous = from_version_id or versions.previous(version_id)
+        return previous if previous and versions.get(previous) else None
+
+    source_id = await db.run_sync(source)
+    if source_id is None:
+        raise HTTPException(status_code=404, detail=Messages.VERSION_NOT_FOUND.value)
+    return await AsyncResponseService(db).carry_over(
+        source_id, version_id, user_id=user_id, all_questions=all_questions
+    )
+
+
+@router.post("/{version_id}/questions/bulk", response_model=QuestionBulkReport)
+async def bulk_load_questions(
+    version_id: int, request: Request, db: AsyncSession = Depends(get_async_db)
+) -> QuestionBulkReport:
+    """
+    Import a questionnaire ({"questions": [...]} or a bare array), read as a
+    stream; numbers the version already has are skipped.
+    """
+    if await AsyncVersionService(db).get(version_id) is None:
+        raise HTTPException(status_code=404, detail=Messages.VERSION_NOT_FOUND.value)
+    try:
+        return await AsyncQuestionImportService(db).load(version_id, request.stream())
+    except ValueError as e:
+        raise HTTPException(status_code=422, detail=str(e))
+    except VersionPublishedError:
+        raise HTTPException(status_code=409, detail=Messages.VERSION_PUBLISHED.value)
+
+
+@router.get(
+    "/{version_id}/users/{user_id}/options/{number}",
+    response_model=QuestionOptions,
+)
+async def get_question_options(
+    version_id: int,
+    user_id: int,
+    number: str,
+    db: AsyncSession = Depends(get_async_db),
+) -> QuestionOptions:
+    """Options the user may pick for a dropdown question right now."""
+    try:
+        options = await AsyncResponseService(db).options_for(
+            version_id, user_id, number
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=422, detail=str(e))
+    if options is None:
+        raise HTTPException(status_code=404, detail=Messages.QUESTION_NOT_FOUND.value)
+    return options
+
+
+@router.get("/{version_id}/stats", response_model=List[QuestionStats])
+async def get_version_stats(
+    version_id: int, db: AsyncSession = Depends(get_async_db)
+) -> List[QuestionStats]:
+    """Per-question answer distributions, read from the summary table only."""
+    if await AsyncVersionService(db).get(version_id) is None:
+        raise HTTPException(status_code=404, detail=Messages.VERSION_NOT_FOUND.value)
+    return await db.run_sync(lambda session: StatsService(session).get(version_id))
+
+
+@router.get(
+    "/{version_id}/users/{user_id}/snapshot", response_model=SurveySnapshot
+)
+async def get_survey_snapshot(
+    version_id: int, user_id: int, db: AsyncSession = Depends(get_async_db)
+) -> SurveySnapshot:
+    """A user's whole questionnaire in one lookup (SURVEY_SNAPSHOTS=true)."""
+    if await AsyncVersionService(db).get(version_id) is None:
+        raise HTTPException(status_code=404, detail=Messages.VERSION_NOT_FOUND.value)
+    snapshot = await db.run_sync(
+        lambda session: load_snapshot(session, user_id, version_id)
+    )
+    if snapshot is None:
+        raise HTTPException(status_code=404, detail=Messages.SNAPSHOT_NOT_FOUND.value)
+    return snapshot
+
+
+@router.get("/{version_id}/responses/export")
+async def export_version_responses(
+    version_id: int,
+    request: Request,
+    format: str = FORMAT_QUERY,
+    db: AsyncSession = Depends(get_async_db),
+    sessions: async_sessionmaker = Depends(get_async_session_factory),
+) -> StreamingResponse:
+    """
+    Stream every response of a version: NDJSON or CSV (one row per answer,
+    gzip-compressed when the client accepts it), or Parquet / Arrow IPC
+    (one row per user, one column per question number).
+    """
+    if await AsyncVersionService(db).get(version_id) is None:
+        raise HTTPException(status_code=404, detail=Messages.VERSION_NOT_FOUND.value)
+    return export_response_async(request, version_id, format, sessions)
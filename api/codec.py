@@ -0,0 +1,68 @@
+# api/codec.py
+"""
+Тела ответов через JSON-кодек (db/codec.py): класс ответа по умолчанию
+и быстрый путь для списков — строки из БД сериализуются напрямую.
+"""
+
+from operator import attrgetter, itemgetter
+from typing import Any, Iterable, List, Sequence, Type
+
+from fastapi import Response
+from fastapi.responses import JSONResponse
+from pydantic import BaseModel
+
+from db.codec import codec
+from db.settings import Settings
+
+# списки, читаемые Core select() и сериализуемые из кортежей (CORE_LIST_ENDPOINTS)
+core_lists = frozenset(
+    name.strip() for name in Settings().CORE_LIST_ENDPOINTS.split(",") if name.strip()
+)
+
+
+class CodecJSONResponse(JSONResponse):
+    """JSONResponse rendered by the application codec (orjson when installed)."""
+
+    def render(self, content: Any) -> bytes:
+        return codec.dumps(content)
+
+
+def rows_response(
+    rows: Iterable[Any], schema: Type[BaseModel], response: Response
+) -> Response:
+    """
+    A list of rows from our own tables as JSON, field by field per `schema`,
+    without jsonable_encoder and the response_model pass: the rows already
+    match the schema. Headers set on `response` (X-Next-Cursor) are kept.
+    """
+    fields = tuple(schema.model_fields)
+    values = attrgetter(*fields)
+    return _json_list([dict(zip(fields, values(row))) for row in rows], response)
+
+
+def core_list(name: str) -> bool:
+    """Whether list endpoint `name` reads rows via Core instead of the ORM."""
+    return name in core_lists
+
+
+def tuples_response(
+    rows: Sequence[Any], schema: Type[BaseModel], response: Response
+) -> Response:
+    """
+    rows_response for rows of a Core select(): values are zipped with the
+    field names by position, with no attribute access per field.
+    """
+    fields = tuple(schema.model_fields)
+    if rows and tuple(rows[0]._fields) != fields:
+        # колонки в другом порядке или лишние — раскладываем по схеме один раз
+        pick = itemgetter(*(rows[0]._fields.index(field) for field in fields))
+        rows = [pick(row) for row in rows]
+    return _json_list([dict(zip(fields, row)) for row in rows], response)
+
+
+def _json_list(items: List[dict], response: Response) -> Response:
+    result = Response(content=codec.dumps(items), media_type="application/json")
+    for key, value in response.headers.items():
+        if key != "content-length":
+            result.headers.append(key, value)
+    return result
@@ -0,0 +1,65 @@
+# api/export.py
+"""
+Общая обвязка потоковой выгрузки ответов версии: выбор формата, gzip по
+Accept-Encoding и заголовки.
+
+ndjson | csv — строка на ответ (services/export.py);
+parquet | arrow — строка на пользователя, колонка на вопрос
+(services/wide_export.py).
+"""
+
+from typing import AsyncIterator, Callable, Iterator, Union
+
+from fastapi import Query, Request
+from fastapi.responses import StreamingResponse
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+from services import export, wide_export
+
+FORMAT_QUERY = Query(
+    "ndjson",
+    pattern="^(ndjson|csv|parquet|arrow)$",
+    description="ndjson | csv — по ответу в строке; parquet | arrow — по пользователю",
+)
+
+_EXTENSIONS = {"arrow": "arrows"}
+
+Stream = Union[Iterator[bytes], AsyncIterator[bytes]]
+
+
+def export_response(
+    request: Request, version_id: int, fmt: str, sessions: Callable[[], Session]
+) -> StreamingResponse:
+    def stream(compress: bool) -> Iterator[bytes]:
+        if fmt in wide_export.FORMATS:
+            return wide_export.export_wide(sessions, version_id, fmt)
+        return export.export_responses(sessions, version_id, fmt, compress)
+
+    return _streaming(request, version_id, fmt, stream)
+
+
+def export_response_async(
+    request: Request, version_id: int, fmt: str, sessions: Callable[[], AsyncSession]
+) -> StreamingResponse:
+    def stream(compress: bool) -> AsyncIterator[bytes]:
+        if fmt in wide_export.FORMATS:
+            return wide_export.export_wide_async(sessions, version_id, fmt)
+        return export.export_responses_async(sessions, version_id, fmt, compress)
+
+    return _streaming(request, version_id, fmt, stream)
+
+
+def _streaming(
+    request: Request, version_id: int, fmt: str, stream: Callable[[bool], Stream]
+) -> StreamingResponse:
+    # parquet/arrow уже сжаты (zstd / словари) — gzip только для текстовых форматов
+    compress = fmt in export.FORMATS and "gzip" in request.headers.get(
+        "accept-encoding", ""
+    )
+    filename = f"responses-v{version_id}.{_EXTENSIONS.get(fmt, fmt)}"
+    headers = {"Content-Disposition": f'attachment; filename="{filename}"'}
+    if compress:
+        headers["Content-Encoding"] = "gzip"
+    media_type = export.FORMATS.get(fmt) or wide_export.FORMATS[fmt]
+    return StreamingResponse(stream(compress), media_type=media_type, headers=headers)
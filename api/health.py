@@ -2,6 +2,8 @@
 from fastapi import APIRouter, Depends
 from sqlalchemy.orm import Session
 from db.database import get_db
+from services.answer_cache import answer_ctx_cache
+from services.metrics import validation_metrics
 
 router = APIRouter()
 
@@ -25,3 +27,23 @@ def readyz(db: Session = Depends(get_db)):
         return {"status": "ok"}
     except Exception:
         return {"status": "error", "detail": "DB not ready"}
+
+
+@router.get("/cachez")
+def cachez():
+    """
+    Статистика in-process кэша контекстов ответов (hits/misses/size).
+    """
+    return {"answer_ctx": answer_ctx_cache.stats()}
+
+
+@router.get("/metricz")
+def metricz():
+    """
+    Тайминги конвейера валидации по семействам правил
+    (count/failures/p50/p99); пусто, пока VALIDATION_METRICS выключен.
+    """
+    return {
+        "enabled": validation_metrics.enabled,
+        "validation": validation_metrics.snapshot(),
+    }
@@ -0,0 +1,62 @@
+# api/pagination.py
+"""
+Общая обвязка курсорной пагинации списков: тело ответа — по-прежнему
+список, курсор следующей страницы — в заголовке X-Next-Cursor.
+"""
+
+from typing import Any, Awaitable, Callable, List, Optional, Tuple
+
+from fastapi import HTTPException, Query, Response
+
+from repositories.pagination import InvalidCursor
+
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+
+AFTER_QUERY = Query(
+    None, description=f"Курсор следующей страницы (заголовок {NEXT_CURSOR_HEADER})"
+)
+OFFSET_QUERY = Query(0, ge=0, description="Устарело: используйте after")
+
+
+def paginate(
+    response: Response,
+    fetch: Callable[..., Tuple[List[Any], Optional[str]]],
+    after: Optional[str],
+    offset: int,
+    **filters: Any,
+) -> List[Any]:
+    """Run a repository `page` call and expose its next cursor as a header."""
+    _check_mode(after, offset)
+    try:
+        rows, next_cursor = fetch(after=after, offset=offset, **filters)
+    except InvalidCursor as e:
+        raise HTTPException(status_code=422, detail=str(e))
+    _set_next_cursor(response, next_cursor)
+    return rows
+
+
+async def paginate_async(
+    response: Response,
+    fetch: Callable[..., Awaitable[Tuple[List[Any], Optional[str]]]],
+    after: Optional[str],
+    offset: int,
+    **filters: Any,
+) -> List[Any]:
+    """`paginate` for async repositories."""
+    _check_mode(after, offset)
+    try:
+        rows, next_cursor = await fetch(after=after, offset=offset, **filters)
+    except InvalidCursor as e:
+        raise HTTPException(status_code=422, detail=str(e))
+    _set_next_cursor(response, next_cursor)
+    return rows
+
+
+def _check_mode(after: Optional[str], offset: int) -> None:
+    if after is not None and offset:
+        raise HTTPException(status_code=422, detail="Use either after or offset.")
+
+
+def _set_next_cursor(response: Response, next_cursor: Optional[str]) -> None:
+    if next_cursor is not None:
+        response.headers[NEXT_CURSOR_HEADER] = next_cursor
@@ -0,0 +1,22 @@
+# api/purges.py
+from fastapi import APIRouter, Depends, HTTPException
+from sqlalchemy.orm import Session
+
+from db.database import get_db
+from domain.messages import Messages
+from domain.schemas import PurgeJob
+from services.purge import PurgeService
+
+router = APIRouter()  # префикс и теги задаются в main.py
+
+
+@router.get("/{job_id}", response_model=PurgeJob)
+def get_purge(job_id: int, db: Session = Depends(get_db)):
+    """
+    Прогресс фонового удаления. Читаем с primary: задание обновляется
+    каждой пачкой, реплика отстаёт.
+    """
+    job = PurgeService(db).get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail=Messages.PURGE_JOB_NOT_FOUND.value)
+    return job
@@ -0,0 +1,40 @@
+# api/questionnaire.py
+"""HTTP-обёртка анкеты: ETag, If-None-Match → 304, Cache-Control."""
+
+from typing import Optional
+
+from fastapi import Header, Response
+
+from services.questionnaire import Questionnaire
+
+IF_NONE_MATCH = Header(None, description="ETag из прошлого ответа — 304, если анкета та же")
+
+# опубликованная версия не меняется никогда — клиент может не перепроверять
+IMMUTABLE = "public, max-age=31536000, immutable"
+# черновик: хранить можно, но перед использованием — If-None-Match
+REVALIDATE = "no-cache"
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """Weak comparison of If-None-Match (a list or "*") with our ETag."""
+    if not if_none_match:
+        return False
+    for candidate in if_none_match.split(","):
+        candidate = candidate.strip()
+        if candidate == "*" or candidate.removeprefix("W/") == etag:
+            return True
+    return False
+
+
+def questionnaire_response(
+    document: Questionnaire, if_none_match: Optional[str]
+) -> Response:
+    headers = {
+        "ETag": document.etag,
+        "Cache-Control": IMMUTABLE if document.published else REVALIDATE,
+    }
+    if etag_matches(if_none_match, document.etag):
+        return Response(status_code=304, headers=headers)
+    return Response(
+        content=document.body, media_type="application/json", headers=headers
+    )
@@ -1,42 +1,45 @@
-from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy.orm import Session
-from domain.schemas import QuestionCreate, QuestionUpdate, Question
-from services.question import QuestionService
-from db.database import get_db
-from typing import List
-from domain.messages import Messages
-
-from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi import APIRouter, Depends, HTTPException, Query, Response
+from sqlalchemy.exc import IntegrityError
 from sqlalchemy.orm import Session
 from typing import List, Optional
 
-from db.database import get_db
+from api.codec import core_list, rows_response, tuples_response
+from api.pagination import AFTER_QUERY, OFFSET_QUERY, paginate
+from db.database import get_db, get_read_db
+from domain.messages import Messages
 from domain.schemas import Question, QuestionCreate, QuestionUpdate
 from repositories.question import QuestionRepository
-from domain import models
+from services.question import QuestionService
+from services.version import VersionPublishedError
 
-router = APIRouter(prefix="/questions", tags=["questions"])
+router = APIRouter()  # префикс и теги задаются в main.py
 
 
 @router.get("/", response_model=List[Question])
 def list_questions(
-    db: Session = Depends(get_db),
+    response: Response,
+    db: Session = Depends(get_read_db),
     version_id: Optional[int] = Query(None, description="Фильтр по версии"),
     number: Optional[str] = Query(None, description="Фильтр по номеру (1.1 и т.п.)"),
     limit: int = Query(100, ge=1, le=1000),
-    offset: int = Query(0, ge=0),
+    after: Optional[str] = AFTER_QUERY,
+    offset: int = OFFSET_QUERY,
 ):
-    return QuestionRepository(db).list(
-        version_id=version_id, number=number, limit=limit, offset=offset
+    """Questions ordered by id; the next page cursor is in X-Next-Cursor."""
+    core = core_list("questions")
+    source = QuestionRepository(db)
+    rows = paginate(
+        response,
+        source.rows_page if core else source.page,
+        after,
+        offset,
+        version_id=version_id,
+        number=number,
+        limit=limit,
     )
-
-
-@router.get("/{question_id}", response_model=Question)
-def get_question(question_id: int, db: Session = Depends(get_db)):
-    obj = QuestionRepository(db).get(question_id)
-    if not obj:
-        raise HTTPException(status_code=404, detail="Question not found")
-    return obj
+    if core:
+        return tuples_response(rows, Question, response)
+    return rows_response(rows, Question, response)
 
 
 @router.post("/", response_model=Question)
@@ -44,17 +47,21 @@ def create_question(
     question: QuestionCreate, db: Session = Depends(get_db)
 ) -> Question:
     """Create a new survey question."""
-    return QuestionService(db).create(question)
-
-
-@router.get("/", response_model=List[Question])
-def get_questions(version_id: int, db: Session = Depends(get_db)) -> List[Question]:
-    """Retrieve all questions for a specific version."""
-    return QuestionService(db).get_by_version(version_id)
+    try:
+        return QuestionService(db).create(question)
+    except ValueError as e:
+        raise HTTPException(status_code=422, detail=str(e))
+    except VersionPublishedError:
+        raise HTTPException(status_code=409, detail=Messages.VERSION_PUBLISHED.value)
+    except IntegrityError:
+        # номер уже занят в версии (uq_questions_version_number)
+        raise HTTPException(
+            status_code=409, detail=Messages.QUESTION_ALREADY_EXISTS.value
+        )
 
 
 @router.get("/{question_id}", response_model=Question)
-def get_question(question_id: int, db: Session = Depends(get_db)) -> Question:
+def get_question(question_id: int, db: Session = Depends(get_read_db)) -> Question:
     """Retrieve a specific question by ID."""
     question = QuestionService(db).get(question_id)
     if not question:
@@ -67,7 +74,17 @@ def update_question(
     question_id: int, question: QuestionUpdate, db: Session = Depends(get_db)
 ) -> Question:
     """Update an existing question."""
-    updated = QuestionService(db).update(question_id, question)
+    try:
+        updated = QuestionService(db).update(question_id, question)
+    except ValueError as e:
+        raise HTTPException(status_code=422, detail=str(e))
+    except VersionPublishedError:
+        raise HTTPException(status_code=409, detail=Messages.VERSION_PUBLISHED.value)
+    except IntegrityError:
+        # номер уже занят в версии (uq_questions_version_number)
+        raise HTTPException(
+            status_code=409, detail=Messages.QUESTION_ALREADY_EXISTS.value
+        )
     if not updated:
         raise HTTPException(status_code=404, detail=Messages.QUESTION_NOT_FOUND.value)
     return updated
@@ -76,23 +93,11 @@ def update_question(
 @router.delete("/{question_id}", response_model=bool)
 def delete_question(question_id: int, db: Session = Depends(get_db)) -> bool:
     """Delete a question by ID."""
-    if not QuestionService(db).delete(question_id):
+    try:
+        deleted = QuestionService(db).delete(question_id)
+    except VersionPublishedError:
+        raise HTTPException(status_code=409, detail=Messages.VERSION_PUBLISHED.value)
+    if not deleted:
         raise HTTPException(status_code=404, detail=Messages.QUESTION_NOT_FOUND.value)
     return True
 
-
-class QuestionRepository:
-    def __init__(self, db):
-        self.db = db
-        self.model = models.Question
-
-    def get(self, id: int):
-        return self.db.query(self.model).get(id)
-
-    def list(self, version_id=None, number=None, limit: int = 100, offset: int = 0):
-        q = self.db.query(self.model)
-        if version_id is not None:
-            q = q.filter(self.model.version_id == version_id)
-        if number:
-            q = q.filter(self.model.number == number)
-        return q.order_by(self.model.id.asc()).offset(offset).limit(limit).all()
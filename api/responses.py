@@ -1,24 +1,33 @@
 # api/responses.py
-from typing import List, Optional
+from typing import Callable, List, Optional
 
 from fastapi import (
     APIRouter,
+    BackgroundTasks,
     Depends,
     HTTPException,
     Query,
     status,
     Response as FastAPIResponse,
 )
+from sqlalchemy.exc import IntegrityError
 from sqlalchemy.orm import Session
 
-from db.database import get_db
+from api.codec import core_list, rows_response, tuples_response
+from api.pagination import AFTER_QUERY, OFFSET_QUERY, paginate
+from db.database import get_db, get_read_db, get_session_factory
 from domain.messages import Messages
 from domain.schemas import (
+    PurgeJob,
     Response as ResponseSchema,
+    ResponseBatchCreate,
+    ResponseBatchResult,
     ResponseCreate,
     ResponseUpdate,
+    ResponseWithDependents,
 )
 from repositories.response import ResponseRepository
+from services.purge import PurgeService, run_purge
 from services.response import ResponseService
 
 router = (
@@ -31,27 +40,38 @@ router = (
 
 @router.get("/", response_model=List[ResponseSchema])
 def list_responses(
-    db: Session = Depends(get_db),
+    response: FastAPIResponse,
+    db: Session = Depends(get_read_db),
     user_id: Optional[int] = Query(None, description="Фильтр по пользователю"),
     version_id: Optional[int] = Query(None, description="Фильтр по версии"),
     question_id: Optional[int] = Query(None, description="Фильтр по вопросу"),
     limit: int = Query(100, ge=1, le=1000),
-    offset: int = Query(0, ge=0),
-) -> List[ResponseSchema]:
+    after: Optional[str] = AFTER_QUERY,
+    offset: int = OFFSET_QUERY,
+) -> FastAPIResponse:
     """
-    Получить список ответов с фильтрами.
+    Получить список ответов с фильтрами (по возрастанию id).
+    Курсор следующей страницы — в заголовке X-Next-Cursor.
     """
-    return ResponseRepository(db).list(
+    core = core_list("responses")
+    source = ResponseRepository(db)
+    rows = paginate(
+        response,
+        source.rows_page if core else source.page,
+        after,
+        offset,
         user_id=user_id,
         version_id=version_id,
         question_id=question_id,
         limit=limit,
-        offset=offset,
     )
+    if core:
+        return tuples_response(rows, ResponseSchema, response)
+    return rows_response(rows, ResponseSchema, response)
 
 
 @router.get("/{response_id}", response_model=ResponseSchema)
-def get_response(response_id: int, db: Session = Depends(get_db)) -> ResponseSchema:
+def get_response(response_id: int, db: Session = Depends(get_read_db)) -> ResponseSchema:
     """
     Получить ответ по ID.
     """
@@ -66,27 +86,60 @@ def get_response(response_id: int, db: Session = Depends(get_db)) -> ResponseSch
 
 @router.post("/", response_model=ResponseSchema, status_code=status.HTTP_201_CREATED)
 def create_response(
-    response: ResponseCreate, db: Session = Depends(get_db)
+    response: ResponseCreate,
+    db: Session = Depends(get_db),
+    upsert: bool = Query(
+        False, description="Перезаписать ответ, если на вопрос уже отвечали"
+    ),
 ) -> ResponseSchema:
     """
     Создать новый ответ пользователя.
     """
     try:
-        created = ResponseService(db).create(response)
+        created = ResponseService(db).create(response, upsert=upsert)
     except ValueError as e:
         # ошибки валидации (depends_on/condition/диапазоны и т.п.)
         raise HTTPException(status_code=422, detail=str(e))
+    except IntegrityError:
+        db.rollback()
+        raise HTTPException(
+            status_code=409, detail=Messages.RESPONSE_ALREADY_EXISTS.value
+        )
     if not created:
         raise HTTPException(status_code=404, detail=Messages.RESPONSE_NOT_FOUND.value)
     return created
 
 
-@router.put("/{response_id}", response_model=ResponseSchema)
+@router.post("/batch", response_model=ResponseBatchResult)
+def create_responses_batch(
+    batch: ResponseBatchCreate,
+    db: Session = Depends(get_db),
+    upsert: bool = Query(
+        False, description="Перезаписать ответы, если на вопросы уже отвечали"
+    ),
+) -> ResponseBatchResult:
+    """
+    Создать пачку ответов одного пользователя для одной версии.
+    Результат — по каждому элементу, в порядке запроса.
+    """
+    try:
+        return ResponseService(db).create_batch(batch, upsert=upsert)
+    except IntegrityError:
+        # ответ появился в обход закэшированного контекста (гонка записей)
+        db.rollback()
+        raise HTTPException(
+            status_code=409, detail=Messages.RESPONSE_ALREADY_EXISTS.value
+        )
+
+
+@router.put("/{response_id}", response_model=ResponseWithDependents)
 def update_response(
     response_id: int, response: ResponseUpdate, db: Session = Depends(get_db)
-) -> ResponseSchema:
+) -> ResponseWithDependents:
     """
     Обновить существующий ответ.
+    В invalid_dependents — зависимые ответы, которые после изменения
+    перестали проходить валидацию.
     """
     try:
         updated = ResponseService(db).update(response_id, response)
@@ -98,11 +151,35 @@ def update_response(
 
 
 @router.delete("/{response_id}", status_code=status.HTTP_204_NO_CONTENT)
-def delete_response(response_id: int, db: Session = Depends(get_db)) -> FastAPIResponse:
+def delete_response(
+    response_id: int,
+    db: Session = Depends(get_db),
+    version_id: Optional[int] = Query(
+        None, description="Версия ответа, если известна: DELETE по одной секции"
+    ),
+) -> FastAPIResponse:
     """
     Удалить ответ по ID.
     """
-    ok = ResponseService(db).delete(response_id)
+    ok = ResponseService(db).delete(response_id, version_id)
     if not ok:
         raise HTTPException(status_code=404, detail=Messages.RESPONSE_NOT_FOUND.value)
     return FastAPIResponse(status_code=status.HTTP_204_NO_CONTENT)
+
+
+@router.delete(
+    "/users/{user_id}", response_model=PurgeJob, status_code=status.HTTP_202_ACCEPTED
+)
+def purge_user_responses(
+    user_id: int,
+    background_tasks: BackgroundTasks,
+    db: Session = Depends(get_db),
+    session_factory: Callable[[], Session] = Depends(get_session_factory),
+):
+    """
+    Удалить все ответы пользователя во всех версиях (в фоне, пачками);
+    прогресс — GET /purges/{job_id}.
+    """
+    job = PurgeService(db).start_user(user_id)
+    background_tasks.add_task(run_purge, session_factory, job.id)
+    return job
@@ -1,20 +1,51 @@
-from fastapi import APIRouter, Depends, HTTPException
+import anyio
+from fastapi import (
+    APIRouter,
+    BackgroundTasks,
+    Depends,
+    HTTPException,
+    Query,
+    Request,
+    Response,
+    status,
+)
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import StreamingResponse
 from sqlalchemy.orm import Session
-from domain.schemas import VersionCreate, VersionUpdate, Version
-from services.version import VersionService
-from db.database import get_db
-from typing import List
-from domain.messages import Messages
-
-from fastapi import APIRouter, Depends, HTTPException, Query
-from sqlalchemy.orm import Session
-from typing import List, Optional
+from typing import Callable, Iterator, List, Optional
 
-from db.database import get_db
-from domain.schemas import Version, VersionCreate, VersionUpdate
+from api.codec import rows_response
+from api.export import FORMAT_QUERY, export_response
+from api.questionnaire import IF_NONE_MATCH, questionnaire_response
+from api.pagination import AFTER_QUERY, OFFSET_QUERY, paginate
+from db.database import (
+    get_db,
+    get_read_db,
+    get_read_session_factory,
+    get_session_factory,
+)
+from domain.messages import Messages
+from domain.schemas import (
+    CarryOverReport,
+    PurgeJob,
+    QuestionBulkReport,
+    QuestionOptions,
+    QuestionStats,
+    SurveySnapshot,
+    Version,
+    VersionCreate,
+    VersionUpdate,
+)
 from repositories.version import VersionRepository
+from services.purge import PurgeService, run_purge
+from services.question_import import QuestionImportService
+from services.questionnaire import load_questionnaire
+from services.response import ResponseService
+from services.snapshot import load_snapshot
+from services.stats import StatsService
+from services.version import VersionPublishedError, VersionService
 
-router = APIRouter(prefix="/versions", tags=["versions"])
+router = APIRouter()  # префикс и теги задаются в main.py
 
 
 @router.post("/", response_model=Version)
@@ -24,13 +55,20 @@ def create_version(version: VersionCreate, db: Session = Depends(get_db)) -> Ver
 
 
 @router.get("/", response_model=List[Version])
-def get_versions(db: Session = Depends(get_db)) -> List[Version]:
-    """Retrieve all survey versions."""
-    return VersionService(db).get_all()
+def list_versions(
+    response: Response,
+    db: Session = Depends(get_read_db),
+    limit: int = Query(100, ge=1, le=1000),
+    after: Optional[str] = AFTER_QUERY,
+    offset: int = OFFSET_QUERY,
+):
+    """Versions, newest first; the next page cursor is in X-Next-Cursor."""
+    rows = paginate(response, VersionRepository(db).page, after, offset, limit=limit)
+    return rows_response(rows, Version, response)
 
 
 @router.get("/{version_id}", response_model=Version)
-def get_version(version_id: int, db: Session = Depends(get_db)) -> Version:
+def get_version(version_id: int, db: Session = Depends(get_read_db)) -> Version:
     """Retrieve a specific version by ID."""
     version = VersionService(db).get(version_id)
     if not version:
@@ -38,23 +76,6 @@ def get_version(version_id: int, db: Session = Depends(get_db)) -> Version:
     return version
 
 
-@router.get("/", response_model=List[Version])
-def list_versions(
-    db: Session = Depends(get_db),
-    limit: int = Query(100, ge=1, le=1000),
-    offset: int = Query(0, ge=0),
-):
-    return VersionRepository(db).list(limit=limit, offset=offset)
-
-
-@router.get("/{version_id}", response_model=Version)
-def get_version(version_id: int, db: Session = Depends(get_db)):
-    obj = VersionRepository(db).get(version_id)
-    if not obj:
-        raise HTTPException(status_code=404, detail="Version not found")
-    return obj
-
-
 @router.put("/{version_id}", response_model=Version)
 def update_version(
     version_id: int, version: VersionUpdate, db: Session = Depends(get_db)
@@ -66,9 +87,186 @@ def update_version(
     return updated
 
 
-@router.delete("/{version_id}", response_model=bool)
-def delete_version(version_id: int, db: Session = Depends(get_db)) -> bool:
-    """Delete a version by ID."""
-    if not VersionService(db).delete(version_id):
+@router.delete(
+    "/{version_id}", response_model=PurgeJob, status_code=status.HTTP_202_ACCEPTED
+)
+def delete_version(
+    version_id: int,
+    background_tasks: BackgroundTasks,
+    db: Session = Depends(get_db),
+    session_factory: Callable[[], Session] = Depends(get_session_factory),
+):
+    """
+    Delete a version with its questions and responses in the background,
+    in bounded chunks; progress at GET /purges/{job_id}.
+    """
+    job = PurgeService(db).start_version(version_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail=Messages.VERSION_NOT_FOUND.value)
+    background_tasks.add_task(run_purge, session_factory, job.id)
+    return job
+
+
+@router.post("/{version_id}/publish", response_model=Version)
+def publish_version(version_id: int, db: Session = Depends(get_db)) -> Version:
+    """Freeze a version's questions; its questionnaire becomes immutable."""
+    published = VersionService(db).publish(version_id)
+    if not published:
+        raise HTTPException(status_code=404, detail=Messages.VERSION_NOT_FOUND.value)
+    return published
+
+
+@router.get(
+    "/{version_id}/questionnaire", responses={304: {"description": "Not Modified"}}
+)
+def get_questionnaire(
+    version_id: int,
+    db: Session = Depends(get_read_db),
+    if_none_match: Optional[str] = IF_NONE_MATCH,
+) -> Response:
+    """
+    All questions of a version in id order with an ETag; If-None-Match
+    gives 304. A published version is served from memory.
+    """
+    document = load_questionnaire(db, version_id)
+    if document is None:
+        raise HTTPException(status_code=404, detail=Messages.VERSION_NOT_FOUND.value)
+    return questionnaire_response(document, if_none_match)
+
+
+@router.post("/{version_id}/clone", response_model=Version)
+def clone_version(
+    version_id: int, version: VersionCreate, db: Session = Depends(get_db)
+) -> Version:
+    """Create a new version with a copy of every question of this one."""
+    cloned = VersionService(db).clone(version_id, version)
+    if cloned is None:
+        raise HTTPException(status_code=404, detail=Messages.VERSION_NOT_FOUND.value)
+    return cloned
+
+
+@router.post("/{version_id}/carry-over", response_model=CarryOverReport)
+def carry_over_responses(
+    version_id: int,
+    db: Session = Depends(get_db),
+    from_version_id: Optional[int] = Query(
+        None, description="Откуда переносить; по умолчанию — предыдущая версия"
+    ),
+    user_id: Optional[int] = Query(None, description="Только этот пользователь"),
+    all_questions: bool = Query(
+        False, description="Все совпавшие номера, а не только prefill_from_previous"
+    ),
+) -> CarryOverReport:
+    """Copy answers from a previous version onto questions with the same number."""
+    versions = VersionRepository(db)
+    if versions.get(version_id) is None:
+        raise HTTPException(status_code=404, detail=Messages.VERSION_NOT_FOUND.value)
+    if from_version_id is None:
+        from_version_id = versions.previous(version_id)
+    if from_version_id is None or versions.get(from_version_id) is None:
         raise HTTPException(status_code=404, detail=Messages.VERSION_NOT_FOUND.value)
-    return True
+    return ResponseService(db).carry_over(
+        from_version_id, version_id, user_id=user_id, all_questions=all_questions
+    )
+
+
+def _body_chunks(request: Request) -> Iterator[bytes]:
+    """Request body as a blocking iterator for code running in the threadpool."""
+    stream = request.stream()
+
+    async def receive() -> Optional[bytes]:
+        return await anext(stream, None)
+
+    while (chunk := anyio.from_thread.run(receive)) is not None:
+        if chunk:
+            yield chunk
+
+
+@router.post("/{version_id}/questions/bulk", response_model=QuestionBulkReport)
+async def bulk_load_questions(
+    version_id: int, request: Request, db: Session = Depends(get_db)
+) -> QuestionBulkReport:
+    """
+    Import a questionnaire ({"questions": [...]} or a bare array), read as a
+    stream; numbers the version already has are skipped.
+    """
+
+    # async def только ради потока тела; сессия синхронная — работаем в потоке
+    def load() -> QuestionBulkReport:
+        if VersionService(db).get(version_id) is None:
+            raise HTTPException(
+                status_code=404, detail=Messages.VERSION_NOT_FOUND.value
+            )
+        try:
+            return QuestionImportService(db).load(version_id, _body_chunks(request))
+        except ValueError as e:
+            raise HTTPException(status_code=422, detail=str(e))
+        except VersionPublishedError:
+            raise HTTPException(
+                status_code=409, detail=Messages.VERSION_PUBLISHED.value
+            )
+
+    return await run_in_threadpool(load)
+
+
+@router.get(
+    "/{version_id}/users/{user_id}/options/{number}",
+    response_model=QuestionOptions,
+)
+def get_question_options(
+    version_id: int, user_id: int, number: str, db: Session = Depends(get_db)
+) -> QuestionOptions:
+    """Options the user may pick for a dropdown question right now."""
+    # primary, не реплика: контекст ответов и каталог попадают в кэши процесса,
+    # и отставшая реплика закэшировала бы устаревшие данные для записей
+    try:
+        options = ResponseService(db).options_for(version_id, user_id, number)
+    except ValueError as e:
+        raise HTTPException(status_code=422, detail=str(e))
+    if options is None:
+        raise HTTPException(status_code=404, detail=Messages.QUESTION_NOT_FOUND.value)
+    return options
+
+
+@router.get("/{version_id}/stats", response_model=List[QuestionStats])
+def get_version_stats(
+    version_id: int, db: Session = Depends(get_read_db)
+) -> List[QuestionStats]:
+    """Per-question answer distributions, read from the summary table only."""
+    if VersionService(db).get(version_id) is None:
+        raise HTTPException(status_code=404, detail=Messages.VERSION_NOT_FOUND.value)
+    return StatsService(db).get(version_id)
+
+
+@router.get(
+    "/{version_id}/users/{user_id}/snapshot", response_model=SurveySnapshot
+)
+def get_survey_snapshot(
+    version_id: int, user_id: int, db: Session = Depends(get_read_db)
+) -> SurveySnapshot:
+    """A user's whole questionnaire in one lookup (SURVEY_SNAPSHOTS=true)."""
+    if VersionService(db).get(version_id) is None:
+        raise HTTPException(status_code=404, detail=Messages.VERSION_NOT_FOUND.value)
+    snapshot = load_snapshot(db, user_id, version_id)
+    if snapshot is None:
+        raise HTTPException(status_code=404, detail=Messages.SNAPSHOT_NOT_FOUND.value)
+    return snapshot
+
+
+@router.get("/{version_id}/responses/export")
+def export_version_responses(
+    version_id: int,
+    request: Request,
+    format: str = FORMAT_QUERY,
+    db: Session = Depends(get_read_db),
+    sessions: Callable[[], Session] = Depends(get_read_session_factory),
+) -> StreamingResponse:
+    """
+    Stream every response of a version: NDJSON or CSV (one row per answer,
+    gzip-compressed when the client accepts it), or Parquet / Arrow IPC
+    (one row per user, one column per question number).
+    """
+    if VersionService(db).get(version_id) is None:
+        raise HTTPException(status_code=404, detail=Messages.VERSION_NOT_FOUND.value)
+    return export_response(request, version_id, format, sessions)
+
@@ -0,0 +1,212 @@
+# benchmarks/bench_async.py
+"""
+Сравнение sync- и async-роутов (ASYNC_DB) при высокой конкурентности:
+requests/s и p50/p99 для одного и того же набора запросов.
+
+Приложение вызывается in-process через httpx.ASGITransport; sync-роуты
+при этом, как и под uvicorn, уходят в threadpool AnyIO (40 потоков по
+умолчанию), async-роуты — нет. По умолчанию база — временный файл SQLite
+(aiosqlite); показательные цифры — на PostgreSQL:
+
+    python benchmarks/bench_async.py --concurrency 200 --requests 5000
+    python benchmarks/bench_async.py --database-url postgresql://…/bench_db
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import pathlib
+import random
+import sys
+import tempfile
+import time
+from typing import Any, Dict, List
+
+ROOT = pathlib.Path(__file__).resolve().parents[1]
+sys.path.append(str(ROOT))
+sys.path.append(str(pathlib.Path(__file__).resolve().parent))
+os.environ.setdefault("DATABASE_URL", "sqlite://")
+os.environ.setdefault("SECRET_KEY", "bench")
+
+import httpx  # noqa: E402
+from sqlalchemy import create_engine  # noqa: E402
+from sqlalchemy.ext.asyncio import (  # noqa: E402
+    async_sessionmaker,
+    create_async_engine,
+)
+from sqlalchemy.orm import sessionmaker  # noqa: E402
+
+from bench_validation import _load_questionnaire, synthesize  # noqa: E402
+from db.async_database import async_url, get_async_db  # noqa: E402
+from db.base import Base  # noqa: E402
+from db.database import get_db, get_read_db  # noqa: E402
+from domain import models as m  # noqa: E402
+from domain.schemas import ResponseBatchCreate, ResponseBatchItem  # noqa: E402
+from main import create_app  # noqa: E402
+from services.answer_cache import answer_ctx_cache  # noqa: E402
+from services.catalog import question_catalog  # noqa: E402
+from services.response import ResponseService  # noqa: E402
+
+
+def seed(url: str, users: int, seed: int) -> int:
+    engine = create_engine(url, future=True)
+    Base.metadata.drop_all(bind=engine)
+    Base.metadata.create_all(bind=engine)
+    db = sessionmaker(bind=engine, autoflush=False, future=True)()
+    version_id = _load_questionnaire(db)
+    catalog = question_catalog.get(
+        version_id,
+        lambda vid: db.query(m.Question).filter(m.Question.version_id == vid).all(),
+    )
+    rng = random.Random(seed)
+    service = ResponseService(db)
+    for user_id in range(1, users + 1):
+        answers = synthesize(catalog, rng)
+        service.create_batch(
+            ResponseBatchCreate(
+                user_id=user_id,
+                version_id=version_id,
+                items=[
+                    ResponseBatchItem(question_id=q, response_value=v)
+                    for q, v in answers
+                ],
+            )
+        )
+    db.close()
+    engine.dispose()
+    return version_id
+
+
+def build_app(url: str, async_db: bool, pool_size: int):
+    app = create_app(async_db=async_db)
+    if async_db:
+        engine = create_async_engine(async_url(url), pool_size=pool_size)
+        sessions = async_sessionmaker(
+            bind=engine, autoflush=False, expire_on_commit=False
+        )
+
+        async def _get_db():
+            async with sessions() as db:
+                yield db
+
+        app.dependency_overrides[get_async_db] = _get_db
+    else:
+        engine = create_engine(url, future=True, pool_size=pool_size)
+        sessions = sessionmaker(bind=engine, autoflush=False, future=True)
+
+        def _get_db():
+            db = sessions()
+            try:
+                yield db
+            finally:
+                db.close()
+
+        app.dependency_overrides[get_db] = _get_db
+        # списки читают через get_read_db (реплики) — та же база бенчмарка
+        app.dependency_overrides[get_read_db] = _get_db
+    return app, engine
+
+
+def _requests(version_id: int, users: int, total: int, seed: int) -> List[str]:
+    rng = random.Random(seed)
+    paths = []
+    for _ in range(total):
+        user_id = rng.randint(1, users)
+        if rng.random() < 0.8:
+            paths.append(
+                f"/responses/?user_id={user_id}&version_id={version_id}&limit=50"
+            )
+        else:
+            paths.append(f"/versions/{version_id}/users/{user_id}/options/2.2.1")
+    return paths
+
+
+async def drive(app, paths: List[str], concurrency: int) -> Dict[str, Any]:
+    queue: "asyncio.Queue[str]" = asyncio.Queue()
+    for path in paths:
+        queue.put_nowait(path)
+    latencies: List[float] = []
+    errors = 0
+    transport = httpx.ASGITransport(app=app)
+
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+
+        async def worker():
+            nonlocal errors
+            while True:
+                try:
+                    path = queue.get_nowait()
+                except asyncio.QueueEmpty:
+                    return
+                start = time.perf_counter()
+                r = await client.get(path)
+                latencies.append(time.perf_counter() - start)
+                errors += r.status_code != 200
+
+        start = time.perf_counter()
+        await asyncio.gather(*(worker() for _ in range(concurrency)))
+        elapsed = time.perf_counter() - start
+
+    latencies.sort()
+    n = len(latencies)
+    return {
+        "requests": n,
+        "errors": errors,
+        "rps": n / elapsed,
+        "p50_ms": latencies[n // 2] * 1e3,
+        "p99_ms": latencies[min(n - 1, int(n * 0.99))] * 1e3,
+    }
+
+
+async def run_mode(url: str, async_db: bool, paths, concurrency: int) -> Dict[str, Any]:
+    # кэши процесса сбрасываются, чтобы оба режима начинали в равных условиях
+    question_catalog.clear()
+    answer_ctx_cache.clear()
+    # пул не должен быть узким местом ни в одном из режимов
+    app, engine = build_app(url, async_db, pool_size=concurrency)
+    await drive(app, paths[: min(len(paths), 200)], concurrency)  # прогрев
+    result = await drive(app, paths, concurrency)
+    if async_db:
+        await engine.dispose()
+    else:
+        engine.dispose()
+    return result
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter
+    )
+    parser.add_argument("--database-url")
+    parser.add_argument("--users", type=int, default=200)
+    parser.add_argument("--requests", type=int, default=5000)
+    parser.add_argument("--concurrency", type=int, default=200)
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--output", type=pathlib.Path)
+    args = parser.parse_args()
+
+    tmp = None
+    url = args.database_url
+    if url is None:
+        tmp = tempfile.TemporaryDirectory()
+        url = f"sqlite:///{tmp.name}/bench.db"
+    version_id = seed(url, args.users, args.seed)
+    paths = _requests(version_id, args.users, args.requests, args.seed)
+
+    report = {"concurrency": args.concurrency, "results": {}}
+    for mode, async_db in (("sync", False), ("async", True)):
+        result = asyncio.run(run_mode(url, async_db, paths, args.concurrency))
+        report["results"][mode] = result
+        print(
+            f"{mode:<6} {result['rps']:9.0f} req/s  p50 {result['p50_ms']:8.2f} ms  "
+            f"p99 {result['p99_ms']:8.2f} ms  errors {result['errors']}"
+        )
+    if args.output:
+        args.output.write_text(json.dumps(report, indent=2), encoding="utf-8")
+    if tmp is not None:
+        tmp.cleanup()
+
+
+if __name__ == "__main__":
+    main()
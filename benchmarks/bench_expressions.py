@@ -0,0 +1,62 @@
+# benchmarks/bench_expressions.py
+"""
+Микробенчмарк движка выражений (services/expressions.py): стоимость
+одного разбора и одного вычисления в микросекундах.
+
+    python benchmarks/bench_expressions.py [--number 200000]
+"""
+
+import argparse
+import pathlib
+import sys
+import timeit
+
+sys.path.append(str(pathlib.Path(__file__).resolve().parents[1]))
+
+from services.expressions import (  # noqa: E402
+    _Parser,
+    compile_condition,
+    compile_expression,
+    compile_range_table,
+)
+
+FIRE_TABLE = {
+    "<50": "R90",
+    "50-75": "R120",
+    "75-100": "R150",
+    "100-150": "R180",
+    ">150": "R240",
+}
+CTX = {"num:2.1.13": 87, "num:2.2": 1}
+
+
+def _us(fn, number: int) -> float:
+    # лучший из трёх прогонов, микросекунды на вызов
+    return min(timeit.repeat(fn, number=number, repeat=3)) / number * 1e6
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--number", type=int, default=200_000)
+    args = parser.parse_args()
+    n = args.number
+
+    calc = compile_expression("II if 2.1.13 < 50 else I")
+    table = compile_range_table(FIRE_TABLE, "2.1.13")
+    cond = compile_condition(">0")
+    flag = compile_condition("True")
+
+    source = "II if 2.1.13 < 50 else I"
+    rows = [
+        (f"parse  {source!r}", lambda: _Parser(source).parse(), n // 10),
+        ("eval   calculation 3.6", lambda: calc.evaluate(CTX), n),
+        ("eval   range table 3.8", lambda: table.evaluate(CTX), n),
+        ("eval   condition '>0'", lambda: cond.evaluate(CTX, 1), n),
+        ("eval   condition 'True'", lambda: flag.evaluate(CTX, True), n),
+    ]
+    for name, fn, number in rows:
+        print(f"{name:<40} {_us(fn, number):8.3f} µs")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,115 @@
+# benchmarks/bench_json.py
+"""
+Сериализация списков в JSON: MB/s и мкс на страницу для
+
+  - codec.<name>       — голый dumps кодека (json / orjson) на странице ответов;
+  - list.response_model — прежний путь списка: валидация List[Response]
+                          из ORM-строк, dump(mode="json"), JSONResponse;
+  - list.rows.<name>   — api/codec.rows_response тем же кодеком.
+
+Строки — несохранённые ORM-объекты Response, без БД.
+
+    python benchmarks/bench_json.py [--rows 1000] [--number 200]
+"""
+
+import argparse
+import datetime
+import os
+import pathlib
+import random
+import sys
+import timeit
+from typing import List
+
+sys.path.append(str(pathlib.Path(__file__).resolve().parents[1]))
+os.environ.setdefault("DATABASE_URL", "sqlite://")
+os.environ.setdefault("SECRET_KEY", "bench")
+
+from fastapi import Response  # noqa: E402
+from fastapi.responses import JSONResponse  # noqa: E402
+from pydantic import TypeAdapter  # noqa: E402
+
+import api.codec  # noqa: E402
+from db.codec import JSONCodec, make_codec  # noqa: E402
+from domain import models as m  # noqa: E402
+from domain.schemas import Response as ResponseSchema  # noqa: E402
+
+VALUES = [
+    lambda r: r.randint(1, 40),
+    lambda r: r.random() * 1000,
+    lambda r: r.choice([True, False]),
+    lambda r: r.choice(["Да", "Нет", "Кирпич", "Панель"]),
+    lambda r: r.sample(["A", "B", "C", "D", "E"], 2),
+    lambda r: {"min": r.randint(0, 5), "max": r.randint(6, 99)},
+]
+
+
+def make_rows(count: int, seed: int = 1) -> List[m.Response]:
+    rnd = random.Random(seed)
+    start = datetime.datetime(2026, 1, 1)
+    return [
+        m.Response(
+            id=i,
+            user_id=rnd.randint(1, 10_000),
+            version_id=1,
+            question_id=rnd.randint(1, 192),
+            response_value=rnd.choice(VALUES)(rnd),
+            response_timestamp=start + datetime.timedelta(seconds=i * 37),
+        )
+        for i in range(1, count + 1)
+    ]
+
+
+def _measure(fn, number: int) -> float:
+    # лучший из трёх прогонов, секунды на вызов
+    return min(timeit.repeat(fn, number=number, repeat=3)) / number
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rows", type=int, default=1000)
+    parser.add_argument("--number", type=int, default=200)
+    args = parser.parse_args()
+
+    rows = make_rows(args.rows)
+    codecs = [JSONCodec()]
+    try:
+        codecs.append(make_codec("orjson"))
+    except ImportError:
+        print("orjson is not installed: only the stdlib codec is measured\n")
+
+    adapter = TypeAdapter(List[ResponseSchema])
+    plain = adapter.dump_python(
+        adapter.validate_python(rows, from_attributes=True), mode="json"
+    )
+
+    def response_model_path() -> bytes:
+        # то, что FastAPI делает со списком при response_model
+        validated = adapter.validate_python(rows, from_attributes=True)
+        return JSONResponse(adapter.dump_python(validated, mode="json")).body
+
+    def rows_path() -> bytes:
+        return api.codec.rows_response(rows, ResponseSchema, Response()).body
+
+    print(f"{args.rows} rows per page\n")
+    print(f"{'case':<24} {'µs/page':>10} {'MB/s':>8} {'bytes':>9}")
+
+    def report(name: str, fn) -> None:
+        size = len(fn())
+        seconds = _measure(fn, args.number)
+        print(f"{name:<24} {seconds * 1e6:10.1f} {size / seconds / 1e6:8.1f} {size:9d}")
+
+    for codec in codecs:
+        report(f"codec.{codec.name}", lambda: codec.dumps(plain))
+    report("list.response_model", response_model_path)
+    default = api.codec.codec
+    try:
+        for codec in codecs:
+            api.codec.codec = codec
+            report(f"list.rows.{codec.name}", rows_path)
+    finally:
+        api.codec.codec = default
+
+
+if __name__ == "__main__":
+    main()
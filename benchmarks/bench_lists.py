@@ -0,0 +1,112 @@
+# benchmarks/bench_lists.py
+"""
+Страница списка ответов целиком — запрос в БД плюс JSON — мкс на страницу для
+
+  - orm.response_model — ORM-сущности, валидация List[Response], JSONResponse;
+  - orm.rows           — ORM-сущности, api/codec.rows_response;
+  - core.tuples        — Core select() без ORM, api/codec.tuples_response
+                         (CORE_LIST_ENDPOINTS).
+
+БД — SQLite в памяти, засеянная --rows ответами одной версии.
+
+    python benchmarks/bench_lists.py [--rows 1000] [--number 50]
+"""
+
+import argparse
+import os
+import pathlib
+import sys
+import timeit
+from typing import List
+
+sys.path.append(str(pathlib.Path(__file__).resolve().parents[1]))
+os.environ.setdefault("DATABASE_URL", "sqlite://")
+os.environ.setdefault("SECRET_KEY", "bench")
+
+from fastapi import Response  # noqa: E402
+from fastapi.responses import JSONResponse  # noqa: E402
+from pydantic import TypeAdapter  # noqa: E402
+from sqlalchemy import create_engine  # noqa: E402
+from sqlalchemy.orm import sessionmaker  # noqa: E402
+from sqlalchemy.pool import StaticPool  # noqa: E402
+
+from api.codec import rows_response, tuples_response  # noqa: E402
+from db.base import Base  # noqa: E402
+from db.codec import engine_options  # noqa: E402
+from domain import models as m  # noqa: E402
+from domain.schemas import Response as ResponseSchema  # noqa: E402
+from repositories.response import ResponseRepository  # noqa: E402
+
+from bench_json import make_rows  # noqa: E402
+
+
+def seed(rows: int):
+    engine = create_engine(
+        "sqlite://",
+        connect_args={"check_same_thread": False},
+        poolclass=StaticPool,
+        **engine_options(),
+    )
+    Base.metadata.create_all(engine)
+    sessions = sessionmaker(bind=engine, autoflush=False)
+    with sessions() as db:
+        version = m.Version(name="bench")
+        db.add(version)
+        db.flush()
+        db.add_all(
+            m.Question(version_id=version.id, number=str(n), text="t", type="text")
+            for n in range(1, 193)
+        )
+        # (user, question) уникальны в версии — пользователь на каждую строку
+        for i, row in enumerate(make_rows(rows), 1):
+            row.id, row.user_id, row.version_id = None, i, version.id
+            db.add(row)
+        db.commit()
+        return sessions, version.id
+
+
+def _measure(fn, number: int) -> float:
+    # лучший из трёх прогонов, секунды на вызов
+    return min(timeit.repeat(fn, number=number, repeat=3)) / number
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rows", type=int, default=1000)
+    parser.add_argument("--number", type=int, default=50)
+    args = parser.parse_args()
+
+    sessions, version_id = seed(args.rows)
+    adapter = TypeAdapter(List[ResponseSchema])
+
+    def orm_response_model() -> bytes:
+        with sessions() as db:
+            rows, _ = ResponseRepository(db).page(version_id=version_id, limit=args.rows)
+            validated = adapter.validate_python(rows, from_attributes=True)
+            return JSONResponse(adapter.dump_python(validated, mode="json")).body
+
+    def orm_rows() -> bytes:
+        with sessions() as db:
+            rows, _ = ResponseRepository(db).page(version_id=version_id, limit=args.rows)
+            return rows_response(rows, ResponseSchema, Response()).body
+
+    def core_tuples() -> bytes:
+        with sessions() as db:
+            rows, _ = ResponseRepository(db).rows_page(
+                version_id=version_id, limit=args.rows
+            )
+            return tuples_response(rows, ResponseSchema, Response()).body
+
+    print(f"{args.rows} rows per page\n")
+    print(f"{'case':<22} {'µs/page':>10} {'bytes':>9}")
+    for name, fn in (
+        ("orm.response_model", orm_response_model),
+        ("orm.rows", orm_rows),
+        ("core.tuples", core_tuples),
+    ):
+        size = len(fn())
+        print(f"{name:<22} {_measure(fn, args.number) * 1e6:10.1f} {size:9d}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,333 @@
+# benchmarks/bench_validation.py
+"""
+Бенчмарк валидации ответов на реальной анкете (data/questions_v1.json)
+в in-memory SQLite: пропускная способность и p50/p99 по группам
+
+  - coerce.<type>   — приведение типа скомпилированным вопросом;
+  - rule.<family>   — каждое семейство правил (depends_on, area, …);
+  - create.cold     — ResponseService.create со сборкой контекста из БД;
+  - create.warm     — то же при закэшированном контексте;
+  - fill.batch      — заполнение всей анкеты одним create_batch на пользователя.
+
+    python benchmarks/bench_validation.py --output new.json
+    python benchmarks/bench_validation.py --compare baseline.json [--threshold 0.1]
+    python benchmarks/bench_validation.py --compare baseline.json --current new.json
+
+В режиме сравнения ненулевой код выхода означает регрессию: p50 вырос
+или пропускная способность упала больше чем на threshold.
+"""
+
+import argparse
+import json
+import os
+import pathlib
+import platform
+import random
+import sys
+import time
+from collections import defaultdict
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+ROOT = pathlib.Path(__file__).resolve().parents[1]
+sys.path.append(str(ROOT))
+os.environ.setdefault("DATABASE_URL", "sqlite://")
+os.environ.setdefault("SECRET_KEY", "bench")
+
+import sqlalchemy  # noqa: E402
+from sqlalchemy import create_engine  # noqa: E402
+from sqlalchemy.orm import sessionmaker  # noqa: E402
+from sqlalchemy.pool import StaticPool  # noqa: E402
+
+from db.base import Base  # noqa: E402
+from domain import models as m  # noqa: E402
+from domain.schemas import (  # noqa: E402
+    ResponseBatchCreate,
+    ResponseBatchItem,
+    ResponseCreate,
+)
+from services.answer_cache import answer_ctx_cache  # noqa: E402
+from services.catalog import QuestionCatalog, question_catalog  # noqa: E402
+from services.question_import import QuestionImportService  # noqa: E402
+from services.response import ResponseService  # noqa: E402
+
+Answers = List[Tuple[int, Any]]
+
+METRICS = ("ops_per_s", "p50_us", "p99_us")
+
+
+# ---------- fixture ----------
+
+
+def _session():
+    engine = create_engine(
+        "sqlite+pysqlite:///:memory:",
+        connect_args={"check_same_thread": False},
+        poolclass=StaticPool,
+        future=True,
+    )
+    Base.metadata.create_all(bind=engine)
+    return sessionmaker(bind=engine, autoflush=False, future=True)()
+
+
+def _load_questionnaire(db) -> int:
+    # через импорт: номера 2.1.2–2.1.21 в файле повторяются, а (version, number)
+    # уникален — импорт оставляет первый вариант, как и для API
+    path = ROOT / "data" / "questions_v1.json"
+    with open(path, "r", encoding="utf-8") as f:
+        name = json.load(f)["version"]["name"]
+    version = m.Version(name=name)
+    db.add(version)
+    db.commit()
+    QuestionImportService(db).load(version.id, [path.read_bytes()])
+    return version.id
+
+
+def _candidates(question, rng: random.Random) -> List[Any]:
+    constraints = question.constraints or {}
+    options = question.options
+    fallback = [constraints.get("example"), constraints.get("default")]
+    if question.type == "boolean":
+        return [rng.random() < 0.5, *fallback]
+    if question.type == "integer":
+        low = constraints.get("min", 0)
+        high = constraints.get("max", max(low, 0) + 20)
+        return [rng.randint(low, high), *fallback, low]
+    if question.type == "dropdown":
+        values = options.get("values") if isinstance(options, dict) else options
+        return [rng.choice(values) if values else None, *fallback]
+    return [f"Ответ {rng.randrange(10_000)}", *fallback]
+
+
+def synthesize(catalog: QuestionCatalog, rng: random.Random) -> Answers:
+    """
+    Валидное заполнение анкеты одним пользователем: вопросы обходятся
+    в порядке зависимостей, значение, не прошедшее проверки (в т.ч.
+    выключенный depends_on), пропускается — как при реальном заполнении.
+    """
+    plan = catalog.plan
+    ctx: Dict[str, Any] = {}
+    answers: Answers = []
+    for compiled in sorted(plan.by_id.values(), key=lambda q: plan.order[q.id]):
+        if compiled.calc is not None:
+            continue
+        if compiled.options is not None and compiled.options.is_dynamic:
+            effective = compiled.options.effective(ctx)
+            candidates = [[rng.choice(effective)]] if effective else []
+        else:
+            candidates = _candidates(catalog.by_id[compiled.id], rng)
+        for raw in candidates:
+            if raw is None:
+                continue
+            ctx[compiled.num_key] = raw
+            try:
+                value = compiled.validate(raw, ctx)
+            except ValueError:
+                ctx.pop(compiled.num_key, None)
+                continue
+            ctx[compiled.id_key] = ctx[compiled.num_key] = value
+            answers.append((compiled.id, raw))
+            break
+    return answers
+
+
+# ---------- measurement ----------
+
+
+def _summary(samples: List[float]) -> Dict[str, float]:
+    ordered = sorted(samples)
+    n = len(ordered)
+    total = sum(ordered)
+    return {
+        "n": n,
+        "ops_per_s": n / total if total else 0.0,
+        "mean_us": total / n * 1e6,
+        "p50_us": ordered[n // 2] * 1e6,
+        "p99_us": ordered[min(n - 1, int(n * 0.99))] * 1e6,
+    }
+
+
+def _time_calls(calls: List[Callable[[], Any]], repeat: int) -> List[float]:
+    clock = time.perf_counter
+    samples = []
+    for _ in range(repeat):
+        for call in calls:
+            start = clock()
+            call()
+            samples.append(clock() - start)
+    return samples
+
+
+def bench_coerce(catalog, fills: List[Answers], repeat: int) -> Dict[str, List[float]]:
+    plan = catalog.plan
+    calls: Dict[str, List[Callable]] = defaultdict(list)
+    for answers in fills[:20]:
+        for qid, raw in answers:
+            compiled = plan.get(qid)
+            calls[compiled.type].append(lambda c=compiled, r=raw: c.coerce(r))
+    return {f"coerce.{t}": _time_calls(c, repeat) for t, c in sorted(calls.items())}
+
+
+def bench_rules(catalog, fills: List[Answers], repeat: int) -> Dict[str, List[float]]:
+    plan = catalog.plan
+    calls: Dict[str, List[Callable]] = defaultdict(list)
+    for answers in fills[:20]:
+        ctx: Dict[str, Any] = {}
+        for qid, raw in answers:
+            compiled = plan.get(qid)
+            ctx[compiled.num_key] = raw
+            value = compiled.validate(raw, ctx)
+            ctx[compiled.id_key] = ctx[compiled.num_key] = value
+        for qid, raw in answers:
+            compiled = plan.get(qid)
+            value = ctx[compiled.id_key]
+            for rule in compiled.pre_rules:
+                calls[rule.family].append(lambda r=rule, v=raw, c=ctx: r.check(v, c))
+            for rule in compiled.post_rules:
+                calls[rule.family].append(lambda r=rule, v=value, c=ctx: r.check(v, c))
+    return {f"rule.{f}": _time_calls(c, repeat) for f, c in sorted(calls.items())}
+
+
+def bench_create(db, version_id, fills: List[Answers], first_user: int, cold: bool):
+    service = ResponseService(db)
+    samples = []
+    clock = time.perf_counter
+    for offset, answers in enumerate(fills):
+        user_id = first_user + offset
+        for qid, raw in answers:
+            payload = ResponseCreate(
+                user_id=user_id,
+                version_id=version_id,
+                question_id=qid,
+                response_value=raw,
+            )
+            if cold:
+                answer_ctx_cache.invalidate(user_id, version_id)
+            start = clock()
+            service.create(payload)
+            samples.append(clock() - start)
+    return samples
+
+
+def bench_fill(db, version_id, fills: List[Answers], first_user: int) -> List[float]:
+    service = ResponseService(db)
+    samples = []
+    clock = time.perf_counter
+    for offset, answers in enumerate(fills):
+        payload = ResponseBatchCreate(
+            user_id=first_user + offset,
+            version_id=version_id,
+            items=[
+                ResponseBatchItem(question_id=qid, response_value=raw)
+                for qid, raw in answers
+            ],
+        )
+        start = clock()
+        result = service.create_batch(payload)
+        samples.append(clock() - start)
+        rejected = [i for i in result.items if i.status != "created"]
+        if rejected:
+            raise RuntimeError(f"synthetic fill rejected: {rejected[0]}")
+    return samples
+
+
+def run(users: int, create_users: int, repeat: int, seed: int) -> Dict[str, Any]:
+    db = _session()
+    version_id = _load_questionnaire(db)
+    catalog = question_catalog.get(
+        version_id,
+        lambda vid: db.query(m.Question).filter(m.Question.version_id == vid).all(),
+    )
+    rng = random.Random(seed)
+    fills = [synthesize(catalog, rng) for _ in range(users)]
+
+    samples: Dict[str, List[float]] = {}
+    samples.update(bench_coerce(catalog, fills, repeat))
+    samples.update(bench_rules(catalog, fills, repeat))
+    half = max(1, create_users // 2)
+    samples["create.cold"] = bench_create(db, version_id, fills[:half], 1, True)
+    samples["create.warm"] = bench_create(
+        db, version_id, fills[half:create_users], 1 + half, False
+    )
+    samples["fill.batch"] = bench_fill(db, version_id, fills, 100_000)
+    db.close()
+
+    return {
+        "meta": {
+            "python": platform.python_version(),
+            "sqlalchemy": sqlalchemy.__version__,
+            "questions": len(catalog.questions),
+            "users": users,
+            "answers_per_user": sum(map(len, fills)) / len(fills),
+            "seed": seed,
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        },
+        "results": {name: _summary(s) for name, s in samples.items() if s},
+    }
+
+
+# ---------- comparison ----------
+
+
+def compare(
+    baseline: Dict[str, Any], current: Dict[str, Any], threshold: float
+) -> List[str]:
+    """Names of benchmarks whose p50 grew or throughput fell beyond threshold."""
+    regressions = []
+    old_results, new_results = baseline["results"], current["results"]
+    print(f"{'benchmark':<28} {'p50 old':>10} {'p50 new':>10} {'Δ p50':>8} {'Δ ops':>8}")
+    for name in sorted(old_results.keys() & new_results.keys()):
+        old, new = old_results[name], new_results[name]
+        d_p50 = new["p50_us"] / old["p50_us"] - 1 if old["p50_us"] else 0.0
+        d_ops = new["ops_per_s"] / old["ops_per_s"] - 1 if old["ops_per_s"] else 0.0
+        flag = d_p50 > threshold or d_ops < -threshold
+        if flag:
+            regressions.append(name)
+        print(
+            f"{name:<28} {old['p50_us']:10.2f} {new['p50_us']:10.2f} "
+            f"{d_p50:+8.1%} {d_ops:+8.1%}{'  REGRESSION' if flag else ''}"
+        )
+    return regressions
+
+
+def _print(report: Dict[str, Any]) -> None:
+    print(f"{'benchmark':<28} {'n':>8} {'ops/s':>12} {'p50 µs':>10} {'p99 µs':>10}")
+    for name, r in report["results"].items():
+        print(
+            f"{name:<28} {r['n']:8d} {r['ops_per_s']:12.0f} "
+            f"{r['p50_us']:10.2f} {r['p99_us']:10.2f}"
+        )
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(
+        description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter
+    )
+    parser.add_argument("--users", type=int, default=1000)
+    parser.add_argument("--create-users", type=int, default=20)
+    parser.add_argument("--repeat", type=int, default=50)
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--output", type=pathlib.Path)
+    parser.add_argument("--compare", type=pathlib.Path, metavar="BASELINE")
+    parser.add_argument("--current", type=pathlib.Path)
+    parser.add_argument("--threshold", type=float, default=0.10)
+    args = parser.parse_args(argv)
+
+    if args.current:
+        report = json.loads(args.current.read_text(encoding="utf-8"))
+    else:
+        report = run(args.users, args.create_users, args.repeat, args.seed)
+        _print(report)
+    if args.output:
+        args.output.write_text(json.dumps(report, indent=2), encoding="utf-8")
+
+    if args.compare:
+        baseline = json.loads(args.compare.read_text(encoding="utf-8"))
+        regressions = compare(baseline, report, args.threshold)
+        if regressions:
+            print(f"regressions (> {args.threshold:.0%}): {', '.join(regressions)}")
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,55 @@
+# db/async_database.py
+"""
+Асинхронный доступ к БД (включается ASYNC_DB=true): AsyncEngine поверх
+asyncpg / aiosqlite. URL берётся из ASYNC_DATABASE_URL, иначе выводится
+из DATABASE_URL заменой драйвера.
+"""
+
+from functools import lru_cache
+from typing import AsyncIterator
+
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+
+from db.codec import engine_options
+from db.settings import Settings
+
+_ASYNC_DRIVERS = {"postgresql": "asyncpg", "sqlite": "aiosqlite"}
+
+
+def async_url(url: str) -> str:
+    """postgresql://… → postgresql+asyncpg://…, sqlite://… → sqlite+aiosqlite://…"""
+    parsed = make_url(url)
+    backend = parsed.get_backend_name()
+    driver = _ASYNC_DRIVERS.get(backend)
+    if driver is None or parsed.get_driver_name() == driver:
+        return url
+    return parsed.set(drivername=f"{backend}+{driver}").render_as_string(
+        hide_password=False
+    )
+
+
+@lru_cache(maxsize=None)
+def async_sessionmaker_() -> async_sessionmaker:
+    """
+    Фабрика AsyncSession; движок создаётся при первом обращении, чтобы
+    в sync-режиме не требовать установленных asyncpg/aiosqlite.
+    """
+    settings = Settings()
+    engine = create_async_engine(
+        settings.ASYNC_DATABASE_URL or async_url(settings.DATABASE_URL),
+        future=True,
+        **engine_options(),
+    )
+    # expire_on_commit=False: после commit атрибуты читаются без ленивой загрузки
+    return async_sessionmaker(bind=engine, autoflush=False, expire_on_commit=False)
+
+
+async def get_async_db() -> AsyncIterator[AsyncSession]:
+    async with async_sessionmaker_()() as db:
+        yield db
+
+
+def get_async_session_factory() -> async_sessionmaker:
+    """Session factory for streaming responses, which outlive get_async_db."""
+    return async_sessionmaker_()
@@ -0,0 +1,97 @@
+# db/codec.py
+"""
+JSON-кодек приложения: колонки JSON (сериализатор движка SQLAlchemy) и
+тела ответов API (api/codec.py). orjson — если установлен, иначе stdlib
+json с тем же результатом: компактно, UTF-8 без \\u-экранирования,
+datetime в ISO 8601. Выбор — JSON_CODEC (auto | orjson | json).
+"""
+
+import datetime
+import decimal
+import json
+import uuid
+from typing import Any, Callable, Dict, Union
+
+from db.settings import Settings
+
+
+def _default(value: Any) -> Any:
+    # то, что stdlib json не умеет, а orjson и pydantic — умеют
+    if isinstance(value, datetime.datetime):
+        text = value.isoformat()
+        return text[:-6] + "Z" if text.endswith("+00:00") else text
+    if isinstance(value, (datetime.date, datetime.time)):
+        return value.isoformat()
+    if isinstance(value, uuid.UUID):
+        return str(value)
+    if isinstance(value, decimal.Decimal):
+        return float(value)
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+
+class JSONCodec:
+    """dumps → UTF-8 bytes, loads ← str | bytes."""
+
+    name = "json"
+
+    def __init__(self) -> None:
+        self._encoder = json.JSONEncoder(
+            ensure_ascii=False, separators=(",", ":"), default=_default
+        )
+
+    def dumps(self, value: Any) -> bytes:
+        return self._encoder.encode(value).encode("utf-8")
+
+    def dumps_text(self, value: Any) -> str:
+        """For drivers that bind JSON as text (json_serializer of the engine)."""
+        return self._encoder.encode(value)
+
+    def loads(self, data: Union[str, bytes]) -> Any:
+        return json.loads(data)
+
+
+class ORJSONCodec(JSONCodec):
+    name = "orjson"
+
+    def __init__(self) -> None:
+        import orjson
+
+        self._dumps = orjson.dumps
+        self._loads = orjson.loads
+        self._option = orjson.OPT_NON_STR_KEYS | orjson.OPT_UTC_Z
+
+    def dumps(self, value: Any) -> bytes:
+        return self._dumps(value, default=_default, option=self._option)
+
+    def dumps_text(self, value: Any) -> str:
+        return self.dumps(value).decode("utf-8")
+
+    def loads(self, data: Union[str, bytes]) -> Any:
+        if not isinstance(data, (str, bytes, bytearray, memoryview)):
+            # SQLite с NUMERIC-аффинитетом отдаёт JSON-число уже числом;
+            # SQLAlchemy пропускает его как есть только на TypeError, как у json.loads
+            raise TypeError(f"the JSON object must be str or bytes, not {type(data).__name__}")
+        return self._loads(data)
+
+
+_CODECS: Dict[str, Callable[[], JSONCodec]] = {"json": JSONCodec, "orjson": ORJSONCodec}
+
+
+def make_codec(name: str = "auto") -> JSONCodec:
+    """Codec by name; "auto" prefers orjson and falls back to stdlib json."""
+    if name != "auto":
+        if name not in _CODECS:
+            raise ValueError(f"Unknown JSON_CODEC {name!r}, expected one of {sorted(_CODECS)}")
+        return _CODECS[name]()
+    try:
+        return ORJSONCodec()
+    except ImportError:
+        return JSONCodec()
+
+
+codec = make_codec(Settings().JSON_CODEC)
+
+
+def engine_options() -> Dict[str, Any]:
+    """create_engine(**engine_options()): JSON columns through the codec."""
+    return {"json_serializer": codec.dumps_text, "json_deserializer": codec.loads}
@@ -1,17 +1,53 @@
+from typing import Callable
+
+from fastapi import Request
 from sqlalchemy import create_engine
-from sqlalchemy.orm import sessionmaker
+from db.codec import engine_options
+from db.routing import DatabaseRouter, replica_urls
 from db.settings import Settings
+from sqlalchemy.orm import Session
 
 settings = Settings()
 
-engine = create_engine(settings.DATABASE_URL, future=True)
+engine = create_engine(settings.DATABASE_URL, future=True, **engine_options())
+
+# реплики для read-only роутов (DATABASE_REPLICA_URLS); без них всё идёт в primary
+router = DatabaseRouter(
+    engine,
+    [
+        create_engine(url, future=True, **engine_options())
+        for url in replica_urls(settings.DATABASE_REPLICA_URLS)
+    ],
+)
 
-SessionLocal = sessionmaker(bind=engine, autocommit=False, autoflush=False, future=True)
+SessionLocal = router.writer
 
 
 def get_db():
-    db = SessionLocal()
+    db = router.writer()
+    try:
+        yield db
+    finally:
+        db.close()
+
+
+def get_read_db(request: Request):
+    """Session for read-only routes: a replica, or the primary after a write."""
+    db = router.session_for(request)
     try:
         yield db
     finally:
         db.close()
+
+
+def get_read_session_factory(request: Request) -> Callable[[], Session]:
+    """
+    Like get_read_db, but for streaming responses: the body is produced after
+    dependencies have exited, so the stream opens (and closes) its own session.
+    """
+    return lambda: router.session_for(request)
+
+
+def get_session_factory() -> Callable[[], Session]:
+    """Primary session factory for work that outlives the request (background tasks)."""
+    return router.writer
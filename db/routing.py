@@ -0,0 +1,87 @@
+# db/routing.py
+"""
+Маршрутизация сессий между primary и read-репликами.
+
+Запись — всегда primary; read-only роуты получают сессию реплики
+(по кругу). Чтобы пользователь видел свои записи, несмотря на лаг
+репликации, после успешного пишущего запроса клиенту ставится cookie
+"читать с primary до <момент>" (read-your-writes): cookie не привязан
+к воркеру, поэтому работает и при нескольких процессах.
+"""
+
+import itertools
+import time
+from typing import List, Sequence
+
+from fastapi import Request, Response
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from sqlalchemy.orm import ORMExecuteState, Session, sessionmaker
+
+PRIMARY_COOKIE = "db_primary_until"
+
+SAFE_METHODS = frozenset({"GET", "HEAD", "OPTIONS"})
+
+
+def replica_urls(value: str) -> List[str]:
+    """DATABASE_REPLICA_URLS: URL реплик через запятую."""
+    return [url.strip() for url in value.split(",") if url.strip()]
+
+
+def _reject_writes(state: ORMExecuteState) -> None:
+    if not state.is_select:
+        raise RuntimeError("Write attempted on a read-replica session.")
+
+
+def _reject_flush(session: Session, flush_context, instances) -> None:
+    raise RuntimeError("Write attempted on a read-replica session.")
+
+
+class DatabaseRouter:
+    """Session factories for one primary engine and any number of replicas."""
+
+    def __init__(self, primary: Engine, replicas: Sequence[Engine] = ()) -> None:
+        self.primary = primary
+        self.replicas = tuple(replicas)
+        self.writer = sessionmaker(
+            bind=primary, autocommit=False, autoflush=False, future=True
+        )
+        self._readers = []
+        for replica in self.replicas:
+            reader = sessionmaker(bind=replica, autoflush=False, future=True)
+            # реплика только для чтения: случайная запись — ошибка, а не расхождение
+            event.listen(reader, "do_orm_execute", _reject_writes)
+            event.listen(reader, "before_flush", _reject_flush)
+            self._readers.append(reader)
+        self._turn = itertools.count()
+
+    def reader(self) -> Session:
+        """A replica session (round-robin); the primary when none are configured."""
+        if not self._readers:
+            return self.writer()
+        return self._readers[next(self._turn) % len(self._readers)]()
+
+    def session_for(self, request: Request) -> Session:
+        """Session for a read-only route: replica unless the client is pinned."""
+        if pinned_to_primary(request):
+            return self.writer()
+        return self.reader()
+
+
+def pinned_to_primary(request: Request) -> bool:
+    try:
+        until = float(request.cookies.get(PRIMARY_COOKIE, 0))
+    except ValueError:
+        return False
+    return until > time.time()
+
+
+def pin_to_primary(response: Response, seconds: float) -> None:
+    """Route this client's reads to the primary for the next `seconds`."""
+    response.set_cookie(
+        PRIMARY_COOKIE,
+        f"{time.time() + seconds:.3f}",
+        max_age=max(1, int(seconds + 0.999)),
+        httponly=True,
+        samesite="lax",
+    )
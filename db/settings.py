@@ -8,6 +8,10 @@ try:
     class Settings(BaseSettings):
         # --- DB ---
         DATABASE_URL: str
+        ASYNC_DB: bool = False  # async-роуты и AsyncSession вместо sync Session
+        ASYNC_DATABASE_URL: Optional[str] = None  # по умолчанию — из DATABASE_URL
+        DATABASE_REPLICA_URLS: str = ""  # read-реплики через запятую
+        READ_YOUR_WRITES_SECONDS: float = 5.0  # чтение с primary после записи; 0 — выкл.
 
         # --- Security / Auth ---
         SECRET_KEY: str
@@ -18,6 +22,22 @@ try:
         UVICORN_HOST: str = "0.0.0.0"
         UVICORN_PORT: int = 8000
 
+        # --- Caches ---
+        ANSWER_CTX_CACHE_SIZE: int = 10000  # 0 — кэш контекстов ответов выключен
+        ANSWER_CTX_CACHE_TTL: float = 60.0  # секунды
+        SURVEY_SNAPSHOTS: bool = False  # документ всех ответов на (user, version)
+
+        # --- Metrics ---
+        VALIDATION_METRICS: bool = False  # тайминги правил, /metricz, Server-Timing
+
+        # --- Maintenance ---
+        PURGE_CHUNK_SIZE: int = 5000  # строк на транзакцию фонового удаления
+
+        # --- Serialization ---
+        JSON_CODEC: str = "auto"  # orjson | json; auto — orjson, если установлен
+        # списки, читаемые Core select() без ORM-сущностей; пусто — все через ORM
+        CORE_LIST_ENDPOINTS: str = "responses,questions"
+
         # --- Config ---
         model_config = SettingsConfigDict(
             env_file=".env",
@@ -30,6 +50,10 @@ except Exception:
     class Settings(BaseSettings):
         # --- DB ---
         DATABASE_URL: str
+        ASYNC_DB: bool = False  # async-роуты и AsyncSession вместо sync Session
+        ASYNC_DATABASE_URL: Optional[str] = None  # по умолчанию — из DATABASE_URL
+        DATABASE_REPLICA_URLS: str = ""  # read-реплики через запятую
+        READ_YOUR_WRITES_SECONDS: float = 5.0  # чтение с primary после записи; 0 — выкл.
 
         # --- Security / Auth ---
         SECRET_KEY: str
@@ -40,6 +64,22 @@ except Exception:
         UVICORN_HOST: str = "0.0.0.0"
         UVICORN_PORT: int = 8000
 
+        # --- Caches ---
+        ANSWER_CTX_CACHE_SIZE: int = 10000  # 0 — кэш контекстов ответов выключен
+        ANSWER_CTX_CACHE_TTL: float = 60.0  # секунды
+        SURVEY_SNAPSHOTS: bool = False  # документ всех ответов на (user, version)
+
+        # --- Metrics ---
+        VALIDATION_METRICS: bool = False  # тайминги правил, /metricz, Server-Timing
+
+        # --- Maintenance ---
+        PURGE_CHUNK_SIZE: int = 5000  # строк на транзакцию фонового удаления
+
+        # --- Serialization ---
+        JSON_CODEC: str = "auto"  # orjson | json; auto — orjson, если установлен
+        # списки, читаемые Core select() без ORM-сущностей; пусто — все через ORM
+        CORE_LIST_ENDPOINTS: str = "responses,questions"
+
         class Config:
             env_file = ".env"
             env_file_encoding = "utf-8"
@@ -0,0 +1,86 @@
+# db/unit_of_work.py
+"""
+Unit of work: одна транзакция и один commit на вызов сервиса.
+
+Репозитории не коммитят сами — запись идёт одним INSERT/UPDATE/DELETE …
+RETURNING в открытой транзакции, commit делает внешний scope. Вложенные
+scope'ы (сервис вызывает сервис, async-обёртка над run_sync) присоединяются
+к внешнему. Побочные эффекты вне БД (кэши процесса) откладываются через
+after_commit и выполняются только после успешного commit.
+"""
+
+from contextlib import asynccontextmanager, contextmanager
+from typing import AsyncIterator, Callable, Iterator, List, Optional, Union
+
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+_KEY = "unit_of_work"
+
+
+class UnitOfWork:
+    """The transaction scope of one service call plus its after-commit hooks."""
+
+    __slots__ = ("_callbacks",)
+
+    def __init__(self) -> None:
+        self._callbacks: List[Callable[[], None]] = []
+
+    def after_commit(self, callback: Callable[[], None]) -> None:
+        self._callbacks.append(callback)
+
+    def _committed(self) -> None:
+        callbacks, self._callbacks = self._callbacks, []
+        for callback in callbacks:
+            callback()
+
+
+def current(session: Union[Session, AsyncSession]) -> Optional[UnitOfWork]:
+    return session.info.get(_KEY)
+
+
+def after_commit(
+    session: Union[Session, AsyncSession], callback: Callable[[], None]
+) -> None:
+    """Run `callback` after the current unit of work commits (now if none)."""
+    uow = current(session)
+    if uow is None:
+        callback()
+    else:
+        uow.after_commit(callback)
+
+
+@contextmanager
+def unit_of_work(session: Session) -> Iterator[UnitOfWork]:
+    uow = current(session)
+    if uow is not None:
+        yield uow
+        return
+    uow = session.info[_KEY] = UnitOfWork()
+    try:
+        yield uow
+        session.commit()
+    except BaseException:
+        session.rollback()
+        raise
+    finally:
+        session.info.pop(_KEY, None)
+    uow._committed()
+
+
+@asynccontextmanager
+async def async_unit_of_work(session: AsyncSession) -> AsyncIterator[UnitOfWork]:
+    uow = current(session)
+    if uow is not None:
+        yield uow
+        return
+    uow = session.info[_KEY] = UnitOfWork()
+    try:
+        yield uow
+        await session.commit()
+    except BaseException:
+        await session.rollback()
+        raise
+    finally:
+        session.info.pop(_KEY, None)
+    uow._committed()
@@ -4,7 +4,12 @@ class Messages(Enum):
     VERSION_NOT_FOUND = "Version not found"
     QUESTION_NOT_FOUND = "Question not found"
     RESPONSE_NOT_FOUND = "Response not found"
+    RESPONSE_ALREADY_EXISTS = "Response for this question already exists"
     INVALID_PAYLOAD = "Invalid payload"
+    SNAPSHOT_NOT_FOUND = "Snapshot not found"
+    QUESTION_ALREADY_EXISTS = "Question with this number already exists in the version"
+    PURGE_JOB_NOT_FOUND = "Purge job not found"
+    VERSION_PUBLISHED = "Version is published, its questions cannot be changed"
 
     # Russian translations (optional future use)
     # VERSION_NOT_FOUND_RU = "Версия не найдена"
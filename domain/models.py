@@ -1,5 +1,16 @@
 from db.base import Base
-from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, JSON
+from sqlalchemy import (
+    Boolean,
+    Column,
+    Integer,
+    String,
+    DateTime,
+    Float,
+    ForeignKey,
+    JSON,
+    Index,
+    false,
+)
 from datetime import datetime
 import pytz
 
@@ -11,10 +22,16 @@ class Version(Base):
     id = Column(Integer, primary_key=True, index=True)
     name = Column(String, nullable=False)
     created_at = Column(DateTime, default=lambda: datetime.now(pytz.UTC))
+    # опубликованная версия заморожена: вопросы не меняются, анкета кэшируется навсегда
+    published = Column(Boolean, nullable=False, default=False, server_default=false())
 
 
 class Question(Base):
     __tablename__ = "questions"
+    # номер вопроса уникален в версии: повторная загрузка анкеты идемпотентна
+    __table_args__ = (
+        Index("uq_questions_version_number", "version_id", "number", unique=True),
+    )
     id = Column(Integer, primary_key=True, index=True)
     version_id = Column(Integer, ForeignKey("versions.id"), nullable=False)
     number = Column(String, nullable=False)
@@ -25,10 +42,79 @@ class Question(Base):
 
 
 class Response(Base):
+    # на PostgreSQL таблица секционирована по version_id (миграция 7d3f0b6c2e58,
+    # repositories/partition.py), первичный ключ там — (id, version_id)
     __tablename__ = "responses"
+    # один ответ на (пользователь, версия, вопрос); заодно индекс для выборок по user+version
+    __table_args__ = (
+        Index(
+            "uq_responses_user_version_question",
+            "user_id",
+            "version_id",
+            "question_id",
+            unique=True,
+        ),
+    )
     id = Column(Integer, primary_key=True, index=True)
     user_id = Column(Integer, nullable=False)
     version_id = Column(Integer, ForeignKey("versions.id"), nullable=False)
     question_id = Column(Integer, ForeignKey("questions.id"), nullable=False)
     response_value = Column(JSON, nullable=False)
     response_timestamp = Column(DateTime, default=lambda: datetime.now(pytz.UTC))
+
+
+class QuestionStat(Base):
+    """
+    Сводка ответов на вопрос: число ответов по корзине (значению варианта,
+    true/false, корзине гистограммы чисел; "*" — всего ответивших) и
+    агрегаты числовых вопросов ("sum"/"min"/"max"). Ведётся инкрементально
+    в ResponseService, полностью пересчитывается scripts/rebuild_stats.py.
+    """
+
+    __tablename__ = "question_stats"
+    version_id = Column(
+        Integer, ForeignKey("versions.id", ondelete="CASCADE"), primary_key=True
+    )
+    question_id = Column(
+        Integer, ForeignKey("questions.id", ondelete="CASCADE"), primary_key=True
+    )
+    bucket = Column(String, primary_key=True)
+    count = Column(Integer, nullable=False, default=0)
+    value = Column(Float, nullable=True)  # сумма / минимум / максимум для "sum"/"min"/"max"
+
+
+class SurveySnapshot(Base):
+    """
+    Все ответы пользователя в версии одним JSON-документом (SURVEY_SNAPSHOTS).
+    Ключи — как в контексте ответов: "num:<номер>" и "id:<question_id>".
+    Обновляется в транзакции записи ответа; revision растёт с каждой записью.
+    """
+
+    __tablename__ = "survey_snapshots"
+    user_id = Column(Integer, primary_key=True)
+    version_id = Column(
+        Integer, ForeignKey("versions.id", ondelete="CASCADE"), primary_key=True
+    )
+    answers = Column(JSON, nullable=False)
+    revision = Column(Integer, nullable=False, default=1)
+    updated_at = Column(DateTime, default=lambda: datetime.now(pytz.UTC))
+
+
+class PurgeJob(Base):
+    """
+    Фоновое удаление версии или всех ответов пользователя (services/purge.py).
+    Строки удаляются пачками, по транзакции на пачку; step — текущий этап,
+    deleted — сколько строк уже удалено. Прерванное задание продолжается
+    с того же этапа.
+    """
+
+    __tablename__ = "purge_jobs"
+    id = Column(Integer, primary_key=True)
+    kind = Column(String, nullable=False)  # "version" | "user"
+    target_id = Column(Integer, nullable=False)
+    status = Column(String, nullable=False, default="pending", index=True)
+    step = Column(String, nullable=True)
+    deleted = Column(Integer, nullable=False, default=0)
+    error = Column(String, nullable=True)
+    created_at = Column(DateTime, default=lambda: datetime.now(pytz.UTC))
+    updated_at = Column(DateTime, default=lambda: datetime.now(pytz.UTC))
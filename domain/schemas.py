@@ -37,6 +37,7 @@ class Version(BaseModel):
     id: int
     name: str
     created_at: datetime
+    published: bool = False
 
     class Config:
         from_attributes = True
@@ -59,6 +60,27 @@ class QuestionCreate(BaseModel):
     constraints: Optional[Dict[str, Any]] = None
 
 
+class QuestionDraft(BaseModel):
+    """One question of a bulk import; the version comes from the URL."""
+
+    number: str
+    text: str
+    type: QuestionType
+    options: Optional[Union[Dict[str, Any], List[Any]]] = None
+    constraints: Optional[Dict[str, Any]] = None
+
+
+class QuestionBulkReport(BaseModel):
+    """Outcome of a bulk question import."""
+
+    version_id: int
+    received: int  # вопросов в файле
+    duplicates: int  # повторы номера внутри файла (берётся первый)
+    inserted: int
+    existing: int  # номер уже был в версии
+    timings: Dict[str, float]  # parse_ms / write_ms / total_ms
+
+
 class QuestionUpdate(BaseModel):
     """Schema for updating an existing question."""
 
@@ -116,3 +138,133 @@ class Response(BaseModel):
     class Config:
         from_attributes = True
         json_encoders = {datetime: lambda v: v.isoformat()}
+
+
+class DependentIssue(BaseModel):
+    """A dependent answer that no longer passes validation."""
+
+    question_id: int
+    number: str
+    detail: str
+
+
+class ResponseWithDependents(Response):
+    """Updated response plus dependent answers invalidated by the change."""
+
+    invalid_dependents: List[DependentIssue] = []
+
+
+# ---------- Batch ----------
+
+
+class ResponseBatchItem(BaseModel):
+    """One answer inside a batch submission."""
+
+    question_id: int
+    response_value: JSONValue
+
+
+class ResponseBatchCreate(BaseModel):
+    """Schema for submitting many answers of one user for one version."""
+
+    user_id: int
+    version_id: int
+    items: List[ResponseBatchItem]
+
+
+class ResponseBatchItemResult(BaseModel):
+    """Per-item outcome of a batch submission."""
+
+    question_id: int
+    status: Literal["created", "invalid", "not_found", "conflict"]
+    response: Optional[Response] = None
+    detail: Optional[str] = None
+
+
+class ResponseBatchResult(BaseModel):
+    """Schema for a batch submission response (items in request order)."""
+
+    items: List[ResponseBatchItemResult]
+
+
+# ---------- Options ----------
+
+
+class QuestionOptions(BaseModel):
+    """Effective dropdown options of one question for one user."""
+
+    question_id: int
+    number: str
+    enabled: bool
+    values: List[str]
+
+
+# ---------- Statistics ----------
+
+
+class HistogramBin(BaseModel):
+    """Histogram bin of a numeric question on the 1-2-5 grid: [lower, upper)."""
+
+    lower: float
+    upper: float
+    count: int
+
+
+class QuestionStats(BaseModel):
+    """Answer distribution of one question, read from the summaries."""
+
+    question_id: int
+    number: str
+    type: str
+    answered: int
+    counts: Optional[Dict[str, int]] = None  # dropdown / boolean
+    true_rate: Optional[float] = None  # boolean
+    min: Optional[float] = None  # integer / number
+    max: Optional[float] = None
+    mean: Optional[float] = None
+    histogram: Optional[List[HistogramBin]] = None
+
+
+class CarryOverReport(BaseModel):
+    """Outcome of copying answers from a previous version."""
+
+    source_version_id: int
+    version_id: int
+    users: int = 0  # пользователей, которым что-то перенесли
+    carried: int = 0
+    rejected: int = 0  # не прошли правила новой версии
+    calculated: int = 0  # пересчитанные вычисляемые поля
+    elapsed_ms: float = 0.0
+
+
+# ---------- Snapshots ----------
+
+
+class SurveySnapshot(BaseModel):
+    """All answers of one user in one version, keyed by question number."""
+
+    user_id: int
+    version_id: int
+    revision: int
+    answers: Dict[str, JSONValue]
+    updated_at: Optional[datetime] = None
+
+
+# ---------- Purges ----------
+
+
+class PurgeJob(BaseModel):
+    """Progress of a background deletion (DELETE /versions/{id}, /responses/users/{id})."""
+
+    id: int
+    kind: Literal["version", "user"]
+    target_id: int
+    status: Literal["pending", "running", "done", "failed"]
+    step: Optional[str] = None  # текущий этап; None — не начато или завершено
+    deleted: int = 0
+    error: Optional[str] = None
+    created_at: Optional[datetime] = None
+    updated_at: Optional[datetime] = None
+
+    class Config:
+        from_attributes = True
@@ -1,13 +1,77 @@
-from fastapi import FastAPI
-from api import versions, questions, responses
+from fastapi import FastAPI, Request
+from api import versions, questions, responses, purges
 from api import auth as auth_api
 from api import health
+from api.codec import CodecJSONResponse
+from db import database
+from db.routing import SAFE_METHODS, pin_to_primary
+from db.settings import Settings
+from services.metrics import validation_metrics
 
 
-app = FastAPI()
+async def validation_timing_header(request: Request, call_next):
+    # при включённых метриках — разбивка времени валидации запроса в Server-Timing
+    if not validation_metrics.enabled:
+        return await call_next(request)
+    with validation_metrics.trace() as trace:
+        response = await call_next(request)
+    if trace.items:
+        response.headers["Server-Timing"] = trace.server_timing()
+    return response
 
-app.include_router(versions.router, prefix="/versions", tags=["versions"])
-app.include_router(questions.router, prefix="/questions", tags=["questions"])
-app.include_router(responses.router, prefix="/responses", tags=["responses"])
-app.include_router(auth_api.router, prefix="/auth", tags=["auth"])
-app.include_router(health.router, tags=["health"])
+
+def read_your_writes(seconds: float):
+    # после успешной записи клиент читает с primary, пока реплики догоняют
+    async def middleware(request: Request, call_next):
+        response = await call_next(request)
+        if (
+            request.method not in SAFE_METHODS
+            and response.status_code < 400
+            and database.router.replicas
+        ):
+            pin_to_primary(response, seconds)
+        return response
+
+    return middleware
+
+
+def create_app(async_db: bool = False, read_your_writes_seconds: float = 0.0) -> FastAPI:
+    """
+    Собрать приложение. async_db=True (ASYNC_DB) — async-роуты поверх
+    AsyncSession вместо sync-роутов, которые занимают поток threadpool
+    на всё время запроса к БД. read_your_writes_seconds > 0 — после записи
+    чтения клиента идут в primary, а не в реплику (READ_YOUR_WRITES_SECONDS).
+    """
+    # тела ответов — через JSON-кодек приложения (orjson, если установлен)
+    app = FastAPI(default_response_class=CodecJSONResponse)
+    app.middleware("http")(validation_timing_header)
+    if read_your_writes_seconds > 0 and not async_db:
+        app.middleware("http")(read_your_writes(read_your_writes_seconds))
+
+    if async_db:
+        from api import async_purges, async_questions, async_responses, async_versions
+
+        versions_router = async_versions.router
+        questions_router = async_questions.router
+        responses_router = async_responses.router
+        purges_router = async_purges.router
+    else:
+        versions_router = versions.router
+        questions_router = questions.router
+        responses_router = responses.router
+        purges_router = purges.router
+
+    app.include_router(versions_router, prefix="/versions", tags=["versions"])
+    app.include_router(questions_router, prefix="/questions", tags=["questions"])
+    app.include_router(responses_router, prefix="/responses", tags=["responses"])
+    app.include_router(purges_router, prefix="/purges", tags=["purges"])
+    app.include_router(auth_api.router, prefix="/auth", tags=["auth"])
+    app.include_router(health.router, tags=["health"])
+    return app
+
+
+settings = Settings()
+app = create_app(
+    async_db=settings.ASYNC_DB,
+    read_your_writes_seconds=settings.READ_YOUR_WRITES_SECONDS,
+)
@@ -0,0 +1,35 @@
+"""question_stats: incremental per-question answer summaries
+
+Revision ID: 4b7e2f9a1c3d
+Revises: d3deecfbced5
+Create Date: 2026-10-18 14:05:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = "4b7e2f9a1c3d"
+down_revision = "d3deecfbced5"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table(
+        "question_stats",
+        sa.Column("version_id", sa.Integer(), nullable=False),
+        sa.Column("question_id", sa.Integer(), nullable=False),
+        sa.Column("bucket", sa.String(), nullable=False),
+        sa.Column("count", sa.Integer(), nullable=False),
+        sa.Column("value", sa.Float(), nullable=True),
+        sa.ForeignKeyConstraint(["version_id"], ["versions.id"], ondelete="CASCADE"),
+        sa.ForeignKeyConstraint(["question_id"], ["questions.id"], ondelete="CASCADE"),
+        sa.PrimaryKeyConstraint("version_id", "question_id", "bucket"),
+    )
+    # сводки заполняются пересчётом: python scripts/rebuild_stats.py
+
+
+def downgrade():
+    op.drop_table("question_stats")
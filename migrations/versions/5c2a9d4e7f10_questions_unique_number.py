@@ -0,0 +1,41 @@
+"""questions: unique (version_id, number)
+
+Revision ID: 5c2a9d4e7f10
+Revises: 8e1d5c0b7a42
+Create Date: 2026-10-18 16:40:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = "5c2a9d4e7f10"
+down_revision = "8e1d5c0b7a42"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # на повторы номера уже могут ссылаться ответы — не удаляем их, а
+    # переименовываем в "<номер>#<id>" (как в широкой выгрузке); первый остаётся
+    op.execute(
+        """
+        UPDATE questions
+        SET number = number || '#' || CAST(id AS VARCHAR)
+        WHERE id NOT IN (
+            SELECT MIN(id) FROM questions
+            GROUP BY version_id, number
+        )
+        """
+    )
+    op.create_index(
+        "uq_questions_version_number",
+        "questions",
+        ["version_id", "number"],
+        unique=True,
+    )
+
+
+def downgrade():
+    op.drop_index("uq_questions_version_number", table_name="questions")
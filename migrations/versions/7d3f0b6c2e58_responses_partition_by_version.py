@@ -0,0 +1,75 @@
+"""responses: LIST partitioning by version_id (PostgreSQL)
+
+Revision ID: 7d3f0b6c2e58
+Revises: 5c2a9d4e7f10
+Create Date: 2026-10-18 18:10:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = "7d3f0b6c2e58"
+down_revision = "5c2a9d4e7f10"
+branch_labels = None
+depends_on = None
+
+
+def _finish(primary_key):
+    # ключи и индексы — после удаления старой таблицы: имена индексов
+    # (responses_pkey, uq_…) общие на схему
+    op.execute(f"ALTER TABLE responses ADD PRIMARY KEY ({primary_key})")
+    op.execute(
+        "ALTER TABLE responses ADD FOREIGN KEY (version_id) REFERENCES versions (id)"
+    )
+    op.execute(
+        "ALTER TABLE responses ADD FOREIGN KEY (question_id) REFERENCES questions (id)"
+    )
+    op.execute("ALTER SEQUENCE responses_id_seq OWNED BY responses.id")
+    op.create_index(
+        "uq_responses_user_version_question",
+        "responses",
+        ["user_id", "version_id", "question_id"],
+        unique=True,
+    )
+
+
+def upgrade():
+    bind = op.get_bind()
+    if bind.dialect.name != "postgresql":
+        # SQLite: секций нет, responses остаётся одной таблицей
+        return
+    op.execute("ALTER TABLE responses RENAME TO responses_unpartitioned")
+    # последовательность id переживёт старую таблицу
+    op.execute("ALTER SEQUENCE responses_id_seq OWNED BY NONE")
+    op.execute(
+        """
+        CREATE TABLE responses (LIKE responses_unpartitioned INCLUDING DEFAULTS)
+        PARTITION BY LIST (version_id)
+        """
+    )
+    # секции без DEFAULT: ответ для версии без секции (архивной) — ошибка, а не
+    # строка, незаметно осевшая в общей секции
+    for (version_id,) in bind.execute(sa.text("SELECT id FROM versions")).all():
+        op.execute(
+            f"CREATE TABLE responses_v{int(version_id)} "
+            f"PARTITION OF responses FOR VALUES IN ({int(version_id)})"
+        )
+    op.execute("INSERT INTO responses SELECT * FROM responses_unpartitioned")
+    op.execute("DROP TABLE responses_unpartitioned")
+    # первичный ключ секционированной таблицы обязан включать ключ секционирования
+    _finish("id, version_id")
+
+
+def downgrade():
+    bind = op.get_bind()
+    if bind.dialect.name != "postgresql":
+        return
+    op.execute("ALTER TABLE responses RENAME TO responses_partitioned")
+    op.execute("ALTER SEQUENCE responses_id_seq OWNED BY NONE")
+    op.execute("CREATE TABLE responses (LIKE responses_partitioned INCLUDING DEFAULTS)")
+    op.execute("INSERT INTO responses SELECT * FROM responses_partitioned")
+    # отсоединённые (архивные) секции остаются отдельными таблицами
+    op.execute("DROP TABLE responses_partitioned")
+    _finish("id")
@@ -0,0 +1,39 @@
+"""survey_snapshots: one answers document per (user_id, version_id)
+
+Revision ID: 8e1d5c0b7a42
+Revises: 4b7e2f9a1c3d
+Create Date: 2026-10-18 15:20:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision = "8e1d5c0b7a42"
+down_revision = "4b7e2f9a1c3d"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table(
+        "survey_snapshots",
+        sa.Column("user_id", sa.Integer(), nullable=False),
+        sa.Column("version_id", sa.Integer(), nullable=False),
+        sa.Column(
+            "answers",
+            sa.JSON().with_variant(postgresql.JSONB(), "postgresql"),
+            nullable=False,
+        ),
+        sa.Column("revision", sa.Integer(), nullable=False),
+        sa.Column("updated_at", sa.DateTime(), nullable=True),
+        sa.ForeignKeyConstraint(["version_id"], ["versions.id"], ondelete="CASCADE"),
+        sa.PrimaryKeyConstraint("user_id", "version_id"),
+    )
+    # документы создаются при первой записи пользователя после SURVEY_SNAPSHOTS=true
+
+
+def downgrade():
+    op.drop_table("survey_snapshots")
@@ -0,0 +1,39 @@
+"""purge_jobs: chunked background deletes
+
+Revision ID: 9a4e6c1d3b27
+Revises: 7d3f0b6c2e58
+Create Date: 2026-10-18 20:30:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = "9a4e6c1d3b27"
+down_revision = "7d3f0b6c2e58"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table(
+        "purge_jobs",
+        sa.Column("id", sa.Integer(), nullable=False),
+        sa.Column("kind", sa.String(), nullable=False),
+        sa.Column("target_id", sa.Integer(), nullable=False),
+        sa.Column("status", sa.String(), nullable=False),
+        sa.Column("step", sa.String(), nullable=True),
+        sa.Column("deleted", sa.Integer(), nullable=False, server_default="0"),
+        sa.Column("error", sa.String(), nullable=True),
+        sa.Column("created_at", sa.DateTime(), nullable=True),
+        sa.Column("updated_at", sa.DateTime(), nullable=True),
+        sa.PrimaryKeyConstraint("id"),
+    )
+    # scripts/run_purges.py ищет незавершённые задания
+    op.create_index("ix_purge_jobs_status", "purge_jobs", ["status"])
+
+
+def downgrade():
+    op.drop_index("ix_purge_jobs_status", table_name="purge_jobs")
+    op.drop_table("purge_jobs")
@@ -0,0 +1,28 @@
+"""versions: published flag
+
+Revision ID: b6d2f8e4a913
+Revises: 9a4e6c1d3b27
+Create Date: 2026-10-18 21:40:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = "b6d2f8e4a913"
+down_revision = "9a4e6c1d3b27"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # существующие версии остаются черновиками: публикует их POST /versions/{id}/publish
+    op.add_column(
+        "versions",
+        sa.Column("published", sa.Boolean(), nullable=False, server_default=sa.false()),
+    )
+
+
+def downgrade():
+    op.drop_column("versions", "published")
@@ -0,0 +1,33 @@
+"""question_stats: numeric questions keep aggregates and 1-2-5 bins, not a row per value
+
+Revision ID: c4a7e1f9d2b6
+Revises: b6d2f8e4a913
+Create Date: 2026-10-18 23:10:00.000000
+
+"""
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = "c4a7e1f9d2b6"
+down_revision = "b6d2f8e4a913"
+branch_labels = None
+depends_on = None
+
+_NUMBER_TYPES = "('integer', 'int', 'number', 'float', 'decimal')"
+
+
+def upgrade():
+    # старые корзины «по значению» несовместимы с новыми агрегатами —
+    # сводки числовых вопросов заполняются заново: python scripts/rebuild_stats.py
+    op.execute(
+        "DELETE FROM question_stats WHERE question_id IN "
+        f"(SELECT id FROM questions WHERE lower(type) IN {_NUMBER_TYPES})"
+    )
+
+
+def downgrade():
+    op.execute(
+        "DELETE FROM question_stats WHERE question_id IN "
+        f"(SELECT id FROM questions WHERE lower(type) IN {_NUMBER_TYPES})"
+    )
@@ -0,0 +1,39 @@
+"""responses: unique (user_id, version_id, question_id)
+
+Revision ID: d3deecfbced5
+Revises: XXXX
+Create Date: 2026-10-18 10:12:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = "d3deecfbced5"
+down_revision = "XXXX"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # перед уникальным индексом убираем дубли: остаётся последний записанный ответ
+    op.execute(
+        """
+        DELETE FROM responses
+        WHERE id NOT IN (
+            SELECT MAX(id) FROM responses
+            GROUP BY user_id, version_id, question_id
+        )
+        """
+    )
+    op.create_index(
+        "uq_responses_user_version_question",
+        "responses",
+        ["user_id", "version_id", "question_id"],
+        unique=True,
+    )
+
+
+def downgrade():
+    op.drop_index("uq_responses_user_version_question", table_name="responses")
@@ -0,0 +1,13 @@
+# repositories/dialect.py
+"""Диалектные конструкции, которых нет в общем sqlalchemy.insert()."""
+
+from sqlalchemy.dialects import postgresql, sqlite
+
+
+def dialect_insert(dialect: str):
+    """insert() with ON CONFLICT support (PostgreSQL and SQLite ≥ 3.24)."""
+    if dialect == "postgresql":
+        return postgresql.insert
+    if dialect == "sqlite":
+        return sqlite.insert
+    raise RuntimeError(f"Upsert is not supported for dialect {dialect!r}")
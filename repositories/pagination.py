@@ -0,0 +1,104 @@
+# repositories/pagination.py
+"""
+Keyset-пагинация (курсоры) для списочных эндпоинтов.
+
+Курсор — непрозрачный токен (base64url от JSON) с ключом сортировки
+последней строки страницы; следующая страница читается условием
+«ключ > курсора» по индексу, а не OFFSET, поэтому обход всей таблицы
+линеен по числу строк.
+"""
+
+import base64
+import binascii
+import json
+from typing import Any, List, Optional, Sequence, Tuple
+
+from sqlalchemy import tuple_
+from sqlalchemy.orm import Query
+
+
+class InvalidCursor(ValueError):
+    """Raised when an `after` token cannot be decoded."""
+
+
+def encode_cursor(values: Sequence[Any]) -> str:
+    raw = json.dumps(list(values), separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(raw).rstrip(b"=").decode()
+
+
+def _typed(value: Any, python_type: type) -> bool:
+    # bool — подкласс int, но true в курсоре по id — это подделка
+    if isinstance(value, bool) and python_type is not bool:
+        return False
+    return isinstance(value, python_type)
+
+
+def decode_cursor(
+    token: str, size: int, types: Sequence[type] = ()
+) -> Tuple[Any, ...]:
+    """Values of a cursor of `size` keys, each checked against `types` if given."""
+    padded = token + "=" * (-len(token) % 4)
+    try:
+        values = json.loads(base64.urlsafe_b64decode(padded.encode()))
+    except (binascii.Error, ValueError, UnicodeDecodeError):
+        raise InvalidCursor("Invalid cursor.") from None
+    if not isinstance(values, list) or len(values) != size:
+        raise InvalidCursor("Invalid cursor.")
+    # значение не того типа ушло бы в сравнение ключа: [] на SQLite, 500 на PostgreSQL
+    if types and not all(_typed(v, t) for v, t in zip(values, types)):
+        raise InvalidCursor("Invalid cursor.")
+    return tuple(values)
+
+
+def keyset_page(
+    query: Query,
+    columns: Sequence[Any],
+    limit: int,
+    after: Optional[str] = None,
+    offset: int = 0,
+    descending: bool = False,
+) -> Tuple[List[Any], Optional[str]]:
+    """
+    Одна страница `query`, упорядоченной по `columns` (последняя — id).
+    Возвращает строки и курсор следующей страницы (None — страниц больше нет).
+    offset оставлен только для обратной совместимости.
+    """
+    query = keyset_statement(query, columns, limit, after, offset, descending)
+    return split_page(query.all(), columns, limit)
+
+
+def keyset_statement(
+    stmt: Any,
+    columns: Sequence[Any],
+    limit: int,
+    after: Optional[str] = None,
+    offset: int = 0,
+    descending: bool = False,
+) -> Any:
+    """Apply the keyset filter and ordering to a Query or a select()."""
+    if after is not None:
+        key = decode_cursor(
+            after, len(columns), [c.type.python_type for c in columns]
+        )
+        if len(columns) == 1:
+            left, right = columns[0], key[0]
+        else:
+            left, right = tuple_(*columns), tuple_(*key)
+        stmt = stmt.filter(left < right if descending else left > right)
+    stmt = stmt.order_by(*(c.desc() if descending else c.asc() for c in columns))
+    if offset:
+        stmt = stmt.offset(offset)
+    # строка сверх limit — признак того, что есть следующая страница
+    return stmt.limit(limit + 1)
+
+
+def split_page(
+    rows: Sequence[Any], columns: Sequence[Any], limit: int
+) -> Tuple[List[Any], Optional[str]]:
+    """Cut the extra probe row off and build the next cursor from the last row."""
+    rows = list(rows)
+    if len(rows) <= limit:
+        return rows, None
+    rows = rows[:limit]
+    last = rows[-1]
+    return rows, encode_cursor([getattr(last, c.key) for c in columns])
@@ -0,0 +1,79 @@
+# repositories/partition.py
+"""
+Секции таблицы responses на PostgreSQL: LIST по version_id, по секции
+responses_v<id> на версию (миграция 7d3f0b6c2e58). На SQLite и на
+несекционированной responses все операции — no-op: таблица одна.
+"""
+
+import weakref
+from typing import Optional
+
+from sqlalchemy import text
+from sqlalchemy.engine import Engine
+from sqlalchemy.orm import Session
+
+PARENT = "responses"
+
+# секционирована ли responses — меняется только миграцией, спрашиваем раз на engine
+_partitioned: "weakref.WeakKeyDictionary[Engine, bool]" = weakref.WeakKeyDictionary()
+
+
+def partition_name(version_id: int) -> str:
+    return f"{PARENT}_v{int(version_id)}"
+
+
+class ResponsePartitions:
+    def __init__(self, db: Session):
+        self.db = db
+
+    @property
+    def enabled(self) -> bool:
+        """True on PostgreSQL once responses is a partitioned table."""
+        engine = self.db.get_bind()
+        if engine.dialect.name != "postgresql":
+            return False
+        if engine not in _partitioned:
+            relkind = self.db.execute(
+                text("SELECT relkind FROM pg_class WHERE oid = to_regclass(:name)"),
+                {"name": PARENT},
+            ).scalar()
+            _partitioned[engine] = relkind == "p"
+        return _partitioned[engine]
+
+    def create(self, version_id: int) -> None:
+        """Partition of a new version (idempotent)."""
+        if not self.enabled:
+            return
+        version_id = int(version_id)
+        self.db.execute(
+            text(
+                f"CREATE TABLE IF NOT EXISTS {partition_name(version_id)} "
+                f"PARTITION OF {PARENT} FOR VALUES IN ({version_id})"
+            )
+        )
+
+    def detach(self, version_id: int) -> Optional[str]:
+        """
+        Detach a version's partition: its rows leave responses at once and
+        stay in a standalone table, whose name is returned (None if none).
+        """
+        if not self.enabled or not self._exists(version_id):
+            return None
+        name = partition_name(version_id)
+        self.db.execute(text(f"ALTER TABLE {PARENT} DETACH PARTITION {name}"))
+        return name
+
+    def drop(self, version_id: int) -> bool:
+        """Drop a version's partition (attached or detached) with all its rows."""
+        if not self.enabled or not self._exists(version_id):
+            return False
+        self.db.execute(text(f"DROP TABLE {partition_name(version_id)}"))
+        return True
+
+    def _exists(self, version_id: int) -> bool:
+        return (
+            self.db.execute(
+                text("SELECT to_regclass(:name) IS NOT NULL"),
+                {"name": partition_name(version_id)},
+            ).scalar()
+        )
@@ -0,0 +1,127 @@
+# repositories/purge.py
+"""
+Задания фонового удаления (purge_jobs) и удаление строк пачками:
+DELETE … WHERE pk IN (SELECT pk … LIMIT n) — одна пачка держит блокировки
+только на своих строках и коммитится отдельно.
+"""
+
+from datetime import datetime
+
+import pytz
+from sqlalchemy import Row, Table, delete, exists, insert, or_, select, tuple_, update
+from sqlalchemy.orm import Session
+from sqlalchemy.sql import ColumnElement
+from domain.models import PurgeJob
+from typing import List, Optional, Sequence
+
+PENDING, RUNNING, DONE, FAILED = "pending", "running", "done", "failed"
+
+_table = PurgeJob.__table__
+
+
+def delete_chunk(
+    db: Session,
+    table: Table,
+    where: ColumnElement,
+    limit: int,
+    returning: Sequence[ColumnElement] = (),
+) -> List[Row]:
+    """
+    Delete at most `limit` rows of `table` matching `where`. Returns the
+    `returning` columns of the deleted rows, or one empty row per deleted
+    row when there are none.
+    """
+    pk = list(table.primary_key.columns)
+    key = pk[0] if len(pk) == 1 else tuple_(*pk)
+    chunk = select(*pk).where(where).limit(limit)
+    # условие и снаружи: на секционированной responses — отсечение секций
+    stmt = delete(table).where(where, key.in_(chunk))
+    if returning:
+        return list(db.execute(stmt.returning(*returning)).all())
+    return [()] * db.execute(stmt).rowcount
+
+
+def has_rows(db: Session, where: ColumnElement) -> bool:
+    return db.execute(select(exists().where(where))).scalar()
+
+
+class PurgeJobRepository:
+    def __init__(self, db: Session):
+        self.db = db
+
+    def create(self, kind: str, target_id: int) -> Row:
+        now = datetime.now(pytz.UTC)
+        stmt = (
+            insert(_table)
+            .values(
+                kind=kind,
+                target_id=target_id,
+                status=PENDING,
+                deleted=0,
+                created_at=now,
+                updated_at=now,
+            )
+            .returning(*_table.c)
+        )
+        return self.db.execute(stmt).one()
+
+    def get(self, job_id: int) -> Optional[Row]:
+        return self.db.execute(select(_table).where(_table.c.id == job_id)).one_or_none()
+
+    def lock(self, job_id: int) -> Optional[Row]:
+        """`get` with SELECT … FOR UPDATE: one chunk of a job at a time."""
+        stmt = select(_table).where(_table.c.id == job_id).with_for_update()
+        return self.db.execute(stmt).one_or_none()
+
+    def unfinished(
+        self, kind: Optional[str] = None, target_id: Optional[int] = None
+    ) -> List[Row]:
+        """Jobs not done yet (oldest first), optionally for one target."""
+        stmt = select(_table).where(_table.c.status != DONE)
+        if kind is not None:
+            stmt = stmt.where(_table.c.kind == kind, _table.c.target_id == target_id)
+        return list(self.db.execute(stmt.order_by(_table.c.id)).all())
+
+    def claim(self, job_id: int, stale_before: datetime) -> Optional[Row]:
+        """
+        Mark a job running for this worker: a pending or failed one, or a
+        running one whose worker has not reported since `stale_before`.
+        None when another worker holds it or it is done.
+        """
+        stmt = (
+            update(_table)
+            .where(
+                _table.c.id == job_id,
+                or_(
+                    _table.c.status.in_((PENDING, FAILED)),
+                    (_table.c.status == RUNNING) & (_table.c.updated_at < stale_before),
+                ),
+            )
+            .values(status=RUNNING, error=None, updated_at=datetime.now(pytz.UTC))
+            .returning(*_table.c)
+        )
+        return self.db.execute(stmt).one_or_none()
+
+    def progress(
+        self, job_id: int, step: Optional[str], deleted: int, status: str = RUNNING
+    ) -> Row:
+        """Record a committed chunk: add `deleted`, move to `step`."""
+        stmt = (
+            update(_table)
+            .where(_table.c.id == job_id)
+            .values(
+                step=step,
+                status=status,
+                deleted=_table.c.deleted + deleted,
+                updated_at=datetime.now(pytz.UTC),
+            )
+            .returning(*_table.c)
+        )
+        return self.db.execute(stmt).one()
+
+    def fail(self, job_id: int, error: str) -> None:
+        self.db.execute(
+            update(_table)
+            .where(_table.c.id == job_id)
+            .values(status=FAILED, error=error, updated_at=datetime.now(pytz.UTC))
+        )
@@ -1,8 +1,115 @@
+import csv
+import io
+import json
+
+from sqlalchemy import Row, delete, exists, insert, literal, select, text, update
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
-from domain.models import Question
+from domain.models import Question, Version
 from domain.schemas import QuestionCreate, QuestionUpdate
-from typing import List, Dict
-import json
+from repositories.dialect import dialect_insert
+from repositories.pagination import keyset_page, keyset_statement, split_page
+from typing import List, Dict, Optional, Tuple
+
+
+# запись — один statement с RETURNING, без commit: его делает unit of work
+_table = Question.__table__
+
+
+def _insert(question: QuestionCreate):
+    return (
+        insert(_table)
+        .values(
+            version_id=question.version_id,
+            number=question.number,
+            text=question.text,
+            type=question.type,
+            # JSON-колонки сериализуют сами: json.dumps давал строку внутри JSON
+            options=question.options or None,
+            constraints=question.constraints or None,
+        )
+        .returning(*_table.c)
+    )
+
+
+def _update_values(question: QuestionUpdate) -> dict:
+    values = {}
+    if question.number:
+        values["number"] = question.number
+    if question.text:
+        values["text"] = question.text
+    if question.type:
+        values["type"] = question.type
+    if question.options is not None:
+        values["options"] = question.options
+    if question.constraints is not None:
+        values["constraints"] = question.constraints
+    return values
+
+
+def _draft():
+    # вопросы опубликованной версии заморожены: такие строки UPDATE/DELETE не трогают
+    versions = Version.__table__
+    return ~exists().where(
+        versions.c.id == _table.c.version_id, versions.c.published.is_(True)
+    )
+
+
+def _update(question_id: int, values: dict):
+    return (
+        update(_table)
+        .where(_table.c.id == question_id, _draft())
+        .values(**values)
+        .returning(*_table.c)
+    )
+
+
+def _delete(question_id: int):
+    return (
+        delete(_table)
+        .where(_table.c.id == question_id, _draft())
+        .returning(*_table.c)
+    )
+
+
+def _insert_many(dialect: str, rows: List[dict]):
+    # multi-row VALUES; номер уже есть в версии — строка пропускается
+    stmt = dialect_insert(dialect)(_table).values(rows)
+    return stmt.on_conflict_do_nothing(
+        index_elements=[_table.c.version_id, _table.c.number]
+    ).returning(_table.c.id)
+
+
+_COPIED = ("number", "text", "type", "options", "constraints")
+
+
+def _copy_version(source_id: int, target_id: int):
+    questions = (
+        select(literal(target_id), *(_table.c[name] for name in _COPIED))
+        .where(_table.c.version_id == source_id)
+        .order_by(_table.c.id)
+    )
+    return insert(_table).from_select(["version_id", *_COPIED], questions)
+
+
+_IMPORT_COLUMNS = ("position", "number", "text", "type", "options", "constraints")
+
+
+def _json_cell(value):
+    return json.dumps(value, ensure_ascii=False) if value is not None else None
+
+
+def _filtered(stmt, version_id=None, number=None):
+    if version_id is not None:
+        stmt = stmt.filter(Question.version_id == version_id)
+    if number:
+        stmt = stmt.filter(Question.number == number)
+    return stmt
+
+
+def _rows_statement(version_id, number, limit, after, offset):
+    stmt = _filtered(select(*_table.c), version_id, number)
+    return keyset_statement(stmt, (Question.id,), limit, after, offset)
 
 
 class QuestionRepository:
@@ -11,61 +118,194 @@ class QuestionRepository:
 
     def get_map_by_ids(self, ids: List[int]) -> Dict[int, str]:
         rows = (
-            self.db.query(self.model.id, self.model.number)
-            .filter(self.model.id.in_(ids))
+            self.db.query(Question.id, Question.number)
+            .filter(Question.id.in_(ids))
             .all()
         )
         return {qid: num for (qid, num) in rows}
 
-    def create(self, question: QuestionCreate) -> Question:
-        """Create a new question in the database."""
-        db_question = Question(
-            version_id=question.version_id,
-            number=question.number,
-            text=question.text,
-            type=question.type,
-            options=json.dumps(question.options) if question.options else None,
-            constraints=(
-                json.dumps(question.constraints) if question.constraints else None
+    def types_by_ids(self, ids: List[int]) -> Dict[int, str]:
+        stmt = select(Question.id, Question.type).where(Question.id.in_(ids))
+        return {qid: qtype for (qid, qtype) in self.db.execute(stmt)}
+
+    def create(self, question: QuestionCreate) -> Row:
+        """Insert a question (INSERT … RETURNING)."""
+        return self.db.execute(_insert(question)).one()
+
+    def insert_many(self, rows: List[dict]) -> int:
+        """Insert questions skipping numbers the version already has; returns inserted."""
+        stmt = _insert_many(self.db.get_bind().dialect.name, rows)
+        return len(self.db.execute(stmt).all())
+
+    def copy_version(self, source_id: int, target_id: int) -> int:
+        """Copy every question of one version into another (INSERT … SELECT)."""
+        return self.db.execute(_copy_version(source_id, target_id)).rowcount
+
+    # ---------- COPY (PostgreSQL + psycopg2) ----------
+
+    def create_import_table(self) -> None:
+        """Temporary staging table for COPY, dropped at commit."""
+        self.db.execute(
+            text(
+                """
+                CREATE TEMP TABLE questions_import ON COMMIT DROP AS
+                SELECT 0::bigint AS position, number, text, type, options, constraints
+                FROM questions WITH NO DATA
+                """
+            )
+        )
+
+    def copy_import(self, rows: List[dict], start: int) -> None:
+        """COPY rows into questions_import; `start` numbers them to keep file order."""
+        buffer = io.StringIO()
+        # QUOTE_NONNUMERIC: пустая строка — "", а без кавычек — NULL
+        writer = csv.writer(buffer, quoting=csv.QUOTE_NONNUMERIC, lineterminator="\n")
+        for position, row in enumerate(rows, start):
+            writer.writerow(
+                (
+                    position,
+                    row["number"],
+                    row["text"],
+                    row["type"],
+                    _json_cell(row["options"]),
+                    _json_cell(row["constraints"]),
+                )
+            )
+        buffer.seek(0)
+        cursor = self.db.connection().connection.cursor()
+        try:
+            cursor.copy_expert(
+                f"COPY questions_import ({', '.join(_IMPORT_COLUMNS)}) "
+                "FROM STDIN WITH (FORMAT csv)",
+                buffer,
+            )
+        finally:
+            cursor.close()
+
+    def insert_imported(self, version_id: int) -> int:
+        """Move staged rows into questions (skipping existing numbers); returns inserted."""
+        result = self.db.execute(
+            text(
+                """
+                INSERT INTO questions (version_id, number, text, type, options, constraints)
+                SELECT :version_id, number, text, type, options, constraints
+                FROM questions_import ORDER BY position
+                ON CONFLICT (version_id, number) DO NOTHING
+                """
             ),
+            {"version_id": version_id},
         )
-        self.db.add(db_question)
-        self.db.commit()
-        self.db.refresh(db_question)
-        return db_question
+        return result.rowcount
+
+    def page(
+        self,
+        version_id: Optional[int] = None,
+        number: Optional[str] = None,
+        limit: int = 100,
+        after: Optional[str] = None,
+        offset: int = 0,
+    ) -> Tuple[List[Question], Optional[str]]:
+        """One page of questions ordered by id plus the cursor of the next one."""
+        q = _filtered(self.db.query(Question), version_id, number)
+        return keyset_page(q, (Question.id,), limit, after=after, offset=offset)
+
+    def rows_page(
+        self,
+        version_id: Optional[int] = None,
+        number: Optional[str] = None,
+        limit: int = 100,
+        after: Optional[str] = None,
+        offset: int = 0,
+    ) -> Tuple[List[Row], Optional[str]]:
+        """`page` as plain rows of a Core select(): no entities, no identity map."""
+        stmt = _rows_statement(version_id, number, limit, after, offset)
+        return split_page(self.db.execute(stmt).all(), (Question.id,), limit)
 
     def get_by_version(self, version_id: int) -> List[Question]:
         """Retrieve all questions for a specific version."""
         return self.db.query(Question).filter(Question.version_id == version_id).all()
 
+    def rows_by_version(self, version_id: int) -> List[Row]:
+        """Questions of a version ordered by id, as plain rows (no ORM objects)."""
+        stmt = select(*_table.c).where(_table.c.version_id == version_id)
+        return list(self.db.execute(stmt.order_by(_table.c.id)).all())
+
     def get(self, question_id: int) -> Question | None:
         """Retrieve a question by its ID."""
         return self.db.query(Question).filter(Question.id == question_id).first()
 
-    def update(self, question_id: int, question: QuestionUpdate) -> Question | None:
-        """Update an existing question."""
-        db_question = self.get(question_id)
-        if db_question:
-            if question.number:
-                db_question.number = question.number
-            if question.text:
-                db_question.text = question.text
-            if question.type:
-                db_question.type = question.type
-            if question.options is not None:
-                db_question.options = question.options
-            if question.constraints is not None:
-                db_question.constraints = question.constraints
-            self.db.commit()
-            self.db.refresh(db_question)
-            return db_question
-        return None
-
-    def delete(self, question_id: int) -> bool:
-        """Delete a question by its ID."""
-        db_question = self.get(question_id)
-        if db_question:
-            self.db.delete(db_question)
-            self.db.commit()
-            return True
-        return False
+    def update(
+        self, question_id: int, question: QuestionUpdate
+    ) -> Row | Question | None:
+        """
+        Update a question (UPDATE … RETURNING); None if it does not exist
+        or belongs to a published version.
+        """
+        values = _update_values(question)
+        if not values:
+            return self.get(question_id)
+        return self.db.execute(_update(question_id, values)).one_or_none()
+
+    def delete(self, question_id: int) -> Row | None:
+        """
+        Delete a question by primary key; returns the deleted row, or None
+        if there is none or its version is published.
+        """
+        return self.db.execute(_delete(question_id)).one_or_none()
+
+
+class AsyncQuestionRepository:
+    """QuestionRepository over an AsyncSession (ASYNC_DB=true)."""
+
+    def __init__(self, db: AsyncSession):
+        self.db = db
+
+    async def create(self, question: QuestionCreate) -> Row:
+        return (await self.db.execute(_insert(question))).one()
+
+    async def insert_many(self, rows: List[dict]) -> int:
+        stmt = _insert_many(self.db.get_bind().dialect.name, rows)
+        return len((await self.db.execute(stmt)).all())
+
+    async def page(
+        self,
+        version_id: Optional[int] = None,
+        number: Optional[str] = None,
+        limit: int = 100,
+        after: Optional[str] = None,
+        offset: int = 0,
+    ) -> Tuple[List[Question], Optional[str]]:
+        stmt = _filtered(select(Question), version_id, number)
+        stmt = keyset_statement(stmt, (Question.id,), limit, after, offset)
+        rows = (await self.db.scalars(stmt)).all()
+        return split_page(rows, (Question.id,), limit)
+
+    async def rows_page(
+        self,
+        version_id: Optional[int] = None,
+        number: Optional[str] = None,
+        limit: int = 100,
+        after: Optional[str] = None,
+        offset: int = 0,
+    ) -> Tuple[List[Row], Optional[str]]:
+        stmt = _rows_statement(version_id, number, limit, after, offset)
+        rows = (await self.db.execute(stmt)).all()
+        return split_page(rows, (Question.id,), limit)
+
+    async def get_by_version(self, version_id: int) -> List[Question]:
+        stmt = _filtered(select(Question), version_id)
+        return list((await self.db.scalars(stmt)).all())
+
+    async def get(self, question_id: int) -> Question | None:
+        return await self.db.get(Question, question_id)
+
+    async def update(
+        self, question_id: int, question: QuestionUpdate
+    ) -> Row | Question | None:
+        values = _update_values(question)
+        if not values:
+            return await self.get(question_id)
+        return (await self.db.execute(_update(question_id, values))).one_or_none()
+
+    async def delete(self, question_id: int) -> Row | None:
+        return (await self.db.execute(_delete(question_id))).one_or_none()
@@ -1,49 +1,380 @@
+from sqlalchemy import Row, bindparam, delete, distinct, insert, literal, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
-from domain.models import Response
-from domain.schemas import ResponseCreate, ResponseUpdate
-from typing import List
+from domain.models import Question, Response
+from domain.schemas import JSONValue, ResponseCreate, ResponseUpdate
+from repositories.dialect import dialect_insert
+from repositories.pagination import keyset_page, keyset_statement, split_page
+from typing import Dict, List, Optional, Tuple
+
+def _values(responses: List[ResponseCreate]) -> List[dict]:
+    return [
+        {
+            "user_id": r.user_id,
+            "version_id": r.version_id,
+            "question_id": r.question_id,
+            "response_value": r.response_value,
+        }
+        for r in responses
+    ]
+
+
+def _insert_statement():
+    table = Response.__table__
+    return insert(table).returning(*table.c, sort_by_parameter_order=True)
+
+
+def _upsert_statement(dialect: str):
+    """INSERT … ON CONFLICT (user_id, version_id, question_id) DO UPDATE … RETURNING."""
+    table = Response.__table__
+    stmt = dialect_insert(dialect)(table)
+    return stmt.on_conflict_do_update(
+        index_elements=[table.c.user_id, table.c.version_id, table.c.question_id],
+        set_={
+            "response_value": stmt.excluded.response_value,
+            "response_timestamp": stmt.excluded.response_timestamp,
+        },
+    ).returning(*table.c, sort_by_parameter_order=True)
+
+
+def _update(response_id: int, response_value, version_id: Optional[int] = None):
+    table = Response.__table__
+    stmt = update(table).where(table.c.id == response_id)
+    if version_id is not None:
+        # ключ секционирования — PostgreSQL трогает одну секцию, а не все
+        stmt = stmt.where(table.c.version_id == version_id)
+    return stmt.values(response_value=response_value).returning(*table.c)
+
+
+def _delete(response_id: int, version_id: Optional[int] = None):
+    table = Response.__table__
+    stmt = delete(table).where(table.c.id == response_id)
+    if version_id is not None:
+        # как в _update: без ключа секционирования DELETE обходит все секции
+        stmt = stmt.where(table.c.version_id == version_id)
+    return stmt.returning(*table.c)
+
+
+def _carry_over(
+    dialect: str,
+    source_id: int,
+    target_id: int,
+    question_ids: List[int],
+    first_user: int,
+    last_user: int,
+):
+    """
+    INSERT … SELECT of source answers onto target questions with the same
+    number; answers the user already gave in the target are kept.
+    """
+    table = Response.__table__
+    src = Question.__table__.alias("src")
+    dst = Question.__table__.alias("dst")
+    answers = (
+        select(
+            table.c.user_id,
+            literal(target_id),
+            dst.c.id,
+            table.c.response_value,
+            table.c.response_timestamp,
+        )
+        .join_from(table, src, src.c.id == table.c.question_id)
+        .join(dst, (dst.c.version_id == target_id) & (dst.c.number == src.c.number))
+        .where(
+            table.c.version_id == source_id,
+            table.c.user_id.between(first_user, last_user),
+            dst.c.id.in_(question_ids),
+        )
+    )
+    stmt = dialect_insert(dialect)(table).from_select(
+        ["user_id", "version_id", "question_id", "response_value", "response_timestamp"],
+        answers,
+    )
+    return stmt.on_conflict_do_nothing(
+        index_elements=[table.c.user_id, table.c.version_id, table.c.question_id]
+    ).returning(table.c.id, table.c.user_id, table.c.question_id, table.c.response_value)
+
+
+def _filtered(stmt, user_id=None, version_id=None, question_id=None):
+    if user_id is not None:
+        stmt = stmt.filter(Response.user_id == user_id)
+    if version_id is not None:
+        stmt = stmt.filter(Response.version_id == version_id)
+    if question_id is not None:
+        stmt = stmt.filter(Response.question_id == question_id)
+    return stmt
+
+
+def _rows_statement(user_id, version_id, question_id, limit, after, offset):
+    stmt = _filtered(select(*Response.__table__.c), user_id, version_id, question_id)
+    return keyset_statement(stmt, (Response.id,), limit, after, offset)
+
 
 class ResponseRepository:
     def __init__(self, db: Session):
         self.db = db
 
-    def create(self, response: ResponseCreate) -> Response:
-        """Create a new response in the database."""
-        db_response = Response(
-            user_id=response.user_id,
-            version_id=response.version_id,
-            question_id=response.question_id,
-            response_value=str(response.response_value)  # Convert to string for consistency
-        )
-        self.db.add(db_response)
-        self.db.commit()
-        self.db.refresh(db_response)
-        return db_response
+    def create(self, response: ResponseCreate) -> Row:
+        """Insert a response (INSERT … RETURNING)."""
+        return self.create_many([response])[0]
+
+    def create_many(self, responses: List[ResponseCreate]) -> List[Row]:
+        """
+        Insert many responses with one multi-row INSERT ... RETURNING.
+        Returns plain rows in input order (no ORM refresh); the commit is
+        left to the caller's unit of work.
+        """
+        if not responses:
+            return []
+        return self.db.execute(_insert_statement(), _values(responses)).all()
+
+    def upsert(self, response: ResponseCreate) -> Row:
+        """Insert a response or overwrite the answer to the same question."""
+        return self.upsert_many([response])[0]
+
+    def upsert_many(self, responses: List[ResponseCreate]) -> List[Row]:
+        """
+        INSERT ... ON CONFLICT (user_id, version_id, question_id) DO UPDATE
+        for many responses in one statement. Returns plain rows in input order.
+        """
+        if not responses:
+            return []
+        stmt = _upsert_statement(self.db.get_bind().dialect.name)
+        return self.db.execute(stmt, _values(responses)).all()
 
     def get_by_user_and_version(self, user_id: int, version_id: int) -> List[Response]:
         """Retrieve all responses for a user and version."""
         return self.db.query(Response).filter(Response.user_id == user_id, Response.version_id == version_id).all()
 
-    def get(self, response_id: int) -> Response | None:
-        """Retrieve a response by its ID."""
-        return self.db.query(Response).filter(Response.id == response_id).first()
-
-    def update(self, response_id: int, response: ResponseUpdate) -> Response | None:
-        """Update an existing response."""
-        db_response = self.get(response_id)
-        if db_response:
-            if response.response_value is not None:
-                db_response.response_value = response.response_value
-            self.db.commit()
-            self.db.refresh(db_response)
-            return db_response
-        return None
-
-    def delete(self, response_id: int) -> bool:
-        """Delete a response by its ID."""
-        db_response = self.get(response_id)
-        if db_response:
-            self.db.delete(db_response)
-            self.db.commit()
-            return True
-        return False
\ No newline at end of file
+    def list(
+        self,
+        user_id=None,
+        version_id=None,
+        question_id=None,
+        limit: int = 100,
+        offset: int = 0,
+    ) -> List[Response]:
+        """List responses with optional filters."""
+        return self.page(user_id, version_id, question_id, limit, offset=offset)[0]
+
+    def page(
+        self,
+        user_id=None,
+        version_id=None,
+        question_id=None,
+        limit: int = 100,
+        after: Optional[str] = None,
+        offset: int = 0,
+    ) -> Tuple[List[Response], Optional[str]]:
+        """One page of responses ordered by id plus the cursor of the next one."""
+        q = _filtered(self.db.query(Response), user_id, version_id, question_id)
+        return keyset_page(q, (Response.id,), limit, after=after, offset=offset)
+
+    def rows_page(
+        self,
+        user_id=None,
+        version_id=None,
+        question_id=None,
+        limit: int = 100,
+        after: Optional[str] = None,
+        offset: int = 0,
+    ) -> Tuple[List[Row], Optional[str]]:
+        """`page` as plain rows of a Core select(): no entities, no identity map."""
+        stmt = _rows_statement(user_id, version_id, question_id, limit, after, offset)
+        return split_page(self.db.execute(stmt).all(), (Response.id,), limit)
+
+    def get(self, response_id: int, for_update: bool = False) -> Response | None:
+        """
+        Retrieve a response by its ID. `for_update` locks the row until the
+        end of the transaction (SELECT … FOR UPDATE; no-op on SQLite).
+        """
+        q = self.db.query(Response).filter(Response.id == response_id)
+        if for_update:
+            # значение из identity map могло устареть — берём то, что заблокировали
+            q = q.with_for_update().populate_existing()
+        return q.first()
+
+    def current_values(
+        self, user_id: int, version_id: int, question_ids: List[int]
+    ) -> Dict[int, JSONValue]:
+        """
+        question_id -> stored answer of a user, locked until the end of the
+        transaction (SELECT … FOR UPDATE): what an upsert is about to overwrite.
+        """
+        if not question_ids:
+            return {}
+        table = Response.__table__
+        stmt = (
+            select(table.c.question_id, table.c.response_value)
+            .where(
+                table.c.user_id == user_id,
+                table.c.version_id == version_id,
+                table.c.question_id.in_(question_ids),
+            )
+            .with_for_update()
+        )
+        return {qid: value for qid, value in self.db.execute(stmt)}
+
+    def update(
+        self,
+        response_id: int,
+        response: ResponseUpdate,
+        version_id: Optional[int] = None,
+    ) -> Row | Response | None:
+        """
+        Update a response (UPDATE … RETURNING); None if it does not exist.
+        A known `version_id` lets a partitioned table prune to one partition.
+        """
+        if response.response_value is None:
+            return self.get(response_id)
+        stmt = _update(response_id, response.response_value, version_id)
+        return self.db.execute(stmt).one_or_none()
+
+    def delete(self, response_id: int, version_id: Optional[int] = None) -> Row | None:
+        """
+        Delete a response by primary key; returns the deleted row or None.
+        A known `version_id` lets a partitioned table prune to one partition.
+        """
+        return self.db.execute(_delete(response_id, version_id)).one_or_none()
+
+    def user_ids(
+        self, version_id: int, after: Optional[int] = None, limit: int = 1000
+    ) -> List[int]:
+        """Keyset page of distinct users who answered in a version."""
+        table = Response.__table__
+        stmt = select(distinct(table.c.user_id)).where(table.c.version_id == version_id)
+        if after is not None:
+            stmt = stmt.where(table.c.user_id > after)
+        return list(self.db.scalars(stmt.order_by(table.c.user_id).limit(limit)))
+
+    def answers_of_users(
+        self, version_id: int, first_user: int, last_user: int
+    ) -> List[Row]:
+        """(user_id, question_id, response_value) of a range of users in a version."""
+        table = Response.__table__
+        stmt = select(table.c.user_id, table.c.question_id, table.c.response_value).where(
+            table.c.version_id == version_id,
+            table.c.user_id.between(first_user, last_user),
+        )
+        return self.db.execute(stmt).all()
+
+    def carry_over(
+        self,
+        source_id: int,
+        target_id: int,
+        question_ids: List[int],
+        first_user: int,
+        last_user: int,
+    ) -> List[Row]:
+        """Copy a range of users' answers into another version; returns inserted rows."""
+        stmt = _carry_over(
+            self.db.get_bind().dialect.name,
+            source_id,
+            target_id,
+            question_ids,
+            first_user,
+            last_user,
+        )
+        return self.db.execute(stmt).all()
+
+    def set_values(self, values: List[Tuple[int, JSONValue]]) -> None:
+        """Overwrite response_value of many responses (executemany)."""
+        if not values:
+            return
+        table = Response.__table__
+        stmt = (
+            update(table)
+            .where(table.c.id == bindparam("b_id"))
+            .values(response_value=bindparam("b_value"))
+        )
+        self.db.execute(stmt, [{"b_id": i, "b_value": v} for i, v in values])
+
+    def delete_many(self, response_ids: List[int], version_id: int) -> None:
+        if response_ids:
+            table = Response.__table__
+            self.db.execute(
+                delete(table).where(
+                    table.c.version_id == version_id, table.c.id.in_(response_ids)
+                )
+            )
+
+    def delete_by_version(self, version_id: int) -> int:
+        """Delete every response of a version; returns the number deleted."""
+        table = Response.__table__
+        stmt = delete(table).where(table.c.version_id == version_id)
+        return self.db.execute(stmt).rowcount
+
+
+class AsyncResponseRepository:
+    """ResponseRepository over an AsyncSession (ASYNC_DB=true)."""
+
+    def __init__(self, db: AsyncSession):
+        self.db = db
+
+    async def create(self, response: ResponseCreate) -> Row:
+        return (await self.create_many([response]))[0]
+
+    async def create_many(self, responses: List[ResponseCreate]) -> List[Row]:
+        if not responses:
+            return []
+        result = await self.db.execute(_insert_statement(), _values(responses))
+        return result.all()
+
+    async def upsert_many(self, responses: List[ResponseCreate]) -> List[Row]:
+        if not responses:
+            return []
+        stmt = _upsert_statement(self.db.get_bind().dialect.name)
+        result = await self.db.execute(stmt, _values(responses))
+        return result.all()
+
+    async def get_by_user_and_version(
+        self, user_id: int, version_id: int
+    ) -> List[Response]:
+        stmt = _filtered(select(Response), user_id, version_id)
+        return list((await self.db.scalars(stmt)).all())
+
+    async def page(
+        self,
+        user_id=None,
+        version_id=None,
+        question_id=None,
+        limit: int = 100,
+        after: Optional[str] = None,
+        offset: int = 0,
+    ) -> Tuple[List[Response], Optional[str]]:
+        stmt = _filtered(select(Response), user_id, version_id, question_id)
+        stmt = keyset_statement(stmt, (Response.id,), limit, after, offset)
+        rows = (await self.db.scalars(stmt)).all()
+        return split_page(rows, (Response.id,), limit)
+
+    async def rows_page(
+        self,
+        user_id=None,
+        version_id=None,
+        question_id=None,
+        limit: int = 100,
+        after: Optional[str] = None,
+        offset: int = 0,
+    ) -> Tuple[List[Row], Optional[str]]:
+        stmt = _rows_statement(user_id, version_id, question_id, limit, after, offset)
+        rows = (await self.db.execute(stmt)).all()
+        return split_page(rows, (Response.id,), limit)
+
+    async def get(self, response_id: int) -> Response | None:
+        return await self.db.get(Response, response_id)
+
+    async def update(
+        self,
+        response_id: int,
+        response: ResponseUpdate,
+        version_id: Optional[int] = None,
+    ) -> Row | Response | None:
+        if response.response_value is None:
+            return await self.get(response_id)
+        stmt = _update(response_id, response.response_value, version_id)
+        return (await self.db.execute(stmt)).one_or_none()
+
+    async def delete(
+        self, response_id: int, version_id: Optional[int] = None
+    ) -> Row | None:
+        return (await self.db.execute(_delete(response_id, version_id))).one_or_none()
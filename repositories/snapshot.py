@@ -0,0 +1,60 @@
+from datetime import datetime
+
+import pytz
+from sqlalchemy import Row, delete, select
+from sqlalchemy.orm import Session
+from domain.models import SurveySnapshot
+from repositories.dialect import dialect_insert
+from typing import Any, Dict, List, Optional
+
+_table = SurveySnapshot.__table__
+
+
+def _key(user_id: int, version_id: int):
+    return (_table.c.user_id == user_id) & (_table.c.version_id == version_id)
+
+
+class SnapshotRepository:
+    def __init__(self, db: Session):
+        self.db = db
+
+    def get(self, user_id: int, version_id: int) -> Optional[Row]:
+        """Primary-key lookup of a user's snapshot in a version."""
+        stmt = select(_table).where(_key(user_id, version_id))
+        return self.db.execute(stmt).one_or_none()
+
+    def lock(self, user_id: int, version_id: int) -> Optional[Row]:
+        """`get` with SELECT … FOR UPDATE: concurrent writers of one user queue up."""
+        stmt = select(_table).where(_key(user_id, version_id)).with_for_update()
+        return self.db.execute(stmt).one_or_none()
+
+    def save(
+        self, user_id: int, version_id: int, answers: Dict[str, Any], revision: int
+    ) -> None:
+        """Insert or overwrite a snapshot document."""
+        stmt = dialect_insert(self.db.get_bind().dialect.name)(_table).values(
+            user_id=user_id,
+            version_id=version_id,
+            answers=answers,
+            revision=revision,
+            updated_at=datetime.now(pytz.UTC),
+        )
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[_table.c.user_id, _table.c.version_id],
+            set_={
+                "answers": stmt.excluded.answers,
+                "revision": stmt.excluded.revision,
+                "updated_at": stmt.excluded.updated_at,
+            },
+        )
+        self.db.execute(stmt)
+
+    def clear_version(self, version_id: int) -> None:
+        self.db.execute(delete(_table).where(_table.c.version_id == version_id))
+
+    def clear_users(self, version_id: int, user_ids: List[int]) -> None:
+        self.db.execute(
+            delete(_table).where(
+                _table.c.version_id == version_id, _table.c.user_id.in_(user_ids)
+            )
+        )
@@ -0,0 +1,80 @@
+from sqlalchemy import Row, and_, case, delete, func, or_, select
+from sqlalchemy.orm import Session
+from domain.models import Question, QuestionStat
+from repositories.dialect import dialect_insert
+from typing import Dict, List, Optional, Tuple
+
+# (version_id, question_id, bucket) -> (изменение count, агрегат корзины:
+# приращение суммы для "sum", кандидат в минимум/максимум для "min"/"max")
+StatsDeltas = Dict[Tuple[int, int, str], Tuple[int, Optional[float]]]
+
+_table = QuestionStat.__table__
+
+
+def _apply_statement(dialect: str):
+    """
+    INSERT … ON CONFLICT (version_id, question_id, bucket) DO UPDATE count += …,
+    value — сумма для "sum", наименьшее/наибольшее для "min"/"max".
+    """
+    stmt = dialect_insert(dialect)(_table)
+    c, new = _table.c, stmt.excluded
+    # у SQLite скалярные min()/max() от двух аргументов, у PostgreSQL least/greatest
+    least, greatest = (
+        (func.least, func.greatest) if dialect == "postgresql" else (func.min, func.max)
+    )
+    candidate = func.coalesce(new.value, c.value)
+    value = case(
+        # корзина опустела — старая граница больше не действует
+        (and_(or_(c.bucket == "min", c.bucket == "max"), c.count <= 0), new.value),
+        (c.bucket == "min", least(c.value, candidate)),
+        (c.bucket == "max", greatest(c.value, candidate)),
+        else_=c.value + new.value,
+    )
+    return stmt.on_conflict_do_update(
+        index_elements=[c.version_id, c.question_id, c.bucket],
+        set_={"count": c.count + new.count, "value": value},
+    )
+
+
+class StatsRepository:
+    def __init__(self, db: Session):
+        self.db = db
+
+    def apply(self, deltas: StatsDeltas) -> None:
+        """Add count and aggregate deltas to the summaries in one statement."""
+        rows = [
+            {
+                "version_id": version_id,
+                "question_id": question_id,
+                "bucket": bucket,
+                "count": count,
+                "value": value,
+            }
+            # один порядок блокировок у всех пишущих — без взаимных блокировок
+            for (version_id, question_id, bucket), (count, value) in sorted(
+                deltas.items()
+            )
+            if count or value is not None
+        ]
+        if rows:
+            stmt = _apply_statement(self.db.get_bind().dialect.name)
+            self.db.execute(stmt, rows)
+
+    def for_version(self, version_id: int) -> List[Row]:
+        """
+        Every question of a version with its non-empty buckets (one row per
+        bucket; bucket is None for questions nobody answered), ordered by id.
+        """
+        q, s = Question.__table__.c, _table.c
+        return self.db.execute(
+            select(q.id, q.number, q.type, s.bucket, s.count, s.value)
+            .outerjoin(
+                _table,
+                and_(s.question_id == q.id, s.version_id == version_id, s.count > 0),
+            )
+            .where(q.version_id == version_id)
+            .order_by(q.id)
+        ).all()
+
+    def clear_version(self, version_id: int) -> None:
+        self.db.execute(delete(_table).where(_table.c.version_id == version_id))
@@ -1,63 +1,137 @@
+from sqlalchemy import Row, delete, func, insert, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 from domain.models import Version
 from domain.schemas import VersionCreate, VersionUpdate
-from typing import List
-from domain import models
+from repositories.pagination import keyset_page, keyset_statement, split_page
+from typing import List, Optional, Tuple
+
+# запись — один statement с RETURNING, без commit: его делает unit of work
+_table = Version.__table__
+
+
+def _insert(version: VersionCreate):
+    return insert(_table).values(name=version.name).returning(*_table.c)
+
+
+def _update_values(version: VersionUpdate) -> dict:
+    return {"name": version.name} if version.name else {}
+
+
+def _update(version_id: int, values: dict):
+    return (
+        update(_table)
+        .where(_table.c.id == version_id)
+        .values(**values)
+        .returning(*_table.c)
+    )
+
+
+def _delete(version_id: int):
+    return delete(_table).where(_table.c.id == version_id).returning(*_table.c)
+
+
+def _publish(version_id: int):
+    return (
+        update(_table)
+        .where(_table.c.id == version_id)
+        .values(published=True)
+        .returning(*_table.c)
+    )
+
+
+def _published(version_id: int):
+    # FOR SHARE: публикация (UPDATE строки версии) ждёт пишущих в вопросы и наоборот
+    return select(_table.c.published).where(_table.c.id == version_id).with_for_update(
+        read=True
+    )
 
 
 class VersionRepository:
     def __init__(self, db: Session):
         self.db = db
 
-    def create(self, version: VersionCreate) -> Version:
-        """Create a new version in the database."""
-        db_version = Version(name=version.name)
-        self.db.add(db_version)
-        self.db.commit()
-        self.db.refresh(db_version)
-        return db_version
+    def create(self, version: VersionCreate) -> Row:
+        """Insert a version (INSERT … RETURNING)."""
+        return self.db.execute(_insert(version)).one()
 
     def get_all(self) -> List[Version]:
         """Retrieve all versions from the database."""
         return self.db.query(Version).all()
 
+    def page(
+        self, limit: int = 100, after: Optional[str] = None, offset: int = 0
+    ) -> Tuple[List[Version], Optional[str]]:
+        """One page of versions, newest first, plus the cursor of the next one."""
+        return keyset_page(
+            self.db.query(Version),
+            (Version.id,),
+            limit,
+            after=after,
+            offset=offset,
+            descending=True,
+        )
+
     def get(self, version_id: int) -> Version | None:
         """Retrieve a version by its ID."""
         return self.db.query(Version).filter(Version.id == version_id).first()
 
-    def update(self, version_id: int, version: VersionUpdate) -> Version | None:
-        """Update an existing version."""
-        db_version = self.get(version_id)
-        if db_version:
-            if version.name:
-                db_version.name = version.name
-            self.db.commit()
-            self.db.refresh(db_version)
-            return db_version
-        return None
-
-    def delete(self, version_id: int) -> bool:
-        """Delete a version by its ID."""
-        db_version = self.get(version_id)
-        if db_version:
-            self.db.delete(db_version)
-            self.db.commit()
-            return True
-        return False
+    def previous(self, version_id: int) -> Optional[int]:
+        """Id of the version created right before `version_id`."""
+        stmt = select(func.max(_table.c.id)).where(_table.c.id < version_id)
+        return self.db.execute(stmt).scalar()
 
+    def update(self, version_id: int, version: VersionUpdate) -> Row | Version | None:
+        """Update a version (UPDATE … RETURNING); None if it does not exist."""
+        values = _update_values(version)
+        if not values:
+            return self.get(version_id)
+        return self.db.execute(_update(version_id, values)).one_or_none()
 
-class VersionRepository:
-    def __init__(self, db):
+    def delete(self, version_id: int) -> Row | None:
+        """Delete a version row (last step of services/purge.py); returns it or None."""
+        return self.db.execute(_delete(version_id)).one_or_none()
+
+    def publish(self, version_id: int) -> Row | None:
+        """Set the published flag (UPDATE … RETURNING); None if there is no version."""
+        return self.db.execute(_publish(version_id)).one_or_none()
+
+    def is_published(self, version_id: int) -> bool:
+        """Published flag, share-locked until the end of the transaction."""
+        return bool(self.db.execute(_published(version_id)).scalar())
+
+
+class AsyncVersionRepository:
+    """VersionRepository over an AsyncSession (ASYNC_DB=true)."""
+
+    def __init__(self, db: AsyncSession):
         self.db = db
 
-    def get(self, id: int):
-        return self.db.query(models.Version).get(id)
+    async def create(self, version: VersionCreate) -> Row:
+        return (await self.db.execute(_insert(version))).one()
 
-    def list(self, limit: int = 100, offset: int = 0):
-        return (
-            self.db.query(models.Version)
-            .order_by(models.Version.id.desc())
-            .offset(offset)
-            .limit(limit)
-            .all()
+    async def page(
+        self, limit: int = 100, after: Optional[str] = None, offset: int = 0
+    ) -> Tuple[List[Version], Optional[str]]:
+        stmt = keyset_statement(
+            select(Version), (Version.id,), limit, after, offset, descending=True
         )
+        rows = (await self.db.scalars(stmt)).all()
+        return split_page(rows, (Version.id,), limit)
+
+    async def get(self, version_id: int) -> Version | None:
+        return await self.db.get(Version, version_id)
+
+    async def update(
+        self, version_id: int, version: VersionUpdate
+    ) -> Row | Version | None:
+        values = _update_values(version)
+        if not values:
+            return await self.get(version_id)
+        return (await self.db.execute(_update(version_id, values))).one_or_none()
+
+    async def publish(self, version_id: int) -> Row | None:
+        return (await self.db.execute(_publish(version_id))).one_or_none()
+
+    async def is_published(self, version_id: int) -> bool:
+        return bool((await self.db.execute(_published(version_id))).scalar())
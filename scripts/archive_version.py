@@ -0,0 +1,40 @@
+import sys, pathlib
+
+sys.path.append(str(pathlib.Path(__file__).resolve().parents[1]))
+
+import argparse
+from db.database import SessionLocal
+from repositories.partition import partition_name
+from services.version import VersionService
+
+
+def main():
+    """
+    Архивация ответов версии. На PostgreSQL секция responses_v<id>
+    отсоединяется от responses (строки остаются в отдельной таблице) или,
+    с --drop, удаляется целиком — без DELETE по строкам. Без секций
+    (SQLite) работает только --drop, обычным DELETE.
+    """
+    parser = argparse.ArgumentParser(description=main.__doc__)
+    parser.add_argument("version_ids", nargs="+", type=int)
+    parser.add_argument("--drop", action="store_true", help="удалить ответы")
+    args = parser.parse_args()
+
+    db = SessionLocal()
+    try:
+        service = VersionService(db)
+        for version_id in args.version_ids:
+            if service.get(version_id) is None:
+                print(f"Version {version_id} not found")
+            elif not service.archive(version_id, drop=args.drop):
+                print(f"Version {version_id}: nothing to archive")
+            elif args.drop:
+                print(f"Archive OK: version {version_id}, responses dropped")
+            else:
+                print(f"Archive OK: version {version_id} -> {partition_name(version_id)}")
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,34 @@
+import sys, pathlib
+
+sys.path.append(str(pathlib.Path(__file__).resolve().parents[1]))
+
+import argparse
+from sqlalchemy import select
+from db.database import SessionLocal
+from domain.models import Version
+from services.stats import StatsService
+
+
+def main():
+    """
+    Полный пересчёт сводок статистики (question_stats) из responses —
+    после миграции или если сводки разошлись с ответами. Записи, идущие
+    во время пересчёта той же версии, могут в него не попасть: запускать
+    в тихое время.
+    """
+    parser = argparse.ArgumentParser(description=main.__doc__)
+    parser.add_argument("version_ids", nargs="*", type=int, help="по умолчанию — все")
+    args = parser.parse_args()
+
+    db = SessionLocal()
+    try:
+        version_ids = args.version_ids or db.scalars(select(Version.id)).all()
+        for version_id in version_ids:
+            scanned = StatsService(db).rebuild(version_id)
+            print(f"Stats OK: version {version_id}, responses: {scanned}")
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
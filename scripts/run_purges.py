@@ -0,0 +1,40 @@
+import sys, pathlib
+
+sys.path.append(str(pathlib.Path(__file__).resolve().parents[1]))
+
+import argparse
+from db.database import SessionLocal
+from repositories.purge import PurgeJobRepository
+from services.purge import PurgeService
+
+
+def main():
+    """
+    Довести до конца фоновые удаления, прерванные рестартом или ошибкой:
+    задание продолжается с записанного этапа. Задания, которые сейчас
+    выполняет живой воркер (running с недавним прогрессом), пропускаются.
+    """
+    parser = argparse.ArgumentParser(description=main.__doc__)
+    parser.add_argument("job_ids", nargs="*", type=int, help="по умолчанию — все незавершённые")
+    parser.add_argument("--chunk-size", type=int, default=None)
+    args = parser.parse_args()
+
+    db = SessionLocal()
+    try:
+        job_ids = args.job_ids or [job.id for job in PurgeJobRepository(db).unfinished()]
+        db.rollback()
+        for job_id in job_ids:
+            job = PurgeService(db, chunk_size=args.chunk_size).run(job_id)
+            if job is None:
+                print(f"Purge {job_id}: taken by another worker or already done")
+            else:
+                print(
+                    f"Purge {job_id} ({job.kind} {job.target_id}): {job.status}, "
+                    f"deleted {job.deleted}" + (f", error: {job.error}" if job.error else "")
+                )
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
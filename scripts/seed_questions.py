@@ -2,102 +2,75 @@ import sys, pathlib
 
 sys.path.append(str(pathlib.Path(__file__).resolve().parents[1]))
 
-import json
+import argparse
 from pathlib import Path
-from sqlalchemy import text
+from typing import Iterator
+from sqlalchemy import select
 from db.database import SessionLocal
+from domain.models import Version
+from domain.schemas import VersionCreate
+from repositories.partition import ResponsePartitions
+from services.question_import import BATCH_SIZE, PayloadScanner, QuestionImportService
+from services.version import VersionService
 
 
-def load_payload():
-    root = Path(__file__).resolve().parents[1]  # корень проекта
-    with open(root / "data" / "questions_v1.json", "r", encoding="utf-8") as f:
-        return json.load(f)
+CHUNK_SIZE = 64 * 1024
+
+DEFAULT_PATH = Path(__file__).resolve().parents[1] / "data" / "questions_v1.json"
+
+
+def read_chunks(path: Path) -> Iterator[bytes]:
+    with open(path, "rb") as f:
+        while chunk := f.read(CHUNK_SIZE):
+            yield chunk
+
+
+def payload_version(path: Path) -> str:
+    """Имя версии из ключа "version" файла — читаем только до него."""
+    scanner = PayloadScanner()
+    for chunk in read_chunks(path):
+        scanner.feed(chunk)
+        if "version" in scanner.meta:
+            return scanner.meta["version"]["name"]
+    raise SystemExit(f"{path}: no \"version\" in the payload, pass --version-name")
 
 
 def get_or_create_version(db, version_name: str) -> int:
     """
     Возвращает id версии с именем `version_name`, создаёт её при отсутствии.
-    Работает и на SQLite, и на PostgreSQL.
+    Новая версия — через VersionService: на PostgreSQL ей нужна секция responses.
     """
-    dialect = db.bind.dialect.name
-
-    if dialect == "sqlite":
-        db.execute(
-            text(
-                """
-                INSERT INTO versions (name, created_at)
-                SELECT :name, CURRENT_TIMESTAMP
-                WHERE NOT EXISTS (SELECT 1 FROM versions WHERE name = :name)
-            """
-            ),
-            {"name": version_name},
-        )
-        vid = db.execute(
-            text("SELECT id FROM versions WHERE name = :name"),
-            {"name": version_name},
-        ).scalar()
-        return vid
-    else:
-        vid = db.execute(
-            text(
-                """
-                WITH ins AS (
-                  INSERT INTO versions (name, created_at)
-                  SELECT :name, NOW()
-                  WHERE NOT EXISTS (SELECT 1 FROM versions WHERE name = :name)
-                  RETURNING id
-                )
-                SELECT id FROM ins
-                UNION ALL
-                SELECT id FROM versions WHERE name = :name
-                LIMIT 1
-            """
-            ),
-            {"name": version_name},
-        ).scalar()
-        return vid
+    vid = db.execute(
+        select(Version.id).where(Version.name == version_name).order_by(Version.id)
+    ).scalar()
+    if vid is None:
+        return VersionService(db).create(VersionCreate(name=version_name)).id
+    # версии, засеянные до секционирования, получают секцию задним числом
+    ResponsePartitions(db).create(vid)
+    return vid
 
 
 def main():
-    payload = load_payload()
-    version_name = payload["version"]["name"]
-    questions = payload["questions"]
+    """
+    Загрузка анкеты из JSON ({"version": {"name": …}, "questions": [...]})
+    пачками через QuestionImportService; повторный запуск ничего не меняет.
+    """
+    parser = argparse.ArgumentParser(description=main.__doc__)
+    parser.add_argument("path", nargs="?", type=Path, default=DEFAULT_PATH)
+    parser.add_argument("--version-name", help="по умолчанию — из файла")
+    parser.add_argument("--batch-size", type=int, default=BATCH_SIZE)
+    args = parser.parse_args()
+    version_name = args.version_name or payload_version(args.path)
 
     db = SessionLocal()
     try:
-        # 👇 заменили блок на функцию
         version_id = get_or_create_version(db, version_name)
-
-        for q in questions:
-            db.execute(
-                text(
-                    """
-                    INSERT INTO questions (version_id, number, text, type, options, constraints)
-                    SELECT :version_id, :number, :text, :type, :options, :constraints
-                    WHERE NOT EXISTS (
-                      SELECT 1 FROM questions WHERE version_id = :version_id AND number = :number
-                    )
-                """
-                ),
-                {
-                    "version_id": version_id,
-                    "number": q["number"],
-                    "text": q["text"],
-                    "type": q["type"],
-                    "options": (
-                        json.dumps(q["options"])
-                        if q.get("options") is not None
-                        else None
-                    ),
-                    "constraints": (
-                        json.dumps(q["constraints"])
-                        if q.get("constraints") is not None
-                        else None
-                    ),
-                },
-            )
         db.commit()
-        print(f"Seed OK: version '{version_name}', questions: {len(questions)}")
+        report = QuestionImportService(db).load(
+            version_id, read_chunks(args.path), batch_size=args.batch_size
+        )
+        print(f"Seed OK: version '{version_name}'")
+        print(report.model_dump_json(indent=2))
     except:
         db.rollback()
         raise
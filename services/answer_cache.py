@@ -0,0 +1,128 @@
+# services/answer_cache.py
+"""
+LRU-кэш контекстов ответов (см. ResponseService._answers_ctx) по ключу
+(user_id, version_id) с ограничением размера и TTL.
+
+Кэш живёт в процессе воркера: запись через ResponseService обновляет его
+сразу (write-through), а TTL ограничивает устаревание, если тот же
+пользователь пишет через другой воркер.
+"""
+
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Optional, Set, Tuple
+
+from db.settings import Settings
+from services.invalidation import on_version_change
+
+Key = Tuple[int, int]
+Context = Dict[str, Any]
+
+
+class AnswerContextCache:
+    """Bounded LRU cache of answer contexts keyed by (user_id, version_id)."""
+
+    def __init__(self, maxsize: int = 10000, ttl: float = 60.0) -> None:
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self._data: "OrderedDict[Key, Tuple[float, Context]]" = OrderedDict()
+        self._by_version: Dict[int, Set[Key]] = {}
+        self._lock = threading.Lock()
+
+    @property
+    def enabled(self) -> bool:
+        return self.maxsize > 0
+
+    def get(self, user_id: int, version_id: int) -> Optional[Context]:
+        """Return a private copy of the cached context, or None on a miss."""
+        if not self.enabled:
+            return None
+        key = (user_id, version_id)
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None or entry[0] < time.monotonic():
+                if entry is not None:
+                    self._drop(key)
+                self.misses += 1
+                return None
+            self._data.move_to_end(key)
+            self.hits += 1
+            return dict(entry[1])
+
+    def put(self, user_id: int, version_id: int, ctx: Context) -> None:
+        """Store a copy of a freshly loaded context."""
+        if not self.enabled:
+            return
+        key = (user_id, version_id)
+        with self._lock:
+            self._data[key] = (time.monotonic() + self.ttl, dict(ctx))
+            self._data.move_to_end(key)
+            self._by_version.setdefault(version_id, set()).add(key)
+            while len(self._data) > self.maxsize:
+                self._drop(next(iter(self._data)))
+
+    def write(self, user_id: int, version_id: int, values: Context) -> None:
+        """Write-through: merge saved values into a cached context, if any."""
+        self._patch(user_id, version_id, values, ())
+
+    def forget(self, user_id: int, version_id: int, keys: Tuple[str, ...]) -> None:
+        """Write-through for deletes: remove keys from a cached context, if any."""
+        self._patch(user_id, version_id, {}, keys)
+
+    def invalidate(self, user_id: int, version_id: int) -> None:
+        with self._lock:
+            self._drop((user_id, version_id))
+
+    def invalidate_version(self, version_id: int) -> None:
+        """Drop every cached context of a version."""
+        with self._lock:
+            for key in list(self._by_version.get(version_id, ())):
+                self._drop(key)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+            self._by_version.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "size": len(self._data),
+            "maxsize": self.maxsize,
+            "ttl": self.ttl,
+            "hits": self.hits,
+            "misses": self.misses,
+        }
+
+    # ---------- internals ----------
+
+    def _patch(
+        self, user_id: int, version_id: int, values: Context, drop: Tuple[str, ...]
+    ) -> None:
+        key = (user_id, version_id)
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                return
+            ctx = entry[1]
+            ctx.update(values)
+            for k in drop:
+                ctx.pop(k, None)
+
+    def _drop(self, key: Key) -> None:
+        if self._data.pop(key, None) is not None:
+            keys = self._by_version.get(key[1])
+            if keys is not None:
+                keys.discard(key)
+                if not keys:
+                    del self._by_version[key[1]]
+
+
+_settings = Settings()
+
+answer_ctx_cache = AnswerContextCache(
+    maxsize=_settings.ANSWER_CTX_CACHE_SIZE, ttl=_settings.ANSWER_CTX_CACHE_TTL
+)
+on_version_change(answer_ctx_cache.invalidate_version)
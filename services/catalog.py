@@ -0,0 +1,145 @@
+# services/catalog.py
+"""
+Каталог вопросов версии: неизменяемый снимок всех вопросов с уже
+разобранными options/constraints и индексами id ↔ number.
+
+Загружается лениво, один на версию в пределах воркера, сбрасывается
+хуком services.invalidation при записи вопросов.
+"""
+
+import threading
+from types import MappingProxyType
+from typing import Any, Callable, Dict, Iterable, Mapping, Optional, Tuple
+
+from services.invalidation import on_version_change
+from services.validation import ValidationPlan, compile_plan, load_json
+
+
+class CatalogQuestion:
+    """Read-only question snapshot with parsed options and constraints."""
+
+    __slots__ = (
+        "id",
+        "version_id",
+        "number",
+        "text",
+        "type",
+        "options",
+        "constraints",
+    )
+
+    def __init__(self, question: Any) -> None:
+        set_ = object.__setattr__
+        set_(self, "id", question.id)
+        set_(self, "version_id", question.version_id)
+        set_(self, "number", question.number)
+        set_(self, "text", question.text)
+        set_(self, "type", question.type)
+        set_(self, "options", load_json(question.options))
+        constraints = load_json(question.constraints)
+        set_(self, "constraints", constraints if isinstance(constraints, dict) else None)
+
+    def __setattr__(self, name: str, value: Any) -> None:
+        raise AttributeError("CatalogQuestion is immutable")
+
+    def __repr__(self) -> str:
+        return f"CatalogQuestion(id={self.id}, number={self.number!r})"
+
+
+class QuestionCatalog:
+    """
+    All questions of one version with O(1) id/number lookups and the
+    compiled validation plan built from them.
+    """
+
+    __slots__ = (
+        "version_id",
+        "questions",
+        "by_id",
+        "by_number",
+        "id_to_number",
+        "number_to_id",
+        "_plan",
+    )
+
+    def __init__(self, version_id: int, questions: Iterable[Any]) -> None:
+        items = tuple(
+            sorted((CatalogQuestion(q) for q in questions), key=lambda q: q.id)
+        )
+        by_number: Dict[str, CatalogQuestion] = {}
+        for q in items:
+            # номера в анкете могут повторяться (2.1.2 …) — берём первый по id
+            by_number.setdefault(q.number, q)
+        self.version_id = version_id
+        self.questions: Tuple[CatalogQuestion, ...] = items
+        self.by_id: Mapping[int, CatalogQuestion] = MappingProxyType(
+            {q.id: q for q in items}
+        )
+        self.by_number: Mapping[str, CatalogQuestion] = MappingProxyType(by_number)
+        self.id_to_number: Mapping[int, str] = MappingProxyType(
+            {q.id: q.number for q in items}
+        )
+        self.number_to_id: Mapping[str, int] = MappingProxyType(
+            {number: q.id for number, q in by_number.items()}
+        )
+        self._plan: Optional[ValidationPlan] = None
+
+    @property
+    def plan(self) -> ValidationPlan:
+        """Validation plan compiled lazily from this catalog snapshot."""
+        # план живёт вместе с каталогом, поэтому не может пережить его сброс
+        if self._plan is None:
+            self._plan = compile_plan(self.version_id, self.questions)
+        return self._plan
+
+    def get(self, question_id: int) -> Optional[CatalogQuestion]:
+        return self.by_id.get(question_id)
+
+    def get_by_number(self, number: str) -> Optional[CatalogQuestion]:
+        return self.by_number.get(number)
+
+    def __len__(self) -> int:
+        return len(self.questions)
+
+
+class CatalogCache:
+    """Process-local cache of question catalogs keyed by version_id."""
+
+    def __init__(self) -> None:
+        self._catalogs: Dict[int, QuestionCatalog] = {}
+        # счётчик сбросов по версии: каталог, загруженный до сброса, не сохраняем
+        self._generations: Dict[int, int] = {}
+        self._lock = threading.Lock()
+
+    def get(
+        self, version_id: int, load: Callable[[int], Iterable[Any]]
+    ) -> QuestionCatalog:
+        """Return the cached catalog or build it from `load(version_id)`."""
+        catalog = self._catalogs.get(version_id)
+        if catalog is not None:
+            return catalog
+        generation = self._generations.get(version_id, 0)
+        # load() вызывается без блокировки: в async-режиме (run_sync) он
+        # переключает greenlet, и соседняя корутина того же потока иначе
+        # заблокировала бы event loop на этом lock'е
+        catalog = QuestionCatalog(version_id, load(version_id))
+        with self._lock:
+            if self._generations.get(version_id, 0) != generation:
+                return catalog
+            return self._catalogs.setdefault(version_id, catalog)
+
+    def invalidate(self, version_id: int) -> None:
+        """Drop the catalog of a version."""
+        with self._lock:
+            self._generations[version_id] = self._generations.get(version_id, 0) + 1
+            self._catalogs.pop(version_id, None)
+
+    def clear(self) -> None:
+        with self._lock:
+            for version_id in self._catalogs:
+                self._generations[version_id] = self._generations.get(version_id, 0) + 1
+            self._catalogs.clear()
+
+
+question_catalog = CatalogCache()
+on_version_change(question_catalog.invalidate)
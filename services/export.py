@@ -0,0 +1,163 @@
+# services/export.py
+"""
+Потоковая выгрузка ответов версии в NDJSON / CSV.
+
+Строки читаются серверным курсором (stream_results + yield_per) пачками
+и сериализуются напрямую из Row — без ORM-объектов и Pydantic, — поэтому
+память не растёт с размером версии. gzip применяется на лету, по пачкам.
+"""
+
+import csv
+import io
+import json
+import zlib
+from datetime import datetime
+from typing import AsyncIterator, Callable, Iterator, Sequence
+
+from sqlalchemy import Row, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+from domain.models import Question, Response
+
+FORMATS = {
+    "ndjson": "application/x-ndjson",
+    "csv": "text/csv; charset=utf-8",
+}
+
+COLUMNS = (
+    "id",
+    "user_id",
+    "version_id",
+    "question_id",
+    "number",
+    "response_value",
+    "response_timestamp",
+)
+
+BATCH_SIZE = 1000
+
+
+def _statement(version_id: int):
+    r = Response.__table__.c
+    return (
+        select(
+            r.id,
+            r.user_id,
+            r.version_id,
+            r.question_id,
+            Question.__table__.c.number,
+            r.response_value,
+            r.response_timestamp,
+        )
+        .join_from(Response.__table__, Question.__table__)
+        .where(r.version_id == version_id)
+        .order_by(r.id)
+    )
+
+
+def _timestamp(value: datetime | None) -> str | None:
+    return value.isoformat() if value is not None else None
+
+
+_dumps = json.JSONEncoder(ensure_ascii=False, separators=(",", ":")).encode
+
+
+def encode_ndjson(rows: Sequence[Row]) -> bytes:
+    lines = []
+    for row in rows:
+        record = dict(zip(COLUMNS, row))
+        record["response_timestamp"] = _timestamp(row.response_timestamp)
+        lines.append(_dumps(record))
+    lines.append("")
+    return "\n".join(lines).encode("utf-8")
+
+
+def encode_csv(rows: Sequence[Row], header: bool = False) -> bytes:
+    buffer = io.StringIO()
+    writer = csv.writer(buffer, lineterminator="\n")
+    if header:
+        writer.writerow(COLUMNS)
+    for row in rows:
+        # значение ответа — JSON: строки/списки/числа однозначно различимы
+        writer.writerow(
+            (
+                *row[:5],
+                json.dumps(row.response_value, ensure_ascii=False),
+                _timestamp(row.response_timestamp),
+            )
+        )
+    return buffer.getvalue().encode("utf-8")
+
+
+class _Encoder:
+    """Batch → bytes in the requested format, optionally as one gzip stream."""
+
+    def __init__(self, fmt: str, compress: bool) -> None:
+        self.fmt = fmt
+        self._first = True
+        # wbits=31 — deflate с gzip-заголовком
+        self._gzip = zlib.compressobj(6, zlib.DEFLATED, 31) if compress else None
+
+    def encode(self, rows: Sequence[Row]) -> bytes:
+        if self.fmt == "csv":
+            data = encode_csv(rows, header=self._first)
+        else:
+            data = encode_ndjson(rows)
+        self._first = False
+        return self._gzip.compress(data) if self._gzip else data
+
+    def finish(self) -> bytes:
+        # пустая выгрузка CSV — всё равно с заголовком
+        data = self.encode(()) if self._first else b""
+        return data + self._gzip.flush() if self._gzip else data
+
+
+def _stream_options(batch_size: int) -> dict:
+    return {"stream_results": True, "yield_per": batch_size}
+
+
+def export_responses(
+    session_factory: Callable[[], Session],
+    version_id: int,
+    fmt: str,
+    compress: bool = False,
+    batch_size: int = BATCH_SIZE,
+) -> Iterator[bytes]:
+    """
+    Byte stream of a version's responses in `fmt` ("ndjson" | "csv").
+    Owns its session: the generator outlives the request's dependencies.
+    """
+    encoder = _Encoder(fmt, compress)
+    db = session_factory()
+    try:
+        result = db.execute(
+            _statement(version_id), execution_options=_stream_options(batch_size)
+        )
+        for rows in result.partitions():
+            chunk = encoder.encode(rows)
+            if chunk:
+                yield chunk
+        yield encoder.finish()
+    finally:
+        db.close()
+
+
+async def export_responses_async(
+    session_factory: Callable[[], AsyncSession],
+    version_id: int,
+    fmt: str,
+    compress: bool = False,
+    batch_size: int = BATCH_SIZE,
+) -> AsyncIterator[bytes]:
+    """export_responses over an AsyncSession (ASYNC_DB=true)."""
+    encoder = _Encoder(fmt, compress)
+    async with session_factory() as db:
+        result = await db.stream(
+            _statement(version_id), execution_options=_stream_options(batch_size)
+        )
+        async for rows in result.partitions():
+            chunk = encoder.encode(rows)
+            if chunk:
+                yield chunk
+        yield encoder.finish()
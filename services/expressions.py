@@ -0,0 +1,476 @@
+# services/expressions.py
+"""
+Маленький безопасный язык выражений для constraints.calculation и
+строковых condition (без eval).
+
+    "II if 2.1.13 < 50 else I"     — тернарник; 2.1.13 — ссылка на ответ,
+                                     II / I — «голые» слова = строковые литералы
+    {"<50": "R90", "50-75": "R120", ">150": "R240"}
+                                   — таблица диапазонов по одному входу
+    ">0", "True"                   — условие над ответом из depends_on
+
+Исходник разбирается один раз (parse кэшируется) в AST из кортежей, затем
+компилируется в дерево замыканий, которое вычисляется над контекстом ответов.
+"""
+
+from __future__ import annotations
+
+import operator
+import re
+from functools import lru_cache
+from typing import Any, Callable, Container, Dict, List, Optional, Tuple
+
+Context = Dict[str, Any]
+Evaluator = Callable[[Context, Any], Any]
+
+Node = Tuple[Any, ...]
+
+_TOKEN = re.compile(
+    r"""
+    \s*(?:
+        (?P<ref>\d+(?:\.\w+)+)              # 2.1.13, 3.6.рд.св.кор
+      | (?P<num>\d+)
+      | (?P<str>'[^']*'|"[^"]*")
+      | (?P<name>[^\W\d]\w*)
+      | (?P<op>==|!=|<=|>=|<|>|\+|-|\*|/|%|\(|\)|@)
+    )""",
+    re.VERBOSE | re.UNICODE,
+)
+
+_KEYWORDS = {"if", "else", "and", "or", "not"}
+_CONSTANTS = {"True": True, "False": False, "None": None}
+_CMP_OPS = ("==", "!=", "<=", ">=", "<", ">")
+
+# глубина AST: парсер, компиляция и вычисление рекурсивны — без предела
+# "((((…1…))))" или "1+1+…+1" упирались в RecursionError, т. е. в 500
+MAX_DEPTH = 64
+
+
+class ExpressionError(ValueError):
+    """Raised for syntactically invalid expressions."""
+
+
+# ---------- parser ----------
+
+
+def _tokenize(source: str) -> List[Tuple[str, str]]:
+    tokens: List[Tuple[str, str]] = []
+    pos = 0
+    source = source.rstrip()
+    while pos < len(source):
+        m = _TOKEN.match(source, pos)
+        if m is None or m.end() == pos:
+            raise ExpressionError(f"Unexpected character at {pos} in {source!r}")
+        kind = m.lastgroup
+        text = m.group(kind)
+        if kind == "name" and text in _KEYWORDS:
+            kind = "kw"
+        tokens.append((kind, text))
+        pos = m.end()
+    tokens.append(("end", ""))
+    return tokens
+
+
+class _Parser:
+    """Recursive-descent parser for a Python-like expression subset."""
+
+    def __init__(self, source: str) -> None:
+        self.source = source
+        self.tokens = _tokenize(source)
+        self.pos = 0
+        self.nesting = 0
+
+    def parse(self) -> Node:
+        node = self._ternary()
+        if self._peek()[0] != "end":
+            self._fail()
+        if _depth(node) > MAX_DEPTH:
+            self._too_deep()
+        return node
+
+    # ternary := or ['if' or 'else' ternary]
+    def _ternary(self) -> Node:
+        body = self._or()
+        if self._accept("kw", "if"):
+            cond = self._or()
+            self._expect("kw", "else")
+            return ("if", cond, body, self._nested(self._ternary))
+        return body
+
+    def _or(self) -> Node:
+        node = self._and()
+        while self._accept("kw", "or"):
+            node = ("or", node, self._and())
+        return node
+
+    def _and(self) -> Node:
+        node = self._not()
+        while self._accept("kw", "and"):
+            node = ("and", node, self._not())
+        return node
+
+    def _not(self) -> Node:
+        if self._accept("kw", "not"):
+            return ("not", self._nested(self._not))
+        return self._comparison()
+
+    def _comparison(self) -> Node:
+        node = self._additive()
+        kind, text = self._peek()
+        if kind == "op" and text in _CMP_OPS:
+            self.pos += 1
+            node = ("cmp", text, node, self._additive())
+        return node
+
+    def _additive(self) -> Node:
+        node = self._term()
+        while self._peek() in (("op", "+"), ("op", "-")):
+            op = self._next()[1]
+            node = ("bin", op, node, self._term())
+        return node
+
+    def _term(self) -> Node:
+        node = self._unary()
+        while self._peek() in (("op", "*"), ("op", "/"), ("op", "%")):
+            op = self._next()[1]
+            node = ("bin", op, node, self._unary())
+        return node
+
+    def _unary(self) -> Node:
+        if self._accept("op", "-"):
+            return ("neg", self._nested(self._unary))
+        return self._primary()
+
+    def _primary(self) -> Node:
+        kind, text = self._next()
+        if kind == "num":
+            return ("lit", int(text))
+        if kind == "ref":
+            return ("ref", text)
+        if kind == "str":
+            return ("lit", text[1:-1])
+        if kind == "name":
+            # True/False/None — константы, прочие слова (I, II, R90) — строки
+            return ("lit", _CONSTANTS[text]) if text in _CONSTANTS else ("lit", text)
+        if (kind, text) == ("op", "@"):
+            return ("subject",)
+        if (kind, text) == ("op", "("):
+            node = self._nested(self._ternary)
+            self._expect("op", ")")
+            return node
+        self.pos -= 1
+        self._fail()
+
+    def _nested(self, rule: Callable[[], Node]) -> Node:
+        # вложенность считается на спуске: глубже MAX_DEPTH стек не растёт
+        self.nesting += 1
+        if self.nesting > MAX_DEPTH:
+            self._too_deep()
+        try:
+            return rule()
+        finally:
+            self.nesting -= 1
+
+    def _too_deep(self) -> None:
+        raise ExpressionError(
+            f"Expression is nested deeper than {MAX_DEPTH} levels: {self.source[:80]!r}"
+        )
+
+    # ---------- token helpers ----------
+
+    def _peek(self) -> Tuple[str, str]:
+        return self.tokens[self.pos]
+
+    def _next(self) -> Tuple[str, str]:
+        token = self.tokens[self.pos]
+        self.pos += 1
+        return token
+
+    def _accept(self, kind: str, text: str) -> bool:
+        if self.tokens[self.pos] == (kind, text):
+            self.pos += 1
+            return True
+        return False
+
+    def _expect(self, kind: str, text: str) -> None:
+        if not self._accept(kind, text):
+            self._fail()
+
+    def _fail(self) -> None:
+        token = self._peek()[1] or "end of input"
+        raise ExpressionError(f"Unexpected {token!r} in expression {self.source!r}")
+
+
+def _depth(node: Node) -> int:
+    """AST depth, counted without recursion (left-deep chains like a+b+…+z)."""
+    deepest, stack = 0, [(node, 1)]
+    while stack:
+        node, depth = stack.pop()
+        deepest = max(deepest, depth)
+        stack.extend((child, depth + 1) for child in node if isinstance(child, tuple))
+    return deepest
+
+
+@lru_cache(maxsize=1024)
+def parse(source: str) -> Node:
+    """Parse an expression into an immutable tuple AST (cached by source)."""
+    if not isinstance(source, str) or not source.strip():
+        raise ExpressionError("Expression must be a non-empty string")
+    return _Parser(source).parse()
+
+
+def parse_condition(condition: str) -> Node:
+    """
+    Parse a condition over a referenced answer: ">0" means "answer > 0",
+    a bare value ("True", "Да") means "answer == value".
+    """
+    text = str(condition).strip()
+    if text.startswith(_CMP_OPS):
+        return parse(f"@ {text}")
+    return parse(f"@ == ({text})")
+
+
+# ---------- compiler ----------
+
+
+class Expression:
+    """A compiled expression: evaluator closure plus referenced numbers."""
+
+    __slots__ = ("source", "refs", "_fn")
+
+    def __init__(self, source: Any, refs: Tuple[str, ...], fn: Evaluator) -> None:
+        self.source = source
+        self.refs = refs
+        self._fn = fn
+
+    def evaluate(self, ctx: Context, subject: Any = None) -> Any:
+        """Evaluate against an answer context; `@` stands for `subject`."""
+        return self._fn(ctx, subject)
+
+    def __repr__(self) -> str:
+        return f"Expression({self.source!r})"
+
+
+def compile_expression(
+    source: str, numbers: Optional[Container[str]] = None
+) -> Expression:
+    """
+    Compile an expression. Dotted tokens are answer references when they are
+    known question numbers (or always, if `numbers` is None); otherwise they
+    are read as decimal literals (2.5).
+    """
+    refs: List[str] = []
+    fn = _compile(parse(source), numbers, refs)
+    return Expression(source, tuple(dict.fromkeys(refs)), fn)
+
+
+def compile_condition(
+    condition: str, numbers: Optional[Container[str]] = None
+) -> Expression:
+    """Compile a string condition evaluated with the referenced answer as `@`."""
+    refs: List[str] = []
+    fn = _compile(parse_condition(condition), numbers, refs)
+    return Expression(condition, tuple(dict.fromkeys(refs)), fn)
+
+
+_RANGE = re.compile(
+    r"^\s*(?:(?P<op><=|>=|<|>)\s*(?P<bound>-?\d+(?:\.\d+)?)"
+    r"|(?P<lo>-?\d+(?:\.\d+)?)\s*-\s*(?P<hi>-?\d+(?:\.\d+)?))\s*$"
+)
+
+
+def compile_range_table(table: Dict[str, Any], input_number: str) -> Expression:
+    """
+    Compile {"<50": "R90", "50-75": "R120", ">150": "R240"} over the answer to
+    `input_number`. Ranges "a-b" are inclusive; the first matching row wins.
+    """
+    rows: List[Tuple[Callable[[float], bool], Any]] = []
+    for key, result in table.items():
+        m = _RANGE.match(str(key))
+        if m is None:
+            raise ExpressionError(f"Invalid range {key!r} in calculation table")
+        if m.group("op"):
+            op = _NUM_OPS[m.group("op")]
+            bound = float(m.group("bound"))
+            rows.append((lambda x, op=op, b=bound: op(x, b), result))
+        else:
+            lo, hi = float(m.group("lo")), float(m.group("hi"))
+            rows.append((lambda x, lo=lo, hi=hi: lo <= x <= hi, result))
+    key = f"num:{input_number}"
+    rows_t = tuple(rows)
+
+    def evaluate(ctx: Context, subject: Any) -> Any:
+        x = _number(ctx.get(key))
+        if x is None:
+            return None
+        for test, result in rows_t:
+            if test(x):
+                return result
+        return None
+
+    return Expression(table, (str(input_number),), evaluate)
+
+
+_NUM_OPS: Dict[str, Callable[[Any, Any], bool]] = {
+    "<": operator.lt,
+    "<=": operator.le,
+    ">": operator.gt,
+    ">=": operator.ge,
+}
+
+_ARITH: Dict[str, Callable[[Any, Any], Any]] = {
+    "+": operator.add,
+    "-": operator.sub,
+    "*": operator.mul,
+    "/": operator.truediv,
+    "%": operator.mod,
+}
+
+
+def _compile(
+    node: Node, numbers: Optional[Container[str]], refs: List[str]
+) -> Evaluator:
+    tag = node[0]
+
+    if tag == "lit":
+        value = node[1]
+        return lambda ctx, subject: value
+
+    if tag == "subject":
+        return lambda ctx, subject: subject
+
+    if tag == "ref":
+        text = node[1]
+        if numbers is not None and text not in numbers:
+            try:
+                value = float(text)
+            except ValueError:
+                value = text  # неизвестный номер — оставим как строку
+            return lambda ctx, subject: value
+        refs.append(text)
+        key = f"num:{text}"
+        return lambda ctx, subject: ctx.get(key)
+
+    if tag == "neg":
+        inner = _compile(node[1], numbers, refs)
+
+        def neg(ctx: Context, subject: Any) -> Any:
+            x = _number(inner(ctx, subject))
+            return None if x is None else -x
+
+        return neg
+
+    if tag == "not":
+        inner = _compile(node[1], numbers, refs)
+        return lambda ctx, subject: not _truthy(inner(ctx, subject))
+
+    if tag == "and":
+        left = _compile(node[1], numbers, refs)
+        right = _compile(node[2], numbers, refs)
+        return lambda ctx, subject: _truthy(left(ctx, subject)) and _truthy(
+            right(ctx, subject)
+        )
+
+    if tag == "or":
+        left = _compile(node[1], numbers, refs)
+        right = _compile(node[2], numbers, refs)
+        return lambda ctx, subject: _truthy(left(ctx, subject)) or _truthy(
+            right(ctx, subject)
+        )
+
+    if tag == "if":
+        cond = _compile(node[1], numbers, refs)
+        body = _compile(node[2], numbers, refs)
+        orelse = _compile(node[3], numbers, refs)
+        return lambda ctx, subject: (
+            body(ctx, subject) if _truthy(cond(ctx, subject)) else orelse(ctx, subject)
+        )
+
+    if tag == "cmp":
+        op = node[1]
+        left = _compile(node[2], numbers, refs)
+        right = _compile(node[3], numbers, refs)
+        if op in ("==", "!="):
+            negate = op == "!="
+            return lambda ctx, subject: _equals(
+                left(ctx, subject), right(ctx, subject)
+            ) is not negate
+        cmp = _NUM_OPS[op]
+
+        def compare(ctx: Context, subject: Any) -> bool:
+            a, b = _number(left(ctx, subject)), _number(right(ctx, subject))
+            if a is None or b is None:
+                return False
+            return cmp(a, b)
+
+        return compare
+
+    if tag == "bin":
+        arith = _ARITH[node[1]]
+        left = _compile(node[2], numbers, refs)
+        right = _compile(node[3], numbers, refs)
+
+        def binary(ctx: Context, subject: Any) -> Any:
+            a, b = _number(left(ctx, subject)), _number(right(ctx, subject))
+            if a is None or b is None:
+                return None
+            try:
+                return arith(a, b)
+            except ArithmeticError:
+                return None
+
+        return binary
+
+    raise ExpressionError(f"Unknown node {tag!r}")
+
+
+# ---------- value semantics ----------
+
+
+def _number(v: Any) -> Optional[float]:
+    if isinstance(v, bool) or v is None:
+        return None
+    if isinstance(v, (int, float)):
+        return v
+    if isinstance(v, str):
+        try:
+            return float(v.strip())
+        except ValueError:
+            return None
+    return None
+
+
+# слова «да/нет» в ответах; services.validation (parse_bool) берёт их отсюда
+TRUE_WORDS = ("true", "1", "yes", "y", "да")
+FALSE_WORDS = ("false", "0", "no", "n", "нет")
+
+
+def _as_bool(v: Any) -> Optional[bool]:
+    if isinstance(v, bool):
+        return v
+    if isinstance(v, (int, float)):
+        return v != 0
+    if isinstance(v, str):
+        s = v.strip().lower()
+        if s in TRUE_WORDS:
+            return True
+        if s in FALSE_WORDS:
+            return False
+    return None
+
+
+def _truthy(v: Any) -> bool:
+    b = _as_bool(v)
+    return bool(v) if b is None else b
+
+
+def _equals(a: Any, b: Any) -> bool:
+    # сравнение с True/False терпимо к "да"/"1"/"true" в старых ответах
+    if isinstance(b, bool) and not isinstance(a, bool):
+        return _as_bool(a) is b
+    if isinstance(a, bool) and not isinstance(b, bool):
+        return _as_bool(b) is a
+    if a == b:
+        return True
+    na, nb = _number(a), _number(b)
+    return na is not None and na == nb
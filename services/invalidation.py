@@ -0,0 +1,23 @@
+# services/invalidation.py
+"""
+Хук инвалидации по версии: in-process кэши подписываются на изменения
+вопросов/версии и сбрасывают всё, что к ней относится.
+"""
+
+from typing import Callable, List
+
+VersionListener = Callable[[int], None]
+
+_listeners: List[VersionListener] = []
+
+
+def on_version_change(listener: VersionListener) -> VersionListener:
+    """Register a callback invoked with the version_id on every invalidation."""
+    _listeners.append(listener)
+    return listener
+
+
+def invalidate_version(version_id: int) -> None:
+    """Drop every cached artefact of a version in this worker."""
+    for listener in _listeners:
+        listener(version_id)
@@ -0,0 +1,169 @@
+# services/metrics.py
+"""
+Инструментирование конвейера валидации: время, число вызовов и отказов
+по семействам правил, приведению типа и загрузке контекста ответов.
+
+Выключено по умолчанию (VALIDATION_METRICS) — тогда ResponseService
+проверяет только флаг и идёт по обычному пути. Во включённом режиме:
+  - агрегаты по процессу — гистограммы с фиксированными log2-корзинами
+    (GET /metricz);
+  - разбивка текущего запроса — заголовок Server-Timing (см. main.py).
+"""
+
+import threading
+import time
+from bisect import bisect_left
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Dict, Iterator, List, Optional
+
+from db.settings import Settings
+
+# верхние границы корзин в микросекундах: 1, 2, 4, … ~1 с
+BUCKETS_US = tuple(2**i for i in range(21))
+
+
+class Histogram:
+    """Latency histogram with log2 buckets plus invocation/failure counters."""
+
+    __slots__ = ("count", "failures", "total", "max", "buckets")
+
+    def __init__(self) -> None:
+        self.count = 0
+        self.failures = 0
+        self.total = 0.0
+        self.max = 0.0
+        self.buckets = [0] * (len(BUCKETS_US) + 1)
+
+    def observe(self, seconds: float, failed: bool = False) -> None:
+        self.count += 1
+        self.failures += failed
+        self.total += seconds
+        if seconds > self.max:
+            self.max = seconds
+        self.buckets[bisect_left(BUCKETS_US, seconds * 1e6)] += 1
+
+    def quantile(self, q: float) -> float:
+        """Upper bucket bound (µs) below which a q share of samples falls."""
+        rank = q * self.count
+        seen = 0
+        for bound, n in zip(BUCKETS_US, self.buckets):
+            seen += n
+            if seen >= rank and n:
+                return float(bound)
+        return self.max * 1e6
+
+    def snapshot(self) -> Dict[str, Any]:
+        return {
+            "count": self.count,
+            "failures": self.failures,
+            "total_ms": self.total * 1e3,
+            "mean_us": self.total / self.count * 1e6 if self.count else 0.0,
+            "p50_us": self.quantile(0.5),
+            "p99_us": self.quantile(0.99),
+            "max_us": self.max * 1e6,
+        }
+
+
+class _Trace:
+    """Per-request totals: name -> [seconds, count, failures]."""
+
+    __slots__ = ("items",)
+
+    def __init__(self) -> None:
+        self.items: Dict[str, List[float]] = {}
+
+    def add(self, name: str, seconds: float, failed: bool) -> None:
+        item = self.items.get(name)
+        if item is None:
+            self.items[name] = [seconds, 1, int(failed)]
+        else:
+            item[0] += seconds
+            item[1] += 1
+            item[2] += failed
+
+    def server_timing(self) -> str:
+        return ", ".join(
+            f'{name};dur={s * 1e3:.3f};desc="n={int(n)} fail={int(f)}"'
+            for name, (s, n, f) in self.items.items()
+        )
+
+
+_current_trace: ContextVar[Optional[_Trace]] = ContextVar(
+    "validation_trace", default=None
+)
+
+
+class ValidationMetrics:
+    """Process-wide registry of validation histograms."""
+
+    def __init__(self, enabled: bool = False) -> None:
+        self.enabled = enabled
+        self._stats: Dict[str, Histogram] = {}
+        self._lock = threading.Lock()
+
+    def observe(self, name: str, seconds: float, failed: bool = False) -> None:
+        with self._lock:
+            hist = self._stats.get(name)
+            if hist is None:
+                hist = self._stats[name] = Histogram()
+            hist.observe(seconds, failed)
+        trace = _current_trace.get()
+        if trace is not None:
+            trace.add(name, seconds, failed)
+
+    @contextmanager
+    def timed(self, name: str) -> Iterator[None]:
+        start = time.perf_counter()
+        failed = True
+        try:
+            yield
+            failed = False
+        finally:
+            self.observe(name, time.perf_counter() - start, failed)
+
+    def validate(self, question, raw: Any, ctx: Dict[str, Any]) -> Any:
+        """Instrumented twin of CompiledQuestion.validate."""
+        clock = time.perf_counter
+        for rule in question.pre_rules:
+            self._run(rule.family, rule.check, raw, ctx, clock)
+        start = clock()
+        try:
+            value = question.coerce(raw)
+        except ValueError:
+            self.observe(f"coerce.{question.type}", clock() - start, True)
+            raise
+        self.observe(f"coerce.{question.type}", clock() - start)
+        for rule in question.post_rules:
+            self._run(rule.family, rule.check, value, ctx, clock)
+        return value
+
+    def _run(self, family, check, value, ctx, clock) -> None:
+        start = clock()
+        try:
+            check(value, ctx)
+        except ValueError:
+            self.observe(family, clock() - start, True)
+            raise
+        self.observe(family, clock() - start)
+
+    @contextmanager
+    def trace(self) -> Iterator[_Trace]:
+        """Collect the timings of the current request (for Server-Timing)."""
+        trace = _Trace()
+        token = _current_trace.set(trace)
+        try:
+            yield trace
+        finally:
+            _current_trace.reset(token)
+
+    def snapshot(self) -> Dict[str, Dict[str, Any]]:
+        with self._lock:
+            return {name: h.snapshot() for name, h in sorted(self._stats.items())}
+
+    def reset(self) -> None:
+        with self._lock:
+            self._stats.clear()
+
+
+validation_metrics = ValidationMetrics(enabled=Settings().VALIDATION_METRICS)
@@ -0,0 +1,148 @@
+# services/options.py
+"""
+Движок динамических вариантов для dropdown (constraints.dynamic_options).
+
+Эффективный набор вариантов = универсум − ответы вопросов из exclude_from:
+  - универсум — options.values, либо "1".."N", где N — ответ на вопрос
+    constraints.options_from (например, количество корпусов 2.1);
+  - options.depends_on + options.condition — «выключатель»: если условие
+    не выполнено, вариантов нет.
+
+И для валидации, и для GET-эндпоинта набор считается прямо по контексту
+ответов (заранее подготовленные frozenset'ы): O(размер универсума) на
+вопрос, без состояния в процессе.
+"""
+
+from __future__ import annotations
+
+from functools import lru_cache
+from typing import Any, Dict, FrozenSet, Iterable, Optional, Tuple
+
+from services.expressions import Expression, compile_condition
+
+Context = Dict[str, Any]
+
+MAX_GENERATED_OPTIONS = 1000
+
+
+@lru_cache(maxsize=MAX_GENERATED_OPTIONS + 1)
+def _numbered(count: int) -> Tuple[Tuple[str, ...], FrozenSet[str]]:
+    values = tuple(str(i) for i in range(1, count + 1))
+    return values, frozenset(values)
+
+
+_EMPTY: Tuple[Tuple[str, ...], FrozenSet[str]] = ((), frozenset())
+
+
+def selected_items(value: Any) -> FrozenSet[str]:
+    """Answer of a (multi-)select question as a set of option strings."""
+    if value is None:
+        return frozenset()
+    if isinstance(value, (list, tuple, set)):
+        return frozenset(str(v) for v in value if v is not None)
+    return frozenset((str(value),))
+
+
+class DynamicOptions:
+    """Compiled option-set definition of one dropdown question."""
+
+    __slots__ = (
+        "static",
+        "count_key",
+        "exclude_keys",
+        "gate_key",
+        "gate",
+        "refs",
+    )
+
+    def __init__(
+        self,
+        values: Iterable[Any] = (),
+        count_from: Optional[str] = None,
+        exclude_from: Iterable[str] = (),
+        gate_from: Optional[str] = None,
+        gate: Optional[Expression] = None,
+    ) -> None:
+        ordered = tuple(dict.fromkeys(str(v) for v in values))
+        self.static: Tuple[Tuple[str, ...], FrozenSet[str]] = (
+            ordered,
+            frozenset(ordered),
+        )
+        self.count_key = f"num:{count_from}" if count_from else None
+        self.exclude_keys = tuple(f"num:{n}" for n in exclude_from)
+        self.gate_key = f"num:{gate_from}" if gate_from else None
+        self.gate = gate
+        refs = [count_from, gate_from, *exclude_from]
+        self.refs = tuple(dict.fromkeys(str(r) for r in refs if r))
+
+    @property
+    def is_dynamic(self) -> bool:
+        return bool(self.count_key or self.exclude_keys or self.gate_key)
+
+    def enabled(self, ctx: Context) -> bool:
+        if self.gate_key is None:
+            return True
+        return bool(self.gate.evaluate(ctx, ctx.get(self.gate_key)))
+
+    def universe(self, ctx: Context) -> Tuple[Tuple[str, ...], FrozenSet[str]]:
+        """Ordered values and their frozenset before exclusions."""
+        if self.count_key is None:
+            return self.static
+        try:
+            count = int(ctx.get(self.count_key))
+        except (TypeError, ValueError):
+            return _EMPTY
+        return _numbered(max(0, min(count, MAX_GENERATED_OPTIONS)))
+
+    def excluded(self, ctx: Context) -> FrozenSet[str]:
+        if not self.exclude_keys:
+            return frozenset()
+        return frozenset().union(
+            *(selected_items(ctx.get(k)) for k in self.exclude_keys)
+        )
+
+    def effective(self, ctx: Context) -> Tuple[str, ...]:
+        """Options the user may pick right now, in universe order."""
+        if not self.enabled(ctx):
+            return ()
+        ordered, _ = self.universe(ctx)
+        excluded = self.excluded(ctx)
+        if not excluded:
+            return ordered
+        return tuple(v for v in ordered if v not in excluded)
+
+    def check(self, value: Any, ctx: Context) -> None:
+        """Validation rule: every selected item must be an effective option."""
+        if not self.enabled(ctx):
+            raise ValueError("Question is disabled by depends_on condition.")
+        _, allowed = self.universe(ctx)
+        excluded = self.excluded(ctx)
+        for item in selected_items(value):
+            if item not in allowed or item in excluded:
+                raise ValueError(f"Value '{item}' is not in allowed options.")
+
+
+def compile_options(
+    options: Any, constraints: Dict[str, Any], numbers=None
+) -> DynamicOptions:
+    """Build DynamicOptions from question.options / question.constraints."""
+    values: Iterable[Any] = ()
+    gate_from = None
+    gate = None
+    if isinstance(options, dict):
+        values = options.get("values") or ()
+        if options.get("depends_on"):
+            gate_from = str(options["depends_on"])
+            gate = compile_condition(options.get("condition") or "True", numbers)
+    elif isinstance(options, list):
+        values = options
+    exclude = constraints.get("exclude_from") or ()
+    if isinstance(exclude, str):
+        exclude = (exclude,)
+    return DynamicOptions(
+        values=values,
+        count_from=constraints.get("options_from"),
+        exclude_from=[str(n) for n in exclude],
+        gate_from=gate_from,
+        gate=gate,
+    )
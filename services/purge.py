@@ -0,0 +1,213 @@
+# services/purge.py
+"""
+Фоновое удаление версии (DELETE /versions/{id}) и всех ответов
+пользователя (DELETE /responses/users/{user_id}).
+
+Задание (purge_jobs) идёт по этапам. Шаг удаляет не больше
+PURGE_CHUNK_SIZE строк текущего этапа и в той же транзакции записывает
+прогресс: блокировки держатся недолго, а прерванное задание продолжается
+с места остановки (scripts/run_purges.py).
+
+Версия: ответы (на PostgreSQL — DROP секции), сводки, снимки, вопросы,
+сама версия. Пользователь: ответы (со списанием из сводок), снимки.
+"""
+
+import logging
+from datetime import datetime, timedelta
+from typing import Callable, List, Optional, Tuple
+
+import pytz
+from sqlalchemy import Row
+from sqlalchemy.ext.asyncio import async_sessionmaker
+from sqlalchemy.orm import Session
+
+from db.settings import Settings
+from db.unit_of_work import after_commit, unit_of_work
+from domain.models import Question, QuestionStat, Response, SurveySnapshot
+from repositories.partition import ResponsePartitions
+from repositories.purge import DONE, RUNNING, PurgeJobRepository, delete_chunk, has_rows
+from repositories.question import QuestionRepository
+from repositories.snapshot import SnapshotRepository
+from repositories.stats import StatsRepository
+from repositories.version import VersionRepository
+from services.answer_cache import answer_ctx_cache
+from services.invalidation import invalidate_version
+from services.stats import StatsDelta
+
+logger = logging.getLogger(__name__)
+
+VERSION, USER = "version", "user"
+STEPS = {
+    VERSION: ("responses", "question_stats", "survey_snapshots", "questions", "version"),
+    USER: ("responses", "survey_snapshots"),
+}
+# задание в running без прогресса дольше этого считается брошенным
+LEASE = timedelta(minutes=5)
+
+PURGE_CHUNK_SIZE = Settings().PURGE_CHUNK_SIZE
+
+_responses = Response.__table__
+_questions = Question.__table__
+_stats = QuestionStat.__table__
+_snapshots = SurveySnapshot.__table__
+
+
+def _next(kind: str, step: str) -> Optional[str]:
+    steps = STEPS[kind]
+    index = steps.index(step) + 1
+    return steps[index] if index < len(steps) else None
+
+
+class PurgeService:
+    def __init__(self, db: Session, chunk_size: Optional[int] = None):
+        self.db = db
+        self.jobs = PurgeJobRepository(db)
+        self.chunk_size = chunk_size or PURGE_CHUNK_SIZE
+
+    def start_version(self, version_id: int) -> Optional[Row]:
+        """Queue the deletion of a version; None when it does not exist."""
+        if VersionRepository(self.db).get(version_id) is None:
+            return None
+        return self._start(VERSION, version_id)
+
+    def start_user(self, user_id: int) -> Row:
+        """Queue the deletion of every response of a user."""
+        return self._start(USER, user_id)
+
+    def _start(self, kind: str, target_id: int) -> Row:
+        with unit_of_work(self.db):
+            # повторный запрос получает уже идущее задание, а не второе
+            unfinished = self.jobs.unfinished(kind, target_id)
+            return unfinished[0] if unfinished else self.jobs.create(kind, target_id)
+
+    def get(self, job_id: int) -> Optional[Row]:
+        return self.jobs.get(job_id)
+
+    def run(self, job_id: int) -> Optional[Row]:
+        """
+        Claim a job and delete chunk by chunk until it is done. Returns the
+        final job row, or None when another worker holds the job.
+        """
+        with unit_of_work(self.db):
+            job = self.jobs.claim(job_id, datetime.now(pytz.UTC) - LEASE)
+        if job is None:
+            return None
+        try:
+            while job.status == RUNNING:
+                job = self.step(job_id)
+        except Exception as e:
+            logger.exception("Purge job %s failed", job_id)
+            with unit_of_work(self.db):
+                self.jobs.fail(job_id, str(e))
+            return self.jobs.get(job_id)
+        return job
+
+    def step(self, job_id: int) -> Row:
+        """Delete one chunk of a running job and record it in the same transaction."""
+        with unit_of_work(self.db):
+            job = self.jobs.lock(job_id)
+            if job.status != RUNNING:
+                return job
+            step = job.step or STEPS[job.kind][0]
+            if job.kind == VERSION:
+                deleted, step = self._version_chunk(step, job.target_id)
+            else:
+                deleted, step = self._user_chunk(step, job.target_id)
+            return self.jobs.progress(job_id, step, deleted, RUNNING if step else DONE)
+
+    # ---------- версия ----------
+
+    def _version_chunk(self, step: str, version_id: int) -> Tuple[int, Optional[str]]:
+        """One chunk of a version purge: (rows deleted, step to continue with)."""
+        if step == "version":
+            # пока шли этапы, в версию могли записать — тогда ещё круг
+            if has_rows(self.db, _responses.c.version_id == version_id) or has_rows(
+                self.db, _questions.c.version_id == version_id
+            ):
+                return 0, STEPS[VERSION][0]
+            VersionRepository(self.db).delete(version_id)
+            after_commit(self.db, lambda: invalidate_version(version_id))
+            return 1, None
+        if step == "questions" and has_rows(self.db, _responses.c.version_id == version_id):
+            # ответ, записанный после этапа responses, держит вопрос по FK
+            return 0, STEPS[VERSION][0]
+        if step == "responses" and ResponsePartitions(self.db).drop(version_id):
+            # секция удаляется одной командой, без DELETE по строкам
+            after_commit(self.db, lambda: invalidate_version(version_id))
+            return 0, _next(VERSION, step)
+        table = {
+            "responses": _responses,
+            "question_stats": _stats,
+            "survey_snapshots": _snapshots,
+            "questions": _questions,
+        }[step]
+        deleted = len(
+            delete_chunk(self.db, table, table.c.version_id == version_id, self.chunk_size)
+        )
+        if deleted < self.chunk_size:
+            if step == "responses":
+                after_commit(self.db, lambda: invalidate_version(version_id))
+            return deleted, _next(VERSION, step)
+        return deleted, step
+
+    # ---------- пользователь ----------
+
+    def _user_chunk(self, step: str, user_id: int) -> Tuple[int, Optional[str]]:
+        """One chunk of a user purge: (rows deleted, step to continue with)."""
+        if step == "responses":
+            c = _responses.c
+            rows = delete_chunk(
+                self.db,
+                _responses,
+                c.user_id == user_id,
+                self.chunk_size,
+                returning=(c.version_id, c.question_id, c.response_value),
+            )
+            self._write_off(user_id, rows)
+        else:
+            rows = delete_chunk(
+                self.db, _snapshots, _snapshots.c.user_id == user_id, self.chunk_size
+            )
+        if len(rows) < self.chunk_size:
+            return len(rows), _next(USER, step)
+        return len(rows), step
+
+    def _write_off(self, user_id: int, rows: List[Row]) -> None:
+        """Subtract deleted answers from the summaries; drop snapshots and cached contexts."""
+        if not rows:
+            return
+        types = QuestionRepository(self.db).types_by_ids(
+            list({row.question_id for row in rows})
+        )
+        delta = StatsDelta()
+        for version_id, question_id, value in rows:
+            # вопроса уже нет — нет и его сводки
+            if question_id in types:
+                delta.add(version_id, question_id, types[question_id], value, -1)
+        StatsRepository(self.db).apply(delta.take())
+        version_ids = sorted({row.version_id for row in rows})
+        # снимок частично удалённых ответов устарел сразу, не в конце задания
+        snapshots = SnapshotRepository(self.db)
+        for version_id in version_ids:
+            snapshots.clear_users(version_id, [user_id])
+
+        def forget() -> None:
+            for version_id in version_ids:
+                answer_ctx_cache.invalidate(user_id, version_id)
+
+        after_commit(self.db, forget)
+
+
+def run_purge(session_factory: Callable[[], Session], job_id: int) -> Optional[Row]:
+    """Background task: run a job in its own session."""
+    db = session_factory()
+    try:
+        return PurgeService(db).run(job_id)
+    finally:
+        db.close()
+
+
+async def run_purge_async(sessions: async_sessionmaker, job_id: int) -> Optional[Row]:
+    """run_purge over an AsyncSession (ASYNC_DB=true)."""
+    async with sessions() as db:
+        return await db.run_sync(lambda session: PurgeService(session).run(job_id))
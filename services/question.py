@@ -1,15 +1,36 @@
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
+from db.unit_of_work import after_commit, async_unit_of_work, unit_of_work
 from domain.schemas import QuestionCreate, QuestionUpdate, Question
-from repositories.question import QuestionRepository
+from repositories.question import AsyncQuestionRepository, QuestionRepository
+from repositories.snapshot import SnapshotRepository
+from services.invalidation import invalidate_version
+from services.validation import check_expressions
+from services.version import check_draft, check_draft_async
 from typing import List
 
+
+def _reshapes_answers(question: QuestionUpdate) -> bool:
+    # номер — ключ "num:<номер>" в снимках анкет, тип — форма значений
+    return bool(question.number or question.type)
+
+
 class QuestionService:
     def __init__(self, db: Session):
+        self.db = db
         self.repo = QuestionRepository(db)
 
     def create(self, question: QuestionCreate) -> Question:
         """Create a new survey question."""
-        return self.repo.create(question)
+        # выражения (calculation/condition) разбираем сразу — ошибка синтаксиса = 422
+        check_expressions(question.constraints)
+        with unit_of_work(self.db):
+            check_draft(self.db, question.version_id)
+            created = self.repo.create(question)
+            # кэши версии сбрасываем после commit: до него другие запросы
+            # перечитали бы старые вопросы и закэшировали их снова
+            after_commit(self.db, lambda: invalidate_version(created.version_id))
+        return created
 
     def get_by_version(self, version_id: int) -> List[Question]:
         """Retrieve all questions for a specific version."""
@@ -21,8 +42,84 @@ class QuestionService:
 
     def update(self, question_id: int, question: QuestionUpdate) -> Question | None:
         """Update an existing question."""
-        return self.repo.update(question_id, question)
+        check_expressions(question.constraints)
+        with unit_of_work(self.db):
+            updated = self.repo.update(question_id, question)
+            if updated is None:
+                self._check_frozen(question_id)
+            else:
+                if _reshapes_answers(question):
+                    self._clear_snapshots(updated.version_id)
+                after_commit(self.db, lambda: invalidate_version(updated.version_id))
+        return updated
 
     def delete(self, question_id: int) -> bool:
         """Delete a question by ID."""
-        return self.repo.delete(question_id)
\ No newline at end of file
+        with unit_of_work(self.db):
+            deleted = self.repo.delete(question_id)
+            if deleted is None:
+                self._check_frozen(question_id)
+                return False
+            self._clear_snapshots(deleted.version_id)
+            after_commit(self.db, lambda: invalidate_version(deleted.version_id))
+        return True
+
+    def _clear_snapshots(self, version_id: int) -> None:
+        # снимки версии хранят ответы под старыми номерами — сбрасываем в той же
+        # транзакции; следующая запись пользователя строит снимок из responses
+        SnapshotRepository(self.db).clear_version(version_id)
+
+    def _check_frozen(self, question_id: int) -> None:
+        # запись ничего не задела: вопроса нет (None/False) или версия опубликована (409)
+        current = self.repo.get(question_id)
+        if current is not None:
+            check_draft(self.db, current.version_id)
+
+
+class AsyncQuestionService:
+    def __init__(self, db: AsyncSession):
+        self.db = db
+        self.repo = AsyncQuestionRepository(db)
+
+    async def create(self, question: QuestionCreate) -> Question:
+        check_expressions(question.constraints)
+        async with async_unit_of_work(self.db):
+            await check_draft_async(self.db, question.version_id)
+            created = await self.repo.create(question)
+            after_commit(self.db, lambda: invalidate_version(created.version_id))
+        return created
+
+    async def get(self, question_id: int) -> Question | None:
+        return await self.repo.get(question_id)
+
+    async def update(self, question_id: int, question: QuestionUpdate) -> Question | None:
+        check_expressions(question.constraints)
+        async with async_unit_of_work(self.db):
+            updated = await self.repo.update(question_id, question)
+            if updated is None:
+                await self._check_frozen(question_id)
+            else:
+                if _reshapes_answers(question):
+                    await self._clear_snapshots(updated.version_id)
+                after_commit(self.db, lambda: invalidate_version(updated.version_id))
+        return updated
+
+    async def delete(self, question_id: int) -> bool:
+        async with async_unit_of_work(self.db):
+            deleted = await self.repo.delete(question_id)
+            if deleted is None:
+                await self._check_frozen(question_id)
+                return False
+            await self._clear_snapshots(deleted.version_id)
+            after_commit(self.db, lambda: invalidate_version(deleted.version_id))
+        return True
+
+    async def _clear_snapshots(self, version_id: int) -> None:
+        await self.db.run_sync(
+            lambda session: SnapshotRepository(session).clear_version(version_id)
+        )
+
+    async def _check_frozen(self, question_id: int) -> None:
+        current = await self.repo.get(question_id)
+        if current is not None:
+            await check_draft_async(self.db, current.version_id)
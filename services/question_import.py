@@ -0,0 +1,322 @@
+# services/question_import.py
+"""
+Массовая загрузка вопросов версии (POST /versions/{id}/questions/bulk,
+python scripts/seed_questions.py).
+
+Файл читается потоком: PayloadScanner разбирает JSON по мере поступления
+байтов и отдаёт вопросы по одному, не держа документ целиком. Повторы
+номера внутри файла отбрасываются в памяти (остаётся первый), запись —
+пачками multi-row INSERT … ON CONFLICT DO NOTHING по уникальному индексу
+(version_id, number), поэтому повторная загрузка того же файла ничего не
+меняет. На PostgreSQL с psycopg2 пачки идут через COPY во временную
+таблицу и одним INSERT … SELECT в конце.
+"""
+
+import codecs
+import json
+import time
+from typing import Any, AsyncIterable, Dict, Iterable, List, Optional
+
+from pydantic import ValidationError
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+from db.unit_of_work import after_commit, async_unit_of_work, unit_of_work
+from domain.schemas import QuestionBulkReport, QuestionDraft
+from repositories.question import AsyncQuestionRepository, QuestionRepository
+from services.invalidation import invalidate_version
+from services.validation import check_expressions
+from services.version import check_draft, check_draft_async
+
+BATCH_SIZE = 1000
+
+_WHITESPACE = " \t\n\r"
+
+# состояния PayloadScanner
+_START, _KEY_OR_END, _KEY, _COLON, _VALUE, _NEXT_KEY = range(6)
+_ITEM_OR_END, _ITEM, _NEXT_ITEM, _END = range(6, 10)
+
+_MORE = object()  # значение ещё не дочитано
+
+
+class PayloadError(ValueError):
+    """Malformed import payload (422 in the API)."""
+
+
+class PayloadScanner:
+    """
+    Incremental reader of {"version": …, "questions": [...]} or a bare
+    array of questions: feed() bytes as they arrive, get finished questions.
+    Other top-level keys end up in `meta`.
+    """
+
+    def __init__(self) -> None:
+        self._decoder = codecs.getincrementaldecoder("utf-8")()
+        self._json = json.JSONDecoder()
+        self._buf = ""
+        self._pos = 0
+        self._state = _START
+        self._key: Optional[str] = None
+        self._bare = False
+        self.meta: Dict[str, Any] = {}
+
+    def feed(self, data: bytes) -> List[Any]:
+        self._buf += self._decoder.decode(data)
+        items = self._scan(eof=False)
+        # разобранное начало буфера больше не нужно
+        self._buf, self._pos = self._buf[self._pos :], 0
+        return items
+
+    def close(self) -> List[Any]:
+        self._buf += self._decoder.decode(b"", final=True)
+        items = self._scan(eof=True)
+        if self._state != _END:
+            raise PayloadError("Unexpected end of the questions payload")
+        return items
+
+    def _decode(self, eof: bool):
+        """Next JSON value at the cursor, or _MORE when it is not complete yet."""
+        try:
+            value, end = self._json.raw_decode(self._buf, self._pos)
+        except json.JSONDecodeError as e:
+            if eof:
+                raise PayloadError(f"Invalid JSON: {e}") from None
+            return _MORE
+        # число/литерал у края буфера может продолжиться в следующем куске
+        if end == len(self._buf) and not eof and not isinstance(value, (dict, list, str)):
+            return _MORE
+        self._pos = end
+        return value
+
+    def _expect(self, ch: str, expected: str) -> None:
+        if ch not in expected:
+            raise PayloadError(f"Unexpected {ch!r} in the questions payload")
+        self._pos += 1
+
+    def _scan(self, eof: bool) -> List[Any]:
+        items: List[Any] = []
+        buf = self._buf
+        while True:
+            while self._pos < len(buf) and buf[self._pos] in _WHITESPACE:
+                self._pos += 1
+            if self._pos >= len(buf):
+                return items
+            ch, state = buf[self._pos], self._state
+            if state == _START:
+                self._expect(ch, "{[")
+                self._bare = ch == "["
+                self._state = _ITEM_OR_END if self._bare else _KEY_OR_END
+            elif state in (_KEY_OR_END, _KEY):
+                if ch == "}" and state == _KEY_OR_END:
+                    self._pos += 1
+                    self._state = _END
+                    continue
+                if ch != '"':
+                    raise PayloadError(f"Unexpected {ch!r} in the questions payload")
+                key = self._decode(eof)
+                if key is _MORE:
+                    return items
+                self._key, self._state = key, _COLON
+            elif state == _COLON:
+                self._expect(ch, ":")
+                self._state = _VALUE
+            elif state == _VALUE:
+                if self._key == "questions":
+                    self._expect(ch, "[")
+                    self._state = _ITEM_OR_END
+                    continue
+                value = self._decode(eof)
+                if value is _MORE:
+                    return items
+                self.meta[self._key] = value
+                self._state = _NEXT_KEY
+            elif state == _NEXT_KEY:
+                self._expect(ch, ",}")
+                self._state = _KEY if ch == "," else _END
+            elif state in (_ITEM_OR_END, _ITEM):
+                if ch == "]" and state == _ITEM_OR_END:
+                    self._pos += 1
+                    self._state = _END if self._bare else _NEXT_KEY
+                    continue
+                item = self._decode(eof)
+                if item is _MORE:
+                    return items
+                items.append(item)
+                self._state = _NEXT_ITEM
+            elif state == _NEXT_ITEM:
+                self._expect(ch, ",]")
+                if ch == ",":
+                    self._state = _ITEM
+                else:
+                    self._state = _END if self._bare else _NEXT_KEY
+            else:
+                raise PayloadError("Trailing data after the questions payload")
+
+
+class _Batches:
+    """Validation, in-memory de-duplication and batching of parsed questions."""
+
+    def __init__(self, version_id: int, batch_size: int) -> None:
+        self.version_id = version_id
+        self.batch_size = batch_size
+        self.received = 0
+        self.duplicates = 0
+        self.unique = 0
+        self._numbers: set = set()
+        self._rows: List[dict] = []
+
+    def add(self, item: Any) -> Optional[List[dict]]:
+        """Queue one question; returns a full batch when there is one."""
+        index = self.received
+        self.received += 1
+        try:
+            draft = QuestionDraft.model_validate(item)
+            check_expressions(draft.constraints)
+        except (ValidationError, ValueError) as e:
+            raise PayloadError(f"questions[{index}]: {e}") from None
+        if draft.number in self._numbers:
+            self.duplicates += 1
+            return None
+        self._numbers.add(draft.number)
+        self.unique += 1
+        self._rows.append(
+            {
+                "version_id": self.version_id,
+                "number": draft.number,
+                "text": draft.text,
+                "type": draft.type,
+                "options": draft.options or None,
+                "constraints": draft.constraints or None,
+            }
+        )
+        if len(self._rows) >= self.batch_size:
+            return self.take()
+        return None
+
+    def take(self) -> List[dict]:
+        rows, self._rows = self._rows, []
+        return rows
+
+    def report(self, inserted: int, write: float, total: float) -> QuestionBulkReport:
+        return QuestionBulkReport(
+            version_id=self.version_id,
+            received=self.received,
+            duplicates=self.duplicates,
+            inserted=inserted,
+            existing=self.unique - inserted,
+            timings={
+                "parse_ms": round((total - write) * 1e3, 3),
+                "write_ms": round(write * 1e3, 3),
+                "total_ms": round(total * 1e3, 3),
+            },
+        )
+
+
+class _ValuesWriter:
+    def __init__(self, repo: QuestionRepository, version_id: int) -> None:
+        self.repo = repo
+        self.inserted = 0
+
+    def write(self, rows: List[dict]) -> None:
+        self.inserted += self.repo.insert_many(rows)
+
+    def finish(self) -> int:
+        return self.inserted
+
+
+class _CopyWriter:
+    """PostgreSQL: COPY batches into a temp table, one INSERT … SELECT at the end."""
+
+    def __init__(self, repo: QuestionRepository, version_id: int) -> None:
+        self.repo = repo
+        self.version_id = version_id
+        self.position = 0
+
+    def write(self, rows: List[dict]) -> None:
+        if not self.position:
+            self.repo.create_import_table()
+        self.repo.copy_import(rows, self.position)
+        self.position += len(rows)
+
+    def finish(self) -> int:
+        return self.repo.insert_imported(self.version_id) if self.position else 0
+
+
+class QuestionImportService:
+    def __init__(self, db: Session):
+        self.db = db
+        self.repo = QuestionRepository(db)
+
+    def load(
+        self, version_id: int, chunks: Iterable[bytes], batch_size: int = BATCH_SIZE
+    ) -> QuestionBulkReport:
+        """Import a questions payload read from `chunks` in one transaction."""
+        clock = time.perf_counter
+        start, write = clock(), 0.0
+        scanner, batches = PayloadScanner(), _Batches(version_id, batch_size)
+        bind = self.db.get_bind()
+        copy = bind.dialect.name == "postgresql" and bind.dialect.driver == "psycopg2"
+        writer = (_CopyWriter if copy else _ValuesWriter)(self.repo, version_id)
+
+        def push(items: List[Any]) -> None:
+            nonlocal write
+            for item in items:
+                rows = batches.add(item)
+                if rows:
+                    began = clock()
+                    writer.write(rows)
+                    write += clock() - began
+
+        with unit_of_work(self.db):
+            check_draft(self.db, version_id)
+            for chunk in chunks:
+                push(scanner.feed(chunk))
+            push(scanner.close())
+            began = clock()
+            rows = batches.take()
+            if rows:
+                writer.write(rows)
+            inserted = writer.finish()
+            write += clock() - began
+            after_commit(self.db, lambda: invalidate_version(version_id))
+        return batches.report(inserted, write, clock() - start)
+
+
+class AsyncQuestionImportService:
+    """QuestionImportService over an AsyncSession (multi-row VALUES only)."""
+
+    def __init__(self, db: AsyncSession):
+        self.db = db
+        self.repo = AsyncQuestionRepository(db)
+
+    async def load(
+        self,
+        version_id: int,
+        chunks: AsyncIterable[bytes],
+        batch_size: int = BATCH_SIZE,
+    ) -> QuestionBulkReport:
+        clock = time.perf_counter
+        start, write, inserted = clock(), 0.0, 0
+        scanner, batches = PayloadScanner(), _Batches(version_id, batch_size)
+
+        async def push(items: List[Any]) -> None:
+            nonlocal write, inserted
+            for item in items:
+                rows = batches.add(item)
+                if rows:
+                    began = clock()
+                    inserted += await self.repo.insert_many(rows)
+                    write += clock() - began
+
+        async with async_unit_of_work(self.db):
+            await check_draft_async(self.db, version_id)
+            async for chunk in chunks:
+                await push(scanner.feed(chunk))
+            await push(scanner.close())
+            rows = batches.take()
+            if rows:
+                began = clock()
+                inserted += await self.repo.insert_many(rows)
+                write += clock() - began
+            after_commit(self.db, lambda: invalidate_version(version_id))
+        return batches.report(inserted, write, clock() - start)
@@ -0,0 +1,108 @@
+# services/questionnaire.py
+"""
+Анкета версии целиком (GET /versions/{id}/questionnaire): все вопросы по
+порядку id, один раз сериализованные в JSON-байты, с ETag — хэшем этих байтов.
+
+Черновик собирается из БД на каждый запрос. Опубликованная версия
+(POST /versions/{id}/publish) заморожена, поэтому её байты живут в памяти
+воркера до конца процесса — If-None-Match сверяется без обращения к БД.
+Из кэша версию убирает только хук services.invalidation (удаление версии).
+"""
+
+import hashlib
+import threading
+from typing import Any, Callable, Dict, Iterable, Optional
+
+from sqlalchemy.orm import Session
+
+from db.codec import codec
+from repositories.question import QuestionRepository
+from repositories.version import VersionRepository
+from services.invalidation import on_version_change
+from services.validation import load_json
+
+
+class Questionnaire:
+    """Serialized questionnaire of one version with its strong ETag."""
+
+    __slots__ = ("version_id", "published", "body", "etag")
+
+    def __init__(self, version: Any, questions: Iterable[Any]) -> None:
+        document = {
+            "version_id": version.id,
+            "published": bool(version.published),
+            "questions": [
+                {
+                    "id": q.id,
+                    "number": q.number,
+                    "text": q.text,
+                    "type": q.type,
+                    "options": load_json(q.options),
+                    "constraints": load_json(q.constraints),
+                }
+                for q in questions
+            ],
+        }
+        self.version_id: int = version.id
+        self.published: bool = bool(version.published)
+        self.body: bytes = codec.dumps(document)
+        self.etag: str = '"%s"' % hashlib.sha256(self.body).hexdigest()[:32]
+
+
+class QuestionnaireCache:
+    """Process-local cache of published questionnaires keyed by version_id."""
+
+    def __init__(self) -> None:
+        self._documents: Dict[int, Questionnaire] = {}
+        # как в CatalogCache: анкета, собранная до сброса, не сохраняется
+        self._generations: Dict[int, int] = {}
+        self._lock = threading.Lock()
+
+    def peek(self, version_id: int) -> Optional[Questionnaire]:
+        return self._documents.get(version_id)
+
+    def get(
+        self, version_id: int, load: Callable[[int], Optional[Questionnaire]]
+    ) -> Optional[Questionnaire]:
+        """Cached questionnaire, or `load(version_id)` (kept only if published)."""
+        document = self._documents.get(version_id)
+        if document is not None:
+            return document
+        generation = self._generations.get(version_id, 0)
+        document = load(version_id)
+        if document is None or not document.published:
+            return document
+        with self._lock:
+            if self._generations.get(version_id, 0) != generation:
+                return document
+            return self._documents.setdefault(version_id, document)
+
+    def invalidate(self, version_id: int) -> None:
+        with self._lock:
+            self._generations[version_id] = self._generations.get(version_id, 0) + 1
+            self._documents.pop(version_id, None)
+
+    def clear(self) -> None:
+        with self._lock:
+            for version_id in self._documents:
+                self._generations[version_id] = self._generations.get(version_id, 0) + 1
+            self._documents.clear()
+
+
+questionnaire_cache = QuestionnaireCache()
+on_version_change(questionnaire_cache.invalidate)
+
+
+def build_questionnaire(db: Session, version_id: int) -> Optional[Questionnaire]:
+    """Questionnaire read from the database; None when the version does not exist."""
+    version = VersionRepository(db).get(version_id)
+    if version is None:
+        return None
+    return Questionnaire(version, QuestionRepository(db).rows_by_version(version_id))
+
+
+def load_questionnaire(db: Session, version_id: int) -> Optional[Questionnaire]:
+    """Questionnaire of a version: from memory when published, else from the database."""
+    return questionnaire_cache.get(
+        version_id, lambda version_id: build_questionnaire(db, version_id)
+    )
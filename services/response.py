@@ -1,71 +1,272 @@
 # services/response.py (замени/дополни)
 
 from __future__ import annotations
-import json
-from typing import Any, Dict, List, Optional, Union
+import time
+from collections import defaultdict
+from typing import Any, Callable, Dict, List, Optional, Tuple, Union
+from sqlalchemy import Row
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 
-from repositories.response import ResponseRepository
+from db.unit_of_work import after_commit, unit_of_work
+from repositories.response import AsyncResponseRepository, ResponseRepository
 from repositories.question import QuestionRepository
+from repositories.snapshot import SnapshotRepository
+from repositories.stats import StatsRepository
+from domain.messages import Messages
 from domain.schemas import (
+    CarryOverReport,
+    DependentIssue,
+    QuestionOptions,
     Response as ResponseSchema,
+    ResponseBatchCreate,
+    ResponseBatchItemResult,
+    ResponseBatchResult,
     ResponseCreate,
     ResponseUpdate,
+    ResponseWithDependents,
 )
-from domain.schemas import Question as QuestionSchema
+from services.answer_cache import answer_ctx_cache
+from services.catalog import QuestionCatalog, question_catalog
+from services.metrics import validation_metrics
+from services.snapshot import SnapshotPatch, survey_snapshots
+from services.stats import StatsDelta
+from services.validation import CompiledQuestion, ValidationPlan
 
 
 JSONValue = Union[dict, list, str, int, float, bool, None]
 
+_MISSING = object()
+
+CARRY_OVER_USERS = 1000
+
 
 class ResponseService:
     def __init__(self, db: Session) -> None:
         self.db: Session = db
         self.repo = ResponseRepository(db)
         self.qrepo = QuestionRepository(db)
+        self.stats = StatsDelta()
+        self.stats_repo = StatsRepository(db)
+        self.snapshot = SnapshotPatch()
+        self.snapshot_repo = SnapshotRepository(db)
 
     # ---------- public API ----------
 
-    def create(self, payload: ResponseCreate) -> Optional[ResponseSchema]:
-        question = self._get_question_or_none(payload.question_id)
-        if question is None or question.version_id != payload.version_id:
+    def create(
+        self, payload: ResponseCreate, upsert: bool = False
+    ) -> Optional[ResponseSchema]:
+        with unit_of_work(self.db):
+            saved = self._create(payload, upsert)
+            self._flush_summaries()
+        return saved
+
+    def _create(
+        self, payload: ResponseCreate, upsert: bool
+    ) -> Optional[ResponseSchema]:
+        # вопрос ищем в плане версии: вопрос из чужой версии туда не попадёт
+        plan = self._plan(payload.version_id)
+        question = plan.get(payload.question_id)
+        if question is None:
             return None
+        self._ensure_writable(question)
 
         ctx = self._answers_ctx(user_id=payload.user_id, version_id=payload.version_id)
         # поместим значение «как будто уже сохранено» — для условий, смотрящих на текущий вопрос
         self._ctx_put(ctx, question, payload.response_value)
 
         coerced = self._coerce_and_validate(question, payload.response_value, ctx)
-        return self.repo.create(
-            ResponseCreate(
-                user_id=payload.user_id,
-                version_id=payload.version_id,
-                question_id=payload.question_id,
-                response_value=coerced,
+        to_save = ResponseCreate(
+            user_id=payload.user_id,
+            version_id=payload.version_id,
+            question_id=payload.question_id,
+            response_value=coerced,
+        )
+        # upsert: повторный ответ на тот же вопрос перезаписывает предыдущий
+        if upsert:
+            previous = self._overwritten(payload.user_id, payload.version_id, [question])
+            saved = self.repo.upsert(to_save)
+        else:
+            # INSERT прошёл — значит, ответа не было (уникальный индекс)
+            previous = {}
+            saved = self.repo.create(to_save)
+        self.stats.change(
+            payload.version_id, question, previous.get(question.id), coerced
+        )
+        self._ctx_write_through(
+            payload.user_id, payload.version_id, [(question, coerced)]
+        )
+        self._ctx_put(ctx, question, coerced)
+        self._materialize(plan, payload.user_id, payload.version_id, ctx, [question])
+        return saved
+
+    def create_batch(
+        self, payload: ResponseBatchCreate, upsert: bool = False
+    ) -> ResponseBatchResult:
+        """
+        Создать пачку ответов одного пользователя в одной версии.
+        Контекст грузится один раз, ответы валидируются в порядке зависимостей,
+        валидные пишутся одним INSERT в одной транзакции.
+        С upsert=True уже существующие ответы перезаписываются.
+        """
+        with unit_of_work(self.db):
+            result = self._create_batch(payload, upsert)
+            self._flush_summaries()
+        return result
+
+    def _create_batch(
+        self, payload: ResponseBatchCreate, upsert: bool
+    ) -> ResponseBatchResult:
+        plan = self._plan(payload.version_id)
+        ctx = self._answers_ctx(user_id=payload.user_id, version_id=payload.version_id)
+
+        results: List[Optional[ResponseBatchItemResult]] = [None] * len(payload.items)
+        pending: List[tuple] = []
+        seen = set()
+        for idx, item in enumerate(payload.items):
+            question = plan.get(item.question_id)
+            if question is None:
+                results[idx] = ResponseBatchItemResult(
+                    question_id=item.question_id,
+                    status="not_found",
+                    detail=Messages.QUESTION_NOT_FOUND.value,
+                )
+            elif item.question_id in seen:
+                results[idx] = ResponseBatchItemResult(
+                    question_id=item.question_id,
+                    status="invalid",
+                    detail="Duplicate question_id in batch.",
+                )
+            elif question.calc is not None:
+                results[idx] = ResponseBatchItemResult(
+                    question_id=item.question_id,
+                    status="invalid",
+                    detail=self._read_only_detail(question),
+                )
+            elif not upsert and question.id_key in ctx:
+                results[idx] = ResponseBatchItemResult(
+                    question_id=item.question_id,
+                    status="conflict",
+                    detail=Messages.RESPONSE_ALREADY_EXISTS.value,
+                )
+            else:
+                seen.add(item.question_id)
+                previous = (
+                    ctx.get(question.id_key, _MISSING),
+                    ctx.get(question.num_key, _MISSING),
+                )
+                pending.append((idx, question, item.response_value, previous))
+                # всё, что пришло в пачке, видно условиям «как будто уже сохранено»
+                self._ctx_put(ctx, question, item.response_value)
+
+        to_insert: List[tuple] = []
+        for idx, question, raw, previous in sorted(
+            pending, key=lambda p: plan.order[p[1].id]
+        ):
+            try:
+                coerced = self._coerce_and_validate(question, raw, ctx)
+            except ValueError as e:
+                results[idx] = ResponseBatchItemResult(
+                    question_id=question.id, status="invalid", detail=str(e)
+                )
+                # отклонённое значение не должно влиять на зависимые ответы
+                for key, value in zip((question.id_key, question.num_key), previous):
+                    if value is _MISSING:
+                        ctx.pop(key, None)
+                    else:
+                        ctx[key] = value
+                continue
+            self._ctx_put(ctx, question, coerced)
+            to_insert.append((idx, question, coerced))
+
+        overwritten = (
+            self._overwritten(
+                payload.user_id,
+                payload.version_id,
+                [question for _, question, _ in to_insert],
             )
+            if upsert
+            else {}
+        )
+        for _, question, coerced in to_insert:
+            self.stats.change(
+                payload.version_id, question, overwritten.get(question.id), coerced
+            )
+        write_many = self.repo.upsert_many if upsert else self.repo.create_many
+        rows = write_many(
+            [
+                ResponseCreate(
+                    user_id=payload.user_id,
+                    version_id=payload.version_id,
+                    question_id=question.id,
+                    response_value=coerced,
+                )
+                for _, question, coerced in to_insert
+            ]
+        )
+        self._ctx_write_through(
+            payload.user_id,
+            payload.version_id,
+            [(question, coerced) for _, question, coerced in to_insert],
+        )
+        self._materialize(
+            plan,
+            payload.user_id,
+            payload.version_id,
+            ctx,
+            [question for _, question, _ in to_insert],
         )
+        for (idx, question, _), row in zip(to_insert, rows):
+            results[idx] = ResponseBatchItemResult(
+                question_id=question.id,
+                status="created",
+                response=ResponseSchema.model_validate(row, from_attributes=True),
+            )
+        return ResponseBatchResult(items=results)
 
     def update(
         self, response_id: int, payload: ResponseUpdate
     ) -> Optional[ResponseSchema]:
-        current = self.repo.get(response_id)
+        with unit_of_work(self.db):
+            updated = self._update(response_id, payload)
+            self._flush_summaries()
+        return updated
+
+    def _update(
+        self, response_id: int, payload: ResponseUpdate
+    ) -> Optional[ResponseSchema]:
+        # строка заблокирована до коммита: старое значение для сводок —
+        # ровно то, что перезапишет UPDATE
+        current = self.repo.get(response_id, for_update=True)
         if current is None:
             return None
 
-        question = self._get_question_or_none(current.question_id)
+        plan = self._plan(current.version_id)
+        question = plan.get(current.question_id)
         if question is None:
             return None
+        self._ensure_writable(question)
 
         new_value = payload.response_value
-        if new_value is None:
-            # допускаешь ли очистку ответа? если нет — можно кинуть ValueError
-            new_value = None
-
         ctx = self._answers_ctx(user_id=current.user_id, version_id=current.version_id)
         self._ctx_put(ctx, question, new_value)
 
         coerced = self._coerce_and_validate(question, new_value, ctx)
-        return self.repo.update(response_id, ResponseUpdate(response_value=coerced))
+        updated = self.repo.update(
+            response_id, ResponseUpdate(response_value=coerced), current.version_id
+        )
+        if updated is None:
+            return None
+        self.stats.change(current.version_id, question, current.response_value, coerced)
+        self._ctx_write_through(
+            current.user_id, current.version_id, [(question, coerced)]
+        )
+
+        self._ctx_put(ctx, question, coerced)
+        self._materialize(plan, current.user_id, current.version_id, ctx, [question])
+        result = ResponseWithDependents.model_validate(updated, from_attributes=True)
+        result.invalid_dependents = self._revalidate_dependents(plan, question, ctx)
+        return result
 
     def get(self, response_id: int) -> Optional[ResponseSchema]:
         return self.repo.get(response_id)
@@ -75,8 +276,216 @@ class ResponseService:
     ) -> List[ResponseSchema]:
         return self.repo.get_by_user_and_version(user_id=user_id, version_id=version_id)
 
-    def delete(self, response_id: int) -> bool:
-        return self.repo.delete(response_id)
+    def options_for(
+        self, version_id: int, user_id: int, number: str
+    ) -> Optional[QuestionOptions]:
+        """Эффективные варианты dropdown-вопроса для пользователя."""
+        catalog = self._catalog(version_id)
+        entry = catalog.by_number.get(number)
+        if entry is None:
+            return None
+        question = catalog.plan.get(entry.id)
+        if question.options is None:
+            raise ValueError(f"Question {number} has no options.")
+        dyn = question.options
+        enabled, values = True, dyn.static[0]
+        if dyn.is_dynamic:
+            ctx = self._answers_ctx(user_id, version_id)
+            enabled = dyn.enabled(ctx)
+            values = dyn.effective(ctx)
+        return QuestionOptions(
+            question_id=question.id,
+            number=number,
+            enabled=enabled,
+            values=list(values),
+        )
+
+    def delete(self, response_id: int, version_id: Optional[int] = None) -> bool:
+        """
+        Delete a response. With `version_id` the DELETE touches one partition
+        and misses (returns False) when the response is in another version.
+        """
+        with unit_of_work(self.db):
+            # DELETE … RETURNING: ключи для кэша берём из удалённой строки
+            deleted = self.repo.delete(response_id, version_id)
+            if deleted is None:
+                return False
+            user_id, version_id = deleted.user_id, deleted.version_id
+            question = self._plan(version_id).get(deleted.question_id)
+            if question is not None:
+                keys = (question.id_key, question.num_key)
+                self.stats.change(version_id, question, deleted.response_value, None)
+            else:
+                keys = (f"id:{deleted.question_id}",)
+            if survey_snapshots.enabled:
+                self.snapshot.remove(user_id, version_id, keys)
+            self._flush_summaries()
+            after_commit(
+                self.db, lambda: answer_ctx_cache.forget(user_id, version_id, keys)
+            )
+        return True
+
+    # ---------- carry-over between versions ----------
+
+    def carry_over(
+        self,
+        source_version_id: int,
+        version_id: int,
+        user_id: Optional[int] = None,
+        all_questions: bool = False,
+        batch_size: int = CARRY_OVER_USERS,
+    ) -> CarryOverReport:
+        """
+        Перенос ответов из версии source_version_id в version_id по
+        совпадающим номерам вопросов — по умолчанию только для вопросов с
+        constraints.prefill_from_previous. На пачку пользователей — один
+        INSERT … SELECT, затем перенесённое проверяется правилами новой
+        версии: не прошедшие удаляются, вычисляемые поля пересчитываются.
+        Ответы, уже данные в новой версии, не перезаписываются.
+        Каждая пачка коммитится отдельно; прерванный перенос продолжается
+        повторным вызовом — уже перенесённое просто пропускается.
+        """
+        start = time.perf_counter()
+        report = CarryOverReport(
+            source_version_id=source_version_id, version_id=version_id
+        )
+        catalog = self._catalog(version_id)
+        question_ids = [
+            q.id
+            for q in catalog.questions
+            if catalog.plan.get(q.id).calc is None
+            and (all_questions or (q.constraints or {}).get("prefill_from_previous"))
+        ]
+        after: Optional[int] = None
+        while question_ids:
+            if user_id is not None:
+                users = [user_id] if after is None else []
+            else:
+                users = self.repo.user_ids(source_version_id, after, batch_size)
+            if not users:
+                break
+            # транзакция на пачку: блокировки и WAL не копятся на всю версию
+            with unit_of_work(self.db):
+                self._carry_over_users(
+                    catalog.plan, source_version_id, version_id, question_ids,
+                    users, report,
+                )
+                self._flush_summaries()
+
+                def forget(users: List[int] = users) -> None:
+                    # устарели контексты только пользователей этой пачки
+                    for uid in users:
+                        answer_ctx_cache.invalidate(uid, version_id)
+
+                after_commit(self.db, forget)
+            after = users[-1]
+        report.elapsed_ms = round((time.perf_counter() - start) * 1e3, 3)
+        return report
+
+    def _carry_over_users(
+        self,
+        plan: ValidationPlan,
+        source_version_id: int,
+        version_id: int,
+        question_ids: List[int],
+        users: List[int],
+        report: CarryOverReport,
+    ) -> None:
+        first, last = users[0], users[-1]
+        carried = self.repo.carry_over(
+            source_version_id, version_id, question_ids, first, last
+        )
+        if not carried:
+            return
+        by_user: Dict[int, List[Any]] = defaultdict(list)
+        for row in carried:
+            by_user[row.user_id].append(row)
+        # контексты пачки (с уже перенесёнными значениями) — одним запросом
+        contexts: Dict[int, Dict[str, JSONValue]] = defaultdict(dict)
+        for uid, question_id, value in self.repo.answers_of_users(
+            version_id, first, last
+        ):
+            if uid in by_user:
+                question = plan.get(question_id)
+                contexts[uid][f"id:{question_id}"] = value
+                if question is not None:
+                    contexts[uid][question.num_key] = value
+
+        rejected: List[int] = []
+        coerced_values: List[tuple] = []
+        calculated: List[ResponseCreate] = []
+        for uid, rows in by_user.items():
+            ctx = contexts[uid]
+            kept: List[CompiledQuestion] = []
+            for row in sorted(rows, key=lambda r: plan.order[r.question_id]):
+                question = plan.get(row.question_id)
+                try:
+                    value = self._coerce_and_validate(question, row.response_value, ctx)
+                except ValueError:
+                    rejected.append(row.id)
+                    ctx.pop(question.id_key, None)
+                    ctx.pop(question.num_key, None)
+                    continue
+                if value != row.response_value:
+                    coerced_values.append((row.id, value))
+                self._ctx_put(ctx, question, value)
+                self.stats.change(version_id, question, None, value)
+                kept.append(question)
+            calculated.extend(
+                ResponseCreate(
+                    user_id=uid,
+                    version_id=version_id,
+                    question_id=question.id,
+                    response_value=value,
+                )
+                for question, value in self._calculate(plan, version_id, ctx, kept)
+            )
+        self.repo.delete_many(rejected, version_id)
+        self.repo.set_values(coerced_values)
+        self.repo.upsert_many(calculated)
+        if survey_snapshots.enabled:
+            # снимки этих пользователей пересоберутся из responses при записи
+            self.snapshot_repo.clear_users(version_id, list(by_user))
+        report.users += len(by_user)
+        report.carried += len(carried) - len(rejected)
+        report.rejected += len(rejected)
+        report.calculated += len(calculated)
+
+    # ---------- statistics & snapshots ----------
+
+    def _overwritten(
+        self, user_id: int, version_id: int, questions: List[CompiledQuestion]
+    ) -> Dict[int, JSONValue]:
+        """
+        Stored answers an upsert is about to overwrite, read (and locked) in
+        the write's own transaction — the summaries' "old" side must not come
+        from the per-process context cache, which may be stale.
+        """
+        return self.repo.current_values(
+            user_id, version_id, [question.id for question in questions]
+        )
+
+    def _flush_summaries(self) -> None:
+        """
+        Write the call's derived data before commit: summary deltas
+        (services/stats.py) and survey snapshots (services/snapshot.py).
+        """
+        self.stats_repo.apply(self.stats.take())
+        self.snapshot.flush(self.snapshot_repo, self._build_answers_ctx)
+
+    # ---------- catalog & compiled plan ----------
+
+    def _catalog(self, version_id: int) -> QuestionCatalog:
+        """
+        Каталог вопросов версии (общий для воркера, сбрасывается
+        в QuestionService при изменении вопросов) — в установившемся режиме
+        валидация не делает ни одного запроса к questions.
+        """
+        return question_catalog.get(version_id, self.qrepo.get_by_version)
+
+    def _plan(self, version_id: int) -> ValidationPlan:
+        """Скомпилированный план валидации версии."""
+        return self._catalog(version_id).plan
 
     # ---------- context of answers ----------
 
@@ -87,336 +496,236 @@ class ResponseService:
           - f"id:{question_id}" -> value
           - f"num:{question.number}" -> value
         """
+        cached = answer_ctx_cache.get(user_id, version_id)
+        if cached is not None:
+            return cached
+        # снимок анкеты — одна строка по первичному ключу вместо N ответов
+        snapshot = survey_snapshots.context(self.db, user_id, version_id)
+        if snapshot is not None:
+            answer_ctx_cache.put(user_id, version_id, snapshot)
+            return snapshot
+        if not validation_metrics.enabled:
+            return self._load_answers_ctx(user_id, version_id)
+        with validation_metrics.timed("context.load"):
+            return self._load_answers_ctx(user_id, version_id)
+
+    def _load_answers_ctx(self, user_id: int, version_id: int) -> Dict[str, JSONValue]:
+        ctx = self._build_answers_ctx(user_id, version_id)
+        answer_ctx_cache.put(user_id, version_id, ctx)
+        return ctx
+
+    def _build_answers_ctx(self, user_id: int, version_id: int) -> Dict[str, JSONValue]:
+        """Контекст ответов из responses, без кэша."""
         ctx: Dict[str, JSONValue] = {}
         answers = self.repo.get_by_user_and_version(
             user_id=user_id, version_id=version_id
         )
-        if not answers:
-            return ctx
-        # понадобится мапа id->question.number
-        qids = [a.question_id for a in answers]
-        qmap = self.qrepo.get_map_by_ids(qids)  # см. ниже добавим метод
+        # номера вопросов берём из плана версии — без отдельного запроса
+        plan = self._plan(version_id) if answers else None
         for a in answers:
-            number = qmap.get(a.question_id)
-            if number:
-                ctx[f"num:{number}"] = a.response_value
+            question = plan.get(a.question_id)
+            if question is not None:
+                ctx[question.num_key] = a.response_value
             ctx[f"id:{a.question_id}"] = a.response_value
         return ctx
 
+    def _ctx_write_through(
+        self, user_id: int, version_id: int, saved: List[tuple]
+    ) -> None:
+        """
+        Записать сохранённые значения в закэшированный контекст (если он есть)
+        — после commit: при откате кэш не должен видеть несохранённое.
+        """
+        values: Dict[str, JSONValue] = {}
+        for question, value in saved:
+            values[question.id_key] = value
+            values[question.num_key] = value
+        if survey_snapshots.enabled:
+            self.snapshot.set(user_id, version_id, values)
+        after_commit(
+            self.db, lambda: answer_ctx_cache.write(user_id, version_id, values)
+        )
+
     @staticmethod
     def _ctx_put(
-        ctx: Dict[str, JSONValue], question: QuestionSchema, value: JSONValue
+        ctx: Dict[str, JSONValue], question: CompiledQuestion, value: JSONValue
     ) -> None:
         if question:
-            ctx[f"id:{question.id}"] = value
-            ctx[f"num:{question.number}"] = value
-
-    # ---------- validation core ----------
-
-    def _coerce_and_validate(
-        self, question: QuestionSchema, raw_value: JSONValue, ctx: Dict[str, JSONValue]
-    ) -> JSONValue:
-        qtype = (question.type or "").strip().lower()
-        constraints = question.constraints or {}
-        options = question.options
-
-        # 0) depends_on / condition
-        self._enforce_depends_on(constraints, ctx)
-        self._enforce_condition(constraints, ctx)
-
-        # 1) типовая валидация + приведение типов
-        value = self._coerce_by_type(qtype, raw_value, options, constraints)
-
-        # 2) бизнес-правила (площади/лифты)
-        self._enforce_area_rules(question, value, ctx, constraints)
-        self._enforce_elevator_rules(question, value, ctx, constraints)
+            ctx[question.id_key] = value
+            ctx[question.num_key] = value
 
-        return value
+    # ---------- computed fields ----------
 
-    # ---------- type coercion ----------
-
-    def _coerce_by_type(
-        self, qtype: str, raw: JSONValue, options, constraints
-    ) -> JSONValue:
-        if qtype in ("boolean", "bool"):
-            return self._parse_bool(raw)
-
-        if qtype in ("integer", "int"):
-            ival = self._parse_int(raw)
-            self._check_min_max(ival, constraints)
-            return ival
-
-        if qtype in ("number", "float", "decimal"):
-            fval = self._parse_float(raw)
-            self._check_min_max(fval, constraints)
-            return fval
-
-        if qtype in ("dropdown", "select", "choice"):
-            sval = str(raw) if raw is not None else ""
-            allowed = None
-            if isinstance(options, dict):
-                allowed = options.get("values")
-            elif isinstance(options, list):
-                allowed = options
-            if allowed is not None and len(allowed) > 0 and sval not in allowed:
-                raise ValueError(f"Value '{sval}' is not in allowed options.")
-            return sval
-
-        # text/string/unknown
-        sval = "" if raw is None else str(raw)
-        self._check_len(sval, constraints)
-        return sval
-
-    # ---------- rule helpers ----------
-
-    def _enforce_depends_on(
-        self, constraints: Dict[str, Any], ctx: Dict[str, JSONValue]
-    ) -> None:
-        dep = constraints.get("depends_on")
-        if not dep:
-            return
-        ref_key = self._ref_key(dep, ctx)
-        if ref_key is None:
-            return  # нет такого вопроса в контексте — трактуем как «условие не выполняется»?
-        ref_val = ctx.get(ref_key)
-        allowed = dep.get("values")
-        if allowed is None:
-            return
-        if not self._value_in(ref_val, allowed):
-            raise ValueError("Question is disabled by depends_on condition.")
-
-    def _enforce_condition(
-        self, constraints: Dict[str, Any], ctx: Dict[str, JSONValue]
-    ) -> None:
-        cond = constraints.get("condition")
-        if not cond:
-            return
-        left = self._resolve_ref(cond.get("left"), ctx)
-        right = cond.get("right")
-        op = (cond.get("op") or "==").lower()
-
-        if op == "==":
-            ok = left == right
-        elif op == "!=":
-            ok = left != right
-        elif op == ">":
-            ok = self._cmp(left, right, "gt")
-        elif op == ">=":
-            ok = self._cmp(left, right, "ge")
-        elif op == "<":
-            ok = self._cmp(left, right, "lt")
-        elif op == "<=":
-            ok = self._cmp(left, right, "le")
-        elif op == "in":
-            ok = self._value_in(left, right)
-        elif op == "not_in":
-            ok = not self._value_in(left, right)
-        else:
-            raise ValueError(f"Unsupported condition op: {op}")
+    @staticmethod
+    def _read_only_detail(question: CompiledQuestion) -> str:
+        return f"Question {question.number} is calculated and read-only."
 
-        if not ok:
-            raise ValueError("Condition failed.")
+    def _ensure_writable(self, question: CompiledQuestion) -> None:
+        if question.calc is not None:
+            raise ValueError(self._read_only_detail(question))
 
-    def _enforce_area_rules(
+    def _materialize(
         self,
-        question: QuestionSchema,
-        value: JSONValue,
+        plan: ValidationPlan,
+        user_id: int,
+        version_id: int,
         ctx: Dict[str, JSONValue],
-        constraints: Dict[str, Any],
+        changed: List[CompiledQuestion],
     ) -> None:
-        # total == sum(parts)
-        if "area_total_of" in constraints:
-            parts_nums = constraints["area_total_of"]
-            tolerance = float(constraints.get("tolerance", 0.0))
-            total = self._to_float(value)
-            s = 0.0
-            for num in parts_nums:
-                v = ctx.get(f"num:{num}")
-                s += self._to_float(v)
-            if abs(total - s) > tolerance:
-                raise ValueError(
-                    f"Area total mismatch: total={total} != sum(parts)={s} (tolerance={tolerance})"
-                )
+        """
+        Пересчитывает вычисляемые поля (constraints.calculation), зависящие от
+        изменённых ответов, и сохраняет изменившиеся значения одним upsert.
+        """
+        saved = self._calculate(plan, version_id, ctx, changed)
+        if not saved:
+            return
 
-        # part <= total and sum(parts) <= total
-        if "area_part_of" in constraints:
-            total_num = constraints["area_part_of"]
-            tolerance = float(constraints.get("tolerance", 0.0))
-            part = self._to_float(value)
-            total_val = ctx.get(f"num:{total_num}")
-            total = self._to_float(total_val)
-            if part - total > tolerance:
-                raise ValueError(
-                    f"Area part {part} exceeds total {total} (tolerance={tolerance})"
+        self.repo.upsert_many(
+            [
+                ResponseCreate(
+                    user_id=user_id,
+                    version_id=version_id,
+                    question_id=question.id,
+                    response_value=value,
                 )
-            # если хотим жёстко проверить сумму частей ≤ total — нужно знать список всех «part_of»
-            # здесь минимальная проверка: текущая часть не больше итога
+                for question, value in saved
+            ]
+        )
+        self._ctx_write_through(user_id, version_id, saved)
 
-    def _enforce_elevator_rules(
+    def _calculate(
         self,
-        question: QuestionSchema,
-        value: JSONValue,
+        plan: ValidationPlan,
+        version_id: int,
         ctx: Dict[str, JSONValue],
-        constraints: Dict[str, Any],
-    ) -> None:
-        # floors >= min -> elevator must be true
-        rule = constraints.get("requires_elevator_if")
-        if rule:
-            floors_num = rule.get("floors_question")
-            min_floors = int(rule.get("min_floors", 5))
-            elev_num = rule.get("elevator_question")
-            floors = self._to_int(
-                self._resolve_num_or_self(floors_num, question, value, ctx)
-            )
-            has_elev = self._to_bool(ctx.get(f"num:{elev_num}"))
-            if floors is not None and floors >= min_floors and has_elev is False:
-                raise ValueError(f"Elevator required when floors >= {min_floors}.")
-
-        # no elevator -> floors must be <= max
-        rule2 = constraints.get("no_elevator_max_floors")
-        if rule2:
-            floors_num = rule2.get("floors_question")
-            max_no = int(rule2.get("max", 5))
-            elev_num = rule2.get("elevator_question")
-            floors = self._to_int(
-                self._resolve_num_or_self(floors_num, question, value, ctx)
-            )
-            has_elev = self._to_bool(ctx.get(f"num:{elev_num}"))
-            if has_elev is False and floors is not None and floors > max_no:
-                raise ValueError(
-                    f"Floors {floors} exceed allowed maximum {max_no} without elevator."
+        changed: List[CompiledQuestion],
+    ) -> List[tuple]:
+        """Вычисляемые поля, изменившиеся из-за `changed`: [(question, value)]."""
+        targets: Dict[int, CompiledQuestion] = {}
+        for question in changed:
+            for dependent in plan.downstream(question.number):
+                if dependent.calc is not None:
+                    targets[dependent.id] = dependent
+        if not targets:
+            return []
+
+        saved: List[tuple] = []
+        for question in sorted(targets.values(), key=lambda q: plan.order[q.id]):
+            # пока не на все входы ответили — поле не считаем
+            if any(ctx.get(f"num:{n}") is None for n in question.calc.refs):
+                continue
+            value = question.calc.evaluate(ctx)
+            if value is None:
+                continue
+            try:
+                value = question.coerce(value)
+            except ValueError:
+                continue
+            if ctx.get(question.id_key) == value:
+                continue
+            self.stats.change(version_id, question, ctx.get(question.id_key), value)
+            self._ctx_put(ctx, question, value)
+            saved.append((question, value))
+        return saved
+
+    # ---------- dependents ----------
+
+    def _revalidate_dependents(
+        self,
+        plan: ValidationPlan,
+        question: CompiledQuestion,
+        ctx: Dict[str, JSONValue],
+    ) -> List[DependentIssue]:
+        """
+        Перепроверяет уже данные ответы, которые (транзитивно) зависят от
+        изменённого вопроса, в топологическом порядке. Стоимость — по числу
+        зависимых, а не по размеру анкеты.
+        """
+        issues: List[DependentIssue] = []
+        for dependent in plan.downstream(question.number):
+            if dependent.id_key not in ctx or dependent.calc is not None:
+                continue  # не отвечали или поле вычисляемое (уже пересчитано)
+            try:
+                self._coerce_and_validate(dependent, ctx[dependent.id_key], ctx)
+            except ValueError as e:
+                issues.append(
+                    DependentIssue(
+                        question_id=dependent.id, number=dependent.number, detail=str(e)
+                    )
                 )
+        return issues
 
-    # ---------- tiny utils ----------
-
-    def _get_question_or_none(self, question_id: int) -> Optional[QuestionSchema]:
-        return self.qrepo.get(question_id)
-
-    @staticmethod
-    def _ref_key(ref: Dict[str, Any], ctx: Dict[str, JSONValue]) -> Optional[str]:
-        if not isinstance(ref, dict):
-            return None
-        if "question_id" in ref:
-            return f"id:{ref['question_id']}"
-        if "question_number" in ref:
-            return f"num:{ref['question_number']}"
-        return None
+    # ---------- validation core ----------
 
-    @staticmethod
-    def _value_in(val: JSONValue, bag: Any) -> bool:
-        if isinstance(bag, (list, tuple, set)):
-            return val in bag
-        return val == bag
-
-    def _resolve_ref(self, ref: Any, ctx: Dict[str, JSONValue]) -> JSONValue:
-        if isinstance(ref, dict):
-            key = self._ref_key(ref, ctx)
-            return ctx.get(key) if key else None
-        return ref
-
-    def _resolve_num_or_self(
-        self,
-        number: Optional[str],
-        question: QuestionSchema,
-        value: JSONValue,
-        ctx: Dict[str, JSONValue],
+    def _coerce_and_validate(
+        self, question: CompiledQuestion, raw_value: JSONValue, ctx: Dict[str, JSONValue]
     ) -> JSONValue:
-        if number:
-            return ctx.get(f"num:{number}")
-        # если правило ссылается на «текущий вопрос» (например, floors) — используем его value
-        return value
+        # depends_on/condition → приведение типа → бизнес-правила (площади/лифты);
+        # всё уже разобрано компилятором в services/validation.py
+        if not validation_metrics.enabled:
+            return question.validate(raw_value, ctx)
+        return validation_metrics.validate(question, raw_value, ctx)
+
+
+class AsyncResponseService:
+    """
+    Async-вариант ResponseService (ASYNC_DB=true). Чтения идут через
+    AsyncResponseRepository; записи с валидацией выполняются тем же
+    ResponseService внутри AsyncSession.run_sync — sync-код работает поверх
+    async-драйвера в greenlet, без потока из threadpool, а правила
+    валидации остаются в одном месте.
+    """
+
+    def __init__(self, db: AsyncSession) -> None:
+        self.db = db
+        self.repo = AsyncResponseRepository(db)
+
+    async def _run(self, fn: Callable[[ResponseService], Any]) -> Any:
+        return await self.db.run_sync(lambda session: fn(ResponseService(session)))
+
+    async def create(
+        self, payload: ResponseCreate, upsert: bool = False
+    ) -> Optional[ResponseSchema]:
+        def create(service: ResponseService) -> Optional[ResponseSchema]:
+            saved = service.create(payload, upsert=upsert)
+            if saved is None:
+                return None
+            return ResponseSchema.model_validate(saved, from_attributes=True)
 
-    @staticmethod
-    def _cmp(a: Any, b: Any, op: str) -> bool:
-        try:
-            if op == "gt":
-                return a > b
-            if op == "ge":
-                return a >= b
-            if op == "lt":
-                return a < b
-            if op == "le":
-                return a <= b
-        except Exception:
-            return False
-        return False
+        return await self._run(create)
 
-    @staticmethod
-    def _parse_bool(v) -> bool:
-        if isinstance(v, bool):
-            return v
-        if isinstance(v, (int, float)):
-            return bool(int(v))
-        if isinstance(v, str):
-            s = v.strip().lower()
-            if s in ("true", "1", "yes", "y", "да"):
-                return True
-            if s in ("false", "0", "no", "n", "нет"):
-                return False
-        raise ValueError("Invalid boolean value")
+    async def create_batch(
+        self, payload: ResponseBatchCreate, upsert: bool = False
+    ) -> ResponseBatchResult:
+        return await self._run(lambda service: service.create_batch(payload, upsert))
 
-    @staticmethod
-    def _parse_int(v) -> int:
-        if isinstance(v, int) and not isinstance(v, bool):
-            return v
-        try:
-            return int(str(v).strip())
-        except Exception:
-            raise ValueError("Invalid integer value")
+    async def update(
+        self, response_id: int, payload: ResponseUpdate
+    ) -> Optional[ResponseWithDependents]:
+        return await self._run(lambda service: service.update(response_id, payload))
 
-    @staticmethod
-    def _parse_float(v) -> float:
-        try:
-            return float(str(v).strip())
-        except Exception:
-            raise ValueError("Invalid number value")
+    async def delete(self, response_id: int, version_id: Optional[int] = None) -> bool:
+        return await self._run(lambda service: service.delete(response_id, version_id))
 
-    @staticmethod
-    def _to_float(v) -> float:
-        if v is None:
-            return 0.0
-        try:
-            return float(v)
-        except Exception:
-            return 0.0
+    async def carry_over(
+        self, source_version_id: int, version_id: int, **options: Any
+    ) -> CarryOverReport:
+        return await self._run(
+            lambda service: service.carry_over(source_version_id, version_id, **options)
+        )
 
-    @staticmethod
-    def _to_int(v) -> Optional[int]:
-        try:
-            return int(v)
-        except Exception:
-            return None
+    async def options_for(
+        self, version_id: int, user_id: int, number: str
+    ) -> Optional[QuestionOptions]:
+        return await self._run(
+            lambda service: service.options_for(version_id, user_id, number)
+        )
 
-    @staticmethod
-    def _to_bool(v) -> Optional[bool]:
-        if v is None:
-            return None
-        if isinstance(v, bool):
-            return v
-        if isinstance(v, (int, float)):
-            return bool(int(v))
-        if isinstance(v, str):
-            s = v.strip().lower()
-            if s in ("true", "1", "yes", "y", "да"):
-                return True
-            if s in ("false", "0", "no", "n", "нет"):
-                return False
-        return None
+    async def get(self, response_id: int) -> Optional[ResponseSchema]:
+        return await self.repo.get(response_id)
 
-    @staticmethod
-    def _check_min_max(value, constraints: dict) -> None:
-        if "min" in constraints and value < constraints["min"]:
-            raise ValueError(f"Value {value} is below min={constraints['min']}")
-        if "max" in constraints and value > constraints["max"]:
-            raise ValueError(f"Value {value} is above max={constraints['max']}")
+    async def page(self, **filters: Any) -> Tuple[List[ResponseSchema], Optional[str]]:
+        return await self.repo.page(**filters)
 
-    @staticmethod
-    def _check_len(s: str, constraints: dict) -> None:
-        if "min_length" in constraints and len(s) < constraints["min_length"]:
-            raise ValueError(
-                f"Text length {len(s)} is below min_length={constraints['min_length']}"
-            )
-        if "max_length" in constraints and len(s) > constraints["max_length"]:
-            raise ValueError(
-                f"Text length {len(s)} exceeds max_length={constraints['max_length']}"
-            )
+    async def rows_page(self, **filters: Any) -> Tuple[List[Row], Optional[str]]:
+        return await self.repo.rows_page(**filters)
@@ -0,0 +1,94 @@
+# services/snapshot.py
+"""
+Снимок анкеты пользователя (SURVEY_SNAPSHOTS): одна строка survey_snapshots
+на (user_id, version_id) со всеми ответами в формате контекста ответов.
+
+Чтение полной анкеты и загрузка контекста для валидации — один поиск по
+первичному ключу вместо N строк responses. Документ обновляется в той же
+транзакции, что и ответы: строка блокируется (SELECT … FOR UPDATE), к ней
+применяются изменения вызова сервиса, revision растёт на единицу. Первый
+снимок пользователя строится из responses.
+"""
+
+from typing import Any, Callable, Dict, Iterable, Optional, Tuple
+
+from sqlalchemy.orm import Session
+
+from db.settings import Settings
+from domain.schemas import SurveySnapshot
+from repositories.snapshot import SnapshotRepository
+
+_REMOVED = object()
+
+Answers = Dict[str, Any]
+
+
+class SurveySnapshots:
+    """Process-wide switch of the snapshot table and its read path."""
+
+    def __init__(self, enabled: bool = False) -> None:
+        self.enabled = enabled
+
+    def context(self, db: Session, user_id: int, version_id: int) -> Optional[Answers]:
+        """The user's answers context from the snapshot, or None without one."""
+        if not self.enabled:
+            return None
+        row = SnapshotRepository(db).get(user_id, version_id)
+        return dict(row.answers) if row is not None else None
+
+
+class SnapshotPatch:
+    """Snapshot changes of one service call, written before its commit."""
+
+    __slots__ = ("_pending",)
+
+    def __init__(self) -> None:
+        self._pending: Dict[Tuple[int, int], Dict[str, Any]] = {}
+
+    def set(self, user_id: int, version_id: int, values: Answers) -> None:
+        self._pending.setdefault((user_id, version_id), {}).update(values)
+
+    def remove(self, user_id: int, version_id: int, keys: Iterable[str]) -> None:
+        changes = self._pending.setdefault((user_id, version_id), {})
+        for key in keys:
+            changes[key] = _REMOVED
+
+    def flush(
+        self, repo: SnapshotRepository, build: Callable[[int, int], Answers]
+    ) -> None:
+        pending, self._pending = self._pending, {}
+        for (user_id, version_id), changes in sorted(pending.items()):
+            row = repo.lock(user_id, version_id)
+            if row is None:
+                # первый снимок: responses уже содержат записи этой транзакции
+                repo.save(user_id, version_id, build(user_id, version_id), 1)
+                continue
+            answers = dict(row.answers)
+            for key, value in changes.items():
+                if value is _REMOVED:
+                    answers.pop(key, None)
+                else:
+                    answers[key] = value
+            repo.save(user_id, version_id, answers, row.revision + 1)
+
+
+def by_number(answers: Answers) -> Answers:
+    """Snapshot document → {question number: value}."""
+    return {key[4:]: value for key, value in answers.items() if key.startswith("num:")}
+
+
+def load_snapshot(db: Session, user_id: int, version_id: int) -> Optional[SurveySnapshot]:
+    """A user's snapshot as returned by the API, or None without one."""
+    row = SnapshotRepository(db).get(user_id, version_id)
+    if row is None:
+        return None
+    return SurveySnapshot(
+        user_id=row.user_id,
+        version_id=row.version_id,
+        revision=row.revision,
+        answers=by_number(row.answers),
+        updated_at=row.updated_at,
+    )
+
+
+survey_snapshots = SurveySnapshots(enabled=Settings().SURVEY_SNAPSHOTS)
@@ -0,0 +1,206 @@
+# services/stats.py
+"""
+Статистика ответов по вопросам для дашбордов.
+
+Сводки (question_stats) — счётчики по корзинам (version_id, question_id,
+bucket): значение варианта dropdown, "true"/"false"; корзина "*" —
+сколько всего ответили. Числовые вопросы не хранят строку на каждое
+значение: только агрегаты "sum"/"min"/"max" и корзины гистограммы
+фиксированной сетки 1-2-5 (…, [1, 2), [2, 5), [5, 10), [10, 20), …) —
+число строк на вопрос ограничено. min/max при удалении ответов не
+сужаются (это границы, точные после пересчёта). ResponseService при
+каждой записи добавляет к сводкам разницу между старым и новым значением
+в той же транзакции, а
+GET /versions/{id}/stats читает только сводки: стоимость не зависит от
+числа ответов. Полный пересчёт — StatsService.rebuild
+(python scripts/rebuild_stats.py).
+"""
+
+import math
+from collections import defaultdict
+from typing import Any, Dict, List, Optional, Tuple
+
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+from db.unit_of_work import unit_of_work
+from domain.models import Question, Response
+from domain.schemas import HistogramBin, QuestionStats
+from repositories.stats import StatsDeltas, StatsRepository
+from services.validation import CHOICE_TYPES
+
+ANSWERED = "*"
+SUM, MIN, MAX = "sum", "min", "max"
+BIN_PREFIX = "bin:"
+
+# корзины сетки внутри десятичного порядка, сверху вниз
+_BIN_GRID = ((5, 10), (2, 5), (1, 2))
+
+_NUMBER_TYPES = ("integer", "int", "number", "float", "decimal")
+_BOOL_TYPES = ("boolean", "bool")
+
+
+def buckets(qtype: str, value: Any) -> List[Tuple[str, Optional[float]]]:
+    """Summary buckets one stored (already coerced) answer falls into."""
+    if value is None:
+        return []
+    qtype = (qtype or "").lower()
+    found: List[Tuple[str, Optional[float]]] = [(ANSWERED, None)]
+    if qtype in _BOOL_TYPES and isinstance(value, bool):
+        found.append(("true" if value else "false", None))
+    elif (
+        qtype in _NUMBER_TYPES
+        and isinstance(value, (int, float))
+        and not isinstance(value, bool)
+    ):
+        number = float(value)
+        found.extend(((SUM, number), (MIN, number), (MAX, number)))
+        found.append((bin_bucket(number), None))
+    elif qtype in CHOICE_TYPES:
+        # множественный выбор — по корзине на каждый выбранный вариант
+        items = value if isinstance(value, list) else [value]
+        found.extend((str(item), None) for item in dict.fromkeys(map(str, items)))
+    return found
+
+
+def bin_bucket(number: float) -> str:
+    """Histogram bucket of a number on the 1-2-5 grid: "bin:<lower>:<upper>"."""
+    lower, upper = _bin(abs(float(number)))
+    if number < 0:
+        lower, upper = -upper, -lower
+    return f"{BIN_PREFIX}{lower!r}:{upper!r}"
+
+
+def _bin(size: float) -> Tuple[float, float]:
+    if size == 0 or not math.isfinite(size):
+        return size, size
+    k = math.floor(math.log10(size))
+    # log10 неточен у степеней десяти — поправляем порядок по границам
+    if size >= 10.0 ** (k + 1):
+        k += 1
+    elif size < 10.0 ** k:
+        k -= 1
+    for lower, upper in _BIN_GRID:
+        if size >= lower * 10.0 ** k:
+            break
+    return lower * 10.0 ** k, upper * 10.0 ** k
+
+
+class StatsDelta:
+    """Pending summary changes of one service call, applied before commit."""
+
+    __slots__ = ("_deltas",)
+
+    def __init__(self) -> None:
+        self._deltas: Dict[Tuple[int, int, str], List[Any]] = {}
+
+    def change(self, version_id: int, question: Any, old: Any, new: Any) -> None:
+        if old == new:
+            return
+        self.add(version_id, question.id, question.type, old, -1)
+        self.add(version_id, question.id, question.type, new, 1)
+
+    def add(
+        self, version_id: int, question_id: int, qtype: str, value: Any, sign: int
+    ) -> None:
+        for bucket, number in buckets(qtype, value):
+            entry = self._deltas.setdefault((version_id, question_id, bucket), [0, None])
+            entry[0] += sign
+            if number is None:
+                continue
+            if bucket == SUM:
+                entry[1] = (entry[1] or 0.0) + sign * number
+            elif sign > 0:
+                # min/max только расширяются; удаление их не сужает
+                pick = min if bucket == MIN else max
+                entry[1] = number if entry[1] is None else pick(entry[1], number)
+
+    def take(self) -> StatsDeltas:
+        deltas = {key: (count, value) for key, (count, value) in self._deltas.items()}
+        self._deltas.clear()
+        return deltas
+
+
+class StatsService:
+    def __init__(self, db: Session) -> None:
+        self.db = db
+        self.repo = StatsRepository(db)
+
+    def get(self, version_id: int) -> List[QuestionStats]:
+        """Distributions of every question of a version, from the summaries only."""
+        grouped: Dict[int, List[Any]] = defaultdict(list)
+        meta: Dict[int, Tuple[str, str]] = {}
+        for qid, number, qtype, bucket, count, value in self.repo.for_version(
+            version_id
+        ):
+            meta[qid] = (number, qtype)
+            if bucket is not None:
+                grouped[qid].append((bucket, count, value))
+        return [
+            _summarize(qid, number, qtype, grouped.get(qid, ()))
+            for qid, (number, qtype) in meta.items()
+        ]
+
+    def rebuild(self, version_id: int, batch_size: int = 10000) -> int:
+        """Recompute a version's summaries from responses; returns rows scanned."""
+        r = Response.__table__.c
+        stmt = (
+            select(r.question_id, Question.__table__.c.type, r.response_value)
+            .join_from(Response.__table__, Question.__table__)
+            .where(r.version_id == version_id)
+        )
+        delta = StatsDelta()
+        scanned = 0
+        with unit_of_work(self.db):
+            self.repo.clear_version(version_id)
+            result = self.db.execute(
+                stmt,
+                execution_options={"stream_results": True, "yield_per": batch_size},
+            )
+            for question_id, qtype, value in result:
+                delta.add(version_id, question_id, qtype, value, 1)
+                scanned += 1
+            self.repo.apply(delta.take())
+        return scanned
+
+
+def _summarize(
+    question_id: int, number: str, qtype: str, rows
+) -> QuestionStats:
+    answered = 0
+    counts: Dict[str, int] = {}
+    aggregates: Dict[str, Tuple[int, float]] = {}
+    for bucket, count, value in rows:
+        if bucket == ANSWERED:
+            answered = count
+        elif value is not None:
+            aggregates[bucket] = (count, value)
+        else:
+            counts[bucket] = count
+    stats = QuestionStats(
+        question_id=question_id, number=number, type=qtype, answered=answered
+    )
+    kind = (qtype or "").lower()
+    if kind in _BOOL_TYPES:
+        stats.counts = counts
+        if answered:
+            stats.true_rate = counts.get("true", 0) / answered
+    elif kind in CHOICE_TYPES:
+        stats.counts = counts
+    elif kind in _NUMBER_TYPES and SUM in aggregates:
+        total, value_sum = aggregates[SUM]
+        stats.min = aggregates.get(MIN, (0, None))[1]
+        stats.max = aggregates.get(MAX, (0, None))[1]
+        stats.mean = value_sum / total
+        stats.histogram = _histogram(counts)
+    return stats
+
+
+def _histogram(counts: Dict[str, int]) -> List[HistogramBin]:
+    """Non-empty 1-2-5 grid bins of a numeric question, ordered by lower bound."""
+    bins = []
+    for bucket, count in counts.items():
+        if bucket.startswith(BIN_PREFIX):
+            lower, upper = bucket[len(BIN_PREFIX):].split(":")
+            bins.append(HistogramBin(lower=float(lower), upper=float(upper), count=count))
+    return sorted(bins, key=lambda b: b.lower)
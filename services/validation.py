@@ -0,0 +1,806 @@
+# services/validation.py
+"""
+Компилятор правил валидации ответов.
+
+Все вопросы версии один раз превращаются в план (ValidationPlan): для каждого
+вопроса — готовая функция приведения типа и список заранее связанных проверок.
+План хранится в каталоге версии (services/catalog.py) и сбрасывается вместе
+с ним при изменении вопросов версии.
+"""
+
+from __future__ import annotations
+
+import heapq
+import json
+import logging
+import operator
+from typing import (
+    Any,
+    Callable,
+    Container,
+    Dict,
+    Iterable,
+    List,
+    Optional,
+    Tuple,
+    Union,
+)
+
+from services.options import DynamicOptions, compile_options, selected_items
+from services.expressions import (
+    FALSE_WORDS,
+    TRUE_WORDS,
+    Expression,
+    ExpressionError,
+    compile_condition,
+    compile_expression,
+    compile_range_table,
+)
+
+logger = logging.getLogger(__name__)
+
+JSONValue = Union[dict, list, str, int, float, bool, None]
+Context = Dict[str, JSONValue]
+
+Coercer = Callable[[JSONValue], JSONValue]
+Check = Callable[[JSONValue, Context], None]
+
+
+
+# ---------- compiled structures ----------
+
+
+class Rule:
+    """A pre-bound check together with the rule family it belongs to."""
+
+    __slots__ = ("family", "check")
+
+    def __init__(self, family: str, check: Check) -> None:
+        self.family = family
+        self.check = check
+
+
+class CompiledQuestion:
+    """Question with its coercer and checks resolved at compile time."""
+
+    __slots__ = (
+        "id",
+        "version_id",
+        "number",
+        "type",
+        "id_key",
+        "num_key",
+        "coerce",
+        "pre_rules",
+        "post_rules",
+        "refs",
+        "calc",
+        "options",
+    )
+
+    def __init__(
+        self,
+        id: int,
+        version_id: int,
+        number: str,
+        type: str,
+        coerce: Coercer,
+        pre_rules: Tuple[Rule, ...],
+        post_rules: Tuple[Rule, ...],
+        refs: Tuple[str, ...] = (),
+        calc: Optional[Expression] = None,
+        options: Optional[DynamicOptions] = None,
+    ) -> None:
+        self.id = id
+        self.version_id = version_id
+        self.number = number
+        self.type = type
+        self.id_key = f"id:{id}"
+        self.num_key = f"num:{number}"
+        self.coerce = coerce
+        # pre_rules смотрят только на контекст (depends_on/condition),
+        # post_rules — на уже приведённое значение (площади/лифты)
+        self.pre_rules = pre_rules
+        self.post_rules = post_rules
+        # ключи контекста ("num:…"/"id:…"), на которые смотрят правила вопроса
+        self.refs = refs
+        # вычисляемое read-only поле (constraints.calculation) — значение
+        # материализуется сервисом, клиент его не пишет
+        self.calc = calc
+        # набор вариантов dropdown (статический или динамический)
+        self.options = options
+
+    def validate(self, raw: JSONValue, ctx: Context) -> JSONValue:
+        """Run pre-checks, coerce the value and run post-checks."""
+        for rule in self.pre_rules:
+            rule.check(raw, ctx)
+        value = self.coerce(raw)
+        for rule in self.post_rules:
+            rule.check(value, ctx)
+        return value
+
+
+class ValidationPlan:
+    """
+    Compiled validation rules for every question of one version, plus the
+    dependency graph between them (reverse edges: number -> dependents).
+    """
+
+    __slots__ = ("version_id", "by_id", "by_number", "dependents", "order")
+
+    def __init__(self, version_id: int, questions: Iterable[CompiledQuestion]) -> None:
+        self.version_id = version_id
+        self.by_id: Dict[int, CompiledQuestion] = {q.id: q for q in questions}
+        self.by_number: Dict[str, List[CompiledQuestion]] = {}
+        for q in self.by_id.values():
+            self.by_number.setdefault(q.number, []).append(q)
+        self.dependents: Dict[str, Tuple[int, ...]] = self._reverse_edges()
+        self.order: Dict[int, int] = self._topological_order()
+
+    def get(self, question_id: int) -> Optional[CompiledQuestion]:
+        return self.by_id.get(question_id)
+
+    def __len__(self) -> int:
+        return len(self.by_id)
+
+    def downstream(self, number: str) -> List[CompiledQuestion]:
+        """All questions transitively depending on `number`, in topological order."""
+        seen = set()
+        stack = [number]
+        while stack:
+            for qid in self.dependents.get(stack.pop(), ()):
+                if qid not in seen:
+                    seen.add(qid)
+                    stack.append(self.by_id[qid].number)
+        for q in self.by_number.get(number, ()):
+            seen.discard(q.id)
+        return [self.by_id[qid] for qid in sorted(seen, key=self.order.__getitem__)]
+
+    # ---------- graph ----------
+
+    def _ref_number(self, key: str) -> Optional[str]:
+        kind, _, ref = key.partition(":")
+        if kind == "num":
+            return ref
+        try:
+            q = self.by_id.get(int(ref))
+        except ValueError:
+            return None
+        return q.number if q is not None else None
+
+    def _reverse_edges(self) -> Dict[str, Tuple[int, ...]]:
+        edges: Dict[str, List[int]] = {}
+        for q in self.by_id.values():
+            for key in q.refs:
+                number = self._ref_number(key)
+                if number is None or number == q.number:
+                    continue
+                bucket = edges.setdefault(number, [])
+                if q.id not in bucket:
+                    bucket.append(q.id)
+        return {number: tuple(qids) for number, qids in edges.items()}
+
+    def _topological_order(self) -> Dict[int, int]:
+        # Kahn; вершины из циклов (если такие вдруг есть) уходят в конец по id
+        indegree: Dict[int, int] = {qid: 0 for qid in self.by_id}
+        for number, qids in self.dependents.items():
+            fan_in = len(self.by_number.get(number, ()))
+            for qid in qids:
+                indegree[qid] += fan_in
+        ready = [qid for qid, deg in indegree.items() if deg == 0]
+        heapq.heapify(ready)
+        order: Dict[int, int] = {}
+        while ready:
+            qid = heapq.heappop(ready)
+            order[qid] = len(order)
+            for child in self.dependents.get(self.by_id[qid].number, ()):
+                indegree[child] -= 1
+                if indegree[child] == 0:
+                    heapq.heappush(ready, child)
+        for qid in sorted(self.by_id):
+            if qid not in order:
+                order[qid] = len(order)
+        return order
+
+
+# ---------- compiler ----------
+
+
+def compile_plan(version_id: int, questions: Iterable[Any]) -> ValidationPlan:
+    """Compile all questions of a version into a ValidationPlan."""
+    questions = list(questions)
+    numbers = frozenset(q.number for q in questions)
+    return ValidationPlan(
+        version_id, (compile_question(q, numbers) for q in questions)
+    )
+
+
+def compile_question(
+    question: Any, numbers: Optional[Container[str]] = None
+) -> CompiledQuestion:
+    """
+    Compile a single ORM/schema question into a CompiledQuestion.
+    `numbers` — question numbers of the version, used to tell answer
+    references from decimal literals in expressions.
+    """
+    qtype = (question.type or "").strip().lower()
+    constraints = load_json(question.constraints)
+    if not isinstance(constraints, dict):
+        constraints = {}
+    options = load_json(question.options)
+
+    pre: List[Rule] = []
+    post: List[Rule] = []
+    refs = collect_refs(constraints)
+    # битое выражение не должно ломать план всей версии, но и молча
+    # выпадать нельзя: вместо правила — проверка, отклоняющая любой ответ.
+    # Новые вопросы отсекает QuestionService (check_expressions), сюда
+    # попадают старые строки и импорт в обход него
+    try:
+        _compile_depends_on(constraints, pre, numbers)
+    except ExpressionError as e:
+        pre.append(_broken("depends_on", question, e))
+    try:
+        calc = compile_calculation(constraints, numbers)
+    except ExpressionError as e:
+        calc = None
+        pre.append(_broken("calculation", question, e))
+    _compile_condition(constraints, pre)
+    _compile_area_rules(constraints, post)
+    _compile_elevator_rules(constraints, post)
+    _compile_max_ref_rules(constraints, post)
+    if calc is not None:
+        refs.extend(f"num:{number}" for number in calc.refs)
+    dyn = None
+    if qtype in CHOICE_TYPES:
+        try:
+            dyn = compile_options(options, constraints, numbers)
+        except ExpressionError as e:
+            dyn = compile_options(None, constraints, numbers)
+            pre.append(_broken("options", question, e))
+        if dyn.is_dynamic:
+            post.append(Rule("options", dyn.check))
+            refs.extend(f"num:{number}" for number in dyn.refs)
+
+    return CompiledQuestion(
+        id=question.id,
+        version_id=question.version_id,
+        number=question.number,
+        type=qtype,
+        coerce=_compile_coercer(qtype, options, constraints, dyn),
+        pre_rules=tuple(pre),
+        post_rules=tuple(post),
+        refs=tuple(dict.fromkeys(refs)),
+        calc=calc,
+        options=dyn,
+    )
+
+
+def _broken(family: str, question: Any, error: ExpressionError) -> Rule:
+    """Rule standing in for one that failed to compile: rejects every answer."""
+    logger.warning(
+        "Question %s (id=%s) has an invalid %s expression: %s",
+        question.number, question.id, family, error,
+    )
+    message = (
+        f"Question {question.number} has an invalid {family} expression "
+        f"({error}); answers are rejected until it is fixed."
+    )
+
+    def check_broken(value: JSONValue, ctx: Context) -> None:
+        raise ValueError(message)
+
+    return Rule(family, check_broken)
+
+
+def compile_calculation(
+    constraints: Dict[str, Any], numbers: Optional[Container[str]] = None
+) -> Optional[Expression]:
+    """
+    Compile constraints.calculation: an expression string or a range table
+    over constraints.calculation_input.
+    """
+    calc = constraints.get("calculation")
+    if calc is None:
+        return None
+    if isinstance(calc, str):
+        return compile_expression(calc, numbers)
+    if isinstance(calc, dict):
+        source = constraints.get("calculation_input")
+        if not source:
+            raise ExpressionError("Range table requires calculation_input")
+        return compile_range_table(calc, str(source))
+    raise ExpressionError("calculation must be a string or a range table")
+
+
+def check_expressions(constraints: Any) -> None:
+    """Parse every expression in constraints; raises ExpressionError (ValueError)."""
+    constraints = load_json(constraints)
+    if not isinstance(constraints, dict):
+        return
+    compile_calculation(constraints)
+    if isinstance(constraints.get("condition"), str):
+        compile_condition(constraints["condition"])
+
+
+def load_json(value: Any) -> Any:
+    """Decode JSON stored as text (legacy rows), pass through everything else."""
+    if isinstance(value, str):
+        try:
+            return json.loads(value)
+        except ValueError:
+            return None
+    return value
+
+
+# ---------- type coercion ----------
+
+
+# типы вопросов с выбором из вариантов (options.values / dynamic_options)
+CHOICE_TYPES = ("dropdown", "select", "choice")
+
+
+def _compile_coercer(
+    qtype: str,
+    options: Any,
+    constraints: Dict[str, Any],
+    dyn: Optional[DynamicOptions] = None,
+) -> Coercer:
+    if qtype in ("boolean", "bool"):
+        return parse_bool
+
+    if qtype in ("integer", "int"):
+        check = _compile_min_max(constraints)
+
+        def coerce_int(raw: JSONValue) -> int:
+            ival = parse_int(raw)
+            check(ival)
+            return ival
+
+        return coerce_int
+
+    if qtype in ("number", "float", "decimal"):
+        check = _compile_min_max(constraints)
+
+        def coerce_float(raw: JSONValue) -> float:
+            fval = parse_float(raw)
+            check(fval)
+            return fval
+
+        return coerce_float
+
+    if qtype in CHOICE_TYPES:
+        if dyn is not None and dyn.is_dynamic:
+            # допустимость проверяет правило "options" по контексту
+            return _coerce_choice_multi
+        allowed = None
+        if isinstance(options, dict):
+            allowed = options.get("values")
+        elif isinstance(options, list):
+            allowed = options
+        if not allowed:
+            return _coerce_choice_any
+        allowed_set = _freeze(allowed)
+
+        def coerce_choice(raw: JSONValue) -> str:
+            sval = str(raw) if raw is not None else ""
+            if sval not in allowed_set:
+                raise ValueError(f"Value '{sval}' is not in allowed options.")
+            return sval
+
+        return coerce_choice
+
+    # text/string/unknown
+    check_len = _compile_len(constraints)
+
+    def coerce_text(raw: JSONValue) -> str:
+        sval = "" if raw is None else str(raw)
+        check_len(sval)
+        return sval
+
+    return coerce_text
+
+
+def _coerce_choice_any(raw: JSONValue) -> str:
+    return str(raw) if raw is not None else ""
+
+
+def _coerce_choice_multi(raw: JSONValue) -> JSONValue:
+    # динамические списки допускают множественный выбор ("Выберите корпуса")
+    if isinstance(raw, (list, tuple)):
+        return sorted(selected_items(raw), key=_option_sort_key)
+    return _coerce_choice_any(raw)
+
+
+def _option_sort_key(value: str) -> Tuple[int, Any]:
+    return (0, int(value)) if value.isdigit() else (1, value)
+
+
+def _compile_min_max(constraints: Dict[str, Any]) -> Callable[[Any], None]:
+    has_lo = "min" in constraints
+    has_hi = "max" in constraints
+    lo = constraints.get("min")
+    hi = constraints.get("max")
+
+    def check(value: Any) -> None:
+        if has_lo and value < lo:
+            raise ValueError(f"Value {value} is below min={lo}")
+        if has_hi and value > hi:
+            raise ValueError(f"Value {value} is above max={hi}")
+
+    return check
+
+
+def _compile_len(constraints: Dict[str, Any]) -> Callable[[str], None]:
+    has_lo = "min_length" in constraints
+    has_hi = "max_length" in constraints
+    lo = constraints.get("min_length")
+    hi = constraints.get("max_length")
+
+    def check(s: str) -> None:
+        if has_lo and len(s) < lo:
+            raise ValueError(f"Text length {len(s)} is below min_length={lo}")
+        if has_hi and len(s) > hi:
+            raise ValueError(f"Text length {len(s)} exceeds max_length={hi}")
+
+    return check
+
+
+# ---------- rule families ----------
+
+
+def _compile_depends_on(
+    constraints: Dict[str, Any],
+    rules: List[Rule],
+    numbers: Optional[Container[str]] = None,
+) -> None:
+    dep = constraints.get("depends_on")
+    if not dep:
+        return
+    if isinstance(dep, (str, list)):
+        _compile_depends_on_numbers(dep, constraints.get("condition"), rules, numbers)
+        return
+    key = ref_key(dep)
+    if key is None:
+        return  # нет ссылки на вопрос — проверять нечего
+    allowed = dep.get("values")
+    if allowed is None:
+        return
+    contains = _contains(allowed)
+
+    def check_depends_on(value: JSONValue, ctx: Context) -> None:
+        if not contains(ctx.get(key)):
+            raise ValueError("Question is disabled by depends_on condition.")
+
+    rules.append(Rule("depends_on", check_depends_on))
+
+
+def _compile_depends_on_numbers(
+    dep: Union[str, List[str]],
+    condition: Any,
+    rules: List[Rule],
+    numbers: Optional[Container[str]],
+) -> None:
+    # формат анкеты: depends_on: "4.11" + condition: "True" / ">0";
+    # без condition — ответы на все перечисленные вопросы должны быть даны
+    keys = tuple(f"num:{n}" for n in ([dep] if isinstance(dep, str) else dep))
+    if isinstance(condition, str) and condition.strip():
+        expr = compile_condition(condition, numbers)
+
+        def check_condition_on(value: JSONValue, ctx: Context) -> None:
+            for key in keys:
+                if not expr.evaluate(ctx, ctx.get(key)):
+                    raise ValueError("Question is disabled by depends_on condition.")
+
+        rules.append(Rule("depends_on", check_condition_on))
+        return
+
+    def check_answered(value: JSONValue, ctx: Context) -> None:
+        for key in keys:
+            if ctx.get(key) is None:
+                raise ValueError(f"Response for {key[4:]} required")
+
+    rules.append(Rule("depends_on", check_answered))
+
+
+_OPS: Dict[str, Callable[[Any, Any], bool]] = {
+    ">": operator.gt,
+    ">=": operator.ge,
+    "<": operator.lt,
+    "<=": operator.le,
+}
+
+
+def _compile_condition(constraints: Dict[str, Any], rules: List[Rule]) -> None:
+    cond = constraints.get("condition")
+    if not cond or not isinstance(cond, dict):
+        return
+    resolve_left = _compile_ref(cond.get("left"))
+    right = cond.get("right")
+    op = (cond.get("op") or "==").lower()
+
+    if op == "==":
+        test = lambda left: left == right  # noqa: E731
+    elif op == "!=":
+        test = lambda left: left != right  # noqa: E731
+    elif op in _OPS:
+        test = _safe_cmp(_OPS[op], right)
+    elif op == "in":
+        test = _contains(right)
+    elif op == "not_in":
+        inner = _contains(right)
+        test = lambda left: not inner(left)  # noqa: E731
+    else:
+
+        def check_unsupported(value: JSONValue, ctx: Context) -> None:
+            raise ValueError(f"Unsupported condition op: {op}")
+
+        rules.append(Rule("condition", check_unsupported))
+        return
+
+    def check_condition(value: JSONValue, ctx: Context) -> None:
+        if not test(resolve_left(ctx)):
+            raise ValueError("Condition failed.")
+
+    rules.append(Rule("condition", check_condition))
+
+
+def _compile_area_rules(constraints: Dict[str, Any], rules: List[Rule]) -> None:
+    # total == sum(parts)
+    if "area_total_of" in constraints:
+        part_keys = tuple(f"num:{num}" for num in constraints["area_total_of"])
+        tolerance = float(constraints.get("tolerance", 0.0))
+
+        def check_area_total(value: JSONValue, ctx: Context) -> None:
+            total = to_float(value)
+            s = 0.0
+            for key in part_keys:
+                s += to_float(ctx.get(key))
+            if abs(total - s) > tolerance:
+                raise ValueError(
+                    f"Area total mismatch: total={total} != sum(parts)={s} (tolerance={tolerance})"
+                )
+
+        rules.append(Rule("area", check_area_total))
+
+    # part <= total
+    if "area_part_of" in constraints:
+        total_key = f"num:{constraints['area_part_of']}"
+        tolerance = float(constraints.get("tolerance", 0.0))
+
+        def check_area_part(value: JSONValue, ctx: Context) -> None:
+            part = to_float(value)
+            total = to_float(ctx.get(total_key))
+            if part - total > tolerance:
+                raise ValueError(
+                    f"Area part {part} exceeds total {total} (tolerance={tolerance})"
+                )
+
+        rules.append(Rule("area", check_area_part))
+
+
+def _compile_max_ref_rules(constraints: Dict[str, Any], rules: List[Rule]) -> None:
+    # value <= ответ на max_ref (стилобатов не больше, чем корпусов)
+    ref = constraints.get("max_ref")
+    if isinstance(ref, (str, int)) and not isinstance(ref, bool):
+        ref_key = f"num:{ref}"
+
+        def check_max_ref(value: JSONValue, ctx: Context) -> None:
+            limit = ctx.get(ref_key)
+            if limit is None:
+                return  # на вопрос-ограничитель ещё не ответили
+            if to_float(value) > to_float(limit):
+                raise ValueError(f"Value {value} exceeds the answer to {ref} ({limit}).")
+
+        rules.append(Rule("max_ref", check_max_ref))
+
+    # value <= percent% ответа на ref (площадь квартир — не больше 80% общей)
+    rule = constraints.get("max_ref_percent")
+    if isinstance(rule, dict) and rule.get("ref") is not None:
+        percent_ref = rule["ref"]
+        percent_key = f"num:{percent_ref}"
+        percent = float(rule.get("percent", 100))
+
+        def check_max_ref_percent(value: JSONValue, ctx: Context) -> None:
+            base = ctx.get(percent_key)
+            if base is None:
+                return
+            limit = to_float(base) * percent / 100
+            if to_float(value) > limit:
+                raise ValueError(
+                    f"Value {value} exceeds {percent:g}% of the answer to "
+                    f"{percent_ref} ({limit:g})."
+                )
+
+        rules.append(Rule("max_ref", check_max_ref_percent))
+
+
+def _compile_elevator_rules(constraints: Dict[str, Any], rules: List[Rule]) -> None:
+    # floors >= min -> elevator must be true
+    rule = constraints.get("requires_elevator_if")
+    if rule:
+        floors_key = _num_key_or_none(rule.get("floors_question"))
+        min_floors = int(rule.get("min_floors", 5))
+        elev_key = f"num:{rule.get('elevator_question')}"
+
+        def check_requires_elevator(value: JSONValue, ctx: Context) -> None:
+            floors = to_int(ctx.get(floors_key) if floors_key else value)
+            has_elev = to_bool(ctx.get(elev_key))
+            if floors is not None and floors >= min_floors and has_elev is False:
+                raise ValueError(f"Elevator required when floors >= {min_floors}.")
+
+        rules.append(Rule("elevator", check_requires_elevator))
+
+    # no elevator -> floors must be <= max
+    rule2 = constraints.get("no_elevator_max_floors")
+    if rule2:
+        floors_key2 = _num_key_or_none(rule2.get("floors_question"))
+        max_no = int(rule2.get("max", 5))
+        elev_key2 = f"num:{rule2.get('elevator_question')}"
+
+        def check_no_elevator(value: JSONValue, ctx: Context) -> None:
+            floors = to_int(ctx.get(floors_key2) if floors_key2 else value)
+            has_elev = to_bool(ctx.get(elev_key2))
+            if has_elev is False and floors is not None and floors > max_no:
+                raise ValueError(
+                    f"Floors {floors} exceed allowed maximum {max_no} without elevator."
+                )
+
+        rules.append(Rule("elevator", check_no_elevator))
+
+
+# ---------- references ----------
+
+
+def ref_key(ref: Any) -> Optional[str]:
+    """Context key for a {"question_id"|"question_number": ...} reference."""
+    if not isinstance(ref, dict):
+        return None
+    if "question_id" in ref:
+        return f"id:{ref['question_id']}"
+    if "question_number" in ref:
+        return f"num:{ref['question_number']}"
+    return None
+
+
+def collect_refs(constraints: Dict[str, Any]) -> List[str]:
+    """Context keys of every question referenced by the constraints."""
+    keys: List[str] = []
+
+    def add(ref: Any) -> None:
+        if isinstance(ref, dict):
+            key = ref_key(ref)
+            if key is not None:
+                keys.append(key)
+        elif isinstance(ref, (list, tuple)):
+            for item in ref:
+                add(item)
+        elif isinstance(ref, (str, int, float)) and not isinstance(ref, bool):
+            keys.append(f"num:{ref}")
+
+    add(constraints.get("depends_on"))
+    cond = constraints.get("condition")
+    if isinstance(cond, dict) and isinstance(cond.get("left"), dict):
+        add(cond["left"])
+    add(constraints.get("area_total_of"))
+    add(constraints.get("area_part_of"))
+    for name in ("requires_elevator_if", "no_elevator_max_floors"):
+        rule = constraints.get(name)
+        if isinstance(rule, dict):
+            add(rule.get("floors_question"))
+            add(rule.get("elevator_question"))
+    add(constraints.get("max_ref"))
+    percent = constraints.get("max_ref_percent")
+    if isinstance(percent, dict):
+        add(percent.get("ref"))
+    return list(dict.fromkeys(keys))
+
+
+def _compile_ref(ref: Any) -> Callable[[Context], JSONValue]:
+    if isinstance(ref, dict):
+        key = ref_key(ref)
+        if key is None:
+            return lambda ctx: None
+        return lambda ctx: ctx.get(key)
+    return lambda ctx: ref
+
+
+def _num_key_or_none(number: Optional[str]) -> Optional[str]:
+    # если правило ссылается на «текущий вопрос» (например, floors) — берём его value
+    return f"num:{number}" if number else None
+
+
+# ---------- tiny utils ----------
+
+
+def _freeze(values: Iterable[Any]) -> Union[frozenset, tuple]:
+    try:
+        return frozenset(values)
+    except TypeError:
+        return tuple(values)
+
+
+def _contains(bag: Any) -> Callable[[JSONValue], bool]:
+    if isinstance(bag, (list, tuple, set)):
+        frozen = _freeze(bag)
+
+        def contains(val: JSONValue) -> bool:
+            try:
+                return val in frozen
+            except TypeError:
+                return False
+
+        return contains
+    return lambda val: val == bag
+
+
+def _safe_cmp(op: Callable[[Any, Any], bool], right: Any) -> Callable[[Any], bool]:
+    def test(left: Any) -> bool:
+        try:
+            return op(left, right)
+        except Exception:
+            return False
+
+    return test
+
+
+def parse_bool(v) -> bool:
+    if isinstance(v, bool):
+        return v
+    if isinstance(v, (int, float)):
+        return bool(int(v))
+    if isinstance(v, str):
+        s = v.strip().lower()
+        if s in TRUE_WORDS:
+            return True
+        if s in FALSE_WORDS:
+            return False
+    raise ValueError("Invalid boolean value")
+
+
+def parse_int(v) -> int:
+    if isinstance(v, int) and not isinstance(v, bool):
+        return v
+    try:
+        return int(str(v).strip())
+    except Exception:
+        raise ValueError("Invalid integer value")
+
+
+def parse_float(v) -> float:
+    try:
+        return float(str(v).strip())
+    except Exception:
+        raise ValueError("Invalid number value")
+
+
+def to_float(v) -> float:
+    if v is None:
+        return 0.0
+    try:
+        return float(v)
+    except Exception:
+        return 0.0
+
+
+def to_int(v) -> Optional[int]:
+    try:
+        return int(v)
+    except Exception:
+        return None
+
+
+def to_bool(v) -> Optional[bool]:
+    if v is None:
+        return None
+    if isinstance(v, bool):
+        return v
+    if isinstance(v, (int, float)):
+        return bool(int(v))
+    if isinstance(v, str):
+        s = v.strip().lower()
+        if s in TRUE_WORDS:
+            return True
+        if s in FALSE_WORDS:
+            return False
+    return None
@@ -1,15 +1,54 @@
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
+from db.unit_of_work import after_commit, async_unit_of_work, unit_of_work
 from domain.schemas import VersionCreate, VersionUpdate, Version
-from repositories.version import VersionRepository
+from repositories.partition import ResponsePartitions
+from repositories.question import QuestionRepository
+from repositories.response import ResponseRepository
+from repositories.snapshot import SnapshotRepository
+from repositories.stats import StatsRepository
+from repositories.version import AsyncVersionRepository, VersionRepository
+from services.invalidation import invalidate_version
 from typing import List
 
+
+class VersionPublishedError(Exception):
+    """Write to the questions of a published version (409 in the API)."""
+
+
+def check_draft(db: Session, version_id: int) -> None:
+    """Raise VersionPublishedError unless the version's questions may change."""
+    if VersionRepository(db).is_published(version_id):
+        raise VersionPublishedError(version_id)
+
+
+async def check_draft_async(db: AsyncSession, version_id: int) -> None:
+    if await AsyncVersionRepository(db).is_published(version_id):
+        raise VersionPublishedError(version_id)
+
+
 class VersionService:
     def __init__(self, db: Session):
+        self.db = db
         self.repo = VersionRepository(db)
+        self.partitions = ResponsePartitions(db)
 
     def create(self, version: VersionCreate) -> Version:
         """Create a new survey version."""
-        return self.repo.create(version)
+        with unit_of_work(self.db):
+            created = self.repo.create(version)
+            # секция ответов — в той же транзакции: DDL в PostgreSQL транзакционный
+            self.partitions.create(created.id)
+            return created
+
+    def clone(self, version_id: int, version: VersionCreate) -> Version | None:
+        """Create a version holding a copy of every question of `version_id`."""
+        if self.repo.get(version_id) is None:
+            return None
+        with unit_of_work(self.db):
+            created = self.create(version)
+            QuestionRepository(self.db).copy_version(version_id, created.id)
+            return created
 
     def get_all(self) -> List[Version]:
         """Retrieve all survey versions."""
@@ -21,8 +60,60 @@ class VersionService:
 
     def update(self, version_id: int, version: VersionUpdate) -> Version | None:
         """Update an existing version."""
-        return self.repo.update(version_id, version)
+        with unit_of_work(self.db):
+            return self.repo.update(version_id, version)
+
+    def publish(self, version_id: int) -> Version | None:
+        """
+        Freeze a version: its questions can no longer change, so the
+        serialized questionnaire is cached for good. Idempotent; there is
+        no way back — changes go into a clone.
+        """
+        with unit_of_work(self.db):
+            return self.repo.publish(version_id)
+
+    def archive(self, version_id: int, drop: bool = False) -> bool:
+        """
+        Take a version's responses out of the live table: detach its
+        partition (the rows stay in a standalone responses_v<id> table) or,
+        with `drop`, remove them. Without partitions only `drop` applies,
+        as a plain DELETE. Returns False when there was nothing to archive.
+        """
+        with unit_of_work(self.db):
+            if not drop:
+                archived = self.partitions.detach(version_id) is not None
+            elif self.partitions.enabled:
+                archived = self.partitions.drop(version_id)
+            else:
+                archived = ResponseRepository(self.db).delete_by_version(version_id) > 0
+            if archived:
+                # сводки и снимки описывают ответы, которых в таблице больше нет
+                StatsRepository(self.db).clear_version(version_id)
+                SnapshotRepository(self.db).clear_version(version_id)
+                after_commit(self.db, lambda: invalidate_version(version_id))
+        return archived
+
+
+class AsyncVersionService:
+    def __init__(self, db: AsyncSession):
+        self.db = db
+        self.repo = AsyncVersionRepository(db)
+
+    async def create(self, version: VersionCreate) -> Version:
+        async with async_unit_of_work(self.db):
+            created = await self.repo.create(version)
+            await self.db.run_sync(
+                lambda session: ResponsePartitions(session).create(created.id)
+            )
+            return created
+
+    async def get(self, version_id: int) -> Version | None:
+        return await self.repo.get(version_id)
+
+    async def update(self, version_id: int, version: VersionUpdate) -> Version | None:
+        async with async_unit_of_work(self.db):
+            return await self.repo.update(version_id, version)
 
-    def delete(self, version_id: int) -> bool:
-        """Delete a version by ID."""
-        return self.repo.delete(version_id)
\ No newline at end of file
+    async def publish(self, version_id: int) -> Version | None:
+        async with async_unit_of_work(self.db):
+            return await self.repo.publish(version_id)
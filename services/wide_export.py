@@ -0,0 +1,287 @@
+# services/wide_export.py
+"""
+Широкая выгрузка версии: строка на пользователя, колонка на номер вопроса,
+в Parquet или Arrow IPC (stream).
+
+Тип колонки берётся из Question.type: integer → int64, float → float64,
+boolean → bool, dropdown → dictionary<int32, string> со словарём из
+options.values (динамические списки с множественным выбором — list<string>),
+остальное — string. Матрица строится пачками пользователей
+(USERS_PER_CHUNK): на каждую пачку — один RecordBatch / row group, который
+сразу уходит клиенту, поэтому память ограничена размером пачки, а не версии.
+"""
+
+import io
+import json
+from typing import (
+    Any,
+    AsyncIterator,
+    Callable,
+    Iterable,
+    Iterator,
+    List,
+    Optional,
+    Sequence,
+)
+
+from sqlalchemy import distinct, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+from domain.models import Question, Response
+from services.catalog import CatalogQuestion
+from services.expressions import ExpressionError
+from services.options import compile_options
+from services.validation import CHOICE_TYPES, parse_bool, parse_float, parse_int
+
+FORMATS = {
+    "parquet": "application/vnd.apache.parquet",
+    "arrow": "application/vnd.apache.arrow.stream",
+}
+
+USERS_PER_CHUNK = 10000
+
+_r = Response.__table__.c
+
+
+def _users_statement(version_id: int, after: Optional[int], limit: int):
+    stmt = select(distinct(_r.user_id)).where(_r.version_id == version_id)
+    if after is not None:
+        stmt = stmt.where(_r.user_id > after)
+    return stmt.order_by(_r.user_id).limit(limit)
+
+
+def _cells_statement(version_id: int, user_ids: Sequence[int]):
+    # пачка — непрерывный диапазон user_id, так что хватает BETWEEN вместо IN
+    return select(_r.user_id, _r.question_id, _r.response_value).where(
+        _r.version_id == version_id, _r.user_id.between(user_ids[0], user_ids[-1])
+    )
+
+
+def _questions_statement(version_id: int):
+    return select(Question).where(Question.version_id == version_id)
+
+
+# ---------- columns ----------
+
+
+def _lenient(parse: Callable[[Any], Any]) -> Callable[[Any], Any]:
+    # старые ответы могли сохраниться до приведения типов — такие ячейки пустые
+    def convert(value: Any) -> Any:
+        try:
+            return parse(value)
+        except ValueError:
+            return None
+
+    return convert
+
+
+def _as_text(value: Any) -> str:
+    if isinstance(value, (dict, list)):
+        return json.dumps(value, ensure_ascii=False)
+    return str(value)
+
+
+def _as_choices(value: Any) -> List[str]:
+    return [str(v) for v in value] if isinstance(value, (list, tuple)) else [str(value)]
+
+
+class _Column:
+    """One question column: its Arrow type and value converter."""
+
+    __slots__ = ("question_id", "name", "type", "convert", "dictionary")
+
+    def __init__(self, pa, question: CatalogQuestion, name: str) -> None:
+        self.question_id = question.id
+        self.name = name
+        self.dictionary = None
+        qtype = (question.type or "").lower()
+        if qtype in ("integer", "int"):
+            self.type, self.convert = pa.int64(), _lenient(parse_int)
+        elif qtype in ("number", "float", "decimal"):
+            self.type, self.convert = pa.float64(), _lenient(parse_float)
+        elif qtype in ("boolean", "bool"):
+            self.type, self.convert = pa.bool_(), _lenient(parse_bool)
+        elif qtype in CHOICE_TYPES:
+            constraints = question.constraints or {}
+            try:
+                options = compile_options(question.options, constraints)
+            except ExpressionError:
+                options = compile_options(None, constraints)
+            values = options.static[0]
+            if options.is_dynamic:
+                self.type, self.convert = pa.list_(pa.string()), _as_choices
+            elif values:
+                # фиксированный словарь — одинаковый во всех пачках
+                index = {v: i for i, v in enumerate(values)}
+                self.dictionary = pa.array(values, pa.string())
+                self.type = pa.dictionary(pa.int32(), pa.string())
+                self.convert = lambda value: index.get(str(value))
+            else:
+                self.type, self.convert = pa.dictionary(pa.int32(), pa.string()), str
+        else:
+            self.type, self.convert = pa.string(), _as_text
+
+    def array(self, pa, cells: List[Any]):
+        if self.dictionary is not None:
+            return pa.DictionaryArray.from_arrays(
+                pa.array(cells, pa.int32()), self.dictionary
+            )
+        if pa.types.is_dictionary(self.type):
+            return pa.array(cells, pa.string()).dictionary_encode()
+        return pa.array(cells, self.type)
+
+
+class WideMatrix:
+    """Schema of a version's user × question matrix and its batch builder."""
+
+    def __init__(self, questions: Iterable[Any]) -> None:
+        # pyarrow тяжёлый — импортируем только при выгрузке, не при старте API
+        import pyarrow as pa
+
+        self._pa = pa
+        items = sorted((CatalogQuestion(q) for q in questions), key=lambda q: q.id)
+        seen = set()
+        self.columns: List[_Column] = []
+        for q in items:
+            # номера в анкете могут повторяться — повторам добавляем id
+            name = q.number if q.number not in seen else f"{q.number}#{q.id}"
+            seen.add(q.number)
+            self.columns.append(_Column(pa, q, name))
+        self._by_question = {c.question_id: i for i, c in enumerate(self.columns)}
+        self.schema = pa.schema(
+            [pa.field("user_id", pa.int64(), nullable=False)]
+            + [pa.field(c.name, c.type) for c in self.columns]
+        )
+
+    def chunk(self, user_ids: Sequence[int]) -> "_Chunk":
+        return _Chunk(self, user_ids)
+
+    def writer(self, fmt: str, sink):
+        if fmt == "parquet":
+            import pyarrow.parquet as pq
+
+            return pq.ParquetWriter(sink, self.schema, compression="zstd")
+        return self._pa.ipc.new_stream(sink, self.schema)
+
+
+class _Chunk:
+    """Cells of one slice of users, filled row by row, then one RecordBatch."""
+
+    __slots__ = ("matrix", "user_ids", "row_of", "cells")
+
+    def __init__(self, matrix: WideMatrix, user_ids: Sequence[int]) -> None:
+        self.matrix = matrix
+        self.user_ids = user_ids
+        self.row_of = {u: i for i, u in enumerate(user_ids)}
+        self.cells = [[None] * len(user_ids) for _ in matrix.columns]
+
+    def add(self, user_id: int, question_id: int, value: Any) -> None:
+        col = self.matrix._by_question.get(question_id)
+        if col is None or value is None:
+            return
+        self.cells[col][self.row_of[user_id]] = self.matrix.columns[col].convert(value)
+
+    def batch(self):
+        pa = self.matrix._pa
+        arrays = [pa.array(self.user_ids, pa.int64())] + [
+            column.array(pa, cells)
+            for column, cells in zip(self.matrix.columns, self.cells)
+        ]
+        return pa.RecordBatch.from_arrays(arrays, schema=self.matrix.schema)
+
+
+class _Drain(io.RawIOBase):
+    """Write-only sink the writer fills and the HTTP stream empties."""
+
+    def __init__(self) -> None:
+        super().__init__()
+        self._chunks: List[bytes] = []
+        self._position = 0
+
+    def writable(self) -> bool:
+        return True
+
+    def write(self, data) -> int:
+        data = bytes(data)
+        self._chunks.append(data)
+        self._position += len(data)
+        return len(data)
+
+    def tell(self) -> int:
+        return self._position
+
+    def take(self) -> bytes:
+        data = b"".join(self._chunks)
+        self._chunks.clear()
+        return data
+
+
+# ---------- streams ----------
+
+
+def export_wide(
+    session_factory: Callable[[], Session],
+    version_id: int,
+    fmt: str,
+    users_per_chunk: int = USERS_PER_CHUNK,
+) -> Iterator[bytes]:
+    """Byte stream of a version's wide matrix in `fmt` ("parquet" | "arrow")."""
+    db = session_factory()
+    try:
+        matrix = WideMatrix(db.scalars(_questions_statement(version_id)))
+        drain = _Drain()
+        writer = matrix.writer(fmt, drain)
+        after = None
+        while True:
+            user_ids = db.scalars(
+                _users_statement(version_id, after, users_per_chunk)
+            ).all()
+            if not user_ids:
+                break
+            chunk = matrix.chunk(user_ids)
+            result = db.execute(
+                _cells_statement(version_id, user_ids),
+                execution_options={"stream_results": True, "yield_per": 10000},
+            )
+            for user_id, question_id, value in result:
+                chunk.add(user_id, question_id, value)
+            writer.write_batch(chunk.batch())
+            after = user_ids[-1]
+            yield drain.take()
+        writer.close()
+        yield drain.take()
+    finally:
+        db.close()
+
+
+async def export_wide_async(
+    session_factory: Callable[[], AsyncSession],
+    version_id: int,
+    fmt: str,
+    users_per_chunk: int = USERS_PER_CHUNK,
+) -> AsyncIterator[bytes]:
+    """export_wide over an AsyncSession (ASYNC_DB=true)."""
+    async with session_factory() as db:
+        matrix = WideMatrix(await db.scalars(_questions_statement(version_id)))
+        drain = _Drain()
+        writer = matrix.writer(fmt, drain)
+        after = None
+        while True:
+            user_ids = (
+                await db.scalars(_users_statement(version_id, after, users_per_chunk))
+            ).all()
+            if not user_ids:
+                break
+            chunk = matrix.chunk(user_ids)
+            result = await db.stream(
+                _cells_statement(version_id, user_ids),
+                execution_options={"stream_results": True, "yield_per": 10000},
+            )
+            async for user_id, question_id, value in result:
+                chunk.add(user_id, question_id, value)
+            writer.write_batch(chunk.batch())
+            after = user_ids[-1]
+            yield drain.take()
+        writer.close()
+        yield drain.take()
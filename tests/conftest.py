@@ -7,11 +7,19 @@ from fastapi.testclient import TestClient
 from sqlalchemy import create_engine
 from sqlalchemy.orm import sessionmaker
 
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
 from sqlalchemy.pool import StaticPool
 
 from db.base import Base
-from db.database import get_db
-from main import app  # твой FastAPI(app) в main.py
+from db.codec import engine_options
+from db.async_database import get_async_db, get_async_session_factory
+from db.database import (
+    get_db,
+    get_read_db,
+    get_read_session_factory,
+    get_session_factory,
+)
+from main import app, create_app  # твой FastAPI(app) в main.py
 from domain import models as m  # ORM-модели
 
 # 1) Тестовый in-memory engine c одной "памятью" на весь процесс
@@ -22,6 +30,7 @@ engine = create_engine(
     connect_args={"check_same_thread": False},
     poolclass=StaticPool,  # важно для общей in-memory
     future=True,
+    **engine_options(),  # JSON-колонки — тем же кодеком, что и в приложении
 )
 
 TestingSessionLocal = sessionmaker(
@@ -63,13 +72,62 @@ def client(db_session) -> Generator[TestClient, None, None]:
 
     # override dependency
     app.dependency_overrides[get_db] = _get_test_db
+    app.dependency_overrides[get_read_db] = _get_test_db
+    app.dependency_overrides[get_read_session_factory] = lambda: TestingSessionLocal
+    app.dependency_overrides[get_session_factory] = lambda: TestingSessionLocal
     try:
         yield TestClient(app)
     finally:
         app.dependency_overrides.clear()
 
 
-# 5) Удобные фикстуры-«сидеры»
+# 5) async-профиль: async-роуты поверх aiosqlite (своя in-memory БД)
+def _reset_process_caches() -> None:
+    # кэши процесса общие для профилей, а id версий в двух БД совпадают
+    from services.answer_cache import answer_ctx_cache
+    from services.catalog import question_catalog
+    from services.questionnaire import questionnaire_cache
+
+    question_catalog.clear()
+    questionnaire_cache.clear()
+    answer_ctx_cache.clear()
+
+
+@pytest.fixture()
+def async_client() -> Generator[TestClient, None, None]:
+    async_engine = create_async_engine(
+        "sqlite+aiosqlite://",
+        connect_args={"check_same_thread": False},
+        poolclass=StaticPool,
+        **engine_options(),
+    )
+    sessions = async_sessionmaker(
+        bind=async_engine, autoflush=False, expire_on_commit=False
+    )
+
+    async def _get_test_db():
+        async with sessions() as db:
+            yield db
+
+    async def _create_schema():
+        async with async_engine.begin() as conn:
+            await conn.run_sync(Base.metadata.create_all)
+
+    async_app = create_app(async_db=True)
+    async_app.dependency_overrides[get_async_db] = _get_test_db
+    async_app.dependency_overrides[get_async_session_factory] = lambda: sessions
+    _reset_process_caches()
+    try:
+        # один event loop на весь тест: соединение aiosqlite к нему привязано
+        with TestClient(async_app) as c:
+            c.portal.call(_create_schema)
+            yield c
+            c.portal.call(async_engine.dispose)
+    finally:
+        _reset_process_caches()
+
+
+# 6) Удобные фикстуры-«сидеры»
 @pytest.fixture()
 def version(db_session):
     v = m.Version(name="vTest")
@@ -0,0 +1,74 @@
+import time
+
+from domain import models as m
+from services.answer_cache import AnswerContextCache, answer_ctx_cache
+from services.invalidation import invalidate_version
+
+
+def test_lru_eviction_ttl_and_version_invalidation():
+    cache = AnswerContextCache(maxsize=2, ttl=60)
+    cache.put(1, 10, {"id:1": 1})
+    cache.put(2, 10, {"id:1": 2})
+    assert cache.get(1, 10) == {"id:1": 1}  # 1 становится самым свежим
+    cache.put(3, 20, {"id:1": 3})
+    assert cache.get(2, 10) is None  # вытеснен как самый старый
+    assert cache.stats()["hits"] == 1 and cache.stats()["misses"] == 1
+
+    cache.write(1, 10, {"id:2": True})
+    assert cache.get(1, 10) == {"id:1": 1, "id:2": True}
+    cache.forget(1, 10, ("id:1",))
+    assert cache.get(1, 10) == {"id:2": True}
+
+    cache.invalidate_version(10)
+    assert cache.get(1, 10) is None
+    assert cache.get(3, 20) == {"id:1": 3}
+
+    expiring = AnswerContextCache(maxsize=2, ttl=0.01)
+    expiring.put(1, 1, {})
+    time.sleep(0.02)
+    assert expiring.get(1, 1) is None
+
+
+def test_returned_context_is_a_copy():
+    cache = AnswerContextCache(maxsize=2, ttl=60)
+    cache.put(1, 1, {"id:1": 1})
+    cache.get(1, 1)["id:1"] = "mutated"
+    assert cache.get(1, 1) == {"id:1": 1}
+
+
+def test_writes_go_through_the_cache(client, db_session, version, questions):
+    q_bool, _ = questions
+    dependent = m.Question(
+        version_id=version.id,
+        number="1.3",
+        text="Сколько лифтов?",
+        type="integer",
+        constraints={"depends_on": {"question_number": "1.1", "values": [True]}},
+    )
+    db_session.add(dependent)
+    db_session.commit()
+
+    def post(question, value):
+        return client.post(
+            "/responses/",
+            json={
+                "user_id": 41,
+                "version_id": version.id,
+                "question_id": question.id,
+                "response_value": value,
+            },
+        )
+
+    r = post(q_bool, False)
+    assert r.status_code == 201
+    bool_rid = r.json()["id"]
+    hits = answer_ctx_cache.hits
+    assert post(dependent, 2).status_code == 422  # контекст из кэша: лифта нет
+    assert answer_ctx_cache.hits == hits + 1
+
+    r = client.put(f"/responses/{bool_rid}", json={"response_value": True})
+    assert r.status_code == 200
+    assert post(dependent, 2).status_code == 201
+
+    invalidate_version(version.id)
+    assert answer_ctx_cache.get(41, version.id) is None
@@ -0,0 +1,153 @@
+def _seed(client):
+    version_id = client.post("/versions/", json={"name": "async"}).json()["id"]
+
+    def question(number, type, constraints=None):
+        r = client.post(
+            "/questions/",
+            json={
+                "version_id": version_id,
+                "number": number,
+                "text": number,
+                "type": type,
+                "constraints": constraints,
+            },
+        )
+        assert r.status_code == 200, r.text
+        return r.json()["id"]
+
+    total = question("5.1", "integer", {"min": 1})
+    part = question("5.2", "integer", {"area_part_of": "5.1"})
+    return version_id, total, part
+
+
+def test_async_crud_and_validation(async_client):
+    client = async_client
+    version_id, total, part = _seed(client)
+
+    def answer(question_id, value, **params):
+        return client.post(
+            "/responses/",
+            params=params,
+            json={
+                "user_id": 1,
+                "version_id": version_id,
+                "question_id": question_id,
+                "response_value": value,
+            },
+        )
+
+    assert answer(total, 0).status_code == 422
+    r = answer(total, "100")
+    assert r.status_code == 201, r.text
+    total_rid = r.json()["id"]
+    assert r.json()["response_value"] == 100
+    assert answer(total, 90).status_code == 409
+    assert answer(total, 90, upsert=True).json()["id"] == total_rid
+
+    r = client.post(
+        "/responses/batch",
+        json={
+            "user_id": 1,
+            "version_id": version_id,
+            "items": [{"question_id": part, "response_value": 60}],
+        },
+    )
+    assert [i["status"] for i in r.json()["items"]] == ["created"]
+
+    r = client.put(f"/responses/{total_rid}", json={"response_value": 50})
+    assert r.status_code == 200, r.text
+    assert [i["number"] for i in r.json()["invalid_dependents"]] == ["5.2"]
+
+    r = client.get("/responses/", params={"version_id": version_id, "limit": 1})
+    assert len(r.json()) == 1
+    after = r.headers["x-next-cursor"]
+    r = client.get(
+        "/responses/", params={"version_id": version_id, "limit": 1, "after": after}
+    )
+    assert r.json()[0]["question_id"] == part
+    assert "x-next-cursor" not in r.headers
+
+    assert client.delete(f"/responses/{total_rid}").status_code == 204
+    assert client.get(f"/responses/{total_rid}").status_code == 404
+
+
+def test_async_versions_and_questions(async_client):
+    client = async_client
+    version_id, total, _ = _seed(client)
+    assert client.get(f"/versions/{version_id}").json()["name"] == "async"
+    r = client.put(f"/versions/{version_id}", json={"name": "async-2"})
+    assert r.json()["name"] == "async-2"
+
+    r = client.put(f"/questions/{total}", json={"constraints": {"min": 5}})
+    assert r.status_code == 200, r.text
+    r = client.post(
+        "/responses/",
+        json={
+            "user_id": 2,
+            "version_id": version_id,
+            "question_id": total,
+            "response_value": 3,
+        },
+    )
+    # каталог версии сброшен обновлением вопроса
+    assert r.status_code == 422 and "min=5" in r.text
+
+    pages = client.get("/questions/", params={"version_id": version_id}).json()
+    assert [q["number"] for q in pages] == ["5.1", "5.2"]
+    assert client.delete(f"/questions/{total}").json() is True
+    assert client.get(f"/questions/{total}").status_code == 404
+
+
+def test_async_export(async_client):
+    client = async_client
+    version_id, total, _ = _seed(client)
+    client.post(
+        "/responses/",
+        json={
+            "user_id": 3,
+            "version_id": version_id,
+            "question_id": total,
+            "response_value": 7,
+        },
+    )
+    r = client.get(
+        f"/versions/{version_id}/responses/export",
+        params={"format": "csv"},
+        headers={"Accept-Encoding": "gzip"},
+    )
+    assert r.status_code == 200
+    assert r.headers["content-encoding"] == "gzip"
+    header, row = r.text.splitlines()
+    assert header.startswith("id,user_id")
+    assert row.split(",")[4:6] == ["5.1", "7"]
+
+
+def test_async_bulk_questions(async_client):
+    client = async_client
+    version_id = client.post("/versions/", json={"name": "bulk"}).json()["id"]
+    payload = [
+        {"number": "1", "text": "a", "type": "text"},
+        {"number": "1", "text": "a", "type": "text"},
+        {"number": "2", "text": "b", "type": "integer"},
+    ]
+    r = client.post(f"/versions/{version_id}/questions/bulk", json=payload)
+    assert r.status_code == 200, r.text
+    assert (r.json()["inserted"], r.json()["duplicates"]) == (2, 1)
+    again = client.post(f"/versions/{version_id}/questions/bulk", json=payload)
+    assert (again.json()["inserted"], again.json()["existing"]) == (0, 2)
+
+
+def test_async_clone_and_carry_over(async_client):
+    client = async_client
+    version_id, total, _ = _seed(client)
+    client.post(
+        "/responses/",
+        json={"user_id": 3, "version_id": version_id, "question_id": total, "response_value": 7},
+    )
+    cloned = client.post(f"/versions/{version_id}/clone", json={"name": "next"})
+    assert cloned.status_code == 200, cloned.text
+    target = cloned.json()["id"]
+    r = client.post(f"/versions/{target}/carry-over", params={"all_questions": True})
+    assert r.status_code == 200, r.text
+    assert r.json()["source_version_id"] == version_id
+    assert r.json()["carried"] == 1
@@ -0,0 +1,88 @@
+from domain import models as m
+
+
+def test_batch_validates_in_dependency_order(client, db_session, version, questions):
+    q_bool, q_int = questions
+    dependent = m.Question(
+        version_id=version.id,
+        number="1.3",
+        text="Сколько лифтов?",
+        type="integer",
+        constraints={"depends_on": {"question_number": "1.1", "values": [True]}},
+    )
+    db_session.add(dependent)
+    db_session.commit()
+
+    r = client.post(
+        "/responses/batch",
+        json={
+            "user_id": 21,
+            "version_id": version.id,
+            # зависимый ответ идёт раньше того, от которого зависит
+            "items": [
+                {"question_id": dependent.id, "response_value": 2},
+                {"question_id": q_bool.id, "response_value": "да"},
+                {"question_id": q_int.id, "response_value": 0},
+                {"question_id": 999999, "response_value": 1},
+            ],
+        },
+    )
+    assert r.status_code == 200, r.text
+    items = r.json()["items"]
+    assert [i["status"] for i in items] == ["created", "created", "invalid", "not_found"]
+    assert items[0]["response"]["response_value"] == 2
+    assert items[1]["response"]["response_value"] is True
+    assert "below min=1" in items[2]["detail"]
+
+    r = client.get(f"/responses/?user_id=21&version_id={version.id}")
+    assert r.status_code == 200
+    assert {i["question_id"] for i in r.json()} == {dependent.id, q_bool.id}
+
+
+def test_batch_rejected_value_does_not_enable_dependents(
+    client, db_session, version, questions
+):
+    q_bool, _ = questions
+    dependent = m.Question(
+        version_id=version.id,
+        number="1.4",
+        text="Тип лифта",
+        type="text",
+        constraints={"depends_on": {"question_number": "1.1", "values": [True]}},
+    )
+    db_session.add(dependent)
+    db_session.commit()
+
+    r = client.post(
+        "/responses/batch",
+        json={
+            "user_id": 22,
+            "version_id": version.id,
+            "items": [
+                {"question_id": q_bool.id, "response_value": "maybe"},
+                {"question_id": dependent.id, "response_value": "грузовой"},
+            ],
+        },
+    )
+    assert r.status_code == 200, r.text
+    assert [i["status"] for i in r.json()["items"]] == ["invalid", "invalid"]
+
+
+def test_batch_conflict_behind_cached_context_is_409(client, db_session, version, questions):
+    q_bool, q_int = questions
+    body = {"user_id": 23, "version_id": version.id}
+    first = {"items": [{"question_id": q_bool.id, "response_value": True}], **body}
+    assert client.post("/responses/batch", json=first).status_code == 200
+
+    # ответ записан в обход сервиса: закэшированный контекст о нём не знает
+    db_session.add(
+        m.Response(
+            user_id=23, version_id=version.id, question_id=q_int.id, response_value=3
+        )
+    )
+    db_session.commit()
+
+    second = {"items": [{"question_id": q_int.id, "response_value": 4}], **body}
+    r = client.post("/responses/batch", json=second)
+    assert r.status_code == 409
+    assert r.json()["detail"] == "Response for this question already exists"
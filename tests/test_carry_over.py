@@ -0,0 +1,125 @@
+from sqlalchemy import event
+
+from services.answer_cache import answer_ctx_cache
+from services.response import ResponseService
+
+
+def _question(client, version_id, number, type, constraints=None):
+    r = client.post(
+        "/questions/",
+        json={
+            "version_id": version_id,
+            "number": number,
+            "text": number,
+            "type": type,
+            "constraints": constraints,
+        },
+    )
+    assert r.status_code == 200, r.text
+    return r.json()["id"]
+
+
+def _answer(client, version_id, question_id, user_id, value):
+    r = client.post(
+        "/responses/",
+        json={
+            "user_id": user_id,
+            "version_id": version_id,
+            "question_id": question_id,
+            "response_value": value,
+        },
+    )
+    assert r.status_code == 201, r.text
+
+
+def _answers(client, version_id, user_id):
+    r = client.get("/responses/", params={"version_id": version_id, "user_id": user_id})
+    return {item["question_id"]: item["response_value"] for item in r.json()}
+
+
+def test_clone_copies_questions(client):
+    source = client.post("/versions/", json={"name": "2025"}).json()["id"]
+    _question(client, source, "2.1.2", "integer", {"min": 1, "prefill_from_previous": True})
+    _question(client, source, "2.1.3", "text")
+
+    r = client.post(f"/versions/{source}/clone", json={"name": "2026"})
+    assert r.status_code == 200, r.text
+    target = r.json()["id"]
+    copied = client.get("/questions/", params={"version_id": target}).json()
+    assert [(q["number"], q["constraints"]) for q in copied] == [
+        ("2.1.2", {"min": 1, "prefill_from_previous": True}),
+        ("2.1.3", None),
+    ]
+    assert client.post("/versions/999999/clone", json={"name": "x"}).status_code == 404
+
+
+def test_carry_over_revalidates_in_batches(client, db_session):
+    source = client.post("/versions/", json={"name": "2025"}).json()["id"]
+    floors = _question(client, source, "2.1.2", "integer", {"prefill_from_previous": True})
+    wall = _question(client, source, "2.1.3", "text", {"prefill_from_previous": True})
+    note = _question(client, source, "9", "text")
+    for user_id, n in ((1, 5), (2, 40), (3, 9)):
+        _answer(client, source, floors, user_id, n)
+        _answer(client, source, wall, user_id, "brick")
+        _answer(client, source, note, user_id, "hello")
+
+    target = client.post("/versions/", json={"name": "2026"}).json()["id"]
+    floors2 = _question(
+        client, target, "2.1.2", "integer", {"max": 30, "prefill_from_previous": True}
+    )
+    wall2 = _question(client, target, "2.1.3", "text", {"prefill_from_previous": True})
+    note2 = _question(client, target, "9", "text")
+    _question(
+        client, target, "3.6", "text",
+        {"read_only": True, "calculation": "II if 2.1.2 < 8 else I"},
+    )
+    _answer(client, target, wall2, 3, "panel")  # уже ответил в новой версии
+
+    answer_ctx_cache.put(1, target, {})
+    answer_ctx_cache.put(99, target, {})  # не из переносимых
+    commits = []
+    record = commits.append
+    event.listen(db_session, "after_commit", record)
+    try:
+        report = ResponseService(db_session).carry_over(source, target, batch_size=2)
+    finally:
+        event.remove(db_session, "after_commit", record)
+    assert (report.users, report.carried, report.rejected) == (3, 4, 1)
+    assert report.calculated == 2
+    assert len(commits) == 2  # по коммиту на пачку пользователей
+    assert answer_ctx_cache.get(1, target) is None
+    assert answer_ctx_cache.get(99, target) == {}
+
+    catalog = {q["number"]: q["id"] for q in client.get(
+        "/questions/", params={"version_id": target}).json()}
+    assert _answers(client, target, 1) == {floors2: 5, wall2: "brick", catalog["3.6"]: "II"}
+    # 40 > max 30 — не переносится, зависимое поле не считается
+    assert _answers(client, target, 2) == {wall2: "brick"}
+    assert _answers(client, target, 3) == {floors2: 9, wall2: "panel", catalog["3.6"]: "I"}
+    assert note2 not in _answers(client, target, 1)
+
+    stats = {s["number"]: s for s in client.get(f"/versions/{target}/stats").json()}
+    assert stats["2.1.2"]["answered"] == 2
+    assert stats["2.1.3"]["answered"] == 3
+
+    # повторный перенос ничего не меняет
+    again = client.post(f"/versions/{target}/carry-over").json()
+    assert (again["source_version_id"], again["carried"]) == (source, 0)
+
+
+def test_carry_over_single_user_all_questions(client):
+    source = client.post("/versions/", json={"name": "a"}).json()["id"]
+    note = _question(client, source, "9", "text")
+    for user_id in (1, 2):
+        _answer(client, source, note, user_id, "hello")
+    target = client.post(f"/versions/{source}/clone", json={"name": "b"}).json()["id"]
+
+    r = client.post(
+        f"/versions/{target}/carry-over",
+        params={"user_id": 2, "all_questions": True, "from_version_id": source},
+    )
+    assert r.status_code == 200, r.text
+    assert (r.json()["users"], r.json()["carried"]) == (1, 1)
+    assert _answers(client, target, 1) == {}
+    assert list(_answers(client, target, 2).values()) == ["hello"]
+    assert client.post("/versions/999999/carry-over").status_code == 404
@@ -0,0 +1,91 @@
+import pytest
+from sqlalchemy import event
+
+from domain import models as m
+from repositories.question import QuestionRepository
+from services.catalog import CatalogCache, QuestionCatalog
+
+
+def test_catalog_indexes_and_parsed_json():
+    catalog = QuestionCatalog(
+        1,
+        [
+            m.Question(
+                id=2, version_id=1, number="2.1.2", text="b", type="integer",
+                constraints='{"min": 1}',
+            ),
+            m.Question(
+                id=1, version_id=1, number="1.1", text="a", type="dropdown",
+                options={"values": ["x"]},
+            ),
+            m.Question(id=3, version_id=1, number="2.1.2", text="dup", type="integer"),
+        ],
+    )
+    assert [q.id for q in catalog.questions] == [1, 2, 3]
+    assert catalog.get(2).constraints == {"min": 1}
+    assert catalog.get_by_number("1.1").options == {"values": ["x"]}
+    assert catalog.get_by_number("2.1.2").id == 2
+    assert catalog.id_to_number[3] == "2.1.2"
+    assert catalog.number_to_id["2.1.2"] == 2
+    with pytest.raises(AttributeError):
+        catalog.get(1).number = "9.9"
+    with pytest.raises(TypeError):
+        catalog.by_id[5] = None
+
+
+def test_get_map_by_ids(db_session, questions):
+    q1, q2 = questions
+    assert QuestionRepository(db_session).get_map_by_ids([q1.id, q2.id]) == {
+        q1.id: "1.1",
+        q2.id: "1.2",
+    }
+
+
+def test_no_question_queries_in_steady_state(client, db_session, version, questions):
+    # id берём заранее: обращение к протухшим ORM-объектам само делает SELECT
+    version_id = version.id
+    q_bool_id, q_int_id = (q.id for q in questions)
+
+    def post(question_id, value):
+        return client.post(
+            "/responses/",
+            json={
+                "user_id": 51,
+                "version_id": version_id,
+                "question_id": question_id,
+                "response_value": value,
+            },
+        )
+
+    assert post(q_bool_id, True).status_code == 201  # прогрев каталога
+
+    statements = []
+
+    def record(conn, cursor, statement, *args):
+        statements.append(statement)
+
+    engine = db_session.get_bind()
+    event.listen(engine, "before_cursor_execute", record)
+    try:
+        assert post(q_int_id, 4).status_code == 201
+    finally:
+        event.remove(engine, "before_cursor_execute", record)
+    assert statements
+    assert not [s for s in statements if "FROM questions" in s]
+
+
+def test_catalog_load_runs_outside_the_lock():
+    cache = CatalogCache()
+
+    def load(version_id):
+        # в async-режиме загрузка уступает event loop, и соседний запрос
+        # того же потока может прийти в get() до её окончания
+        if version_id == 1:
+            cache.get(2, load)
+            cache.invalidate(1)
+        return []
+
+    first = cache.get(1, load)
+    assert cache.get(2, load) is not None
+    # сброс во время загрузки: устаревший каталог не закэширован
+    assert cache.get(1, lambda vid: []) is not first
@@ -0,0 +1,69 @@
+import datetime
+from decimal import Decimal
+
+import pytest
+from fastapi import Response
+
+from api.codec import rows_response
+from db.codec import JSONCodec, engine_options, make_codec
+from domain import models as m
+from domain.schemas import Response as ResponseSchema
+
+
+def _codecs():
+    codecs = [JSONCodec()]
+    try:
+        codecs.append(make_codec("orjson"))
+    except ImportError:
+        pass
+    return codecs
+
+
+@pytest.mark.parametrize("codec", _codecs(), ids=lambda c: c.name)
+def test_codec_output_is_compact_utf8(codec):
+    value = {
+        "ответ": ["Да", 1, 2.5, None, True],
+        "at": datetime.datetime(2026, 10, 18, 12, 30, 0, 5),
+        "utc": datetime.datetime(2026, 10, 18, tzinfo=datetime.timezone.utc),
+        "price": Decimal("1.5"),
+    }
+    data = codec.dumps(value)
+    assert data == (
+        '{"ответ":["Да",1,2.5,null,true],"at":"2026-10-18T12:30:00.000005",'
+        '"utc":"2026-10-18T00:00:00Z","price":1.5}'
+    ).encode()
+    assert codec.loads(data)["ответ"] == ["Да", 1, 2.5, None, True]
+    assert codec.dumps_text([1]) == "[1]"
+    # SQLite отдаёт JSON-число числом — TypeError, чтобы SQLAlchemy вернул его как есть
+    with pytest.raises(TypeError):
+        codec.loads(5)
+
+
+def test_make_codec():
+    assert make_codec("json").name == "json"
+    assert make_codec("auto").name in ("json", "orjson")
+    with pytest.raises(ValueError):
+        make_codec("yaml")
+    assert set(engine_options()) == {"json_serializer", "json_deserializer"}
+
+
+def test_rows_response_matches_response_model(client, db_session, questions):
+    q_bool, _ = questions
+    row = m.Response(
+        user_id=77, version_id=q_bool.version_id, question_id=q_bool.id,
+        response_value={"этаж": [1, 2]},
+    )
+    db_session.add(row)
+    db_session.commit()
+
+    headers = Response()
+    headers.headers["X-Next-Cursor"] = "abc"
+    fast = rows_response([row], ResponseSchema, headers)
+    assert fast.headers["x-next-cursor"] == "abc"
+    # тот же JSON, что дал бы проход через response_model
+    expected = [ResponseSchema.model_validate(row).model_dump(mode="json")]
+    assert JSONCodec().loads(fast.body) == expected
+
+    listed = client.get("/responses/", params={"user_id": 77})
+    assert listed.headers["content-type"] == "application/json"
+    assert listed.json() == expected
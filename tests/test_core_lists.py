@@ -0,0 +1,81 @@
+import pytest
+
+import api.codec
+from domain import models as m
+
+
+@pytest.fixture()
+def seeded(db_session, questions):
+    q_bool, q_int = questions
+    db_session.add_all(
+        m.Response(
+            user_id=2501 + i,
+            version_id=q_bool.version_id,
+            question_id=(q_bool, q_int)[i % 2].id,
+            response_value=[i, {"этаж": i}][i % 2],
+        )
+        for i in range(5)
+    )
+    db_session.commit()
+    return q_bool.version_id
+
+
+def _pages(client, path, **params):
+    """All pages of a list endpoint as (body, X-Next-Cursor) pairs."""
+    pages, after = [], None
+    while True:
+        query = dict(params, limit=2, **({"after": after} if after else {}))
+        r = client.get(path, params=query)
+        assert r.status_code == 200
+        after = r.headers.get("x-next-cursor")
+        pages.append((r.json(), after))
+        if not after:
+            return pages
+
+
+def _both_paths(monkeypatch, client, path, **params):
+    monkeypatch.setattr(api.codec, "core_lists", frozenset())
+    orm = _pages(client, path, **params)
+    monkeypatch.setattr(api.codec, "core_lists", frozenset({"responses", "questions"}))
+    core = _pages(client, path, **params)
+    return orm, core
+
+
+def test_core_lists_match_orm_lists(monkeypatch, client, seeded):
+    orm, core = _both_paths(monkeypatch, client, "/responses/", version_id=seeded)
+    assert core == orm
+    assert sum(len(body) for body, _ in orm) == 5
+    assert orm[0][0][1]["response_value"] == {"этаж": 1}
+
+    orm, core = _both_paths(monkeypatch, client, "/responses/", user_id=2502)
+    assert core == orm
+
+    orm, core = _both_paths(monkeypatch, client, "/questions/", version_id=seeded)
+    assert core == orm
+    assert orm[0][0][1]["constraints"] == {"min": 1, "example": 9}
+
+
+def test_async_core_lists_match_orm_lists(monkeypatch, async_client):
+    version_id = async_client.post("/versions/", json={"name": "core"}).json()["id"]
+    question = async_client.post(
+        "/questions/",
+        json={"version_id": version_id, "number": "1", "text": "Т", "type": "text"},
+    ).json()
+    for user_id in (2511, 2512, 2513):
+        r = async_client.post(
+            "/responses/",
+            json={
+                "user_id": user_id,
+                "version_id": version_id,
+                "question_id": question["id"],
+                "response_value": "Да",
+            },
+        )
+        assert r.status_code in (200, 201)
+
+    orm, core = _both_paths(monkeypatch, async_client, "/responses/", version_id=version_id)
+    assert core == orm
+    assert [len(body) for body, _ in orm] == [2, 1]
+
+    orm, core = _both_paths(monkeypatch, async_client, "/questions/", version_id=version_id)
+    assert core == orm == [([question], None)]
@@ -0,0 +1,106 @@
+import json
+import pathlib
+
+import pytest
+
+from domain import models as m
+from services.validation import compile_plan
+
+
+def _q(id, number, constraints=None):
+    return m.Question(
+        id=id, version_id=1, number=number, text=number, type="integer",
+        constraints=constraints,
+    )
+
+
+def test_downstream_is_topologically_ordered():
+    plan = compile_plan(
+        1,
+        [
+            _q(1, "2.1"),
+            _q(2, "2.2", {"max_ref": "2.1"}),
+            _q(3, "2.1.4"),
+            _q(4, "2.1.6", {"max_ref_percent": {"ref": "2.1.4", "percent": 80}}),
+            _q(5, "9.1", {"area_total_of": ["9.2", "2.2"]}),
+            _q(6, "9.2", {"depends_on": {"question_id": 1, "values": [1, 2]}}),
+        ],
+    )
+    assert set(plan.dependents["2.1"]) == {2, 6}
+    assert [q.number for q in plan.downstream("2.1")] == ["2.2", "9.2", "9.1"]
+    assert [q.number for q in plan.downstream("2.1.4")] == ["2.1.6"]
+    assert plan.downstream("9.1") == []
+
+
+def test_update_reports_invalid_dependents(client, db_session, version):
+    total = m.Question(
+        version_id=version.id, number="5.1", text="Общая площадь", type="integer"
+    )
+    db_session.add(total)
+    db_session.commit()
+    part = m.Question(
+        version_id=version.id,
+        number="5.2",
+        text="Площадь части",
+        type="integer",
+        constraints={"area_part_of": "5.1"},
+    )
+    db_session.add(part)
+    db_session.commit()
+
+    def post(question, value):
+        r = client.post(
+            "/responses/",
+            json={
+                "user_id": 11,
+                "version_id": version.id,
+                "question_id": question.id,
+                "response_value": value,
+            },
+        )
+        assert r.status_code == 201, r.text
+        return r.json()["id"]
+
+    total_rid = post(total, 100)
+    post(part, 60)
+
+    r = client.put(f"/responses/{total_rid}", json={"response_value": 80})
+    assert r.status_code == 200, r.text
+    assert r.json()["invalid_dependents"] == []
+
+    r = client.put(f"/responses/{total_rid}", json={"response_value": 50})
+    assert r.status_code == 200, r.text
+    issues = r.json()["invalid_dependents"]
+    assert [(i["question_id"], i["number"]) for i in issues] == [(part.id, "5.2")]
+    assert "exceeds total" in issues[0]["detail"]
+
+
+def test_max_ref_rules_on_the_seed_questionnaire():
+    path = pathlib.Path(__file__).resolve().parents[1] / "data" / "questions_v1.json"
+    payload = json.loads(path.read_text(encoding="utf-8"))["questions"]
+    plan = compile_plan(
+        1,
+        [
+            m.Question(id=i, version_id=1, number=q["number"], text=q["text"],
+                       type=q["type"], options=q.get("options"),
+                       constraints=q.get("constraints"))
+            for i, q in enumerate(payload, 1)
+        ],
+    )
+    by_number = {q.number: q for q in reversed(list(plan.by_id.values()))}
+    stylobates, annexes = by_number["2.2"], by_number["2.3"]
+
+    ctx = {"num:2.1": 2}
+    assert stylobates.validate(2, ctx) == 2 and annexes.validate(0, ctx) == 0
+    for question in (stylobates, annexes):
+        with pytest.raises(ValueError, match="exceeds the answer to 2.1"):
+            question.validate(3, ctx)
+    # 2.1 ещё без ответа — сравнивать не с чем
+    assert stylobates.validate(3, {}) == 3
+    # и пересчёт зависимых при изменении 2.1 теперь что-то находит
+    assert {"2.2", "2.3"} <= {q.number for q in plan.downstream("2.1")}
+
+    apartments = by_number["2.1.6"]
+    with pytest.raises(ValueError, match="80% of the answer to 2.1.4"):
+        apartments.validate(900, {"num:2.1.4": 1000})
+    assert apartments.validate(800, {"num:2.1.4": 1000}) == 800
@@ -0,0 +1,176 @@
+import csv
+import gzip
+import io
+import json
+
+from sqlalchemy.orm import sessionmaker
+
+from domain.schemas import ResponseBatchCreate, ResponseBatchItem
+from services.export import export_responses
+from services.response import ResponseService
+
+
+def _answer(db_session, questions, user_ids):
+    q_bool, q_int = questions
+    for user_id in user_ids:
+        ResponseService(db_session).create_batch(
+            ResponseBatchCreate(
+                user_id=user_id,
+                version_id=q_bool.version_id,
+                items=[
+                    ResponseBatchItem(question_id=q_bool.id, response_value=True),
+                    ResponseBatchItem(question_id=q_int.id, response_value=user_id),
+                ],
+            )
+        )
+
+
+def test_export_ndjson_and_csv(client, db_session, questions):
+    version_id = questions[0].version_id
+    _answer(db_session, questions, [301, 302])
+
+    r = client.get(f"/versions/{version_id}/responses/export")
+    assert r.status_code == 200
+    assert r.headers["content-type"] == "application/x-ndjson"
+    records = [json.loads(line) for line in r.text.splitlines()]
+    ours = [rec for rec in records if rec["user_id"] in (301, 302)]
+    assert [(rec["number"], rec["response_value"]) for rec in ours] == [
+        ("1.1", True),
+        ("1.2", 301),
+        ("1.1", True),
+        ("1.2", 302),
+    ]
+    assert {rec["version_id"] for rec in records} == {version_id}
+
+    r = client.get(
+        f"/versions/{version_id}/responses/export", params={"format": "csv"}
+    )
+    rows = list(csv.DictReader(io.StringIO(r.text)))
+    assert len(rows) == len(records)
+    assert json.loads(rows[-1]["response_value"]) == 302
+
+    assert (
+        client.get(
+            f"/versions/{version_id}/responses/export", params={"format": "xml"}
+        ).status_code
+        == 422
+    )
+    assert client.get("/versions/999999/responses/export").status_code == 404
+
+
+def test_export_gzip_on_the_fly(client, db_session, questions):
+    version_id = questions[0].version_id
+    _answer(db_session, questions, [311])
+
+    r = client.get(
+        f"/versions/{version_id}/responses/export",
+        headers={"Accept-Encoding": "gzip"},
+    )
+    assert r.headers["content-encoding"] == "gzip"
+    # httpx распаковывает сам
+    assert json.loads(r.text.splitlines()[0])["version_id"] == version_id
+
+    chunks = list(
+        export_responses(
+            sessionmaker(bind=db_session.get_bind()), version_id, "csv", compress=True
+        )
+    )
+    text = gzip.decompress(b"".join(chunks)).decode()
+    assert text.startswith("id,user_id,version_id,question_id,number,")
+
+
+def test_export_streams_in_batches(db_session, questions):
+    version_id = questions[0].version_id
+    _answer(db_session, questions, [321, 322, 323])
+
+    chunks = list(
+        export_responses(
+            sessionmaker(bind=db_session.get_bind()), version_id, "ndjson", batch_size=2
+        )
+    )
+    # по чанку на пачку из двух строк — выгрузка не собирается целиком в памяти
+    lines = b"".join(chunks).decode().splitlines()
+    assert len(chunks) >= len(lines) // 2
+    assert all(chunk.count(b"\n") <= 2 for chunk in chunks)
+
+
+def test_wide_export_parquet_and_arrow(client, db_session, version):
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    version_id = version.id
+
+    def question(number, type, options=None, constraints=None):
+        r = client.post(
+            "/questions/",
+            json={
+                "version_id": version_id,
+                "number": number,
+                "text": number,
+                "type": type,
+                "options": options,
+                "constraints": constraints,
+            },
+        )
+        assert r.status_code == 200, r.text
+        return r.json()["id"]
+
+    floors = question("8.1", "integer")
+    lift = question("8.2", "boolean")
+    kind = question("8.3", "dropdown", {"values": ["Стандарт", "Комфорт"]})
+    note = question("8.4", "text")
+    for user_id, answers in (
+        (401, [(floors, 9), (lift, True), (kind, "Комфорт")]),
+        (402, [(floors, 5), (note, "угловая")]),
+        (403, [(kind, "Стандарт")]),
+    ):
+        r = client.post(
+            "/responses/batch",
+            json={
+                "user_id": user_id,
+                "version_id": version_id,
+                "items": [
+                    {"question_id": q, "response_value": v} for q, v in answers
+                ],
+            },
+        )
+        assert all(i["status"] == "created" for i in r.json()["items"]), r.text
+
+    r = client.get(
+        f"/versions/{version_id}/responses/export", params={"format": "parquet"}
+    )
+    assert r.status_code == 200
+    assert "content-encoding" not in r.headers
+    table = pq.read_table(pa.BufferReader(r.content))
+    assert table.schema.field("8.1").type == pa.int64()
+    assert table.schema.field("8.2").type == pa.bool_()
+    assert pa.types.is_dictionary(table.schema.field("8.3").type)
+    assert table.schema.field("8.4").type == pa.string()
+    rows = {row["user_id"]: row for row in table.to_pylist()}
+    assert rows[401]["8.1"] == 9 and rows[401]["8.3"] == "Комфорт"
+    assert rows[402]["8.2"] is None and rows[402]["8.4"] == "угловая"
+    assert rows[403]["8.3"] == "Стандарт"
+
+    r = client.get(
+        f"/versions/{version_id}/responses/export", params={"format": "arrow"}
+    )
+    assert r.headers["content-type"] == "application/vnd.apache.arrow.stream"
+    assert pa.ipc.open_stream(r.content).read_all().equals(table)
+
+
+def test_wide_export_works_in_user_chunks(db_session, questions):
+    import pyarrow as pa
+
+    from services.wide_export import export_wide
+
+    version_id = questions[0].version_id
+    _answer(db_session, questions, [411, 412, 413, 414, 415])
+
+    chunks = export_wide(
+        sessionmaker(bind=db_session.get_bind()), version_id, "arrow",
+        users_per_chunk=2,
+    )
+    batches = list(pa.ipc.open_stream(b"".join(chunks)))
+    assert all(batch.num_rows <= 2 for batch in batches)
+    users = [u for batch in batches for u in batch.column("user_id").to_pylist()]
+    assert users == sorted(set(users)) and {411, 415} <= set(users)
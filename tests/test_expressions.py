@@ -0,0 +1,146 @@
+import pytest
+
+from domain import models as m
+from services.expressions import (
+    ExpressionError,
+    compile_condition,
+    compile_expression,
+    compile_range_table,
+)
+
+FIRE_TABLE = {
+    "<50": "R90",
+    "50-75": "R120",
+    "75-100": "R150",
+    "100-150": "R180",
+    ">150": "R240",
+}
+
+
+def test_calculation_expression():
+    expr = compile_expression("II if 2.1.13 < 50 else I")
+    assert expr.refs == ("2.1.13",)
+    assert expr.evaluate({"num:2.1.13": 40}) == "II"
+    assert expr.evaluate({"num:2.1.13": 60}) == "I"
+    assert compile_expression("2.1.4 * 80 / 100").evaluate({"num:2.1.4": 5000}) == 4000
+    # неизвестный номер читается как десятичная дробь
+    assert compile_expression("2.5 * 2", numbers={"2.1.4"}).evaluate({}) == 5.0
+
+
+@pytest.mark.parametrize(
+    "x, expected",
+    [
+        (10, "R90"),
+        (50, "R120"),
+        (75, "R120"),
+        (150, "R180"),
+        (151, "R240"),
+        (None, None),
+    ],
+)
+def test_range_table(x, expected):
+    table = compile_range_table(FIRE_TABLE, "2.1.13")
+    assert table.evaluate({"num:2.1.13": x}) == expected
+
+
+def test_string_conditions():
+    positive = compile_condition(">0")
+    assert positive.evaluate({}, 3) is True
+    assert positive.evaluate({}, 0) is False
+    assert positive.evaluate({}, None) is False
+    truthy = compile_condition("True")
+    assert truthy.evaluate({}, True) and truthy.evaluate({}, "да")
+    assert not truthy.evaluate({}, False) and not truthy.evaluate({}, None)
+
+
+@pytest.mark.parametrize("source", ["1 +", "(1", "if", "1 ? 2", "__import__('os')"])
+def test_invalid_expressions(source):
+    with pytest.raises(ExpressionError):
+        compile_expression(source)
+
+
+def test_invalid_calculation_rejected_on_question_write(client, version):
+    r = client.post(
+        "/questions/",
+        json={
+            "version_id": version.id,
+            "number": "3.6",
+            "text": "Степень огнестойкости",
+            "type": "text",
+            "constraints": {"calculation": "II if 2.1.13 < else I"},
+        },
+    )
+    assert r.status_code == 422
+
+    # вложенность без предела раньше давала RecursionError → 500
+    for source in ("(" * 3000 + "1" + ")" * 3000, "+".join(["2.1.13"] * 3000)):
+        constraints = {"calculation": source}
+        r = client.post(
+            "/questions/",
+            json={"version_id": version.id, "number": "3.7", "text": "t",
+                  "type": "text", "constraints": constraints},
+        )
+        assert r.status_code == 422
+        assert "nested deeper" in r.json()["detail"]
+
+
+def test_computed_fields_materialized(client, db_session, version):
+    db_session.add(
+        m.Question(version_id=version.id, number="2.1.13", text="h", type="integer")
+    )
+    db_session.add_all(
+        [
+            m.Question(
+                version_id=version.id, number="3.6", text="class", type="text",
+                constraints={
+                    "read_only": True,
+                    "calculation": "II if 2.1.13 < 50 else I",
+                },
+            ),
+            m.Question(
+                version_id=version.id, number="3.8", text="R", type="text",
+                constraints={
+                    "read_only": True,
+                    "calculation_input": "2.1.13",
+                    "calculation": FIRE_TABLE,
+                },
+            ),
+            m.Question(
+                version_id=version.id, number="4.11", text="flag", type="boolean",
+            ),
+            m.Question(
+                version_id=version.id, number="4.12", text="dep", type="text",
+                constraints={"depends_on": "4.11", "condition": "True"},
+            ),
+        ]
+    )
+    db_session.commit()
+    rows = db_session.query(m.Question).filter_by(version_id=version.id)
+    ids = {q.number: q.id for q in rows}
+
+    def post(number, value):
+        return client.post(
+            "/responses/",
+            json={
+                "user_id": 61,
+                "version_id": version.id,
+                "question_id": ids[number],
+                "response_value": value,
+            },
+        )
+
+    def computed():
+        r = client.get(f"/responses/?user_id=61&version_id={version.id}")
+        by_qid = {i["question_id"]: i["response_value"] for i in r.json()}
+        return by_qid.get(ids["3.6"]), by_qid.get(ids["3.8"])
+
+    rid = post("2.1.13", 40).json()["id"]
+    assert computed() == ("II", "R90")
+    client.put(f"/responses/{rid}", json={"response_value": 80})
+    assert computed() == ("I", "R150")
+
+    assert post("3.6", "I").status_code == 422  # вычисляемое поле не пишется клиентом
+
+    assert post("4.12", "x").status_code == 422  # 4.11 не отвечен
+    assert post("4.11", True).status_code == 201
+    assert post("4.12", "x").status_code == 201
@@ -0,0 +1,89 @@
+import pytest
+
+from domain import models as m
+from services.answer_cache import answer_ctx_cache
+from services.metrics import Histogram, validation_metrics
+
+
+@pytest.fixture()
+def metrics():
+    validation_metrics.enabled = True
+    validation_metrics.reset()
+    try:
+        yield validation_metrics
+    finally:
+        validation_metrics.enabled = False
+        validation_metrics.reset()
+
+
+def test_histogram_buckets():
+    h = Histogram()
+    for us in (1, 3, 3, 3, 700):
+        h.observe(us / 1e6)
+    h.observe(5e-6, failed=True)
+    snap = h.snapshot()
+    assert (snap["count"], snap["failures"]) == (6, 1)
+    assert snap["p50_us"] == 4.0
+    assert snap["p99_us"] == 1024.0
+
+
+def test_disabled_metrics_record_nothing(client, version, questions):
+    _, q_int = questions
+    r = client.post(
+        "/responses/",
+        json={
+            "user_id": 31,
+            "version_id": version.id,
+            "question_id": q_int.id,
+            "response_value": 5,
+        },
+    )
+    assert r.status_code == 201
+    assert "server-timing" not in r.headers
+    assert client.get("/metricz").json() == {"enabled": False, "validation": {}}
+
+
+def test_rule_families_timed_and_exposed(client, db_session, version, metrics):
+    gate = m.Question(version_id=version.id, number="7.1", text="Лифт", type="boolean")
+    floors = m.Question(
+        version_id=version.id,
+        number="7.2",
+        text="Этажей",
+        type="integer",
+        constraints={"min": 1, "depends_on": "7.1"},
+    )
+    db_session.add_all([gate, floors])
+    db_session.commit()
+    gate_id, floors_id = gate.id, floors.id
+    answer_ctx_cache.invalidate(32, version.id)
+
+    def post(question_id, value):
+        return client.post(
+            "/responses/",
+            json={
+                "user_id": 32,
+                "version_id": version.id,
+                "question_id": question_id,
+                "response_value": value,
+            },
+        )
+
+    r = post(floors_id, 3)
+    assert r.status_code == 422
+    timing = r.headers["server-timing"]
+    assert timing.startswith("context.load;dur=")
+    assert 'depends_on;dur=' in timing and 'desc="n=1 fail=1"' in timing
+
+    assert post(gate_id, True).status_code == 201
+    r = post(floors_id, 0)
+    assert r.status_code == 422
+    assert 'coerce.integer;dur=' in r.headers["server-timing"]
+
+    stats = client.get("/metricz").json()
+    assert stats["enabled"] is True
+    families = stats["validation"]
+    assert families["depends_on"]["count"] == 2
+    assert families["depends_on"]["failures"] == 1
+    assert families["coerce.integer"]["failures"] == 1
+    assert families["coerce.boolean"]["count"] == 1
+    assert families["context.load"]["count"] == 1
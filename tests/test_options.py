@@ -0,0 +1,138 @@
+import pytest
+
+from domain import models as m
+from services.options import compile_options
+from services.validation import compile_plan
+
+
+def _q(id, number, type="dropdown", options=None, constraints=None, version_id=1):
+    return m.Question(
+        id=id,
+        version_id=version_id,
+        number=number,
+        text=number,
+        type=type,
+        options=options,
+        constraints=constraints,
+    )
+
+
+def _plan():
+    return compile_plan(
+        1,
+        [
+            _q(1, "2.1", "integer"),
+            _q(
+                2,
+                "2.1.1",
+                options={"values": [], "depends_on": "2.1", "condition": ">1"},
+                constraints={
+                    "dynamic_options": True,
+                    "options_from": "2.1",
+                    "exclude_from": ["2.2.1"],
+                },
+            ),
+            _q(
+                3,
+                "2.2.1",
+                options={"values": []},
+                constraints={
+                    "dynamic_options": True,
+                    "options_from": "2.1",
+                    "exclude_from": ["2.1.1"],
+                },
+            ),
+        ],
+    )
+
+
+def test_dynamic_options_validate_against_context():
+    plan = _plan()
+    slab = plan.get(2)
+    assert set(plan.dependents["2.1"]) == {2, 3}
+
+    with pytest.raises(ValueError, match="disabled"):
+        slab.validate(["1"], {"num:2.1": 1})
+    ctx = {"num:2.1": 3, "num:2.2.1": "2"}
+    assert slab.validate([3, "1", "1"], ctx) == ["1", "3"]
+    with pytest.raises(ValueError, match="'2' is not in allowed"):
+        slab.validate(["1", "2"], ctx)
+    with pytest.raises(ValueError, match="'4' is not in allowed"):
+        slab.validate("4", ctx)
+    assert slab.options.effective(ctx) == ("1", "3")
+
+
+def test_exclusions_from_several_sources():
+    dyn = compile_options(
+        {"values": ["a", "b", "c"]}, {"exclude_from": ["1.1", "1.2"]}
+    )
+    ctx = {"num:1.1": ["a"], "num:1.2": None}
+    assert dyn.effective(ctx) == ("b", "c")
+
+    ctx["num:1.2"] = ["a", "b"]
+    assert dyn.effective(ctx) == ("c",)
+    # "a" остаётся исключённым, пока его держит хотя бы один источник
+    ctx["num:1.1"] = None
+    assert dyn.effective(ctx) == ("c",)
+    ctx["num:1.2"] = []
+    assert dyn.effective(ctx) == ("a", "b", "c")
+
+
+def test_options_endpoint(client, db_session, version):
+    count = m.Question(version_id=version.id, number="2.1", text="N", type="integer")
+    db_session.add(count)
+    db_session.commit()
+    slab = m.Question(
+        version_id=version.id,
+        number="2.1.1",
+        text="Корпуса на плите",
+        type="dropdown",
+        options={"values": [], "depends_on": "2.1", "condition": ">1"},
+        constraints={"options_from": "2.1", "exclude_from": ["2.2.1"]},
+    )
+    stylobate = m.Question(
+        version_id=version.id,
+        number="2.2.1",
+        text="Корпус со стилобатом",
+        type="dropdown",
+        options={"values": []},
+        constraints={"options_from": "2.1", "exclude_from": ["2.1.1"]},
+    )
+    db_session.add_all([slab, stylobate])
+    db_session.commit()
+    slab_id, stylobate_id, count_id = slab.id, stylobate.id, count.id
+    url = f"/versions/{version.id}/users/21/options"
+
+    r = client.get(f"{url}/2.1.1")
+    assert r.status_code == 200, r.text
+    assert r.json() == {
+        "question_id": slab_id,
+        "number": "2.1.1",
+        "enabled": False,
+        "values": [],
+    }
+
+    def post(question_id, value):
+        return client.post(
+            "/responses/",
+            json={
+                "user_id": 21,
+                "version_id": version.id,
+                "question_id": question_id,
+                "response_value": value,
+            },
+        )
+
+    assert post(count_id, 4).status_code == 201
+    assert client.get(f"{url}/2.1.1").json()["values"] == ["1", "2", "3", "4"]
+
+    assert post(stylobate_id, "2").status_code == 201
+    assert client.get(f"{url}/2.1.1").json()["values"] == ["1", "3", "4"]
+    r = post(slab_id, ["1", "2"])
+    assert r.status_code == 422
+    assert "'2' is not in allowed" in r.text
+    assert post(slab_id, ["4", "1"]).status_code == 201
+    assert client.get(f"{url}/2.2.1").json()["values"] == ["2", "3"]
+
+    assert client.get(f"{url}/9.9").status_code == 404
+    assert client.get(f"{url}/2.1").status_code == 422
@@ -0,0 +1,79 @@
+import pytest
+
+from domain import models as m
+from repositories.pagination import InvalidCursor, decode_cursor, encode_cursor
+
+
+def _walk(client, url, limit, **filters):
+    pages, after = [], None
+    while True:
+        params = {"limit": limit, **filters}
+        if after:
+            params["after"] = after
+        r = client.get(url, params=params)
+        assert r.status_code == 200, r.text
+        pages.append([row["id"] for row in r.json()])
+        after = r.headers.get("x-next-cursor")
+        if after is None:
+            return pages
+
+
+def test_cursor_roundtrip():
+    token = encode_cursor([42, "2.1"])
+    assert "=" not in token
+    assert decode_cursor(token, 2) == (42, "2.1")
+    assert decode_cursor(token, 2, (int, str)) == (42, "2.1")
+    for values in (["x", "2.1"], [True, "2.1"], [42.5, "2.1"]):
+        with pytest.raises(InvalidCursor):
+            decode_cursor(encode_cursor(values), 2, (int, str))
+
+
+def test_responses_walked_by_cursor(client, db_session, version):
+    qs = [
+        m.Question(version_id=version.id, number=f"8.{i}", text="?", type="integer")
+        for i in range(5)
+    ]
+    db_session.add_all(qs)
+    db_session.commit()
+    db_session.add_all(
+        m.Response(
+            user_id=user_id, version_id=version.id, question_id=q.id, response_value=1
+        )
+        for user_id in (41, 42)
+        for q in qs
+    )
+    db_session.commit()
+
+    filters = {"version_id": version.id, "user_id": 42}
+    pages = _walk(client, "/responses/", limit=2, **filters)
+    assert [len(p) for p in pages] == [2, 2, 1]
+    ids = [i for p in pages for i in p]
+    assert ids == sorted(ids) and len(set(ids)) == 5
+
+    # offset сохранён для обратной совместимости
+    r = client.get("/responses/", params={"limit": 2, "offset": 4, **filters})
+    assert [row["id"] for row in r.json()] == ids[4:]
+    assert "x-next-cursor" not in r.headers
+
+    pages = _walk(client, "/questions/", limit=2, version_id=version.id)
+    assert [len(p) for p in pages] == [2, 2, 1]
+    assert [i for p in pages for i in p] == [q.id for q in qs]
+
+
+def test_versions_newest_first(client, db_session):
+    for i in range(3):
+        db_session.add(m.Version(name=f"page-{i}"))
+    db_session.commit()
+    ids = [i for p in _walk(client, "/versions/", limit=2) for i in p]
+    assert ids == sorted(ids, reverse=True)
+    assert len(ids) >= 3
+
+
+def test_bad_cursor_rejected(client):
+    assert client.get("/responses/?after=not-a-cursor").status_code == 422
+    after = encode_cursor([1])
+    assert client.get(f"/questions/?after={after}&offset=5").status_code == 422
+    for values in (["x"], [True], [None]):
+        after = encode_cursor(values)
+        assert client.get(f"/responses/?after={after}").status_code == 422
+
@@ -0,0 +1,84 @@
+from sqlalchemy import event
+
+from domain.schemas import ResponseCreate, ResponseUpdate
+from repositories.partition import ResponsePartitions, partition_name
+from repositories.snapshot import SnapshotRepository
+from services.response import ResponseService
+from services.snapshot import survey_snapshots
+from services.version import VersionService
+
+
+def _seed(client, db_session):
+    version_id = client.post("/versions/", json={"name": "archive"}).json()["id"]
+    question_id = client.post(
+        "/questions/",
+        json={"version_id": version_id, "number": "1", "text": "1", "type": "integer"},
+    ).json()["id"]
+    saved = ResponseService(db_session).create(
+        ResponseCreate(
+            user_id=1, version_id=version_id, question_id=question_id, response_value=4
+        )
+    )
+    return version_id, saved
+
+
+def test_sqlite_has_no_partitions(db_session):
+    partitions = ResponsePartitions(db_session)
+    assert partition_name(12) == "responses_v12"
+    assert not partitions.enabled
+    partitions.create(1)
+    assert partitions.detach(1) is None
+    assert partitions.drop(1) is False
+
+
+def test_archive_falls_back_to_single_table(client, db_session, monkeypatch):
+    monkeypatch.setattr(survey_snapshots, "enabled", True)
+    version_id, _ = _seed(client, db_session)
+    service = VersionService(db_session)
+
+    # отсоединять нечего — ответы остаются на месте
+    assert service.archive(version_id) is False
+    assert client.get("/responses/", params={"version_id": version_id}).json()
+
+    assert service.archive(version_id, drop=True) is True
+    assert client.get("/responses/", params={"version_id": version_id}).json() == []
+    assert client.get(f"/versions/{version_id}/stats").json()[0]["answered"] == 0
+    assert SnapshotRepository(db_session).get(1, version_id) is None
+    assert service.archive(version_id, drop=True) is False
+
+
+def test_update_prunes_by_version(client, db_session):
+    version_id, saved = _seed(client, db_session)
+    statements = []
+
+    def record(conn, cursor, statement, *args):
+        statements.append(statement)
+
+    engine = db_session.get_bind()
+    event.listen(engine, "before_cursor_execute", record)
+    try:
+        ResponseService(db_session).update(saved.id, ResponseUpdate(response_value=5))
+    finally:
+        event.remove(engine, "before_cursor_execute", record)
+    (update,) = [s for s in statements if s.startswith("UPDATE responses")]
+    assert "responses.version_id = ?" in update
+
+
+def test_delete_prunes_by_version(client, db_session):
+    version_id, saved = _seed(client, db_session)
+    statements = []
+
+    def record(conn, cursor, statement, *args):
+        statements.append(statement)
+
+    engine = db_session.get_bind()
+    event.listen(engine, "before_cursor_execute", record)
+    try:
+        r = client.delete(f"/responses/{saved.id}", params={"version_id": version_id + 1})
+        assert r.status_code == 404
+        r = client.delete(f"/responses/{saved.id}", params={"version_id": version_id})
+        assert r.status_code == 204
+    finally:
+        event.remove(engine, "before_cursor_execute", record)
+    deletes = [s for s in statements if s.startswith("DELETE FROM responses")]
+    assert deletes and all("responses.version_id = ?" in s for s in deletes)
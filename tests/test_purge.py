@@ -0,0 +1,164 @@
+from collections import namedtuple
+
+from sqlalchemy import event
+
+from domain.schemas import ResponseCreate
+from repositories.purge import PurgeJobRepository
+from services.purge import PurgeService
+from services.response import ResponseService
+from services.snapshot import survey_snapshots
+
+
+def _survey(client, db_session, users=(2201, 2202, 2203)):
+    version_id = client.post("/versions/", json={"name": "purge"}).json()["id"]
+    ids = [
+        client.post(
+            "/questions/",
+            json={"version_id": version_id, "number": str(n), "text": "t", "type": t},
+        ).json()["id"]
+        for n, t in ((1, "integer"), (2, "boolean"))
+    ]
+    service = ResponseService(db_session)
+    for user_id in users:
+        service.create(ResponseCreate(
+            user_id=user_id, version_id=version_id, question_id=ids[0], response_value=user_id
+        ))
+        service.create(ResponseCreate(
+            user_id=user_id, version_id=version_id, question_id=ids[1], response_value=True
+        ))
+    return version_id
+
+
+def _statements(db_session):
+    deletes = []
+
+    def before(conn, cursor, statement, *args):
+        if statement.lstrip().upper().startswith("DELETE"):
+            deletes.append(statement)
+
+    event.listen(db_session.get_bind(), "before_cursor_execute", before)
+    return deletes, lambda: event.remove(db_session.get_bind(), "before_cursor_execute", before)
+
+
+def test_delete_version_is_accepted_and_purged_in_chunks(client, db_session, monkeypatch):
+    monkeypatch.setattr(survey_snapshots, "enabled", True)
+    monkeypatch.setattr("services.purge.PURGE_CHUNK_SIZE", 2)
+    version_id = _survey(client, db_session)
+
+    deletes, stop = _statements(db_session)
+    try:
+        r = client.delete(f"/versions/{version_id}")
+    finally:
+        stop()
+    assert r.status_code == 202, r.text
+    assert (r.json()["kind"], r.json()["target_id"]) == ("version", version_id)
+
+    # фоновая задача отработала до возврата TestClient
+    job = client.get(f"/purges/{r.json()['id']}").json()
+    assert (job["status"], job["step"], job["error"]) == ("done", None, None)
+    # 6 ответов + сводки + 3 снимка + 2 вопроса + версия
+    assert job["deleted"] > 12
+    # пачки по 2 строки: 6 ответов — это 4 DELETE (последний пустой)
+    assert sum("FROM responses" in s for s in deletes) == 4
+    assert client.get(f"/versions/{version_id}").status_code == 404
+    assert client.get("/questions/", params={"version_id": version_id}).json() == []
+    assert client.delete(f"/versions/{version_id}").status_code == 404
+    assert client.get("/purges/999999").status_code == 404
+
+
+def test_purge_user_writes_off_stats(client, db_session, monkeypatch):
+    monkeypatch.setattr(survey_snapshots, "enabled", True)
+    version_id = _survey(client, db_session)
+    other = _survey(client, db_session, users=(2202,))
+
+    r = client.delete("/responses/users/2202")
+    assert r.status_code == 202, r.text
+    job = client.get(f"/purges/{r.json()['id']}").json()
+    # 4 ответа в двух версиях; снимки уходят вместе с пачкой ответов
+    assert (job["kind"], job["status"], job["deleted"]) == ("user", "done", 4)
+
+    assert client.get("/responses/", params={"user_id": 2202}).json() == []
+    assert len(client.get("/responses/", params={"user_id": 2201}).json()) == 2
+    stats = {s["number"]: s for s in client.get(f"/versions/{version_id}/stats").json()}
+    assert stats["1"]["answered"] == 2
+    assert (stats["1"]["min"], stats["1"]["max"]) == (2201, 2203)
+    assert client.get(f"/versions/{other}/stats").json()[0]["answered"] == 0
+    snapshot = client.get(f"/versions/{version_id}/users/2202/snapshot")
+    assert snapshot.status_code == 404
+
+
+def test_interrupted_job_resumes_from_its_step(client, db_session):
+    version_id = _survey(client, db_session)
+    service = PurgeService(db_session, chunk_size=4)
+    job = service.start_version(version_id)
+    # повторный запрос — то же задание
+    assert service.start_version(version_id).id == job.id
+
+    claimed = PurgeJobRepository(db_session).claim(job.id, job.created_at)
+    db_session.commit()
+    assert claimed.status == "running"
+    first = service.step(job.id)
+    assert (first.step, first.deleted) == ("responses", 4)
+    # воркер «упал»: running с недавним прогрессом другому не отдаётся
+    assert service.run(job.id) is None
+
+    PurgeJobRepository(db_session).fail(job.id, "worker restarted")
+    db_session.commit()
+    done = service.run(job.id)
+    assert (done.status, done.error) == ("done", None)
+    assert done.deleted > 6
+    assert PurgeJobRepository(db_session).unfinished() == []
+    assert service.start_version(version_id) is None
+
+
+def test_async_delete_version(async_client):
+    version_id = async_client.post("/versions/", json={"name": "a"}).json()["id"]
+    question_id = async_client.post(
+        "/questions/",
+        json={"version_id": version_id, "number": "1", "text": "t", "type": "text"},
+    ).json()["id"]
+    async_client.post("/responses/", json={
+        "user_id": 5, "version_id": version_id, "question_id": question_id,
+        "response_value": "x",
+    })
+
+    user = async_client.delete("/responses/users/5")
+    assert user.status_code == 202, user.text
+    assert async_client.get(f"/purges/{user.json()['id']}").json()["deleted"] == 1
+
+    r = async_client.delete(f"/versions/{version_id}")
+    assert r.status_code == 202, r.text
+    assert async_client.get(f"/purges/{r.json()['id']}").json()["status"] == "done"
+    assert async_client.get(f"/versions/{version_id}").status_code == 404
+    assert async_client.delete("/versions/999999").status_code == 404
+
+
+def test_version_purge_sweeps_responses_written_meanwhile(client, db_session):
+    version_id = _survey(client, db_session, users=(2211,))
+    service = PurgeService(db_session, chunk_size=100)
+    job = service.start_version(version_id)
+    PurgeJobRepository(db_session).claim(job.id, job.created_at)
+    db_session.commit()
+    while service.step(job.id).step != "questions":
+        pass
+
+    # версия ещё доступна для записи: ответ приходит после этапа responses
+    question_id = client.get("/questions/", params={"version_id": version_id}).json()[0]["id"]
+    ResponseService(db_session).create(ResponseCreate(
+        user_id=2212, version_id=version_id, question_id=question_id, response_value=1
+    ))
+    assert service.step(job.id).step == "responses"
+
+    done = service.step(job.id)
+    while done.status == "running":
+        done = service.step(job.id)
+    assert (done.status, done.error) == ("done", None)
+    assert client.get("/responses/", params={"user_id": 2212}).json() == []
+    assert client.get(f"/versions/{version_id}").status_code == 404
+
+
+def test_write_off_skips_deleted_questions(db_session):
+    row = namedtuple("Row", "version_id question_id response_value")
+    # ответ на вопрос, которого уже нет: списывать из сводок нечего
+    PurgeService(db_session)._write_off(2221, [row(999999, 999999, 1)])
+    db_session.rollback()
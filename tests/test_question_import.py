@@ -0,0 +1,76 @@
+import json
+from pathlib import Path
+
+import pytest
+
+from services.question_import import PayloadError, PayloadScanner
+
+DATA = Path(__file__).resolve().parents[1] / "data" / "questions_v1.json"
+
+
+def _scan(data: bytes, size: int):
+    scanner = PayloadScanner()
+    items = []
+    for i in range(0, len(data), size):
+        items.extend(scanner.feed(data[i : i + size]))
+    items.extend(scanner.close())
+    return scanner, items
+
+
+@pytest.mark.parametrize("size", [1, 7, 1 << 20])
+def test_scanner_matches_json_load(size):
+    # куски по 1 байту режут и кириллицу, и числа посередине
+    data = DATA.read_bytes()
+    payload = json.loads(data)
+    scanner, items = _scan(data, size)
+    assert items == payload["questions"]
+    assert scanner.meta["version"] == payload["version"]
+
+
+def test_scanner_bare_array_and_errors():
+    _, items = _scan(b' [{"number": "1"}, {"number": 22}] ', 3)
+    assert items == [{"number": "1"}, {"number": 22}]
+    with pytest.raises(PayloadError):
+        _scan(b'{"questions": [{"number": "1"}', 4)
+    with pytest.raises(PayloadError):
+        _scan(b'[{"number": "1"}] x', 4)
+
+
+def test_bulk_endpoint_is_idempotent(client):
+    version_id = client.post("/versions/", json={"name": "bulk"}).json()["id"]
+    url = f"/versions/{version_id}/questions/bulk"
+    data = DATA.read_bytes()
+    questions = json.loads(data)["questions"]
+    unique = len({q["number"] for q in questions})
+
+    r = client.post(url, content=data)
+    assert r.status_code == 200, r.text
+    report = r.json()
+    assert report["received"] == len(questions)
+    assert report["duplicates"] == len(questions) - unique
+    assert (report["inserted"], report["existing"]) == (unique, 0)
+    assert set(report["timings"]) == {"parse_ms", "write_ms", "total_ms"}
+
+    again = client.post(url, content=data).json()
+    assert (again["inserted"], again["existing"]) == (0, unique)
+    listed = client.get("/questions/", params={"version_id": version_id, "limit": 1000})
+    assert len(listed.json()) == unique
+
+
+def test_bulk_endpoint_errors(client):
+    version_id = client.post("/versions/", json={"name": "bulk-2"}).json()["id"]
+    url = f"/versions/{version_id}/questions/bulk"
+    r = client.post(url, json=[{"number": "1", "text": "a", "type": "text"}, {"number": "2"}])
+    assert r.status_code == 422
+    assert r.json()["detail"].startswith("questions[1]")
+    # ошибка откатывает всю загрузку
+    assert client.get("/questions/", params={"version_id": version_id}).json() == []
+    assert client.post("/versions/999999/questions/bulk", json=[]).status_code == 404
+
+
+def test_duplicate_number_conflict(client):
+    version_id = client.post("/versions/", json={"name": "bulk-3"}).json()["id"]
+    question = {"version_id": version_id, "number": "1.1", "text": "a", "type": "text"}
+    assert client.post("/questions/", json=question).status_code == 200
+    r = client.post("/questions/", json=question)
+    assert r.status_code == 409
@@ -0,0 +1,116 @@
+import json
+
+from sqlalchemy import event
+
+from api.questionnaire import etag_matches
+
+
+def _version(client, *numbers):
+    version_id = client.post("/versions/", json={"name": "questionnaire"}).json()["id"]
+    ids = [
+        client.post(
+            "/questions/",
+            json={
+                "version_id": version_id,
+                "number": number,
+                "text": f"Вопрос {number}",
+                "type": "dropdown",
+                "options": ["a", "b"],
+            },
+        ).json()["id"]
+        for number in numbers
+    ]
+    return version_id, ids
+
+
+def test_draft_questionnaire_revalidates_by_etag(client):
+    version_id, ids = _version(client, "2.1.10", "2.1.2")
+
+    r = client.get(f"/versions/{version_id}/questionnaire")
+    assert r.status_code == 200
+    assert r.headers["cache-control"] == "no-cache"
+    body = r.json()
+    assert (body["version_id"], body["published"]) == (version_id, False)
+    assert [q["id"] for q in body["questions"]] == ids
+    assert body["questions"][0]["options"] == ["a", "b"]
+    assert json.loads(r.content.decode()) == body  # кириллица без \u-экранирования
+    assert "Вопрос".encode() in r.content
+
+    etag = r.headers["etag"]
+    again = client.get(
+        f"/versions/{version_id}/questionnaire", headers={"If-None-Match": etag}
+    )
+    assert (again.status_code, again.content, again.headers["etag"]) == (304, b"", etag)
+
+    client.put(f"/questions/{ids[0]}", json={"text": "Другой текст"})
+    changed = client.get(
+        f"/versions/{version_id}/questionnaire", headers={"If-None-Match": etag}
+    )
+    assert changed.status_code == 200
+    assert changed.headers["etag"] != etag
+
+    assert client.get("/versions/999999/questionnaire").status_code == 404
+
+
+def test_published_version_is_frozen_and_served_from_memory(client, db_session):
+    version_id, ids = _version(client, "1", "2")
+
+    r = client.post(f"/versions/{version_id}/publish")
+    assert (r.status_code, r.json()["published"]) == (200, True)
+    assert client.post(f"/versions/{version_id}/publish").status_code == 200
+    assert client.post("/versions/999999/publish").status_code == 404
+
+    question = {"version_id": version_id, "number": "3", "text": "t", "type": "text"}
+    assert client.post("/questions/", json=question).status_code == 409
+    assert client.put(f"/questions/{ids[0]}", json={"text": "x"}).status_code == 409
+    assert client.delete(f"/questions/{ids[0]}").status_code == 409
+    bulk = client.post(f"/versions/{version_id}/questions/bulk", json=[question])
+    assert bulk.status_code == 409
+    assert client.put("/questions/999999", json={"text": "x"}).status_code == 404
+
+    first = client.get(f"/versions/{version_id}/questionnaire")
+    assert first.headers["cache-control"] == "public, max-age=31536000, immutable"
+    assert first.json()["published"] is True
+
+    statements = []
+    engine = db_session.get_bind()
+    record = lambda conn, cursor, statement, *args: statements.append(statement)
+    event.listen(engine, "before_cursor_execute", record)
+    try:
+        cached = client.get(
+            f"/versions/{version_id}/questionnaire",
+            headers={"If-None-Match": f'W/{first.headers["etag"]}, "other"'},
+        )
+        full = client.get(f"/versions/{version_id}/questionnaire")
+    finally:
+        event.remove(engine, "before_cursor_execute", record)
+    assert cached.status_code == 304
+    assert full.content == first.content
+    assert statements == []
+
+    # клон опубликованной версии — снова черновик
+    clone = client.post(f"/versions/{version_id}/clone", json={"name": "next"}).json()
+    assert clone["published"] is False
+
+
+def test_etag_matches():
+    assert etag_matches('"a", W/"b"', '"b"')
+    assert etag_matches("*", '"a"')
+    assert not etag_matches('"a"', '"b"')
+    assert not etag_matches(None, '"a"')
+
+
+def test_async_questionnaire(async_client):
+    version_id, ids = _version(async_client, "1")
+    draft = async_client.get(f"/versions/{version_id}/questionnaire")
+    assert [q["id"] for q in draft.json()["questions"]] == ids
+
+    assert async_client.post(f"/versions/{version_id}/publish").json()["published"]
+    assert async_client.delete(f"/questions/{ids[0]}").status_code == 409
+    published = async_client.get(f"/versions/{version_id}/questionnaire")
+    assert published.headers["etag"] != draft.headers["etag"]
+    r = async_client.get(
+        f"/versions/{version_id}/questionnaire",
+        headers={"If-None-Match": published.headers["etag"]},
+    )
+    assert r.status_code == 304
@@ -0,0 +1,70 @@
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine, insert
+
+from db import database
+from db.base import Base
+from db.routing import PRIMARY_COOKIE, DatabaseRouter, replica_urls
+from domain import models as m
+from main import create_app
+
+
+@pytest.fixture()
+def two_files(tmp_path):
+    # primary и «реплика» — два отдельных файла SQLite: репликации нет,
+    # поэтому всё, что пишется в primary, на реплике не видно
+    engines = [
+        create_engine(f"sqlite:///{tmp_path / name}.db", future=True)
+        for name in ("primary", "replica")
+    ]
+    for engine in engines:
+        Base.metadata.create_all(bind=engine)
+    yield DatabaseRouter(engines[0], engines[1:])
+    for engine in engines:
+        engine.dispose()
+
+
+def test_replica_urls():
+    assert replica_urls("") == []
+    assert replica_urls(" sqlite:///a.db, ,sqlite:///b.db ") == [
+        "sqlite:///a.db",
+        "sqlite:///b.db",
+    ]
+
+
+def test_reader_uses_replica_and_rejects_writes(two_files):
+    with two_files.writer() as db:
+        db.add(m.Version(name="primary only"))
+        db.commit()
+
+    with two_files.reader() as db:
+        assert db.query(m.Version).count() == 0
+        db.add(m.Version(name="oops"))
+        with pytest.raises(RuntimeError):
+            db.flush()
+        db.expunge_all()
+        with pytest.raises(RuntimeError):
+            db.execute(insert(m.Version.__table__).values(name="oops"))
+
+
+def test_reader_falls_back_to_primary():
+    engine = create_engine("sqlite://", future=True)
+    router = DatabaseRouter(engine)
+    with router.reader() as db:
+        assert db.get_bind() is engine
+
+
+def test_read_your_writes(two_files, monkeypatch):
+    monkeypatch.setattr(database, "router", two_files)
+    app = create_app(read_your_writes_seconds=5)
+
+    writer = TestClient(app)
+    created = writer.post("/versions/", json={"name": "fresh"})
+    assert created.status_code == 200
+    assert PRIMARY_COOKIE in created.cookies
+    version_id = created.json()["id"]
+
+    # тот же клиент сразу после записи читает с primary
+    assert writer.get(f"/versions/{version_id}").status_code == 200
+    # остальные — с реплики, которая запись ещё не видела
+    assert TestClient(app).get(f"/versions/{version_id}").status_code == 404
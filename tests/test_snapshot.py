@@ -0,0 +1,128 @@
+import pytest
+from sqlalchemy import event
+
+from domain.schemas import ResponseCreate, ResponseUpdate
+from repositories.snapshot import SnapshotRepository
+from services.answer_cache import answer_ctx_cache
+from services.response import ResponseService
+from services.snapshot import survey_snapshots
+
+
+@pytest.fixture
+def snapshots(monkeypatch):
+    monkeypatch.setattr(survey_snapshots, "enabled", True)
+    answer_ctx_cache.clear()
+    yield
+    answer_ctx_cache.clear()
+
+
+def _version(client, name):
+    version_id = client.post("/versions/", json={"name": name}).json()["id"]
+
+    def question(number, type):
+        r = client.post(
+            "/questions/",
+            json={"version_id": version_id, "number": number, "text": number, "type": type},
+        )
+        assert r.status_code == 200, r.text
+        return r.json()["id"]
+
+    return version_id, question("4.1", "integer"), question("4.2", "text")
+
+
+def _answer(service, version_id, question_id, value, user_id=7):
+    return service.create(
+        ResponseCreate(
+            user_id=user_id, version_id=version_id,
+            question_id=question_id, response_value=value,
+        ),
+        upsert=True,
+    )
+
+
+def test_snapshot_follows_writes(client, db_session, snapshots):
+    version_id, floors, note = _version(client, "snapshot")
+    service = ResponseService(db_session)
+    repo = SnapshotRepository(db_session)
+
+    _answer(service, version_id, floors, 5)
+    assert repo.get(7, version_id).revision == 1
+    saved = _answer(service, version_id, note, "brick")
+    service.update(saved.id, ResponseUpdate(response_value="panel"))
+    _answer(service, version_id, floors, 9)
+    row = repo.get(7, version_id)
+    assert row.revision == 4
+    assert row.answers == {
+        f"id:{floors}": 9, "num:4.1": 9, f"id:{note}": "panel", "num:4.2": "panel",
+    }
+
+    service.delete(saved.id)
+    assert repo.get(7, version_id).answers == {f"id:{floors}": 9, "num:4.1": 9}
+
+    r = client.get(f"/versions/{version_id}/users/7/snapshot")
+    assert r.status_code == 200, r.text
+    assert r.json()["answers"] == {"4.1": 9}
+    assert r.json()["revision"] == 5
+
+
+def test_first_snapshot_built_from_responses(client, db_session, monkeypatch):
+    version_id, floors, note = _version(client, "snapshot-2")
+    service = ResponseService(db_session)
+    _answer(service, version_id, note, "brick")  # до включения снимков
+    assert SnapshotRepository(db_session).get(7, version_id) is None
+
+    monkeypatch.setattr(survey_snapshots, "enabled", True)
+    _answer(service, version_id, floors, 3)
+    row = SnapshotRepository(db_session).get(7, version_id)
+    assert row.revision == 1
+    assert row.answers == {
+        f"id:{floors}": 3, "num:4.1": 3, f"id:{note}": "brick", "num:4.2": "brick",
+    }
+
+
+def test_answers_context_read_from_snapshot(client, db_session, snapshots):
+    version_id, floors, _ = _version(client, "snapshot-3")
+    service = ResponseService(db_session)
+    _answer(service, version_id, floors, 12)
+    answer_ctx_cache.clear()
+
+    statements = []
+
+    def record(conn, cursor, statement, *args):
+        statements.append(statement)
+
+    engine = db_session.get_bind()
+    event.listen(engine, "before_cursor_execute", record)
+    try:
+        ctx = ResponseService(db_session)._answers_ctx(7, version_id)
+    finally:
+        event.remove(engine, "before_cursor_execute", record)
+    assert ctx["num:4.1"] == 12
+    assert not [s for s in statements if "FROM responses" in s]
+
+
+def test_snapshot_not_found(client):
+    version_id = client.post("/versions/", json={"name": "snapshot-4"}).json()["id"]
+    r = client.get(f"/versions/{version_id}/users/1/snapshot")
+    assert r.status_code == 404
+    assert r.json()["detail"] == "Snapshot not found"
+    assert client.get("/versions/999999/users/1/snapshot").status_code == 404
+
+
+def test_renamed_question_drops_stale_snapshots(client, db_session, snapshots):
+    version_id, floors, note = _version(client, "snapshot-5")
+    service = ResponseService(db_session)
+    _answer(service, version_id, floors, 5)
+    assert client.get(f"/versions/{version_id}/users/7/snapshot").json()["answers"] == {
+        "4.1": 5
+    }
+
+    assert client.put(f"/questions/{floors}", json={"number": "4.9"}).status_code == 200
+    assert SnapshotRepository(db_session).get(7, version_id) is None
+    ctx = ResponseService(db_session)._answers_ctx(7, version_id)
+    assert (ctx.get("num:4.9"), "num:4.1" in ctx) == (5, False)
+
+    # следующая запись строит снимок заново — уже с новыми номерами
+    _answer(service, version_id, note, "brick")
+    r = client.get(f"/versions/{version_id}/users/7/snapshot")
+    assert r.json()["answers"] == {"4.9": 5, "4.2": "brick"}
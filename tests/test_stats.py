@@ -0,0 +1,153 @@
+from sqlalchemy import event
+
+from domain.schemas import ResponseCreate, ResponseUpdate
+from services.answer_cache import answer_ctx_cache
+from services.response import ResponseService
+from services.stats import StatsService, bin_bucket, buckets
+
+
+def _questions(client, version_id):
+    def question(number, type, options=None):
+        r = client.post(
+            "/questions/",
+            json={
+                "version_id": version_id,
+                "number": number,
+                "text": number,
+                "type": type,
+                "options": options,
+            },
+        )
+        assert r.status_code == 200, r.text
+        return r.json()["id"]
+
+    return (
+        question("9.1", "integer"),
+        question("9.2", "boolean"),
+        question("9.3", "dropdown", {"values": ["A", "B"]}),
+    )
+
+
+def test_buckets():
+    assert buckets("integer", 5) == [
+        ("*", None), ("sum", 5.0), ("min", 5.0), ("max", 5.0), ("bin:5.0:10.0", None),
+    ]
+    assert buckets("boolean", False) == [("*", None), ("false", None)]
+    assert buckets("dropdown", ["2", "1", "2"]) == [
+        ("*", None), ("2", None), ("1", None),
+    ]
+    assert buckets("text", "x") == [("*", None)]
+    assert buckets("integer", None) == []
+
+
+def test_bin_bucket_grid():
+    assert bin_bucket(1) == "bin:1.0:2.0"
+    assert bin_bucket(1000) == "bin:1000.0:2000.0"
+    assert bin_bucket(49.9) == "bin:20.0:50.0"
+    assert bin_bucket(-3) == "bin:-5.0:-2.0"
+    assert bin_bucket(0) == "bin:0.0:0.0"
+
+
+def test_numeric_summaries_do_not_grow_with_distinct_values(client, db_session):
+    version_id = client.post("/versions/", json={"name": "stats-3"}).json()["id"]
+    floors, _, _ = _questions(client, version_id)
+    service = ResponseService(db_session)
+    for n in range(1, 201):
+        service.create(
+            ResponseCreate(
+                user_id=1700 + n, version_id=version_id,
+                question_id=floors, response_value=n,
+            ),
+        )
+
+    rows = [r for r in StatsService(db_session).repo.for_version(version_id) if r.id == floors]
+    assert len(rows) == 4 + len({bin_bucket(n) for n in range(1, 201)})  # *, sum, min, max
+    (stats,) = [s for s in StatsService(db_session).get(version_id) if s.question_id == floors]
+    assert (stats.answered, stats.min, stats.max, stats.mean) == (200, 1, 200, 100.5)
+    assert [(b.lower, b.count) for b in stats.histogram][:3] == [(1, 1), (2, 3), (5, 5)]
+
+
+def test_stats_follow_writes_and_match_rebuild(client, db_session):
+    version_id = client.post("/versions/", json={"name": "stats"}).json()["id"]
+    floors, lift, kind = _questions(client, version_id)
+    service = ResponseService(db_session)
+
+    def answer(user_id, question_id, value):
+        return service.create(
+            ResponseCreate(
+                user_id=user_id, version_id=version_id,
+                question_id=question_id, response_value=value,
+            ),
+            upsert=True,
+        )
+
+    for user_id, n, has_lift, k in ((1, 5, True, "A"), (2, 9, False, "A"), (3, 16, True, "B")):
+        answer(user_id, floors, n)
+        answer(user_id, lift, has_lift)
+        answer(user_id, kind, k)
+    answer(2, floors, 12)  # перезапись
+    third = answer(3, kind, "B")
+    service.update(third.id, ResponseUpdate(response_value="A"))
+    service.delete(answer(1, lift, True).id)
+
+    stats = {s["number"]: s for s in client.get(f"/versions/{version_id}/stats").json()}
+    assert stats["9.1"]["answered"] == 3
+    assert (stats["9.1"]["min"], stats["9.1"]["max"]) == (5, 16)
+    assert stats["9.1"]["mean"] == 11
+    assert sum(b["count"] for b in stats["9.1"]["histogram"]) == 3
+    assert stats["9.2"]["counts"] == {"true": 1, "false": 1}
+    assert stats["9.2"]["true_rate"] == 0.5
+    assert stats["9.3"]["counts"] == {"A": 3}
+
+    # пересчёт с нуля даёт то же, что инкрементальные изменения
+    incremental = StatsService(db_session).get(version_id)
+    assert StatsService(db_session).rebuild(version_id) == 8
+    assert StatsService(db_session).get(version_id) == incremental
+
+
+def test_stats_read_only_summaries(client, db_session):
+    version_id = client.post("/versions/", json={"name": "stats-2"}).json()["id"]
+    _questions(client, version_id)
+
+    statements = []
+
+    def record(conn, cursor, statement, *args):
+        statements.append(statement)
+
+    engine = db_session.get_bind()
+    event.listen(engine, "before_cursor_execute", record)
+    try:
+        r = client.get(f"/versions/{version_id}/stats")
+    finally:
+        event.remove(engine, "before_cursor_execute", record)
+    assert [s["answered"] for s in r.json()] == [0, 0, 0]
+    assert not [s for s in statements if "FROM responses" in s]
+    assert client.get("/versions/999999/stats").status_code == 404
+
+
+def test_stats_delta_ignores_stale_context_cache(client, db_session):
+    version_id = client.post("/versions/", json={"name": "stats-4"}).json()["id"]
+    floors, _, kind = _questions(client, version_id)
+    service = ResponseService(db_session)
+
+    def answer(question_id, value):
+        return service.create(
+            ResponseCreate(
+                user_id=1901, version_id=version_id,
+                question_id=question_id, response_value=value,
+            ),
+            upsert=True,
+        )
+
+    answer(floors, 5)
+    saved = answer(kind, "A")
+    # кэш контекста другого воркера не видел записей — «предыдущих» ответов нет
+    answer_ctx_cache.put(1901, version_id, {})
+    answer(floors, 7)
+    answer_ctx_cache.put(1901, version_id, {f"id:{kind}": "B"})
+    service.update(saved.id, ResponseUpdate(response_value="B"))
+
+    stats = {s.number: s for s in StatsService(db_session).get(version_id)}
+    assert (stats["9.1"].answered, stats["9.1"].mean) == (1, 7)
+    assert [(b.lower, b.count) for b in stats["9.1"].histogram] == [(5, 1)]
+    assert stats["9.3"].counts == {"B": 1}
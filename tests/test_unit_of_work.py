@@ -0,0 +1,102 @@
+import pytest
+from sqlalchemy import event
+
+from db.unit_of_work import after_commit, unit_of_work
+from domain import models as m
+from domain.schemas import QuestionUpdate, ResponseCreate
+from services.answer_cache import answer_ctx_cache
+from services.question import QuestionService
+from services.response import ResponseService
+
+
+@pytest.fixture()
+def statements(db_session):
+    recorded = []
+
+    def record(conn, cursor, statement, *args):
+        recorded.append(statement.split()[0].upper())
+
+    engine = db_session.get_bind()
+    event.listen(engine, "before_cursor_execute", record)
+    yield recorded
+    event.remove(engine, "before_cursor_execute", record)
+
+
+@pytest.fixture()
+def commits(db_session):
+    counter = []
+
+    def record(session):
+        counter.append(session)
+
+    event.listen(db_session, "after_commit", record)
+    yield counter
+    event.remove(db_session, "after_commit", record)
+
+
+def test_question_update_is_one_round_trip(db_session, questions, statements, commits):
+    question_id = questions[1].id
+    statements.clear()
+
+    updated = QuestionService(db_session).update(
+        question_id, QuestionUpdate(text="Этажей в доме?")
+    )
+
+    assert updated.text == "Этажей в доме?"
+    # UPDATE … RETURNING вместо SELECT + UPDATE + SELECT (refresh)
+    assert statements == ["UPDATE"]
+    assert len(commits) == 1
+
+
+def test_response_delete_uses_returning_row(db_session, questions, statements):
+    q_bool = questions[0]
+    service = ResponseService(db_session)
+    saved = service.create(
+        ResponseCreate(
+            user_id=81, version_id=q_bool.version_id, question_id=q_bool.id,
+            response_value=True,
+        )
+    )
+    response_id, version_id = saved.id, saved.version_id
+    assert answer_ctx_cache.get(81, version_id)[f"id:{q_bool.id}"] is True
+    statements.clear()
+
+    assert service.delete(response_id) is True
+    # DELETE … RETURNING и изменение сводок статистики, без SELECT перед ними
+    assert statements == ["DELETE", "INSERT"]
+    assert f"id:{q_bool.id}" not in answer_ctx_cache.get(81, version_id)
+    assert service.delete(response_id) is False
+
+
+def test_rollback_keeps_cache_and_table_untouched(db_session, questions):
+    q_bool, q_int = questions
+    version_id = q_bool.version_id
+    answer_ctx_cache.put(82, version_id, {})
+
+    with pytest.raises(RuntimeError):
+        with unit_of_work(db_session):
+            ResponseService(db_session).create(
+                ResponseCreate(
+                    user_id=82, version_id=version_id, question_id=q_int.id,
+                    response_value=3,
+                )
+            )
+            raise RuntimeError("boom")
+
+    assert answer_ctx_cache.get(82, version_id) == {}
+    assert not db_session.query(m.Response).filter_by(user_id=82).count()
+
+
+def test_nested_scopes_commit_once(db_session, commits):
+    calls = []
+    with unit_of_work(db_session) as outer:
+        with unit_of_work(db_session) as inner:
+            assert inner is outer
+            after_commit(db_session, lambda: calls.append("inner"))
+        assert calls == [] and commits == []
+    assert calls == ["inner"]
+    assert len(commits) == 1
+
+    # вне scope колбэк выполняется сразу
+    after_commit(db_session, lambda: calls.append("now"))
+    assert calls == ["inner", "now"]
@@ -0,0 +1,51 @@
+def _post(client, version, question, value, upsert=None):
+    url = "/responses/" if upsert is None else f"/responses/?upsert={upsert}"
+    return client.post(
+        url,
+        json={
+            "user_id": 31,
+            "version_id": version.id,
+            "question_id": question.id,
+            "response_value": value,
+        },
+    )
+
+
+def test_duplicate_answer_conflicts_without_upsert(client, version, questions):
+    _, q_int = questions
+    assert _post(client, version, q_int, 3).status_code == 201
+    r = _post(client, version, q_int, 4)
+    assert r.status_code == 409, r.text
+
+
+def test_upsert_overwrites_answer(client, version, questions):
+    _, q_int = questions
+    first = _post(client, version, q_int, 3, upsert="true")
+    assert first.status_code == 201, first.text
+    second = _post(client, version, q_int, 5, upsert="true")
+    assert second.status_code == 201, second.text
+    assert second.json()["id"] == first.json()["id"]
+    assert second.json()["response_value"] == 5
+
+    r = client.get(f"/responses/?user_id=31&version_id={version.id}")
+    assert [i["response_value"] for i in r.json()] == [5]
+
+
+def test_batch_upsert(client, version, questions):
+    q_bool, q_int = questions
+    assert _post(client, version, q_int, 3).status_code == 201
+    batch = {
+        "user_id": 31,
+        "version_id": version.id,
+        "items": [
+            {"question_id": q_bool.id, "response_value": True},
+            {"question_id": q_int.id, "response_value": 8},
+        ],
+    }
+    r = client.post("/responses/batch", json=batch)
+    assert [i["status"] for i in r.json()["items"]] == ["created", "conflict"]
+
+    r = client.post("/responses/batch?upsert=true", json=batch)
+    items = r.json()["items"]
+    assert [i["status"] for i in items] == ["created", "created"]
+    assert items[1]["response"]["response_value"] == 8
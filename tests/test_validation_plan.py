@@ -0,0 +1,107 @@
+import pytest
+
+from domain import models as m
+from domain.schemas import QuestionUpdate
+from services.question import QuestionService
+from services.catalog import question_catalog
+from services.validation import compile_plan
+
+
+def _q(id, number, type, constraints=None, options=None, version_id=1):
+    return m.Question(
+        id=id,
+        version_id=version_id,
+        number=number,
+        text=number,
+        type=type,
+        options=options,
+        constraints=constraints,
+    )
+
+
+def test_compiled_plan_rules():
+    plan = compile_plan(
+        1,
+        [
+            _q(1, "1.1", "boolean"),
+            _q(2, "1.2", "integer", {"min": 1, "max": 20}),
+            _q(3, "1.3", "dropdown", options={"values": ["A", "B"]}),
+            _q(
+                4,
+                "1.4",
+                "integer",
+                {"depends_on": {"question_number": "1.1", "values": [True]}},
+            ),
+            _q(
+                5,
+                "1.5",
+                "float",
+                {"area_total_of": ["1.6", "1.7"], "tolerance": 0.5},
+            ),
+            # legacy rows keep constraints as a JSON string
+            _q(6, "1.6", "text", '{"max_length": 3}'),
+        ],
+    )
+    assert len(plan) == 6
+
+    assert plan.get(1).validate("да", {}) is True
+    assert plan.get(2).validate("7", {}) == 7
+    with pytest.raises(ValueError, match="above max=20"):
+        plan.get(2).validate(21, {})
+    with pytest.raises(ValueError, match="not in allowed options"):
+        plan.get(3).validate("C", {})
+
+    with pytest.raises(ValueError, match="depends_on"):
+        plan.get(4).validate(1, {"num:1.1": False})
+    assert plan.get(4).validate(1, {"num:1.1": True}) == 1
+
+    ctx = {"num:1.6": 10, "num:1.7": 5}
+    assert plan.get(5).validate(15.2, ctx) == 15.2
+    with pytest.raises(ValueError, match="Area total mismatch"):
+        plan.get(5).validate(20, ctx)
+
+    with pytest.raises(ValueError, match="max_length=3"):
+        plan.get(6).validate("abcd", {})
+
+
+def test_plan_dropped_with_catalog_on_question_update(db_session, version, questions):
+    _, q_int = questions
+    question_catalog.invalidate(version.id)
+    loads = []
+
+    def load(version_id):
+        loads.append(version_id)
+        return QuestionService(db_session).get_by_version(version_id)
+
+    plan = question_catalog.get(version.id, load).plan
+    assert question_catalog.get(version.id, load).plan is plan
+    assert loads == [version.id]
+
+    QuestionService(db_session).update(
+        q_int.id, QuestionUpdate(constraints={"min": 1, "max": 3})
+    )
+    fresh = question_catalog.get(version.id, load).plan
+    assert fresh is not plan
+    assert loads == [version.id, version.id]
+    with pytest.raises(ValueError, match="above max=3"):
+        fresh.get(q_int.id).validate(4, {})
+
+
+def test_broken_expression_rejects_answers(caplog):
+    # строки, сохранённые до check_expressions: правило не пропадает молча
+    with caplog.at_level("WARNING", logger="services.validation"):
+        plan = compile_plan(
+            1,
+            [
+                _q(1, "1.1", "integer"),
+                _q(2, "1.2", "integer", {"depends_on": "1.1", "condition": "> and"}),
+                _q(3, "1.3", "text", {"calculation": "II if 1.1 < else I"}),
+            ],
+        )
+    assert len(plan) == 3
+    assert plan.get(1).validate(5, {}) == 5
+    with pytest.raises(ValueError, match="1.2 has an invalid depends_on expression"):
+        plan.get(2).validate(1, {"num:1.1": 5})
+    with pytest.raises(ValueError, match="1.3 has an invalid calculation expression"):
+        plan.get(3).validate("I", {})
+    assert "invalid calculation expression" in caplog.text